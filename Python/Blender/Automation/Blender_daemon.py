@@ -0,0 +1,311 @@
+"""
+================================================================================
+Blender Daemon
+================================================================================
+
+A resident Blender worker: Blender starts once, imports the pipeline once, and
+then serves JSON-RPC 2.0 requests (one JSON document per line) over a Unix
+socket or localhost TCP. Small jobs skip Blender startup, module imports and
+cold caches, so their overhead drops from seconds to milliseconds.
+
+    blender --background --python Blender_daemon.py -- \
+        --address /tmp/blender_donut_daemon.sock --reset-policy disconnect
+
+Clients use Daemon_client.DaemonClient (or Daemon_client.start_daemon() to
+launch one). bpy is not thread-safe, so everything runs on Blender's main
+thread: connections are served one at a time, in the order they arrive, and a
+connection is a session.
+
+METHODS:
+--------
+- ping():                         version and uptime.
+- build_scene(build, use_cache):  main_AutomateGraphicDesignTools.build_scene().
+- render_settings(output_path, ...): set_render_settings().
+- bake(...):                      bake_physics().
+- render(output_path, frame_start, frame_end, ...): render_animation().
+- render_still(path, frame):      renders one frame to an image file.
+- run_pipeline(output_path, params): the whole main() pipeline.
+- stats():                        scene statistics and daemon counters.
+- reset(full):                    restores a clean state now (full: reload factory settings).
+- shutdown():                     stops the daemon.
+
+RESET POLICY:
+-------------
+A clean state is the empty file the daemon started with. Resets restore a
+snapshot of it (Scene_reset: one batch removal of everything created since),
+and only reload factory settings when the snapshot can no longer be restored.
+- "disconnect" (default): reset when a client disconnects after changing the scene.
+- "idle": reset after --idle-seconds without requests.
+- "never": only on an explicit reset().
+
+================================================================================
+"""
+
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import select
+import socket
+import stat
+import sys
+import time
+from typing import Callable, Dict
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bpy # type: ignore
+
+import main_AutomateGraphicDesignTools as pipeline  # type: ignore
+from Daemon_client import DEFAULT_ADDRESS, parse_address  # type: ignore
+from Blender_Global_Functions.Bake_physics_function import bake_physics  # type: ignore
+from Blender_Global_Functions.Icing_generator import clear_icing_cache  # type: ignore
+from Blender_Global_Functions.Material_library import clear_material_cache  # type: ignore
+from Blender_Global_Functions.Render_animation_function import render_animation  # type: ignore
+from Blender_Global_Functions.Render_worker import render_frame  # type: ignore
+from Blender_Global_Functions.Scene_reset import baseline, capture_snapshot, set_baseline  # type: ignore
+from Blender_Global_Functions.Set_render_settings_function import set_render_settings  # type: ignore
+from Blender_Global_Functions.Stage_telemetry import scene_stats  # type: ignore
+
+RESET_POLICIES = ("disconnect", "idle", "never")
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+def _is_socket(path: str) -> bool:
+    """Whether a path is a Unix socket (and not a file or link that merely has its name)."""
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+
+def reset_state(full: bool = False) -> dict:
+    """
+    Restores the clean state: restores the baseline snapshot, or (full=True, no
+    snapshot, or an incomplete one) loads an empty factory-settings file, forgets
+    the in-process caches and takes a new baseline snapshot.
+
+    Returns:
+        dict: {"mode": "snapshot" or "factory", "removed": datablocks removed by a snapshot restore}.
+    """
+    snapshot = baseline()
+    if snapshot is not None and not full:
+        try:
+            restored = snapshot.restore()
+            if not restored["missing"]:
+                return {"mode": "snapshot", "removed": restored["removed"]}
+        except Exception as e:
+            print(f"[daemon] snapshot restore failed: {e}")
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    clear_material_cache()
+    clear_icing_cache()
+    set_baseline(capture_snapshot())
+    return {"mode": "factory", "removed": None}
+
+
+class BlenderDaemon:
+    """
+    Serves pipeline requests in this Blender session.
+
+    Args:
+        address (str): Unix socket path or "host:port".
+        reset_policy (str): "disconnect", "idle" or "never".
+        idle_seconds (float): Idle time before a reset with the "idle" policy.
+        verbose (bool): Whether to log requests and the output of the stages.
+    """
+
+    def __init__(
+        self,
+        address: str = DEFAULT_ADDRESS,
+        reset_policy: str = "disconnect",
+        idle_seconds: float = 30.0,
+        verbose: bool = False
+    ):
+        if reset_policy not in RESET_POLICIES:
+            raise ValueError(f"Invalid reset_policy '{reset_policy}'. Must be one of {RESET_POLICIES}.")
+        self.address = address
+        self.reset_policy = reset_policy
+        self.idle_seconds = idle_seconds
+        self.verbose = verbose
+        self.started = time.time()
+        self.requests = 0
+        self.resets = 0
+        self.dirty = False   # the scene changed since the last reset
+        self.running = False
+        self.methods: Dict[str, Callable] = {
+            "ping": self.ping,
+            "build_scene": self.build_scene,
+            "render_settings": self.render_settings,
+            "bake": self.bake,
+            "render": self.render,
+            "render_still": self.render_still,
+            "run_pipeline": self.run_pipeline,
+            "stats": self.stats,
+            "reset": self.reset,
+            "shutdown": self.shutdown,
+        }
+
+    # --- Methods ---
+
+    def ping(self) -> dict:
+        return {"blender": bpy.app.version_string, "uptime": round(time.time() - self.started, 3)}
+
+    def build_scene(self, build: dict = None, use_cache: bool = True) -> dict:
+        self.dirty = True
+        objects = pipeline.build_scene(use_cache=use_cache, params=pipeline.merge_build_params(build))
+        return {"objects": {role: obj.name for role, obj in (objects or {}).items() if obj is not None}}
+
+    def render_settings(self, output_path: str, **kwargs) -> dict:
+        self.dirty = True
+        set_render_settings(output_path, verbose=self.verbose, **kwargs)
+        return {"output_path": output_path}
+
+    def bake(self, **kwargs) -> dict:
+        self.dirty = True
+        kwargs.setdefault("verbose", self.verbose)
+        return {"ok": bake_physics(**kwargs)}
+
+    def render(self, output_path: str, frame_start: int = 1, frame_end: int = 100, **kwargs) -> dict:
+        self.dirty = True
+        kwargs.setdefault("verbose", self.verbose)
+        return {"ok": render_animation(frame_start=frame_start, frame_end=frame_end, output_path=output_path,
+                                       **kwargs)}
+
+    def render_still(self, path: str, frame: int = 1) -> dict:
+        self.dirty = True
+        return {"path": path, "seconds": round(render_frame(bpy.context.scene, frame, path), 3)}
+
+    def run_pipeline(self, output_path: str, params: dict = None) -> dict:
+        self.dirty = True
+        return {"ok": pipeline.main(output_path, params)}
+
+    def stats(self) -> dict:
+        return {"scene": scene_stats(), "requests": self.requests, "resets": self.resets,
+                "uptime": round(time.time() - self.started, 3), "reset_policy": self.reset_policy}
+
+    def reset(self, full: bool = False) -> dict:
+        start = time.perf_counter()
+        result = reset_state(full)
+        self.resets += 1
+        self.dirty = False
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def shutdown(self) -> dict:
+        self.running = False
+        return {"stopping": True}
+
+    # --- Protocol ---
+
+    def handle(self, line: bytes) -> dict:
+        """Runs one JSON-RPC request line and returns the response object."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": str(e)}}
+        request_id = request.get("id") if isinstance(request, dict) else None
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": INVALID_REQUEST, "message": "Invalid request."}}
+
+        method = self.methods.get(request["method"])
+        if method is None:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method '{request['method']}'."}}
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": INVALID_PARAMS, "message": "Params must be an object."}}
+
+        try:
+            inspect.signature(method).bind(**params)
+        except TypeError as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": INVALID_PARAMS, "message": str(e)}}
+
+        self.requests += 1
+        start = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, \
+                    contextlib.redirect_stdout(sys.stdout if self.verbose else devnull):
+                result = method(**params)
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": SERVER_ERROR, "message": f"{type(e).__name__}: {e}"}}
+        if isinstance(result, dict):
+            result.setdefault("seconds", round(time.perf_counter() - start, 3))
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        with connection, connection.makefile("rb") as reader:
+            for line in reader:
+                if not line.strip():
+                    continue
+                response = self.handle(line)
+                if self.verbose:
+                    print(f"[daemon] {line.strip()[:120]!r} -> {'error' if 'error' in response else 'ok'}")
+                connection.sendall(json.dumps(response, default=str).encode("utf-8") + b"\n")
+                if not self.running:
+                    break
+
+    def _listen(self) -> socket.socket:
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.lexists(target):
+            if not _is_socket(target):
+                raise FileExistsError(f"'{target}' exists and is not a socket; refusing to replace it.")
+            os.remove(target)  # stale socket of a previous daemon
+        server = socket.socket(family, socket.SOCK_STREAM)
+        if family != socket.AF_UNIX:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(target)
+        server.listen(16)
+        return server
+
+    def serve_forever(self) -> None:
+        """Accepts connections until shutdown() is requested."""
+        server = self._listen()
+        self.running = True
+        print(f"Blender daemon listening on {self.address} (reset policy: {self.reset_policy}).")
+        try:
+            while self.running:
+                timeout = self.idle_seconds if self.reset_policy == "idle" and self.dirty else None
+                readable, _, _ = select.select([server], [], [], timeout)
+                if not readable:
+                    self.reset()  # idle timeout
+                    continue
+                connection, _ = server.accept()
+                try:
+                    self._serve_connection(connection)
+                except OSError as e:
+                    print(f"[daemon] connection lost: {e}")
+                if self.reset_policy == "disconnect" and self.dirty and self.running:
+                    self.reset()
+        finally:
+            server.close()
+            family, target = parse_address(self.address)
+            if family == socket.AF_UNIX and _is_socket(target):
+                os.remove(target)
+        print("Blender daemon stopped.")
+
+
+def parse_cli_args(argv=None) -> argparse.Namespace:
+    """Parses the script arguments given after '--' on the Blender command line."""
+    argv = sys.argv if argv is None else argv
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description="Serve pipeline requests from a resident Blender.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="Unix socket path or host:port.")
+    parser.add_argument("--reset-policy", choices=RESET_POLICIES, default="disconnect")
+    parser.add_argument("--idle-seconds", type=float, default=30.0)
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_cli_args()
+    reset_state(full=True)
+    BlenderDaemon(args.address, args.reset_policy, args.idle_seconds, args.verbose).serve_forever()
@@ -0,0 +1,267 @@
+"""
+================================================================================
+Blender Daemon Client
+================================================================================
+
+Client library for Blender_daemon.py, the resident Blender worker. It speaks
+JSON-RPC 2.0 with one JSON document per line over a Unix socket or localhost
+TCP, and runs outside Blender (no bpy needed).
+
+ADDRESSES:
+----------
+- "/tmp/blender_donut_daemon.sock" (any path): Unix socket.
+- "127.0.0.1:8765" (host:port): TCP. Loopback hosts only (anything else is
+  refused); the daemon runs arbitrary pipeline jobs and has no authentication.
+
+USAGE EXAMPLE:
+--------------
+    process = start_daemon()                  # or attach to a running daemon
+    with DaemonClient() as client:
+        client.build_scene(build={"donut": {"major_radius": 1.2}})
+        client.bake()
+        client.render_still("/tmp/donut.png", frame=60)
+        print(client.stats())
+    # Closing the connection resets the daemon's scene (default reset policy)
+
+================================================================================
+"""
+
+import ipaddress
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, List, Optional, Tuple, Union
+
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Blender_daemon.py")
+
+if hasattr(socket, "AF_UNIX"):
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), "blender_donut_daemon.sock")
+else:
+    DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+
+class DaemonError(RuntimeError):
+    """A JSON-RPC error returned by the daemon."""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def _is_loopback(host: str) -> bool:
+    """Whether a host name or IPv4 address is on the loopback interface."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # other host names could resolve to anything
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    Splits an address into a socket family and a socket address.
+
+    Args:
+        address (str): A Unix socket path, or "host:port" with a loopback host.
+
+    Returns:
+        tuple: (socket family, address for connect()/bind()).
+
+    Raises:
+        ValueError: For a TCP host that is not a loopback address (the daemon runs
+            arbitrary pipeline jobs and has no authentication).
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit() and os.sep not in address:
+        host = host or "127.0.0.1"
+        if not _is_loopback(host):
+            raise ValueError(f"Refusing non-loopback daemon address '{address}'; use 127.0.0.1 or localhost.")
+        return socket.AF_INET, (host, int(port))
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError(f"Unix sockets are not available here; use host:port instead of '{address}'.")
+    return socket.AF_UNIX, address
+
+
+class DaemonClient:
+    """
+    A connection to the daemon. Requests on one connection run in order; the daemon
+    serves one connection at a time, so a connection is also a session.
+
+    Args:
+        address (str): Daemon address (see parse_address()).
+        timeout (float, optional): Socket timeout in seconds. None waits forever
+            (renders can take long).
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = None):
+        self.address = address
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+        self._ids = itertools.count(1)
+
+    def connect(self) -> "DaemonClient":
+        """Opens the connection (call() also connects on demand)."""
+        if self._socket is None:
+            family, target = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(target)
+            self._socket = sock
+            self._reader = sock.makefile("rb")
+        return self
+
+    def close(self) -> None:
+        """Closes the connection, which ends the session on the daemon."""
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = self._reader = None
+
+    def __enter__(self) -> "DaemonClient":
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def call(self, method: str, **params) -> Any:
+        """
+        Sends one request and waits for its response.
+
+        Args:
+            method (str): Method name (see Blender_daemon.METHODS).
+            **params: Method arguments.
+
+        Returns:
+            The method's result.
+
+        Raises:
+            DaemonError: If the daemon returned an error.
+            ConnectionError: If the daemon closed the connection.
+        """
+        self.connect()
+        request = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+        self._socket.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("The daemon closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            error = response["error"]
+            raise DaemonError(error.get("code", -32000), error.get("message", ""), error.get("data"))
+        return response.get("result")
+
+    # --- Convenience wrappers for the daemon methods ---
+
+    def ping(self) -> dict:
+        return self.call("ping")
+
+    def build_scene(self, build: Optional[dict] = None, use_cache: bool = True) -> dict:
+        return self.call("build_scene", build=build, use_cache=use_cache)
+
+    def render_settings(self, output_path: str, **kwargs) -> dict:
+        return self.call("render_settings", output_path=output_path, **kwargs)
+
+    def bake(self, **kwargs) -> dict:
+        return self.call("bake", **kwargs)
+
+    def render(self, output_path: str, frame_start: int = 1, frame_end: int = 100, **kwargs) -> dict:
+        return self.call("render", output_path=output_path, frame_start=frame_start, frame_end=frame_end, **kwargs)
+
+    def render_still(self, path: str, frame: int = 1) -> dict:
+        return self.call("render_still", path=path, frame=frame)
+
+    def run_pipeline(self, output_path: str, params: Optional[dict] = None) -> dict:
+        return self.call("run_pipeline", output_path=output_path, params=params)
+
+    def stats(self) -> dict:
+        return self.call("stats")
+
+    def reset(self, full: bool = False) -> dict:
+        return self.call("reset", full=full)
+
+    def shutdown(self) -> dict:
+        return self.call("shutdown")
+
+
+def wait_for_daemon(address: str = DEFAULT_ADDRESS, timeout: float = 60.0, process=None) -> bool:
+    """
+    Waits until the daemon answers a ping.
+
+    Args:
+        address (str): Daemon address.
+        timeout (float): Seconds to wait.
+        process (subprocess.Popen, optional): The daemon process; waiting stops if it exits.
+
+    Returns:
+        bool: True once the daemon answered, False on timeout or if the process exited.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            with DaemonClient(address, timeout=5.0) as client:
+                client.ping()
+            return True
+        except (OSError, ValueError, DaemonError):
+            time.sleep(0.2)
+    return False
+
+
+def start_daemon(
+    address: str = DEFAULT_ADDRESS,
+    blender_binary: str = "blender",
+    reset_policy: str = "disconnect",
+    idle_seconds: float = 30.0,
+    extra_args: Optional[List[str]] = None,
+    timeout: float = 60.0
+) -> subprocess.Popen:
+    """
+    Starts a daemon in the background and waits until it is ready.
+
+    Args:
+        address (str): Address to serve on.
+        blender_binary (str): Blender executable.
+        reset_policy (str): "disconnect", "idle" or "never" (see Blender_daemon).
+        idle_seconds (float): Idle time before a reset with the "idle" policy.
+        extra_args (list, optional): More daemon arguments.
+        timeout (float): Seconds to wait for the daemon to answer.
+
+    Returns:
+        subprocess.Popen: The Blender process.
+
+    Raises:
+        RuntimeError: If the daemon did not come up.
+    """
+    command = [blender_binary, "--background", "--python", DAEMON_SCRIPT, "--",
+               "--address", address, "--reset-policy", reset_policy, "--idle-seconds", str(idle_seconds)]
+    process = subprocess.Popen(command + list(extra_args or []), stdin=subprocess.DEVNULL)
+    if not wait_for_daemon(address, timeout, process):
+        process.kill()
+        raise RuntimeError(f"Blender daemon did not start on {address} (exit code {process.poll()}).")
+    return process
+
+
+if __name__ == "__main__":
+    # python Daemon_client.py <method> ['{"json": "params"}'] [--address ADDRESS]
+    argv = sys.argv[1:]
+    target = DEFAULT_ADDRESS
+    if "--address" in argv:
+        i = argv.index("--address")
+        target = argv[i + 1]
+        del argv[i:i + 2]
+    if not argv:
+        sys.exit("usage: Daemon_client.py <method> [JSON params] [--address ADDRESS]")
+    with DaemonClient(target) as cli_client:
+        print(json.dumps(cli_client.call(argv[0], **(json.loads(argv[1]) if len(argv) > 1 else {})), indent=2))
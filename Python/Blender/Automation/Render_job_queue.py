@@ -0,0 +1,362 @@
+"""
+================================================================================
+Render Job Queue
+================================================================================
+
+A local, persistent queue of pipeline runs backed by one SQLite file, and a
+pool of Blender workers that drains it.
+
+Each job carries the scene parameters (the 'params' JSON understood by
+main_AutomateGraphicDesignTools.py) and an output path. Workers claim the
+highest-priority queued job under a lease, renew the lease with heartbeats
+while Blender runs, and mark the job done or failed. Failed jobs are retried
+until they run out of attempts; jobs whose worker vanished (expired lease) are
+claimed again by another worker. Several pools, even in separate processes,
+can share the same database.
+
+COMMAND LINE:
+-------------
+    python Render_job_queue.py submit --output /renders/a/ --params '{"build": {...}}' --priority 5
+    python Render_job_queue.py list [--state queued]
+    python Render_job_queue.py cancel 12
+    python Render_job_queue.py work --workers 4 --blender /opt/blender/blender
+
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "blender_donut", "render_jobs.sqlite")
+PIPELINE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main_AutomateGraphicDesignTools.py")
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    name          TEXT,
+    params        TEXT NOT NULL,
+    output        TEXT NOT NULL,
+    priority      INTEGER NOT NULL DEFAULT 0,
+    state         TEXT NOT NULL DEFAULT 'queued',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    created       REAL NOT NULL,
+    updated       REAL NOT NULL,
+    last_error    TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, priority DESC, id);
+"""
+
+
+class JobQueue:
+    """
+    The SQLite-backed job table.
+
+    Args:
+        db_path (str): Path of the SQLite file (created if missing).
+        lease_seconds (float): How long a claim stays valid without a heartbeat.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, lease_seconds: float = 120.0):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived autocommit connection per call keeps the queue safe to use
+        # from threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def submit(
+        self,
+        params: dict,
+        output: str,
+        priority: int = 0,
+        name: Optional[str] = None,
+        max_attempts: int = 3
+    ) -> int:
+        """
+        Adds a job to the queue.
+
+        Args:
+            params (dict): Pipeline parameters ({"build": ..., "render": ...}).
+            output (str): Render output path of the job.
+            priority (int): Higher values run first.
+            name (str, optional): Label shown by list().
+            max_attempts (int): Runs before the job is marked failed.
+
+        Returns:
+            int: The job id.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (name, params, output, priority, max_attempts, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, json.dumps(params, sort_keys=True), output, priority, max_attempts, now, now))
+            return cursor.lastrowid
+
+    def claim(self, owner: str) -> Optional[sqlite3.Row]:
+        """
+        Leases the next job: the highest-priority queued job, or a running job whose
+        lease expired (its worker died).
+
+        Args:
+            owner (str): Identifier of the claiming worker.
+
+        Returns:
+            sqlite3.Row or None: The claimed job, or None if nothing is runnable.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE state = ? OR (state = ? AND lease_expires < ?) "
+                    "ORDER BY priority DESC, id LIMIT 1", (QUEUED, RUNNING, now)).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["state"] == RUNNING and row["attempts"] >= row["max_attempts"]:
+                    conn.execute("UPDATE jobs SET state = ?, lease_owner = NULL, updated = ?, "
+                                 "last_error = ? WHERE id = ?",
+                                 (FAILED, now, "lease expired on the last attempt", row["id"]))
+                    conn.execute("COMMIT")
+                    return self.claim(owner)
+                conn.execute(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, updated = ? WHERE id = ?",
+                    (RUNNING, owner, now + self.lease_seconds, now, row["id"]))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+
+    def heartbeat(self, job_id: int, owner: str) -> bool:
+        """
+        Renews a lease.
+
+        Returns:
+            bool: False if the job is no longer leased to this owner (cancelled or
+            taken over), in which case the worker should stop it.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND lease_owner = ? AND state = ?",
+                (now + self.lease_seconds, now, job_id, owner, RUNNING))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, owner: str) -> None:
+        """Marks a leased job as done."""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET state = ?, lease_owner = NULL, updated = ? "
+                         "WHERE id = ? AND lease_owner = ? AND state = ?",
+                         (DONE, time.time(), job_id, owner, RUNNING))
+
+    def fail(self, job_id: int, owner: str, error: str) -> str:
+        """
+        Records a failed run: the job is queued again while attempts remain.
+
+        Returns:
+            str: The new state of the job.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ? "
+                               "AND state = ?", (job_id, owner, RUNNING)).fetchone()
+            if row is None:
+                return CANCELLED
+            state = QUEUED if row["attempts"] < row["max_attempts"] else FAILED
+            conn.execute("UPDATE jobs SET state = ?, lease_owner = NULL, updated = ?, last_error = ? "
+                         "WHERE id = ?", (state, time.time(), error[-2000:], job_id))
+            return state
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancels a queued or running job. Returns True if the job was cancelled."""
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET state = ?, lease_owner = NULL, updated = ? "
+                                  "WHERE id = ? AND state IN (?, ?)",
+                                  (CANCELLED, time.time(), job_id, QUEUED, RUNNING))
+            return cursor.rowcount == 1
+
+    def jobs(self, state: Optional[str] = None) -> List[sqlite3.Row]:
+        """Lists jobs, optionally filtered by state, in claim order."""
+        with self._connect() as conn:
+            if state:
+                return conn.execute("SELECT * FROM jobs WHERE state = ? ORDER BY priority DESC, id",
+                                    (state,)).fetchall()
+            return conn.execute("SELECT * FROM jobs ORDER BY priority DESC, id").fetchall()
+
+
+def pipeline_command(job: sqlite3.Row, blender_binary: str, script: str = PIPELINE_SCRIPT) -> List[str]:
+    """Returns the Blender command line that runs the pipeline for a job."""
+    return [blender_binary, "--background", "--python-exit-code", "1", "--python", script, "--",
+            "--output", job["output"], "--params", job["params"]]
+
+
+def run_job(
+    queue: JobQueue,
+    job: sqlite3.Row,
+    owner: str,
+    blender_binary: str,
+    heartbeat_interval: float = 10.0,
+    log_dir: Optional[str] = None
+) -> str:
+    """
+    Runs one claimed job in a Blender process, sending heartbeats while it runs and
+    stopping it if the job is cancelled.
+
+    Returns:
+        str: The final state recorded for the job.
+    """
+    log_path = os.path.join(log_dir, f"job_{job['id']}_attempt_{job['attempts']}.log") if log_dir else os.devnull
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(pipeline_command(job, blender_binary), stdout=log, stderr=subprocess.STDOUT)
+        while True:
+            try:
+                process.wait(timeout=heartbeat_interval)
+                break
+            except subprocess.TimeoutExpired:
+                if not queue.heartbeat(job["id"], owner):
+                    process.kill()
+                    process.wait()
+                    return CANCELLED
+
+    if process.returncode == 0:
+        queue.complete(job["id"], owner)
+        return DONE
+    error = f"exit code {process.returncode}"
+    if log_dir:
+        with open(log_path, "r", errors="replace") as log:
+            error += ": " + log.read()[-1000:]
+    return queue.fail(job["id"], owner, error)
+
+
+def run_pool(
+    queue: JobQueue,
+    workers: int = 2,
+    blender_binary: str = "blender",
+    heartbeat_interval: float = 10.0,
+    poll_interval: float = 5.0,
+    exit_when_idle: bool = False,
+    log_dir: Optional[str] = None
+) -> None:
+    """
+    Runs a pool of worker threads, each driving one Blender process at a time.
+
+    Args:
+        queue (JobQueue): The job queue.
+        workers (int): Number of concurrent Blender processes.
+        blender_binary (str): Blender executable.
+        heartbeat_interval (float): Seconds between lease renewals (keep it well below
+            the queue's lease_seconds).
+        poll_interval (float): Seconds to wait when the queue is empty.
+        exit_when_idle (bool): Stop once no job is runnable instead of polling forever.
+        log_dir (str, optional): Directory for per-attempt Blender logs.
+    """
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    host = f"{socket.gethostname()}:{os.getpid()}"
+
+    def work(index: int) -> None:
+        owner = f"{host}:{index}"
+        while True:
+            job = queue.claim(owner)
+            if job is None:
+                if exit_when_idle:
+                    return
+                time.sleep(poll_interval)
+                continue
+            print(f"[worker {index}] job {job['id']} ({job['name'] or job['output']}), attempt {job['attempts']}")
+            state = run_job(queue, job, owner, blender_binary, heartbeat_interval, log_dir)
+            print(f"[worker {index}] job {job['id']} -> {state}")
+
+    threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        print("Stopping workers; running jobs will be picked up again once their lease expires.")
+
+
+def _print_jobs(rows: List[sqlite3.Row]) -> None:
+    print(f"{'id':>5}  {'state':<9}  {'prio':>4}  {'tries':>5}  {'name / output'}")
+    for row in rows:
+        tries = f"{row['attempts']}/{row['max_attempts']}"
+        print(f"{row['id']:>5}  {row['state']:<9}  {row['priority']:>4}  {tries:>5}  {row['name'] or row['output']}")
+        if row["state"] == FAILED and row["last_error"]:
+            print(f"       last error: {row['last_error'].splitlines()[0]}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local render job queue for the donut pipeline.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite queue file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue a job.")
+    submit.add_argument("--output", required=True, help="Render output path.")
+    submit.add_argument("--params", default="{}", help="Pipeline parameters as JSON.")
+    submit.add_argument("--priority", type=int, default=0)
+    submit.add_argument("--name", default=None)
+    submit.add_argument("--max-attempts", type=int, default=3)
+
+    listing = commands.add_parser("list", help="Show jobs.")
+    listing.add_argument("--state", choices=[QUEUED, RUNNING, DONE, FAILED, CANCELLED])
+
+    cancel = commands.add_parser("cancel", help="Cancel a queued or running job.")
+    cancel.add_argument("job_id", type=int)
+
+    work = commands.add_parser("work", help="Run a pool of Blender workers.")
+    work.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 4))
+    work.add_argument("--blender", default="blender", help="Blender executable.")
+    work.add_argument("--lease", type=float, default=120.0, help="Lease length in seconds.")
+    work.add_argument("--heartbeat", type=float, default=10.0, help="Heartbeat interval in seconds.")
+    work.add_argument("--exit-when-idle", action="store_true")
+    work.add_argument("--log-dir", default=None)
+
+    args = parser.parse_args(argv)
+    queue = JobQueue(args.db, lease_seconds=getattr(args, "lease", 120.0))
+
+    if args.command == "submit":
+        job_id = queue.submit(json.loads(args.params), args.output, args.priority, args.name, args.max_attempts)
+        print(f"Submitted job {job_id}.")
+    elif args.command == "list":
+        _print_jobs(queue.jobs(args.state))
+    elif args.command == "cancel":
+        if not queue.cancel(args.job_id):
+            print(f"Job {args.job_id} is not queued or running.")
+            return 1
+        print(f"Cancelled job {args.job_id}.")
+    elif args.command == "work":
+        run_pool(queue, args.workers, args.blender, args.heartbeat,
+                 exit_when_idle=args.exit_when_idle, log_dir=args.log_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
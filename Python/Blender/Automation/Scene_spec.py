@@ -0,0 +1,480 @@
+"""
+================================================================================
+Declarative Scene Spec
+================================================================================
+
+Describes the donut pipeline as data: a spec file (JSON, or TOML with Python
+3.11+) lists the stages with the Global Function each one calls, its
+parameters and its dependencies. SceneSpecExecutor orders the stages into a
+DAG, fingerprints each one and re-executes only the stages whose fingerprint
+changed since the last run. A stage's fingerprint covers its function, its
+parameters, the sources of the Global Functions modules that function uses and
+the fingerprints of the stages it depends on, so a change flows downstream and
+nowhere else: a new light energy (or an edit to Add_light_function.py)
+re-creates the light and re-renders, but neither re-bakes the physics nor
+regenerates the sprinkles.
+
+SPEC FORMAT:
+------------
+    {
+      "stages": {
+        "donut":  {"function": "add_donut", "params": {"major_radius": 1.2}},
+        "icing_and_sprinkles": {"function": "add_icing_and_sprinkles",
+                                "params": {"seed": 7}, "inputs": {"donut_obj": "donut"}},
+        "bake":   {"function": "bake_physics", "after": ["donut"]},
+        ...
+      }
+    }
+
+- "function": a key of STAGE_FUNCTIONS.
+- "params":   keyword arguments (JSON lists become tuples).
+- "inputs":   {argument: stage}: passes the object another stage returned.
+- "after":    stages this one depends on without taking their result (e.g. the
+              physics bake depends on the stages that create rigid bodies).
+Automation/donut_scene.json is the spec of main().
+
+RE-EXECUTION:
+-------------
+Before a stage runs again, every datablock it created last time (objects,
+collections, meshes, materials, images, actions, ...) is removed in one
+batch_remove, the materials it changed on upstream objects are put back, and
+its reset hook undoes other changes to upstream objects (e.g. the camera
+keyframes of a fly-through). Stages that change upstream
+objects irreversibly (level of detail) also re-run the stages they depend on.
+
+Within one Blender session the executor keeps its state in memory (e.g. in a
+daemon or a variant loop). With a state directory the scene is saved there as
+scene.blend next to state.json after every run, and the next process continues
+from it, so the saved renders are only redone when something they show changed.
+
+Command line (arguments after '--' are read by this script):
+
+    blender --background --python Scene_spec.py -- --spec donut_scene.json \
+        --state-dir /tmp/donut_state --params '{"light": {"energy": 500}}'
+
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Make the 'Blender_Global_Functions' package importable relative to this script as well.
+BLENDER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BLENDER_DIR not in sys.path:
+    sys.path.append(BLENDER_DIR)
+
+import bpy # type: ignore
+
+from Blender_Global_Functions.Add_camera_function import add_camera, animate_camera_fly_through  # type: ignore
+from Blender_Global_Functions.Add_donut_function import add_donut  # type: ignore
+from Blender_Global_Functions.Add_ground_function import add_ground  # type: ignore
+from Blender_Global_Functions.Add_light_function import add_light  # type: ignore
+from Blender_Global_Functions.Bake_physics_function import bake_physics  # type: ignore
+from Blender_Global_Functions.Blender_clear_scene_function import clear_scene  # type: ignore
+from Blender_Global_Functions.Cache_utils import code_fingerprint, stable_hash  # type: ignore
+from Blender_Global_Functions.Frosting_and_sprinkles import add_icing_and_sprinkles  # type: ignore
+from Blender_Global_Functions.Level_of_detail import apply_level_of_detail  # type: ignore
+from Blender_Global_Functions.Modifier_freeze import freeze_modifiers, thaw_modifiers  # type: ignore
+from Blender_Global_Functions.Render_animation_function import render_animation  # type: ignore
+from Blender_Global_Functions.Scene_build_cache import tag_role  # type: ignore
+from Blender_Global_Functions.Scene_reset import capture_snapshot, set_baseline  # type: ignore
+from Blender_Global_Functions.Set_render_settings_function import set_render_settings  # type: ignore
+from Blender_Global_Functions.Stage_telemetry import StageTelemetry, stage_scope  # type: ignore
+from Blender_Global_Functions.Texture_bake import bake_procedural_textures, restore_procedural_materials  # type: ignore
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "donut_scene.json")
+STATE_FORMAT = 1
+
+
+def as_args(value):
+    """JSON lists become tuples, which is what the Global Functions expect for vectors and colors."""
+    if isinstance(value, list):
+        return tuple(as_args(v) for v in value)
+    if isinstance(value, dict):
+        return {k: as_args(v) for k, v in value.items()}
+    return value
+
+
+def alive(datablock) -> bool:
+    """False for datablocks Blender already removed (their Python wrapper is dangling)."""
+    try:
+        datablock.name
+        return True
+    except ReferenceError:
+        return False
+
+
+def _clear_camera_animation(inputs: Dict[str, Any]) -> None:
+    camera = inputs.get("camera_obj")
+    if camera is not None and alive(camera):
+        camera.animation_data_clear()
+
+
+class StageFunction(NamedTuple):
+    """How the executor calls, checks and undoes one Global Function."""
+    call: Callable
+    ok: Callable[[Any], bool]                                   # whether a result means success
+    reset: Optional[Callable[[Dict[str, Any]], None]] = None    # undoes changes to its inputs
+    rebuilds_upstream: bool = False                             # re-running needs fresh dependencies
+
+
+def _is_object(result) -> bool:
+    return result is not None
+
+
+def _not_false(result) -> bool:
+    return result is not False
+
+
+STAGE_FUNCTIONS: Dict[str, StageFunction] = {
+    "add_ground": StageFunction(add_ground, _is_object),
+    "add_donut": StageFunction(add_donut, _is_object),
+    "add_icing_and_sprinkles": StageFunction(add_icing_and_sprinkles, lambda result: bool(result and all(result))),
+    "add_camera": StageFunction(add_camera, _is_object),
+    "animate_camera_fly_through": StageFunction(animate_camera_fly_through, _not_false, _clear_camera_animation),
+    "add_light": StageFunction(add_light, _is_object),
+    "set_render_settings": StageFunction(set_render_settings, _not_false),
+    "bake_physics": StageFunction(bake_physics, bool),
+    "render_animation": StageFunction(render_animation, bool),
+    "bake_procedural_textures": StageFunction(bake_procedural_textures, _not_false,
+                                              lambda inputs: restore_procedural_materials()),
+    "apply_level_of_detail": StageFunction(apply_level_of_detail, _not_false, rebuilds_upstream=True),
+    "freeze_modifiers": StageFunction(freeze_modifiers, _not_false, lambda inputs: thaw_modifiers()),
+}
+
+
+def stage_dependencies(stage_spec: dict) -> List[str]:
+    """Stages a stage depends on: its inputs, then its 'after' stages, without duplicates."""
+    dependencies = list(stage_spec.get("inputs", {}).values()) + list(stage_spec.get("after", []))
+    return list(dict.fromkeys(dependencies))
+
+
+def stage_order(spec: dict) -> List[str]:
+    """
+    Orders the stages of a spec so every stage comes after its dependencies;
+    independent stages keep their order in the spec.
+
+    Raises:
+        ValueError: For unknown dependencies or a dependency cycle.
+    """
+    stages = spec["stages"]
+    remaining = {name: set(stage_dependencies(stage)) for name, stage in stages.items()}
+    for name, dependencies in remaining.items():
+        unknown = dependencies - set(stages)
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s) {sorted(unknown)}.")
+    order: List[str] = []
+    while remaining:
+        ready = [name for name in stages if name in remaining and not remaining[name] - set(order)]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages {sorted(remaining)}.")
+        order.append(ready[0])
+        del remaining[ready[0]]
+    return order
+
+
+def load_scene_spec(path: str) -> dict:
+    """
+    Reads and validates a scene spec file.
+
+    Args:
+        path (str): A .json or .toml file.
+
+    Returns:
+        dict: The spec.
+
+    Raises:
+        ValueError: For an unreadable format or an invalid spec.
+    """
+    if path.lower().endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML scene specs need Python 3.11+ (tomllib); use JSON instead.")
+        with open(path, "rb") as handle:
+            spec = tomllib.load(handle)
+    else:
+        with open(path, "r", encoding="utf-8") as handle:
+            spec = json.load(handle)
+
+    if not isinstance(spec.get("stages"), dict) or not spec["stages"]:
+        raise ValueError(f"Scene spec '{path}' has no stages.")
+    for name, stage in spec["stages"].items():
+        if stage.get("function") not in STAGE_FUNCTIONS:
+            raise ValueError(f"Stage '{name}' has an invalid function '{stage.get('function')}'. "
+                             f"Must be one of {sorted(STAGE_FUNCTIONS)}.")
+    stage_order(spec)
+    return spec
+
+
+def apply_overrides(spec: dict, overrides: Optional[dict] = None) -> dict:
+    """Returns a copy of a spec with per-stage parameter overrides ({stage: {param: value}})."""
+    spec = json.loads(json.dumps(spec))
+    for name, params in (overrides or {}).items():
+        if name not in spec["stages"]:
+            raise ValueError(f"Unknown stage '{name}'. Expected one of {sorted(spec['stages'])}.")
+        spec["stages"][name].setdefault("params", {}).update(params)
+    return spec
+
+
+def stage_keys(spec: dict) -> Dict[str, str]:
+    """
+    Fingerprints every stage: function, parameters, the sources of the Global Functions
+    modules its function uses (see Cache_utils.module_sources) and the fingerprints of
+    its dependencies.
+    """
+    code: Dict[str, str] = {}
+    keys: Dict[str, str] = {}
+    for name in stage_order(spec):
+        stage = spec["stages"][name]
+        function = stage["function"]
+        if function not in code:
+            code[function] = code_fingerprint([STAGE_FUNCTIONS[function].call])
+        keys[name] = stable_hash({
+            "function": function,
+            "params": stage.get("params", {}),
+            "inputs": stage.get("inputs", {}),
+            "code": code[function],
+            "dependencies": [keys[dependency] for dependency in stage_dependencies(stage)],
+        })
+    return keys
+
+
+class SceneSpecExecutor:
+    """
+    Runs scene specs incrementally in the current Blender session.
+
+    Args:
+        state_dir (str, optional): Directory to keep the scene (scene.blend) and the
+            stage state (state.json) in between processes. None keeps it in memory only.
+        verbose (bool): Whether to print progress.
+    """
+
+    def __init__(self, state_dir: Optional[str] = None, verbose: bool = True):
+        self.state_dir = state_dir
+        self.verbose = verbose
+        self.stages: Dict[str, dict] = {}   # per executed stage: key, created, materials, result, inputs
+        self._loaded = False
+
+    # --- State -------------------------------------------------------------------------
+
+    def _state_paths(self):
+        return os.path.join(self.state_dir, "scene.blend"), os.path.join(self.state_dir, "state.json")
+
+    def _load_state(self) -> None:
+        """Continues from the saved scene and stage state, or starts from an empty scene."""
+        self._loaded = True
+        if self.state_dir:
+            blend_path, state_path = self._state_paths()
+            if os.path.isfile(blend_path) and os.path.isfile(state_path):
+                with open(state_path, "r", encoding="utf-8") as handle:
+                    state = json.load(handle)
+                if state.get("format") == STATE_FORMAT:
+                    bpy.ops.wm.open_mainfile(filepath=blend_path)
+                    set_baseline(None)  # a snapshot of the previous file cannot be restored here
+                    self.stages = state["stages"]
+                    if self.verbose:
+                        print(f"Scene spec state loaded ({len(self.stages)} stage(s)): {blend_path}")
+                    return
+        clear_scene(verbose=self.verbose)
+        self.stages = {}
+
+    def _save_state(self) -> None:
+        if not self.state_dir:
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        blend_path, state_path = self._state_paths()
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"format": STATE_FORMAT, "stages": self.stages}, handle, indent=1)
+        os.replace(tmp_path, state_path)
+
+    # --- Planning ----------------------------------------------------------------------
+
+    def plan(self, spec: dict) -> List[str]:
+        """
+        Returns the stages a run of 'spec' would execute, in order: stages whose
+        fingerprint changed (or never ran), everything downstream of them, and the
+        dependencies of dirty stages that change their inputs irreversibly.
+        """
+        keys = stage_keys(spec)
+        order = stage_order(spec)
+        dirty = {name for name in order if self.stages.get(name, {}).get("key") != keys[name]}
+        changed = True
+        while changed:
+            changed = False
+            for name in order:
+                stage = spec["stages"][name]
+                dependencies = stage_dependencies(stage)
+                if name not in dirty and any(dependency in dirty for dependency in dependencies):
+                    dirty.add(name)
+                    changed = True
+                if name in dirty and STAGE_FUNCTIONS[stage["function"]].rebuilds_upstream:
+                    missing = set(dependencies) - dirty
+                    if missing:
+                        dirty |= missing
+                        changed = True
+        return [name for name in order if name in dirty]
+
+    # --- Execution ---------------------------------------------------------------------
+
+    def _result_object(self, name: str):
+        result = self.stages.get(name, {}).get("result")
+        return bpy.data.objects.get(result) if result else None
+
+    def _resolve_inputs(self, inputs: Dict[str, str]) -> Dict[str, Any]:
+        return {argument: self._result_object(stage) for argument, stage in inputs.items()}
+
+    def _reset_stage(self, name: str) -> None:
+        """Undoes what the last run of a stage did to the scene."""
+        state = self.stages.pop(name, None)
+        if state is None:
+            return
+        function = STAGE_FUNCTIONS.get(state.get("function"))
+        if function is not None and function.reset is not None:
+            function.reset(self._resolve_inputs(state.get("inputs", {})))
+        datablocks = [getattr(bpy.data, kind).get(datablock) for kind, datablock in state.get("created", [])]
+        datablocks = [d for d in datablocks if d is not None and alive(d)]
+        if datablocks:
+            bpy.data.batch_remove(datablocks)
+
+    def _restore_upstream_materials(self, stage: dict) -> None:
+        """Puts back the materials the dependencies' objects had after they were built."""
+        for dependency in stage_dependencies(stage):
+            for obj_name, materials in self.stages.get(dependency, {}).get("materials", []):
+                obj = bpy.data.objects.get(obj_name)
+                if obj is None:
+                    continue
+                for slot, material in zip(obj.material_slots, materials):
+                    slot.material = bpy.data.materials.get(material) if material else None
+
+    def _run_stage(self, name: str, stage: dict, key: str) -> None:
+        function = STAGE_FUNCTIONS[stage["function"]]
+        self._restore_upstream_materials(stage)
+        kwargs = as_args(stage.get("params", {}))
+        kwargs.update(self._resolve_inputs(stage.get("inputs", {})))
+
+        snapshot = capture_snapshot()
+        try:
+            result = function.call(**kwargs)
+        finally:
+            # Every datablock type (meshes, materials, images, actions, ...), and recorded even
+            # on failure, so the next run removes what a failed attempt left behind
+            created = snapshot.created_by_collection()
+            self.stages[name] = {
+                "key": None,
+                "function": stage["function"],
+                "inputs": stage.get("inputs", {}),
+                "created": [[kind, d.name] for kind, blocks in created.items() for d in blocks],
+                "materials": [[d.name, [slot.material.name if slot.material else None for slot in d.material_slots]]
+                              for d in created.get("objects", [])],
+                "result": None,
+            }
+        if not function.ok(result):
+            raise RuntimeError(f"Stage '{name}' ({stage['function']}) failed.")
+        if isinstance(result, bpy.types.Object):
+            self.stages[name]["result"] = tag_role(result, name).name
+        self.stages[name]["key"] = key
+
+    def run(self, spec: dict, overrides: Optional[dict] = None, telemetry: StageTelemetry = None) -> List[str]:
+        """
+        Brings the scene up to date with a spec, executing only the stages that changed.
+
+        Args:
+            spec (dict): A spec from load_scene_spec().
+            overrides (dict, optional): Per-stage parameter overrides.
+            telemetry (StageTelemetry, optional): Records a telemetry line per executed stage.
+
+        Returns:
+            list: The executed stages, in order.
+
+        Raises:
+            RuntimeError: If a stage fails (the stages before it stay up to date).
+        """
+        spec = apply_overrides(spec, overrides)
+        if not self._loaded:
+            self._load_state()
+
+        # Stages dropped from the spec are undone like changed ones
+        for name in [name for name in self.stages if name not in spec["stages"]]:
+            self._reset_stage(name)
+
+        run = self.plan(spec)
+        keys = stage_keys(spec)
+        for name in reversed(run):
+            self._reset_stage(name)
+        if self.verbose:
+            skipped = [name for name in stage_order(spec) if name not in run]
+            print(f"Scene spec: running {run or 'nothing'}; up to date: {skipped or 'nothing'}.")
+
+        try:
+            for name in run:
+                with stage_scope(telemetry, name) as record:
+                    self._run_stage(name, spec["stages"][name], keys[name])
+                    record["function"] = spec["stages"][name]["function"]
+                if self.verbose:
+                    print(f"Stage '{name}' done.")
+        finally:
+            self._save_state()
+        return run
+
+
+def run_scene_spec(
+    spec_path: str = DEFAULT_SPEC_PATH,
+    overrides: Optional[dict] = None,
+    output_path: Optional[str] = None,
+    state_dir: Optional[str] = None,
+    telemetry: StageTelemetry = None
+) -> bool:
+    """
+    Runs a scene spec file once (the command line entry point).
+
+    Args:
+        spec_path (str): The spec file.
+        overrides (dict, optional): Per-stage parameter overrides.
+        output_path (str, optional): Replaces the 'output_path' parameter of every stage that has one.
+        state_dir (str, optional): State directory (see SceneSpecExecutor).
+        telemetry (StageTelemetry, optional): Records a telemetry line per executed stage.
+
+    Returns:
+        bool: True if every stage is up to date.
+    """
+    try:
+        spec = load_scene_spec(spec_path)
+        overrides = dict(overrides or {})
+        if output_path:
+            for name, stage in spec["stages"].items():
+                if "output_path" in stage.get("params", {}):
+                    overrides[name] = {**overrides.get(name, {}), "output_path": output_path}
+        SceneSpecExecutor(state_dir).run(spec, overrides, telemetry)
+        return True
+    except Exception as e:
+        print(f"\n[ERROR] Scene spec failed: {e}")
+        return False
+
+
+def parse_cli_args(argv=None) -> argparse.Namespace:
+    """Parses the script arguments given after '--' on the Blender command line."""
+    argv = sys.argv if argv is None else argv
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description="Run a declarative donut scene spec incrementally.")
+    parser.add_argument("--spec", default=DEFAULT_SPEC_PATH, help="Scene spec file (.json or .toml).")
+    parser.add_argument("--params", default="{}", help='JSON per-stage overrides: {"stage": {"param": value}}.')
+    parser.add_argument("--output", default=None, help="Replaces the output_path parameter of the stages.")
+    parser.add_argument("--state-dir", default=None,
+                        help="Keep the scene and stage fingerprints here, so the next run only redoes what changed.")
+    parser.add_argument("--telemetry", default=None, help="Append one JSON line per executed stage to this file.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_cli_args()
+    run_telemetry = StageTelemetry(args.telemetry) if args.telemetry else None
+    ok = run_scene_spec(args.spec, json.loads(args.params), args.output, args.state_dir, run_telemetry)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,323 @@
+"""
+================================================================================
+Donut Variant Sweep
+================================================================================
+
+Builds and renders many variants of the donut scene in one Blender process.
+Blender startup, module imports, clearing the scene and the render setup are
+paid once; after that every variant only rebuilds the stages whose arguments
+differ from the previous variant (plus the stages that depend on them):
+
+    ground, donut, icing_and_sprinkles (needs donut), camera,
+    fly_through (needs camera and donut), light
+
+A stage is rebuilt by removing every datablock it created (objects, meshes,
+materials, images, actions, ...; one batch_remove) and running it again.
+Within a variant, materials and icing shells come from the in-process material
+and icing caches, so stages with identical specs share them, and the physics
+bake is only redone when a rigid body stage (ground, donut) was
+rebuilt; identical rigid body setups replay from the physics bake cache.
+
+Variants are given as a list of per-stage overrides of BUILD_PARAMS, or as a
+grid that expands to every combination. By default they are reordered so the
+costliest stages change least often; results keep their original index.
+
+Command line (arguments after '--' are read by this script):
+
+    blender --background --python Variant_sweep.py -- --output /tmp/variants \
+        --grid '{"donut": {"major_radius": [1.0, 1.2]}, "icing_and_sprinkles": {"seed": [1, 2, 3]}}'
+
+Every variant renders to <output>/variant_<index>/ (a still of --frame, or the
+animation with --render animation). <output>/sweep.json lists the variants with
+their parameters, rebuilt stages, timings and outputs.
+
+================================================================================
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bpy # type: ignore
+
+import main_AutomateGraphicDesignTools as pipeline  # type: ignore
+from Scene_spec import alive, as_args  # type: ignore
+from Blender_Global_Functions.Blender_clear_scene_function import clear_scene  # type: ignore
+from Blender_Global_Functions.Add_donut_function import add_donut  # type: ignore
+from Blender_Global_Functions.Add_camera_function import add_camera, animate_camera_fly_through  # type: ignore
+from Blender_Global_Functions.Add_light_function import add_light  # type: ignore
+from Blender_Global_Functions.Add_ground_function import add_ground  # type: ignore
+from Blender_Global_Functions.Frosting_and_sprinkles import add_icing_and_sprinkles  # type: ignore
+from Blender_Global_Functions.Bake_physics_function import bake_physics  # type: ignore
+from Blender_Global_Functions.Set_render_settings_function import set_render_settings  # type: ignore
+from Blender_Global_Functions.Render_animation_function import render_animation  # type: ignore
+from Blender_Global_Functions.Render_sequence import frame_file  # type: ignore
+from Blender_Global_Functions.Render_worker import render_frame  # type: ignore
+from Blender_Global_Functions.Scene_build_cache import tag_role  # type: ignore
+from Blender_Global_Functions.Scene_reset import capture_snapshot  # type: ignore
+
+STAGE_ORDER = ("ground", "donut", "icing_and_sprinkles", "camera", "fly_through", "light")
+STAGE_DEPENDENCIES = {"icing_and_sprinkles": ("donut",), "fly_through": ("camera", "donut")}
+PHYSICS_STAGES = {"ground", "donut"}  # stages that create rigid bodies
+
+# Variants are sorted by these stages' arguments, costliest first
+SWEEP_ORDER = ("donut", "ground", "icing_and_sprinkles", "camera", "fly_through", "light")
+
+
+def expand_grid(grid: Dict[str, Dict[str, list]]) -> List[dict]:
+    """
+    Expands a parameter grid into one override dict per combination.
+
+    Args:
+        grid (dict): {stage: {argument: [values, ...]}}. Every argument maps to a list
+            of candidate values (a color is one value: [[1, 0, 0, 1], [0, 0, 1, 1]]).
+
+    Returns:
+        list: {stage: {argument: value}} per combination, in itertools.product order.
+    """
+    axes = [(stage, name, values) for stage, arguments in grid.items() for name, values in arguments.items()]
+    variants = []
+    for combination in itertools.product(*(values for _, _, values in axes)):
+        overrides: Dict[str, dict] = {}
+        for (stage, name, _), value in zip(axes, combination):
+            overrides.setdefault(stage, {})[name] = value
+        variants.append(overrides)
+    return variants
+
+
+def order_variants(variants: List[dict]) -> List[int]:
+    """
+    Orders variants so consecutive ones share as many costly stages as possible.
+
+    Returns:
+        list: Indices into 'variants', in build order.
+    """
+    params = [pipeline.merge_build_params(v) for v in variants]
+
+    def sort_key(index):
+        return [json.dumps(params[index][stage], sort_keys=True) for stage in SWEEP_ORDER]
+    return sorted(range(len(variants)), key=sort_key)
+
+
+class VariantSweep:
+    """
+    Builds donut scene variants incrementally in the current Blender session.
+
+    Args:
+        output_dir (str): Directory of the variant renders and sweep.json.
+        render (str or None): "still" renders 'frame' of every variant, "animation"
+            renders the frame range, None only builds (and bakes).
+        frame (int, optional): Frame of the stills. Defaults to the scene's middle frame.
+        render_settings (dict, optional): Keyword arguments of set_render_settings(),
+            applied once.
+        render_kwargs (dict, optional): Keyword arguments of render_animation().
+        bake (bool): Whether to bake physics for each variant.
+        verbose (bool): Whether to print progress.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        render: Optional[str] = "still",
+        frame: Optional[int] = None,
+        render_settings: Optional[dict] = None,
+        render_kwargs: Optional[dict] = None,
+        bake: bool = True,
+        verbose: bool = True
+    ):
+        if render not in {"still", "animation", None}:
+            raise ValueError(f"Invalid render mode '{render}'. Must be 'still', 'animation' or None.")
+        self.output_dir = output_dir
+        self.render = render
+        self.frame = frame
+        self.render_settings = render_settings or {}
+        self.render_kwargs = render_kwargs or {}
+        self.bake = bake
+        self.verbose = verbose
+        self.params: Optional[dict] = None      # build params of the scene as it is now
+        self.objects: Dict[str, object] = {}    # role objects (ground, donut, camera, light)
+        self._created: Dict[str, list] = {}     # datablocks each stage created
+        self._materials: Dict[str, list] = {}   # (object, slot materials) after each stage
+        self._still_format = "PNG"
+
+    def setup(self) -> None:
+        """Clears the scene and applies the render settings (once per sweep)."""
+        clear_scene(verbose=self.verbose)
+        os.makedirs(self.output_dir, exist_ok=True)
+        settings = dict(self.render_settings)
+        if self.render == "still":
+            settings.setdefault("file_format", self._still_format)
+        set_render_settings(os.path.join(self.output_dir, ""), verbose=self.verbose, **settings)
+        self._still_format = bpy.context.scene.render.image_settings.file_format
+        self.params = None
+
+    def changed_stages(self, params: dict) -> List[str]:
+        """Stages to rebuild to go from the current scene to 'params', in build order."""
+        if self.params is None:
+            return list(STAGE_ORDER)
+        changed = {stage for stage in STAGE_ORDER if params[stage] != self.params[stage]}
+        for stage in STAGE_ORDER:
+            if any(dependency in changed for dependency in STAGE_DEPENDENCIES.get(stage, ())):
+                changed.add(stage)
+        return [stage for stage in STAGE_ORDER if stage in changed]
+
+    def _remove_stage(self, stage: str) -> None:
+        datablocks = [d for d in self._created.pop(stage, []) if alive(d)]
+        if datablocks:
+            bpy.data.batch_remove(datablocks)
+        self._materials.pop(stage, None)
+
+    def _restore_upstream_materials(self, stage: str) -> None:
+        """Undoes material changes a stage made to objects of the stages it depends on."""
+        for dependency in STAGE_DEPENDENCIES.get(stage, ()):
+            for obj, materials in self._materials.get(dependency, []):
+                if alive(obj):
+                    for slot, material in zip(obj.material_slots, materials):
+                        slot.material = material
+
+    def _call_stage(self, stage: str, kwargs: dict):
+        objects = self.objects
+        if stage == "ground":
+            objects["ground"] = tag_role(add_ground(**kwargs), "ground")
+        elif stage == "donut":
+            objects["donut"] = tag_role(add_donut(**kwargs), "donut")
+        elif stage == "icing_and_sprinkles":
+            add_icing_and_sprinkles(objects["donut"], **kwargs)
+        elif stage == "camera":
+            objects["camera"] = tag_role(add_camera(**kwargs), "camera")
+        elif stage == "fly_through":
+            # A reused camera keeps keyframes of the previous fly-through otherwise
+            objects["camera"].animation_data_clear()
+            animate_camera_fly_through(objects["camera"], objects["donut"], **kwargs)
+        elif stage == "light":
+            objects["light"] = tag_role(add_light(**kwargs), "light")
+
+    def _run_stage(self, stage: str, kwargs: dict) -> None:
+        self._restore_upstream_materials(stage)
+        snapshot = capture_snapshot()
+        self._call_stage(stage, as_args(kwargs))
+        # Every datablock type: meshes (sprinkle prototypes, instancer points), materials,
+        # images and actions go with the stage's objects, so rebuilds do not pile up orphans
+        created = snapshot.created()
+        self._created[stage] = created
+        self._materials[stage] = [(obj, [slot.material for slot in obj.material_slots])
+                                  for obj in created if isinstance(obj, bpy.types.Object)]
+
+    def build(self, overrides: Optional[dict] = None) -> List[str]:
+        """
+        Turns the current scene into a variant, rebuilding only the changed stages.
+
+        Args:
+            overrides (dict, optional): Per-stage overrides of BUILD_PARAMS.
+
+        Returns:
+            list: The rebuilt stages.
+        """
+        params = pipeline.merge_build_params(overrides)
+        rebuild = self.changed_stages(params)
+        for stage in reversed(rebuild):
+            self._remove_stage(stage)
+        for stage in rebuild:
+            self._run_stage(stage, params[stage])
+        bpy.context.view_layer.update()
+
+        if self.bake and (self.params is None or PHYSICS_STAGES & set(rebuild)):
+            if not bake_physics(verbose=self.verbose):
+                raise RuntimeError("Physics baking failed.")
+        self.params = params
+        return rebuild
+
+    def render_variant(self, index: int) -> Optional[str]:
+        """Renders the current scene as variant 'index'; returns the output path."""
+        variant_dir = os.path.join(self.output_dir, f"variant_{index:04d}")
+        scene = bpy.context.scene
+        if self.render == "still":
+            frame = self.frame if self.frame is not None else (scene.frame_start + scene.frame_end) // 2
+            path = frame_file(variant_dir, frame, self._still_format)
+            render_frame(scene, frame, path)
+            return path
+        if self.render == "animation":
+            if not render_animation(output_path=os.path.join(variant_dir, ""), verbose=self.verbose,
+                                    **self.render_kwargs):
+                raise RuntimeError("Rendering failed.")
+            return variant_dir
+        return None
+
+    def run(self, variants: List[dict], reorder: bool = True) -> List[dict]:
+        """
+        Builds (and renders) every variant and writes sweep.json.
+
+        Args:
+            variants (list): Per-stage overrides, one dict per variant.
+            reorder (bool): Build in order_variants() order instead of list order.
+
+        Returns:
+            list: One result per variant, in list order: index, params, rebuilt stages,
+                build/render seconds, output path and error (None on success).
+        """
+        self.setup()
+        order = order_variants(variants) if reorder else list(range(len(variants)))
+        results: List[Optional[dict]] = [None] * len(variants)
+        for index in order:
+            result = {"index": index, "overrides": variants[index], "rebuilt": [], "build_seconds": 0.0,
+                      "render_seconds": 0.0, "output": None, "error": None}
+            try:
+                start = time.perf_counter()
+                result["rebuilt"] = self.build(variants[index])
+                result["build_seconds"] = round(time.perf_counter() - start, 3)
+                start = time.perf_counter()
+                result["output"] = self.render_variant(index)
+                result["render_seconds"] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                result["error"] = str(e)
+                # Start the next variant from a clean scene
+                self.setup()
+                self._created.clear()
+                self._materials.clear()
+            results[index] = result
+            if self.verbose:
+                status = "failed: " + result["error"] if result["error"] else f"rebuilt {result['rebuilt'] or 'nothing'}"
+                print(f"Variant {index}: {status} ({result['build_seconds']}s build, "
+                      f"{result['render_seconds']}s render)")
+
+        with open(os.path.join(self.output_dir, "sweep.json"), "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=1, default=str)
+        return results
+
+
+def parse_cli_args(argv=None) -> argparse.Namespace:
+    """Parses the script arguments given after '--' on the Blender command line."""
+    argv = sys.argv if argv is None else argv
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description="Build and render donut variants in one Blender process.")
+    parser.add_argument("--output", required=True, help="Output directory.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--grid", help='JSON grid: {"stage": {"argument": [values, ...]}}.')
+    source.add_argument("--variants", help="JSON list of per-stage overrides, or a path to a JSON file with one.")
+    parser.add_argument("--render", choices=["still", "animation", "none"], default="still")
+    parser.add_argument("--frame", type=int, default=None, help="Frame of the stills.")
+    parser.add_argument("--render-settings", default="{}", help="JSON keyword arguments of set_render_settings().")
+    parser.add_argument("--no-bake", action="store_true", help="Skip physics baking.")
+    parser.add_argument("--keep-order", action="store_true", help="Build variants in the given order.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_cli_args()
+    if args.grid:
+        variant_list = expand_grid(json.loads(args.grid))
+    elif os.path.isfile(args.variants):
+        with open(args.variants, "r", encoding="utf-8") as handle:
+            variant_list = json.load(handle)
+    else:
+        variant_list = json.loads(args.variants)
+    sweep = VariantSweep(args.output, render=None if args.render == "none" else args.render, frame=args.frame,
+                         render_settings=json.loads(args.render_settings), bake=not args.no_bake)
+    sweep_results = sweep.run(variant_list, reorder=not args.keep_order)
+    sys.exit(1 if any(r["error"] for r in sweep_results) else 0)
@@ -9,6 +9,7 @@ It demonstrates modular, robust, and readable Blender scripting practices.
 
 Features:
 - Clears the scene for a fresh start.
+- Reuses a cached build of the scene when no build input changed.
 - Adds a ground plane, realistic donut, camera, and lighting.
 - Adds a perfect icing layer and sprinkles to the donut.
 - Animates the camera with an anime-style fly-through (if available).
@@ -17,13 +18,44 @@ Features:
 - Renders the animation to the specified output directory.
 - Prints clear progress and completion messages.
 
+Command line (arguments after '--' are read by this script):
+
+    blender --background --python main_AutomateGraphicDesignTools.py -- \
+        --output /tmp/render_output/ --params '{"build": {"donut": {"major_radius": 1.2}}}'
+
+'params' holds per-stage overrides of BUILD_PARAMS under "build", keyword
+arguments of set_render_settings() under "render_settings", of bake_physics()
+under "bake" and of render_animation() under "render". '--fast-physics' solves
+the donut's drop onto the ground in closed form instead of baking it (other
+scenes still bake; see Fast_physics). '--profile draft|preview|final' and
+'--seconds-per-frame N' select a render profile and auto-tune its samples. The script exits with code 1
+if a stage fails, so job runners can retry it.
+
+'--spec donut_scene.json' runs a declarative scene spec instead (see Scene_spec):
+only the stages whose inputs changed since the last run are executed ('--state-dir'
+keeps the scene between runs), and '--params' then holds {stage: overrides}.
+
+'--telemetry run.jsonl' appends one JSON line per stage (wall/CPU time, memory
+peak, datablock counts, vertex/face totals; see Stage_telemetry), and
+'--profile-stage donut' also writes a cProfile dump of that stage.
+
 ================================================================================
 """
 
 import sys
 import os
+import inspect
+import json
+import argparse
+# Blender does not put the script's own folder on sys.path (Scene_spec is imported from there)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append('/home/spacecadet/Desktop/Master Folder/Ariel\'s/Repo/Programming/Python/Blender')
 
+# Make the 'Blender_Global_Functions' package importable relative to this script as well.
+BLENDER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BLENDER_DIR not in sys.path:
+    sys.path.append(BLENDER_DIR)
+
 # Configure the path to include the directory containing Blender global function scripts.
 SCRIPT_DIR = os.path.abspath(
     os.path.join(os.path.dirname(__file__), "../Blender Global Functions")
@@ -52,62 +84,271 @@ from Blender_Global_Functions.Add_donut_function import add_donut  # type: ignor
 from Blender_Global_Functions.Add_camera_function import add_camera, animate_camera_fly_through  # type: ignore
 from Blender_Global_Functions.Add_light_function import add_light  # type: ignore
 from Blender_Global_Functions.Add_ground_function import add_ground  # type: ignore
-from Blender_Global_Functions.Set_render_settings_function import set_render_settings  # type: ignore
+from Blender_Global_Functions.Set_render_settings_function import auto_tune_samples, set_render_settings  # type: ignore
 from Blender_Global_Functions.Bake_physics_function import bake_physics  # type: ignore
+from Blender_Global_Functions.Level_of_detail import apply_level_of_detail  # type: ignore
+from Blender_Global_Functions.Modifier_freeze import freeze_modifiers  # type: ignore
 from Blender_Global_Functions.Render_animation_function import render_animation  # type: ignore
+from Blender_Global_Functions.Texture_bake import bake_procedural_textures  # type: ignore
 from Blender_Global_Functions.Frosting_and_sprinkles import add_icing_and_sprinkles  # type: ignore
+from Blender_Global_Functions.Scene_builder import SceneBuilder  # type: ignore
+from Blender_Global_Functions.Cache_utils import DiskCache  # type: ignore
+from Blender_Global_Functions.Scene_build_cache import (  # type: ignore
+    DEFAULT_SCENE_CACHE_DIR, load_scene_build, save_scene_build, scene_build_key, tag_role
+)
+from Blender_Global_Functions.Stage_telemetry import StageTelemetry, stage_scope  # type: ignore
 
 OUTPUT_PATH = "/tmp/render_output"  # Set your desired output path here
 
-def main():
-    print("=== Blender Donut Scene Automation Started ===")
-    try:
-        clear_scene(verbose=True)
-        print("Scene cleared.")
+# Keyword arguments of every build stage. The scene cache key is derived from these,
+# so any change here (or in the Global Functions the build calls) triggers a rebuild.
+BUILD_PARAMS = {
+    "ground": {},
+    "donut": {},
+    "icing_and_sprinkles": {"seed": 7},  # fixed seed: cached builds must be reproducible
+    "camera": {},
+    "fly_through": {},
+    "light": {},
+    # Bake procedural materials to images (see Texture_bake); other keys are
+    # bake_procedural_textures() arguments
+    "texture_bake": {"enabled": False},
+    # Camera-aware detail (see Level_of_detail); other keys are apply_level_of_detail() arguments
+    "level_of_detail": {"enabled": False},
+    # Replace static modifier stacks with their evaluated meshes (see Modifier_freeze), so
+    # bake_physics and render_animation stop re-evaluating them on every frame
+    "freeze_modifiers": {"enabled": False},
+}
+
+SCENE_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Size cap of the scene cache directory
+SCENE_CACHE_MAX_ENTRIES = 32
 
-        ground = add_ground()
-        print("Ground added.")
+def _build_objects(params: dict, telemetry: StageTelemetry = None):
+    """
+    Adds ground, donut, icing/sprinkles, camera (with animation), light, and the optional
+    texture bake, LOD and modifier freeze stages.
+    """
+    with stage_scope(telemetry, "ground") as record:
+        ground = tag_role(add_ground(**params["ground"]), "ground")
+        record["ok"] = ground is not None
+    print("Ground added.")
 
-        donut = add_donut()
-        print("Donut added.")
+    with stage_scope(telemetry, "donut") as record:
+        donut = tag_role(add_donut(**params["donut"]), "donut")
+        record["ok"] = donut is not None
+    print("Donut added.")
 
-        # Add icing and sprinkles to the donut
+    # Add icing and sprinkles to the donut
+    with stage_scope(telemetry, "icing_and_sprinkles") as record:
         try:
-            icing, sprinkles = add_icing_and_sprinkles(donut)
+            icing, sprinkles = add_icing_and_sprinkles(donut, **params["icing_and_sprinkles"])
+            record["ok"] = bool(icing and sprinkles)
             if icing and sprinkles:
                 print("Icing and sprinkles added.")
             else:
                 print("Icing and sprinkles could not be added.")
         except Exception as e:
+            record.update(ok=False, error=str(e))
             print(f"Icing and sprinkles skipped or failed: {e}")
 
-        camera = add_camera()
-        print("Camera added.")
+    with stage_scope(telemetry, "camera") as record:
+        camera = tag_role(add_camera(**params["camera"]), "camera")
+        record["ok"] = camera is not None
+    print("Camera added.")
 
-        # Animate camera if function is available
+    # Animate camera if function is available
+    with stage_scope(telemetry, "fly_through") as record:
         try:
-            animate_camera_fly_through(camera, donut)
+            animate_camera_fly_through(camera, donut, **params["fly_through"])
             print("Camera animation applied (anime-style fly-through).")
         except Exception as e:
+            record.update(ok=False, error=str(e))
             print(f"Camera animation skipped or failed: {e}")
 
-        light = add_light()
-        print("Lighting added.")
+    with stage_scope(telemetry, "light") as record:
+        light = tag_role(add_light(**params["light"]), "light")
+        record["ok"] = light is not None
+    print("Lighting added.")
+
+    bake_params = dict(params.get("texture_bake", {}))
+    if bake_params.pop("enabled", False):
+        with stage_scope(telemetry, "texture_bake") as record:
+            report = bake_procedural_textures(**bake_params)
+            record["objects"] = len(report)
+        print(f"Procedural textures baked for {len(report)} object(s).")
+
+    lod_params = dict(params.get("level_of_detail", {}))
+    if lod_params.pop("enabled", False):
+        with stage_scope(telemetry, "level_of_detail") as record:
+            report = apply_level_of_detail(camera, **lod_params)
+            record["triangles"] = report["triangles"]
+        print(f"Level of detail applied (~{report['triangles']:,} triangles).")
+
+    freeze_params = dict(params.get("freeze_modifiers", {}))
+    if freeze_params.pop("enabled", False):
+        with stage_scope(telemetry, "freeze_modifiers") as record:
+            frozen = freeze_modifiers(**freeze_params)
+            record["objects"] = len(frozen)
+        print(f"Modifier stacks frozen on {len(frozen)} object(s).")
+    return {"ground": ground, "donut": donut, "camera": camera, "light": light}
+
+
+def build_scene(
+    use_scene_builder: bool = True,
+    use_cache: bool = True,
+    cache_dir: str = DEFAULT_SCENE_CACHE_DIR,
+    params: dict = None,
+    telemetry: StageTelemetry = None
+):
+    """
+    Clears the scene and builds every object of the donut scene, or loads the same
+    build from the scene cache.
+
+    Args:
+        use_scene_builder (bool): Build inside a SceneBuilder block, which defers the
+            selection changes and view layer updates to one update at the end. The
+            icing evaluation and the rigid body world creation still update the
+            depsgraph on the way (see Scene_builder).
+        use_cache (bool): Whether to look up and store the build in the scene cache.
+        cache_dir (str): Directory of the scene cache.
+        params (dict, optional): Build stage arguments. Defaults to BUILD_PARAMS.
+        telemetry (StageTelemetry, optional): Records a telemetry line per stage.
+
+    Returns:
+        dict: The ground, donut, camera and light objects by name.
+    """
+    params = BUILD_PARAMS if params is None else params
+    with stage_scope(telemetry, "clear_scene"):
+        clear_scene(verbose=True)
+    print("Scene cleared.")
+
+    cache = key = None
+    if use_cache:
+        with stage_scope(telemetry, "scene_cache_load") as record:
+            cache = DiskCache(cache_dir, max_bytes=SCENE_CACHE_MAX_BYTES,
+                              max_entries=SCENE_CACHE_MAX_ENTRIES, suffix=".blend")
+            # The stage code is part of the key, next to the sources of the Global Functions it calls
+            key = scene_build_key({"stages": params, "code": inspect.getsource(_build_objects)}, [_build_objects])
+            objects = load_scene_build(cache, key)
+            record["hit"] = objects is not None
+        if objects is not None:
+            return objects
+
+    if not use_scene_builder:
+        objects = _build_objects(params, telemetry)
+    else:
+        with stage_scope(telemetry, "build_objects"):
+            with SceneBuilder(verbose=True):
+                objects = _build_objects(params, telemetry)
+
+    if cache is not None:
+        with stage_scope(telemetry, "scene_cache_save"):
+            save_scene_build(cache, key)
+    return objects
+
+
+def merge_build_params(overrides: dict = None) -> dict:
+    """Returns BUILD_PARAMS with per-stage keyword overrides applied."""
+    params = {stage: dict(kwargs) for stage, kwargs in BUILD_PARAMS.items()}
+    for stage, kwargs in (overrides or {}).items():
+        if stage not in params:
+            raise ValueError(f"Unknown build stage '{stage}'. Expected one of {sorted(params)}.")
+        params[stage].update(kwargs)
+    return params
+
+
+def parse_cli_args(argv=None) -> argparse.Namespace:
+    """Parses the script arguments given after '--' on the Blender command line."""
+    argv = sys.argv if argv is None else argv
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description="Build, bake and render the donut scene.")
+    parser.add_argument("--output", default=None, help=f"Render output path (default: {OUTPUT_PATH}).")
+    parser.add_argument("--params", default="{}",
+                        help='JSON with "build" (per-stage overrides), "render_settings", "bake" and "render" arguments.')
+    parser.add_argument("--fast-physics", action="store_true",
+                        help="Solve a single donut dropped on the ground analytically instead of baking.")
+    parser.add_argument("--profile", choices=["draft", "preview", "final"], default=None,
+                        help="Render profile (see Set_render_settings_function.RENDER_PROFILES).")
+    parser.add_argument("--seconds-per-frame", type=float, default=None,
+                        help="Auto-tune render samples to this time budget.")
+    parser.add_argument("--spec", default=None,
+                        help="Run this scene spec (.json/.toml) incrementally instead of the fixed pipeline.")
+    parser.add_argument("--state-dir", default=None,
+                        help="With --spec: keep the scene here so the next run only redoes what changed.")
+    parser.add_argument("--telemetry", default=None,
+                        help="Append one JSON line of timing/memory/scene stats per stage to this file.")
+    parser.add_argument("--profile-stage", action="append", default=[],
+                        help="Stage to run under cProfile (repeatable); dumps go next to the telemetry file.")
+    return parser.parse_args(argv)
+
+
+def main(output_path: str = OUTPUT_PATH, params: dict = None, telemetry: StageTelemetry = None) -> bool:
+    """
+    Runs the whole pipeline.
+
+    Args:
+        output_path (str): Render output path.
+        params (dict, optional): {"build": {stage: kwargs}, "render_settings": {kwargs},
+            "bake": {kwargs}, "render": {kwargs}} overrides. A "seconds_per_frame" render
+            setting auto-tunes the samples after the bake, on the simulated scene.
+        telemetry (StageTelemetry, optional): Records a telemetry line per stage, plus
+            one "pipeline" line for the whole run.
+
+    Returns:
+        bool: True if every stage succeeded.
+    """
+    params = params or {}
+    print("=== Blender Donut Scene Automation Started ===")
+    try:
+        with stage_scope(telemetry, "pipeline"):
+            build_scene(params=merge_build_params(params.get("build")), telemetry=telemetry)
+
+            # The bake needs the frame rate, but auto-tuning must time the baked scene
+            render_settings = dict(params.get("render_settings", {}))
+            seconds_per_frame = render_settings.pop("seconds_per_frame", None)
+            with stage_scope(telemetry, "render_settings"):
+                set_render_settings(output_path, **render_settings)
+            print(f"Render settings configured. Output path: {output_path}")
 
-        set_render_settings(OUTPUT_PATH)
-        print(f"Render settings configured. Output path: {OUTPUT_PATH}")
+            with stage_scope(telemetry, "bake_physics") as record:
+                record["ok"] = bake_physics(**params.get("bake", {}))
+            if not record["ok"]:
+                raise RuntimeError("Physics baking failed.")
+            print("Physics baked.")
 
-        bake_physics()
-        print("Physics baked.")
+            if seconds_per_frame is not None:
+                with stage_scope(telemetry, "auto_tune_samples"):
+                    auto_tune_samples(seconds_per_frame)
 
-        render_animation()
-        print("Rendering animation...")
+            print("Rendering animation...")
+            with stage_scope(telemetry, "render_animation") as record:
+                record["ok"] = render_animation(output_path=output_path, **params.get("render", {}))
+            if not record["ok"]:
+                raise RuntimeError("Rendering failed.")
 
         print("\n=== Script ran successfully! ===")
-        print(f"Your animation will be saved to: {OUTPUT_PATH}")
+        print(f"Your animation will be saved to: {output_path}")
         print("Check Blender's Render Properties for the exact output file name and format.")
+        return True
     except Exception as e:
         print(f"\n[ERROR] Script failed: {e}")
+        return False
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_cli_args()
+    cli_params = json.loads(args.params)
+    render_settings = cli_params.setdefault("render_settings", {})
+    if args.profile:
+        render_settings["profile"] = args.profile
+    if args.seconds_per_frame:
+        render_settings["seconds_per_frame"] = args.seconds_per_frame
+    if args.fast_physics:
+        cli_params.setdefault("bake", {})["fast_physics"] = True
+    run_telemetry = None
+    if args.telemetry or args.profile_stage:
+        run_telemetry = StageTelemetry(args.telemetry, profile_stages=args.profile_stage)
+    if args.spec:
+        from Scene_spec import run_scene_spec  # type: ignore
+        # '--profile' and '--fast-physics' land on the spec's "render_settings" and "bake" stages
+        overrides = {stage: kwargs for stage, kwargs in cli_params.items() if kwargs}
+        sys.exit(0 if run_scene_spec(args.spec, overrides, args.output, args.state_dir, run_telemetry) else 1)
+    sys.exit(0 if main(args.output or OUTPUT_PATH, cli_params, run_telemetry) else 1)
@@ -0,0 +1,251 @@
+"""
+================================================================================
+Scene Build Benchmark (before / after)
+================================================================================
+
+Counts the operator calls, depsgraph updates and wall time of building the
+donut scene of main_AutomateGraphicDesignTools.main(), twice:
+
+- before: the operator-based Global Functions of the baseline commit
+  (BASELINE_REF), called in the order the original main() called them;
+- after:  build_scene() with the data-API Global Functions inside a
+  SceneBuilder block (scene cache off).
+
+Both builds start from an empty file and are measured with
+Scene_builder.OperationCounter. The 'before' Global Functions are extracted
+with 'git archive' into a temporary folder and built in a child process, so
+the two versions of Blender_Global_Functions never share an interpreter.
+
+Two modes, as run_benchmarks.py:
+
+- standin: outside Blender, against the recording bpy stand-in.
+
+      python Python/Blender/Benchmarks/benchmark_build_scene.py
+
+- blender: inside Blender (started automatically when '--mode blender' is given
+  outside of it).
+
+      blender --background --factory-startup --python benchmark_build_scene.py -- --mode blender
+
+'--ref' compares against another commit; '--output' also writes the results as JSON.
+
+================================================================================
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCHMARK_DIR not in sys.path:
+    sys.path.append(BENCHMARK_DIR)
+
+from run_benchmarks import BLENDER_DIR, STANDIN_DIR, _fresh_session, _inside_blender, _setup_imports  # noqa: E402
+
+# Last commit with the operator-based Global Functions
+BASELINE_REF = "cdd4c57"
+
+# Prefix of the line a child process reports its result on
+RESULT_MARKER = "BUILD_RESULT "
+
+
+def _parse_args(argv: List[str]):
+    parser = argparse.ArgumentParser(description="Compare the scene build before and after the data-API helpers.")
+    parser.add_argument("--mode", choices=("auto", "standin", "blender"), default="auto",
+                        help="'auto' uses Blender when run inside it, the bpy stand-in otherwise.")
+    parser.add_argument("--ref", default=BASELINE_REF, help="Commit whose Global Functions are the 'before' build.")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file.")
+    parser.add_argument("--blender-binary", default="blender", help="Blender executable for '--mode blender'.")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the build stages.")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def _load_operation_counter():
+    """Loads OperationCounter from this tree's Scene_builder without importing the package."""
+    path = os.path.join(BLENDER_DIR, "Blender_Global_Functions", "Scene_builder.py")
+    spec = importlib.util.spec_from_file_location("_benchmark_scene_builder", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.OperationCounter
+
+
+def measure(build: Callable[[], None], verbose: bool = False) -> dict:
+    """
+    Runs a build under OperationCounter.
+
+    Args:
+        build (callable): The build; it starts from an empty file.
+        verbose (bool): Whether to show the output of the build.
+
+    Returns:
+        dict: "ok", "seconds", "operator_calls", "operators" and "depsgraph_updates".
+    """
+    operation_counter = _load_operation_counter()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    error = None
+    with output, operation_counter() as counter:
+        start = time.perf_counter()
+        try:
+            build()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+    result = {
+        "ok": error is None,
+        "seconds": round(seconds, 6),
+        "operator_calls": counter.operator_calls,
+        "operators": dict(sorted(counter.operators.items())),
+        "depsgraph_updates": counter.depsgraph_updates,
+    }
+    if error:
+        result["error"] = error
+    return result
+
+
+def build_before() -> None:
+    """The scene build of the original main(), with the Global Functions on sys.path."""
+    from Blender_Global_Functions.Blender_clear_scene_function import clear_scene  # type: ignore
+    from Blender_Global_Functions.Add_donut_function import add_donut  # type: ignore
+    from Blender_Global_Functions.Add_camera_function import add_camera, animate_camera_fly_through  # type: ignore
+    from Blender_Global_Functions.Add_light_function import add_light  # type: ignore
+    from Blender_Global_Functions.Add_ground_function import add_ground  # type: ignore
+    from Blender_Global_Functions.Frosting_and_sprinkles import add_icing_and_sprinkles  # type: ignore
+
+    clear_scene(verbose=True)
+    add_ground()
+    donut = add_donut()
+    # The original main() carried on when these two failed
+    try:
+        add_icing_and_sprinkles(donut)
+    except Exception as e:
+        print(f"Icing and sprinkles skipped or failed: {e}")
+    camera = add_camera()
+    try:
+        animate_camera_fly_through(camera, donut)
+    except Exception as e:
+        print(f"Camera animation skipped or failed: {e}")
+    add_light()
+
+
+def build_after() -> None:
+    """build_scene() of the current pipeline, without the scene cache."""
+    sys.path.append(os.path.join(BLENDER_DIR, "Automation"))
+    import main_AutomateGraphicDesignTools as pipeline  # type: ignore
+    pipeline.build_scene(use_cache=False)
+
+
+def _extract_global_functions(ref: str, destination: str) -> None:
+    """Writes the Blender_Global_Functions folder of a commit into 'destination'."""
+    archive = subprocess.run(["git", "-C", BLENDER_DIR, "archive", "--format=tar", ref, "Blender_Global_Functions"],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(destination)
+
+
+def _run_child(folder: str, mode: str, verbose: bool) -> None:
+    """Child process: builds the 'before' scene from 'folder' and prints the result."""
+    if mode == "standin":
+        sys.path.insert(0, STANDIN_DIR)
+    sys.path.insert(0, folder)
+    import bpy  # type: ignore
+
+    if mode == "standin":
+        bpy.reset()
+    else:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+    print(RESULT_MARKER + json.dumps(measure(build_before, verbose)), flush=True)
+
+
+def measure_before(ref: str, mode: str, verbose: bool = False) -> dict:
+    """
+    Builds the scene with the Global Functions of 'ref' in a child process.
+
+    Returns:
+        dict: As measure().
+    """
+    with tempfile.TemporaryDirectory(prefix="build_scene_before_") as folder:
+        _extract_global_functions(ref, folder)
+        script = os.path.abspath(__file__)
+        child_args = ["--mode", mode, "--child", folder] + (["--verbose"] if verbose else [])
+        if mode == "standin":
+            command = [sys.executable, script] + child_args
+        else:
+            import bpy  # type: ignore
+            command = [bpy.app.binary_path, "--background", "--factory-startup", "--python", script, "--"] + child_args
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    for line in output.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"The 'before' build reported no result:\n{output}")
+
+
+def measure_after(mode: str, verbose: bool = False) -> dict:
+    """Builds the scene with the current Global Functions in this process (as measure())."""
+    _fresh_session(mode)
+    return measure(build_after, verbose)
+
+
+def print_report(results: dict) -> None:
+    """Prints both builds side by side, with their most frequent operators."""
+    before, after = results["before"], results["after"]
+    print(f"\n=== Scene build ({results['mode']}): {results['ref']} helpers vs data API ===")
+    print(f"{'':<20}{'before':>12}{'after':>12}")
+    for metric in ("operator_calls", "depsgraph_updates"):
+        print(f"{metric:<20}{before[metric]:>12}{after[metric]:>12}")
+    print(f"{'seconds':<20}{before['seconds']:>12.4f}{after['seconds']:>12.4f}")
+    for label, result in (("before", before), ("after", after)):
+        top = sorted(result["operators"].items(), key=lambda item: -item[1])[:5]
+        print(f"{label} operators: " + (", ".join(f"{name} x{count}" for name, count in top) or "none"))
+        if not result["ok"]:
+            print(f"{label} build failed: {result['error']}")
+
+
+def _run_in_blender(args, argv: List[str]) -> int:
+    """Starts Blender in the background on this script and returns its exit code."""
+    command = [args.blender_binary, "--background", "--factory-startup", "--python-exit-code", "1",
+               "--python", os.path.abspath(__file__), "--"] + argv
+    return subprocess.call(command)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = _parse_args(argv)
+
+    in_blender = _inside_blender()
+    mode = args.mode if args.mode != "auto" else ("blender" if in_blender else "standin")
+    if args.child:
+        _run_child(args.child, mode, args.verbose)
+        return 0
+    if mode == "blender" and not in_blender:
+        return _run_in_blender(args, argv)
+
+    try:
+        before = measure_before(args.ref, mode, args.verbose)
+    except (subprocess.CalledProcessError, RuntimeError) as e:
+        stderr = getattr(e, "stderr", None) or ""
+        stderr = stderr.decode(errors="replace") if isinstance(stderr, bytes) else stderr
+        print(f"Failed to build the scene with the Global Functions of {args.ref}: {e}\n{stderr}")
+        return 1
+    _setup_imports(mode)
+    results = {"mode": mode, "ref": args.ref, "before": before, "after": measure_after(mode, args.verbose)}
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    return 0 if before["ok"] and results["after"]["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1211 @@
+"""
+================================================================================
+Recording bpy Stand-in
+================================================================================
+
+A small, pure-Python imitation of the parts of Blender's 'bpy' module that the
+Global Functions use, so the pipeline can be benchmarked (and smoke-tested)
+without Blender. It is only put on sys.path by the benchmark runner; inside
+Blender the real module is used.
+
+What it models:
+- bpy.data collections with unique names, remove/batch_remove, and an
+  orphans_purge() that removes datablocks no scene references any more.
+- Meshes backed by NumPy arrays (foreach_get/foreach_set, from_pydata,
+  loop triangles), objects with transforms, modifiers, constraints, material
+  slots and rigid body settings, cameras, lights, curves, materials with node
+  trees, textures, images, actions with F-curves.
+- bpy.ops as callable operator objects with 'idname_py' (like the real
+  _BPyOpsSubModOp), so Scene_builder.OperationCounter can count them. The
+  primitive/camera/light/duplicate/rigid body operators create datablocks.
+- bpy.app.handlers.depsgraph_update_post, fired for every operator call,
+  view_layer.update(), evaluated_depsgraph_get() and frame_set(), which is
+  where Blender also updates the depsgraph.
+
+What it does not model: evaluation (modifiers, constraints, drivers), physics
+simulation, rendering and file I/O beyond writing placeholder files. Wall
+times measured against it are the Python-side cost of the Global Functions.
+
+reset() discards every datablock and starts a fresh session, like
+bpy.ops.wm.read_factory_settings(use_empty=True).
+
+================================================================================
+"""
+
+import itertools
+import os
+import types as _pytypes
+from contextlib import contextmanager
+
+import numpy as np
+
+_SESSION_UIDS = itertools.count(1)
+
+
+class Vec:
+    """Vector with x/y/z/w access, indexing and iteration (like mathutils.Vector)."""
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        object.__setattr__(self, "_v", [float(v) for v in values])
+
+    def __getattr__(self, item):
+        idx = "xyzw".find(item)
+        if len(item) == 1 and 0 <= idx < len(self._v):
+            return self._v[idx]
+        raise AttributeError(item)
+
+    def __setattr__(self, key, value):
+        if key in ("x", "y", "z", "w"):
+            self._v["xyzw".index(key)] = float(value)
+        else:
+            object.__setattr__(self, key, value)
+
+    def __getitem__(self, i):
+        return self._v[i]
+
+    def __setitem__(self, i, value):
+        self._v[i] = float(value)
+
+    def __iter__(self):
+        return iter(list(self._v))
+
+    def __len__(self):
+        return len(self._v)
+
+    def __eq__(self, other):
+        try:
+            return list(self) == [float(v) for v in other]
+        except TypeError:
+            return NotImplemented
+
+    def copy(self):
+        return Vec(self._v)
+
+    def __repr__(self):
+        return f"Vec({self._v})"
+
+
+class Struct:
+    """Generic RNA struct: any attribute can be set; unknown attributes read as child structs."""
+
+    def __init__(self, **kwargs):
+        object.__setattr__(self, "_props", dict(kwargs))
+
+    def __getattr__(self, item):
+        if item.startswith("__"):
+            raise AttributeError(item)
+        props = object.__getattribute__(self, "_props")
+        if item not in props:
+            props[item] = Struct()
+        return props[item]
+
+    def __setattr__(self, key, value):
+        self._props[key] = value
+
+    def __iter__(self):
+        return iter(())
+
+    def __repr__(self):
+        return f"Struct({sorted((k, v) for k, v in self._props.items() if not isinstance(v, Struct))})"
+
+    def __bool__(self):
+        return True
+
+
+class ElemCollection:
+    """Vertex/loop/polygon style collection backed by one NumPy array per attribute."""
+
+    def __init__(self, attrs):
+        self._attrs = attrs  # name -> (width, dtype)
+        self._data = {k: np.zeros((0, w), dtype=dt) for k, (w, dt) in attrs.items()}
+        self._n = 0
+
+    def add(self, count):
+        for k, (w, dt) in self._attrs.items():
+            self._data[k] = np.concatenate([self._data[k], np.zeros((count, w), dtype=dt)])
+        self._n += count
+
+    def clear(self):
+        self.__init__(self._attrs)
+
+    def foreach_set(self, attr, seq):
+        width, dtype = self._attrs[attr]
+        self._data[attr] = np.asarray(seq).reshape(self._n, width).astype(dtype)
+
+    def foreach_get(self, attr, buf):
+        buf[:] = self._data[attr].ravel()
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return iter([Struct() for _ in range(self._n)])
+
+
+class KeyframePoints(ElemCollection):
+    """F-curve keyframes: 'co' pairs plus insert() for single keys."""
+
+    def __init__(self):
+        super().__init__({"co": (2, np.float32), "interpolation": (1, np.int32)})
+
+    def clear(self):
+        ElemCollection.__init__(self, self._attrs)
+
+    def insert(self, frame, value, options=None, keyframe_type='KEYFRAME'):
+        co = self._data["co"]
+        hit = np.nonzero(co[:, 0] == frame)[0] if len(co) else []
+        if len(hit):
+            co[hit[0], 1] = value
+        else:
+            self.add(1)
+            self._data["co"][-1] = (frame, value)
+            self._data["co"] = self._data["co"][np.argsort(self._data["co"][:, 0], kind="stable")]
+        return Struct(co=(frame, value), interpolation='BEZIER')
+
+
+class ID:
+    """Base of every datablock: name, custom properties, fake user, animation data."""
+
+    def __init__(self, name):
+        self.name = name
+        self.session_uid = next(_SESSION_UIDS)
+        self._custom = {}
+        self.use_fake_user = False
+        self.animation_data = None
+
+    def __getitem__(self, key):
+        return self._custom[key]
+
+    def __setitem__(self, key, value):
+        self._custom[key] = value
+
+    def __contains__(self, key):
+        return key in self._custom
+
+    def __delitem__(self, key):
+        del self._custom[key]
+
+    def get(self, key, default=None):
+        return self._custom.get(key, default)
+
+    def keys(self):
+        return self._custom.keys()
+
+    def as_pointer(self):
+        return id(self)
+
+    @property
+    def users(self):
+        return _user_count(self)
+
+    def copy(self):
+        dup = type(self).__new__(type(self))
+        dup.__dict__.update(self.__dict__)
+        dup.session_uid = next(_SESSION_UIDS)
+        dup._custom = dict(self._custom)
+        return _collection_of(self)._adopt(dup, self.name)
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = Struct(action=None)
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+    def keyframe_insert(self, data_path, index=-1, frame=None, group=""):
+        frame = data.scenes[0].frame_current if frame is None else frame
+        value = getattr(self, data_path)
+        anim = self.animation_data_create()
+        if anim.action is None:
+            anim.action = data.actions.new(f"{self.name}Action")
+        channels = range(len(value)) if hasattr(value, "__len__") and index < 0 else [max(index, 0)]
+        for channel in channels:
+            fcurve = anim.action.fcurves.find(data_path, index=channel)
+            if fcurve is None:
+                fcurve = anim.action.fcurves.new(data_path, index=channel, action_group=group)
+            channel_value = value[channel] if hasattr(value, "__len__") else value
+            fcurve.keyframe_points.insert(frame, float(channel_value))
+        return True
+
+
+class Mesh(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.vertices = ElemCollection({"co": (3, np.float32), "normal": (3, np.float32)})
+        self.loops = ElemCollection({"vertex_index": (1, np.int32)})
+        self.polygons = ElemCollection({"loop_start": (1, np.int32), "loop_total": (1, np.int32),
+                                        "use_smooth": (1, bool)})
+        self.edges = ElemCollection({"vertices": (2, np.int32)})
+        self.loop_triangles = ElemCollection({"vertices": (3, np.int32)})
+        self.materials = IDList()
+        self.uv_layers = UVLayers(self)
+        self.attributes = Struct()
+
+    def clear_geometry(self):
+        for elements in (self.vertices, self.loops, self.polygons, self.edges, self.loop_triangles):
+            elements.clear()
+
+    def from_pydata(self, verts, edges, faces):
+        self.clear_geometry()
+        verts = np.asarray(verts, dtype=np.float32).reshape(-1, 3)
+        self.vertices.add(len(verts))
+        self.vertices.foreach_set("co", verts.ravel())
+        flat = [i for face in faces for i in face]
+        self.loops.add(len(flat))
+        self.loops.foreach_set("vertex_index", flat)
+        self.polygons.add(len(faces))
+        starts = np.cumsum([0] + [len(face) for face in faces[:-1]]) if len(faces) else []
+        self.polygons.foreach_set("loop_start", starts)
+        self.polygons.foreach_set("loop_total", [len(face) for face in faces])
+
+    def update(self, calc_edges=False, calc_edges_loose=False):
+        pass
+
+    def validate(self, verbose=False, clean_customdata=True):
+        return False
+
+    def _faces(self):
+        starts = self.polygons._data["loop_start"].ravel()
+        totals = self.polygons._data["loop_total"].ravel()
+        if totals.size and not totals.any():
+            totals = np.diff(np.append(starts, len(self.loops)))
+        indices = self.loops._data["vertex_index"].ravel()
+        return [indices[s:s + t] for s, t in zip(starts, totals)]
+
+    def calc_loop_triangles(self):
+        tris = [(face[0], face[k], face[k + 1]) for face in self._faces() for k in range(1, len(face) - 1)]
+        self.loop_triangles.clear()
+        self.loop_triangles.add(len(tris))
+        if tris:
+            self.loop_triangles.foreach_set("vertices", np.asarray(tris).ravel())
+
+    def shade_smooth(self):
+        self.polygons._data["use_smooth"][:] = True
+
+    def shade_flat(self):
+        self.polygons._data["use_smooth"][:] = False
+
+    def transform(self, matrix):
+        m = np.asarray(matrix, dtype=np.float64)
+        co = self.vertices._data["co"].astype(np.float64)
+        self.vertices._data["co"] = (co @ m[:3, :3].T + m[:3, 3]).astype(np.float32)
+
+
+class UVLayers(list):
+    def __init__(self, mesh):
+        super().__init__()
+        self._mesh = mesh
+
+    def new(self, name="UVMap", do_init=True):
+        layer = Struct(name=name, data=ElemCollection({"uv": (2, np.float32)}))
+        layer.data.add(len(self._mesh.loops))
+        self.append(layer)
+        return layer
+
+    @property
+    def active(self):
+        return self[0] if self else None
+
+
+class IDList(list):
+    def clear(self):
+        del self[:]
+
+
+class Sockets(dict):
+    """Node sockets; any name exists and defaults to 0.0."""
+
+    def __contains__(self, key):
+        return True
+
+    def __missing__(self, key):
+        socket = Struct(name=key, default_value=0.0)
+        self[key] = socket
+        return socket
+
+
+class Nodes(list):
+    def new(self, type):
+        node = Struct(type=type, name=type, inputs=Sockets(), outputs=Sockets(), location=(0, 0))
+        if type == "ShaderNodeValToRGB":
+            node.color_ramp = Struct(elements=RampElements([Struct(position=0.0, color=(0, 0, 0, 1)),
+                                                            Struct(position=1.0, color=(1, 1, 1, 1))]))
+        self.append(node)
+        return node
+
+    def get(self, name):
+        return next((node for node in self if node.name == name), None)
+
+    def clear(self):
+        del self[:]
+
+
+class RampElements(list):
+    def new(self, position):
+        element = Struct(position=position, color=(0, 0, 0, 1))
+        self.append(element)
+        return element
+
+
+class Links(list):
+    def new(self, from_socket, to_socket):
+        if from_socket is None or to_socket is None:
+            raise TypeError("NodeLinks.new(): error with argument 1, \"input\" - Function.input expected a NodeSocket type, not NoneType")
+        link = Struct(from_socket=from_socket, to_socket=to_socket)
+        self.append(link)
+        return link
+
+
+class Material(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.use_nodes = False
+        self.node_tree = Struct(nodes=Nodes(), links=Links())
+
+
+class World(Material):
+    pass
+
+
+class NodeTree(Material):
+    pass
+
+
+class Image(ID):
+    def __init__(self, name, width=1, height=1, alpha=False, float_buffer=False, **kwargs):
+        super().__init__(name)
+        self.size = (width, height)
+        self.pixels = np.zeros(width * height * 4, dtype=np.float32)
+        self.filepath = self.filepath_raw = ""
+        self.file_format = "PNG"
+        self.colorspace_settings = Struct(name="sRGB")
+        self.packed_file = None
+
+    def save(self, filepath=None, **kwargs):
+        with open(filepath or self.filepath_raw, "wb") as handle:
+            handle.write(b"\x89PNG stand-in")
+
+    def save_render(self, filepath, scene=None, **kwargs):
+        with open(filepath, "wb") as handle:
+            handle.write(b"\x89PNG stand-in")
+
+    def pack(self):
+        with open(self.filepath, "rb") as handle:
+            self.packed_file = Struct(data=handle.read())
+        self.packed_file.size = len(self.packed_file.data)
+
+
+class Text(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self._body = ""
+
+    def write(self, text):
+        self._body += text
+
+    def from_string(self, text):
+        self._body = text
+
+    def clear(self):
+        self._body = ""
+
+    def as_string(self):
+        return self._body
+
+
+class Texture(ID):
+    def __init__(self, name, type="CLOUDS"):
+        super().__init__(name)
+        self.type = type
+
+
+class Collection(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = ObjectLinks(self)
+        self.children = ChildLinks()
+        self.hide_render = False
+        self.hide_viewport = False
+
+    @property
+    def all_objects(self):
+        found = list(self.objects)
+        for child in self.children:
+            found.extend(o for o in child.all_objects if o not in found)
+        return found
+
+
+def _rigid_body_settings(body_type="ACTIVE"):
+    return Struct(type=body_type, mass=1.0, friction=0.5, restitution=0.0, collision_shape="CONVEX_HULL",
+                  mesh_source="DEFORM", enabled=True, kinematic=False, collision_margin=0.04,
+                  use_margin=False, linear_damping=0.04, angular_damping=0.1, use_deactivation=False)
+
+
+class ObjectLinks(list):
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+
+    def link(self, obj):
+        if list.__contains__(self, obj):
+            raise RuntimeError(f"Object '{obj.name}' already in collection '{self._owner.name}'")
+        self.append(obj)
+        obj.users_collection.append(self._owner)
+        # Objects linked into the rigid body world collection become rigid bodies
+        for scene in data.scenes:
+            rbw = scene.rigidbody_world
+            if rbw is not None and rbw.collection is self._owner and obj.rigid_body is None:
+                obj.rigid_body = _rigid_body_settings()
+
+    def unlink(self, obj):
+        self.remove(obj)
+        obj.users_collection.remove(self._owner)
+
+    def __contains__(self, item):
+        if isinstance(item, str):
+            return any(obj.name == item for obj in self)
+        return list.__contains__(self, item)
+
+    def get(self, name):
+        return next((obj for obj in self if obj.name == name), None)
+
+
+class ChildLinks(list):
+    def link(self, collection):
+        self.append(collection)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(child.name == key for child in self)
+        return list.__contains__(self, key)
+
+    def unlink(self, collection):
+        self.remove(collection)
+
+
+class Modifiers(list):
+    def new(self, name, type):
+        modifier = Struct(name=name, type=type, show_viewport=True, show_render=True, texture=None,
+                          texture_coords="LOCAL")
+        self.append(modifier)
+        return modifier
+
+    def get(self, name):
+        return next((m for m in self if m.name == name), None)
+
+    def clear(self):
+        del self[:]
+
+
+class Constraints(Modifiers):
+    def new(self, type):
+        return Modifiers.new(self, type, type)
+
+
+class Matrix:
+    """4x4 matrix (like mathutils.Matrix), convertible with np.array()."""
+
+    def __init__(self, rows=None):
+        self.m = np.eye(4) if rows is None else np.asarray(rows, dtype=float)
+
+    def __iter__(self):
+        return iter(self.m.tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        return self.m.astype(dtype) if dtype else self.m.copy()
+
+    def copy(self):
+        return Matrix(self.m.copy())
+
+    def __matmul__(self, other):
+        return Matrix(self.m @ np.asarray(other))
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self.m))
+
+    @property
+    def translation(self):
+        return Vec(self.m[:3, 3])
+
+    @staticmethod
+    def Identity(size=4):
+        return Matrix()
+
+
+def _euler_matrix(euler):
+    (cx, cy, cz), (sx, sy, sz) = np.cos(euler), np.sin(euler)
+    rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+def _quaternion_matrix(q):
+    w, x, y, z = np.asarray(q, dtype=float) / (np.linalg.norm(q) or 1.0)
+    return np.array([[1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+                     [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+                     [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)]])
+
+
+def _vector_property(name):
+    """Object transform channel: assigning any sequence stores a Vec."""
+    def getter(self):
+        return self.__dict__[name]
+
+    def setter(self, value):
+        self.__dict__[name] = Vec(value)
+    return property(getter, setter)
+
+
+class Object(ID):
+    location = _vector_property("location")
+    rotation_euler = _vector_property("rotation_euler")
+    rotation_quaternion = _vector_property("rotation_quaternion")
+    scale = _vector_property("scale")
+
+    def __init__(self, name, object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        self.type = {Mesh: "MESH", Camera: "CAMERA", Light: "LIGHT", Curve: "CURVE"}.get(type(object_data), "EMPTY")
+        self.location = (0, 0, 0)
+        self.rotation_euler = (0, 0, 0)
+        self.rotation_mode = "XYZ"
+        self.rotation_quaternion = (1, 0, 0, 0)
+        self.scale = (1, 1, 1)
+        self.parent = None
+        self.matrix_parent_inverse = Matrix()
+        self.modifiers = Modifiers()
+        self.constraints = Constraints()
+        self.rigid_body = None
+        self.hide_viewport = False
+        self.hide_render = False
+        self.display_type = "TEXTURED"
+        self.instance_type = "NONE"
+        self.users_collection = []
+        self.mode = "OBJECT"
+        self._slots = []
+
+    @property
+    def material_slots(self):
+        materials = getattr(self.data, "materials", [])
+        while len(self._slots) < len(materials):
+            self._slots.append(Struct(link="DATA", material=materials[len(self._slots)]))
+        return self._slots[:len(materials)]
+
+    @property
+    def children(self):
+        return [obj for obj in data.objects if obj.parent is self]
+
+    @property
+    def matrix_basis(self):
+        m = np.eye(4)
+        if self.rotation_mode == "QUATERNION":
+            m[:3, :3] = _quaternion_matrix(list(self.rotation_quaternion))
+        else:
+            m[:3, :3] = _euler_matrix(list(self.rotation_euler))
+        m[:3, :3] *= np.asarray(list(self.scale))
+        m[:3, 3] = list(self.location)
+        return Matrix(m)
+
+    @property
+    def matrix_world(self):
+        if self.parent is None:
+            return self.matrix_basis
+        return self.parent.matrix_world @ self.matrix_parent_inverse @ self.matrix_basis
+
+    @matrix_world.setter
+    def matrix_world(self, value):
+        self.location = np.asarray(value)[:3, 3]
+
+    @property
+    def dimensions(self):
+        if isinstance(self.data, Mesh) and len(self.data.vertices):
+            co = self.data.vertices._data["co"]
+            return Vec((co.max(0) - co.min(0)) * np.abs(list(self.scale)))
+        return Vec()
+
+    @property
+    def bound_box(self):
+        if isinstance(self.data, Mesh) and len(self.data.vertices):
+            co = self.data.vertices._data["co"]
+            lo, hi = co.min(0), co.max(0)
+        else:
+            lo = hi = np.zeros(3)
+        return [(x, y, z) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+
+    def select_set(self, state):
+        pass
+
+    def select_get(self):
+        return False
+
+    def hide_set(self, state):
+        pass
+
+    def evaluated_get(self, depsgraph):
+        return self
+
+    def to_mesh(self, preserve_all_data_layers=False, depsgraph=None):
+        return self.data
+
+    def to_mesh_clear(self):
+        pass
+
+
+class Camera(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.type = "PERSP"
+        self.lens = 50.0
+        self.sensor_width = 36.0
+        self.sensor_fit = "AUTO"
+        self.angle = 0.691
+        self.clip_start = 0.1
+        self.clip_end = 100.0
+        self.dof = Struct(use_dof=False, focus_distance=10.0, aperture_fstop=2.8, focus_object=None)
+
+
+class Light(ID):
+    def __init__(self, name, type="POINT"):
+        super().__init__(name)
+        self.type = type
+        self.energy = 10.0
+        self.color = (1.0, 1.0, 1.0)
+        if type in {"AREA", "POINT", "SPOT"}:
+            self.size = 0.25
+        if type == "SPOT":
+            self.spot_size = 0.785
+        if type == "SUN":
+            self.angle = 0.00918
+
+
+class Curve(ID):
+    def __init__(self, name, type="CURVE"):
+        super().__init__(name)
+        self.type = type
+        self.dimensions = "2D"
+        self.splines = Splines()
+        self.path_duration = 100
+        self.use_path = True
+        self.eval_time = 0.0
+
+
+def _bezier_point():
+    return Struct(co=(0, 0, 0), handle_left=(0, 0, 0), handle_right=(0, 0, 0),
+                  handle_left_type="FREE", handle_right_type="FREE")
+
+
+class Splines(list):
+    def new(self, type):
+        spline = Struct(type=type, bezier_points=BezierPoints(), points=[])
+        self.append(spline)
+        return spline
+
+
+class BezierPoints(list):
+    def __init__(self):
+        super().__init__([_bezier_point()])
+
+    def add(self, count=1):
+        self.extend(_bezier_point() for _ in range(count))
+
+
+class Action(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.fcurves = FCurves()
+
+    def fcurve_ensure_for_datablock(self, datablock, data_path, index=0, group_name=""):
+        return self.fcurves.find(data_path, index=index) or self.fcurves.new(data_path, index=index)
+
+
+class FCurves(list):
+    def new(self, data_path, index=0, action_group=""):
+        fcurve = FCurve(data_path, index, action_group)
+        self.append(fcurve)
+        return fcurve
+
+    def find(self, data_path, index=0):
+        return next((fc for fc in self if fc.data_path == data_path and fc.array_index == index), None)
+
+
+class FCurve:
+    def __init__(self, data_path, index, group=""):
+        self.data_path = data_path
+        self.array_index = index
+        self.group = Struct(name=group) if group else None
+        self.keyframe_points = KeyframePoints()
+        self.modifiers = Modifiers()
+
+    def evaluate(self, frame):
+        co = self.keyframe_points._data["co"]
+        if not len(co):
+            return 0.0
+        return float(np.interp(frame, co[:, 0], co[:, 1]))
+
+    def update(self):
+        pass
+
+
+class Scene(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.camera = None
+        self.world = None
+        self.rigidbody_world = None
+        self.gravity = Vec((0, 0, -9.81))
+        self.use_gravity = True
+        self.cursor = Struct(location=Vec())
+        self.render = Struct(
+            engine="BLENDER_EEVEE_NEXT", fps=24, fps_base=1.0, resolution_x=1920, resolution_y=1080,
+            resolution_percentage=100, filepath="//", film_transparent=False, use_motion_blur=False,
+            use_simplify=False, simplify_subdivision_render=6,
+            image_settings=Struct(file_format="PNG", color_mode="RGBA", color_depth="8"),
+            ffmpeg=Struct(format="MPEG4", codec="H264", constant_rate_factor="MEDIUM"),
+        )
+        self.cycles = Struct(samples=4096, use_adaptive_sampling=True, adaptive_threshold=0.01,
+                             use_denoising=True)
+        self.eevee = Struct(taa_render_samples=64)
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = int(frame)
+        _fire_update(self)
+
+
+class ViewLayer:
+    def __init__(self):
+        self.objects = Struct(active=None)
+        self.depsgraph = Struct()
+
+    def update(self):
+        _fire_update(context.scene)
+
+
+class IDCollection:
+    """One bpy.data collection: unique names, new/remove/get, iteration."""
+
+    def __init__(self, cls):
+        self._cls = cls
+        self._items = []
+
+    def _unique(self, name):
+        existing = {item.name for item in self._items}
+        base, n = name, 0
+        while name in existing:
+            n += 1
+            name = f"{base}.{n:03d}"
+        return name
+
+    def new(self, name, *args, **kwargs):
+        item = self._cls(self._unique(name), *args, **kwargs)
+        self._items.append(item)
+        return item
+
+    def _adopt(self, item, name=None):
+        item.name = self._unique(name or item.name)
+        self._items.append(item)
+        return item
+
+    def remove(self, item, do_unlink=True):
+        self._items.remove(item)
+        if isinstance(item, Object):
+            for collection in list(item.users_collection):
+                collection.objects.unlink(item)
+            for scene in data.scenes:
+                if scene.camera is item:
+                    scene.camera = None
+            for obj in data.objects:
+                if obj.parent is item:
+                    obj.parent = None
+        elif isinstance(item, Collection):
+            for parent in [*data.collections, *(scene.collection for scene in data.scenes)]:
+                if any(child is item for child in parent.children):
+                    parent.children.unlink(item)
+
+    def get(self, name, default=None):
+        return next((item for item in self._items if item.name == name), default)
+
+    def new_from_object(self, obj, preserve_all_data_layers=False, depsgraph=None):
+        """bpy.data.meshes.new_from_object(): a copy of the (unevaluated) object data."""
+        return obj.data.copy()
+
+    def load(self, filepath, check_existing=False):
+        """bpy.data.images.load(): an image datablock for a file on disk."""
+        if not os.path.isfile(filepath):
+            raise RuntimeError(f"Error: Cannot read '{filepath}': No such file or directory")
+        if check_existing:
+            for item in self._items:
+                if getattr(item, "filepath", None) == filepath:
+                    return item
+        item = self.new(os.path.basename(filepath))
+        item.filepath = item.filepath_raw = filepath
+        return item
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self._items[key]
+        item = self.get(key)
+        if item is None:
+            raise KeyError(f"bpy_prop_collection[key]: key \"{key}\" not found")
+        return item
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self.get(key) is not None
+        return any(item is key for item in self._items)
+
+
+class Libraries(list):
+    """bpy.data.libraries: write() records the datablocks, load() appends copies of them."""
+
+    def write(self, filepath, datablocks, fake_user=False, compress=False, **kwargs):
+        written = list(datablocks)
+        # Collection contents as of the write (the scene may change before the load)
+        contents, pending = {}, [item for item in written if isinstance(item, Collection)]
+        while pending:
+            collection = pending.pop()
+            if id(collection) not in contents:
+                contents[id(collection)] = (list(collection.objects), list(collection.children))
+                pending.extend(collection.children)
+        _WRITTEN[os.path.realpath(filepath)] = (written, contents)
+        with open(filepath, "wb") as handle:
+            handle.write(b"BLENDER stand-in")
+
+    @contextmanager
+    def load(self, filepath, link=False, **kwargs):
+        written = _WRITTEN.get(os.path.realpath(filepath))
+        if written is None and _WRITTEN:
+            # Written under a temporary name and moved into place afterwards
+            written = list(_WRITTEN.values())[-1]
+        written, contents = written or ([], {})
+        # Collections come with their child collections (and objects)
+        collections = [item for item in written if isinstance(item, Collection)]
+        for collection in collections:
+            collections.extend(child for child in contents[id(collection)][1] if child not in collections)
+        by_kind = {
+            "objects": [item for item in written if isinstance(item, Object)],
+            "collections": collections,
+            "worlds": [item for item in written if isinstance(item, World)],
+            "texts": [item for item in written if isinstance(item, Text)],
+        }
+        data_from = Struct(scenes=[], **{kind: [item.name for item in items] for kind, items in by_kind.items()})
+        data_to = Struct(scenes=[], **{kind: [] for kind in by_kind})
+        yield data_from, data_to
+
+        copies = {}
+
+        def append(item):
+            if id(item) in copies:
+                return copies[id(item)]
+            if isinstance(item, Object):
+                dup = Object(item.name, item.data)
+                dup.rigid_body = item.rigid_body
+                dup = data.objects._adopt(dup)
+            elif isinstance(item, Collection):
+                dup = data.collections._adopt(Collection(item.name))
+                copies[id(item)] = dup
+                objects, children = contents[id(item)]
+                for obj in objects:
+                    dup.objects.link(append(obj))
+                for child in children:
+                    dup.children.link(append(child))
+            elif isinstance(item, Text):
+                dup = data.texts._adopt(Text(item.name))
+                dup._body = item._body
+            else:
+                dup = item.copy()
+            dup._custom = dict(item._custom)
+            dup.use_fake_user = True
+            copies[id(item)] = dup
+            return dup
+
+        for kind, items in by_kind.items():
+            wanted = set(getattr(data_to, kind))
+            setattr(data_to, kind, [append(item) if item.name in wanted else None for item in items])
+
+
+class Data:
+    """bpy.data."""
+
+    _KINDS = {"objects": Object, "meshes": Mesh, "materials": Material, "textures": Texture,
+              "collections": Collection, "cameras": Camera, "lights": Light, "curves": Curve,
+              "images": Image, "actions": Action, "node_groups": NodeTree, "worlds": World, "texts": Text,
+              "scenes": Scene}
+
+    def __init__(self):
+        for attr, cls in self._KINDS.items():
+            setattr(self, attr, IDCollection(cls))
+        self.libraries = Libraries()
+        self.filepath = ""
+        self.is_dirty = False
+
+    def _collections(self):
+        return [getattr(self, attr) for attr in self._KINDS]
+
+    def batch_remove(self, ids):
+        for item in list(ids):
+            owner = _collection_of(item)
+            if owner is not None:
+                owner.remove(item)
+
+    def orphans_purge(self, do_local_ids=True, do_linked_ids=True, do_recursive=False):
+        removed = 0
+        while True:
+            used = _reachable()
+            orphans = [item for collection in self._collections() if collection._cls is not Scene
+                       for item in collection if id(item) not in used and not item.use_fake_user]
+            self.batch_remove(orphans)
+            removed += len(orphans)
+            if not orphans or not do_recursive:
+                return removed
+
+
+def _collection_of(item):
+    for collection in data._collections():
+        if any(existing is item for existing in collection._items):
+            return collection
+    return None
+
+
+def _id_references(value, found, depth=0):
+    """Collects the datablocks referenced by an ID's properties (data, materials, targets, ...)."""
+    if depth > 3:
+        return
+    if isinstance(value, ID):
+        found.append(value)
+    elif isinstance(value, Struct):
+        for child in value._props.values():
+            _id_references(child, found, depth + 1)
+    elif isinstance(value, (list, tuple)):
+        for child in value:
+            _id_references(child, found, depth + 1)
+
+
+def _references(item):
+    found = []
+    if isinstance(item, Scene):
+        found.extend([item.collection, item.camera, item.world])
+        if item.rigidbody_world is not None:
+            found.append(item.rigidbody_world.collection)
+    elif isinstance(item, Collection):
+        found.extend(item.objects)
+        found.extend(item.children)
+    elif isinstance(item, Object):
+        found.extend([item.data, item.parent])
+        _id_references(list(item.modifiers) + list(item.constraints), found)
+        found.extend(slot.material for slot in item._slots)
+    elif isinstance(item, Mesh):
+        found.extend(item.materials)
+    elif isinstance(item, Material):
+        _id_references(list(item.node_tree.nodes), found)
+    if item.animation_data is not None:
+        found.append(item.animation_data.action)
+    return [ref for ref in found if isinstance(ref, ID)]
+
+
+def _reachable():
+    """Ids of every datablock a scene (or a fake user) references, directly or indirectly."""
+    seen = set()
+    stack = [item for collection in data._collections() for item in collection
+             if isinstance(item, Scene) or item.use_fake_user]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        stack.extend(_references(item))
+    return seen
+
+
+def _user_count(item):
+    users = sum(1 for collection in data._collections() for other in collection
+                for ref in _references(other) if ref is item)
+    return users + int(item.use_fake_user)
+
+
+_WRITTEN = {}
+_OVERRIDES = []
+
+
+def _fire_update(scene=None):
+    for handler in list(app.handlers.depsgraph_update_post):
+        handler(scene or context.scene, context.view_layer.depsgraph)
+
+
+class Context:
+    """bpy.context."""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.view_layer = ViewLayer()
+        self.window = None
+        self.preferences = Struct()
+
+    @property
+    def collection(self):
+        return self.scene.collection
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def object(self):
+        return self.view_layer.objects.active
+
+    @property
+    def selected_objects(self):
+        return []
+
+    def evaluated_depsgraph_get(self):
+        # Blender evaluates the pending changes here, like view_layer.update()
+        _fire_update(self.scene)
+        return self.view_layer.depsgraph
+
+    @contextmanager
+    def temp_override(self, **kwargs):
+        _OVERRIDES.append(kwargs)
+        try:
+            yield
+        finally:
+            _OVERRIDES.pop()
+
+
+def reset():
+    """Starts a fresh session: one empty scene, no datablocks, no handlers."""
+    global data, context
+    data = Data()
+    context = Context(data.scenes.new("Scene"))
+    _WRITTEN.clear()
+    for handlers in vars(app.handlers).values():
+        del handlers[:]
+
+
+def _link_new(obj):
+    context.scene.collection.objects.link(obj)
+    context.view_layer.objects.active = obj
+    return obj
+
+
+def _ensure_rigidbody_world():
+    scene = _OVERRIDES[-1].get("scene", context.scene) if _OVERRIDES else context.scene
+    if scene.rigidbody_world is None:
+        scene.rigidbody_world = Struct(
+            enabled=True, collection=data.collections.new("RigidBodyWorld"), constraints=None, steps_per_second=60,
+            substeps_per_frame=10, solver_iterations=10, time_scale=1.0, use_split_impulse=False,
+            point_cache=Struct(frame_start=1, frame_end=250, is_baked=False))
+
+
+def _run_operator(module, name, kwargs):
+    """Side effects of the operators the Global Functions (or their fallbacks) use."""
+    idname = f"{module}.{name}"
+    location = kwargs.get("location", (0, 0, 0))
+    if idname.startswith("mesh.primitive_") and idname.endswith("_add"):
+        mesh = data.meshes.new(name[len("primitive_"):-len("_add")].replace("_", " ").title())
+        mesh.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)], [], [(0, 1, 2, 3)])
+        obj = _link_new(data.objects.new(mesh.name, mesh))
+        obj.location = location
+    elif idname == "object.camera_add":
+        obj = _link_new(data.objects.new("Camera", data.cameras.new("Camera")))
+        obj.location = location
+    elif idname == "object.light_add":
+        light = data.lights.new("Light", type=kwargs.get("type", "POINT"))
+        obj = _link_new(data.objects.new("Light", light))
+        obj.location = location
+    elif idname == "curve.primitive_bezier_curve_add":
+        curve = data.curves.new("BezierCurve")
+        curve.splines.new("BEZIER").bezier_points.add(1)
+        _link_new(data.objects.new("BezierCurve", curve))
+    elif idname == "object.duplicate" and context.active_object is not None:
+        source = context.active_object
+        _link_new(data.objects.new(source.name, source.data.copy() if source.data else None))
+    elif idname in {"rigidbody.world_add", "rigidbody.object_add"}:
+        _ensure_rigidbody_world()
+        obj = _OVERRIDES[-1].get("object") if _OVERRIDES else context.active_object
+        if idname == "rigidbody.object_add" and obj is not None and obj.rigid_body is None:
+            obj.rigid_body = _rigid_body_settings(kwargs.get("type", "ACTIVE"))
+    elif idname == "rigidbody.world_remove":
+        scene = _OVERRIDES[-1].get("scene", context.scene) if _OVERRIDES else context.scene
+        scene.rigidbody_world = None
+    elif idname == "render.render" and data.images.get("Render Result") is None:
+        data.images.new("Render Result")
+    elif idname == "outliner.orphans_purge":
+        data.orphans_purge(do_recursive=kwargs.get("do_recursive", False))
+    elif idname == "wm.read_factory_settings":
+        reset()
+    elif idname == "wm.save_as_mainfile":
+        with open(kwargs["filepath"], "wb") as handle:
+            handle.write(b"BLENDER stand-in")
+
+
+class _BPyOpsSubModOp:
+    """An operator: callable, with the same class name and idname_py() as Blender's."""
+
+    def __init__(self, module, name):
+        self._module = module
+        self._name = name
+
+    def idname_py(self):
+        return f"{self._module}.{self._name}"
+
+    def poll(self, *args):
+        return True
+
+    def __call__(self, *args, **kwargs):
+        _run_operator(self._module, self._name, kwargs)
+        _fire_update()
+        return {'FINISHED'}
+
+
+class _OpsSubMod:
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _BPyOpsSubModOp(self._module, name)
+
+
+class _Ops:
+    def __getattr__(self, module):
+        if module.startswith("__"):
+            raise AttributeError(module)
+        return _OpsSubMod(module)
+
+
+ops = _Ops()
+
+types = _pytypes.SimpleNamespace(
+    ID=ID, Object=Object, Mesh=Mesh, Material=Material, Collection=Collection, Scene=Scene,
+    Camera=Camera, Light=Light, Curve=Curve, Image=Image, Texture=Texture, Action=Action,
+    FCurve=FCurve, World=World, NodeTree=NodeTree, RigidBodyObject=Struct, RigidBodyWorld=Struct,
+    MeshUVLoopLayer=Struct, Library=Struct, Depsgraph=Struct,
+)
+app = _pytypes.SimpleNamespace(
+    version=(4, 2, 0), version_string="4.2.0 (bpy stand-in)", binary_path="blender", background=True,
+    handlers=_pytypes.SimpleNamespace(depsgraph_update_post=[], frame_change_post=[], render_post=[],
+                                      load_post=[]),
+)
+path = _pytypes.SimpleNamespace(abspath=lambda p: os.path.abspath(p[2:]) if p.startswith("//") else p)
+props = Struct()
+utils = Struct()
+
+data = None
+context = None
+reset()
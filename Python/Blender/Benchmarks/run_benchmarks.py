@@ -0,0 +1,341 @@
+"""
+================================================================================
+Pipeline Benchmark Suite
+================================================================================
+
+Runs every stage of the donut pipeline in a fresh session and measures, per
+stage:
+
+- wall time (fastest of --repeats runs),
+- operator calls (by operator) and depsgraph updates (Scene_builder.OperationCounter),
+- datablocks created and removed (by bpy.data collection).
+
+The results are compared against a JSON baseline in 'baselines/'. A stage that
+fails, or whose counts or time grow beyond the thresholds, is a regression and
+the script exits with code 1, so e.g. a change that compiles one material per
+sprinkle is caught before it reaches production.
+
+Two modes run the same suite:
+
+- standin: outside Blender, against the recording bpy stand-in in
+  'bpy_standin/' (counts are exact; times are the Python-side cost only).
+
+      python Python/Blender/Benchmarks/run_benchmarks.py
+
+- blender: inside Blender (started automatically when '--mode blender' is given
+  outside of it), with real evaluation and physics.
+
+      blender --background --factory-startup --python run_benchmarks.py -- --mode blender
+
+'--update-baseline' stores the current results as the new baseline.
+'--ignore-time' only gates the counts (for machines other than the one that
+recorded the baseline).
+
+clear_scene runs last, against the scene the other stages built, so it
+measures a real teardown instead of clearing an empty scene.
+
+benchmark_build_scene.py compares the whole scene build of main() against the
+operator-based Global Functions it replaced.
+
+================================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BLENDER_DIR = os.path.dirname(BENCHMARK_DIR)
+STANDIN_DIR = os.path.join(BENCHMARK_DIR, "bpy_standin")
+BASELINE_DIR = os.path.join(BENCHMARK_DIR, "baselines")
+
+STAGES = ("add_ground", "add_donut", "add_icing_and_sprinkles", "add_camera",
+          "animate_camera_fly_through", "add_light", "bake_physics", "clear_scene")
+
+# bpy.data collections whose datablocks are counted
+DATABLOCK_KINDS = ("objects", "meshes", "materials", "textures", "images", "node_groups", "collections",
+                   "cameras", "lights", "curves", "actions", "worlds")
+
+# Metrics gated against the baseline: relative growth allowed before a stage regresses
+COUNT_METRICS = ("operator_calls", "depsgraph_updates", "datablocks_created")
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_TIME_THRESHOLD = 0.50
+MIN_TIME_REGRESSION = 0.005  # seconds: smaller slowdowns are timer noise
+
+
+def _parse_args(argv: List[str]):
+    parser = argparse.ArgumentParser(description="Benchmark the donut pipeline stages.")
+    parser.add_argument("--mode", choices=("auto", "standin", "blender"), default="auto",
+                        help="'auto' uses Blender when run inside it, the bpy stand-in otherwise.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per stage; the fastest time is kept.")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON file (defaults to baselines/<mode>.json).")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative growth of operator calls, depsgraph updates and datablocks.")
+    parser.add_argument("--time-threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help="Allowed relative growth of a stage's wall time.")
+    parser.add_argument("--ignore-time", action="store_true", help="Do not gate wall times.")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file.")
+    parser.add_argument("--blender-binary", default="blender", help="Blender executable for '--mode blender'.")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the stages.")
+    return parser.parse_args(argv)
+
+
+def _inside_blender() -> bool:
+    """True when running in Blender's Python (and not against the stand-in)."""
+    try:
+        import bpy  # type: ignore
+    except ImportError:
+        return False
+    return not getattr(bpy, "__file__", "").startswith(STANDIN_DIR)
+
+
+def _setup_imports(mode: str) -> None:
+    if mode == "standin":
+        sys.path.insert(0, STANDIN_DIR)
+    if BLENDER_DIR not in sys.path:
+        sys.path.append(BLENDER_DIR)
+
+
+def _fresh_session(mode: str) -> None:
+    """Starts every run from an empty file and empty in-process caches."""
+    import bpy  # type: ignore
+    from Blender_Global_Functions.Icing_generator import clear_icing_cache  # type: ignore
+    from Blender_Global_Functions.Material_library import clear_material_cache  # type: ignore
+    from Blender_Global_Functions.Scene_reset import capture_snapshot, set_baseline  # type: ignore
+
+    if mode == "standin":
+        bpy.reset()
+    else:
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+    clear_material_cache()
+    clear_icing_cache()
+    # The empty file is the baseline clear_scene restores, as at the start of a pipeline run
+    set_baseline(capture_snapshot())
+
+
+def _datablock_pointers() -> Dict[str, set]:
+    import bpy  # type: ignore
+    return {kind: {block.as_pointer() for block in getattr(bpy.data, kind)} for kind in DATABLOCK_KINDS
+            if hasattr(bpy.data, kind)}
+
+
+def _stage_calls() -> list:
+    """(name, callable) per stage; the callables share the objects earlier stages created."""
+    from Blender_Global_Functions.Blender_clear_scene_function import clear_scene  # type: ignore
+    from Blender_Global_Functions.Add_ground_function import add_ground  # type: ignore
+    from Blender_Global_Functions.Add_donut_function import add_donut  # type: ignore
+    from Blender_Global_Functions.Frosting_and_sprinkles import add_icing_and_sprinkles  # type: ignore
+    from Blender_Global_Functions.Add_camera_function import add_camera, animate_camera_fly_through  # type: ignore
+    from Blender_Global_Functions.Add_light_function import add_light  # type: ignore
+    from Blender_Global_Functions.Bake_physics_function import bake_physics  # type: ignore
+
+    built = {}
+
+    def icing_and_sprinkles():
+        icing, sprinkles = add_icing_and_sprinkles(built["donut"], seed=7)
+        return icing is not None and sprinkles is not None
+
+    def fly_through():
+        animate_camera_fly_through(built["camera"], built["donut"])
+        return True
+
+    def store(name, function):
+        def call():
+            built[name] = function()
+            return built[name] is not None
+        return call
+
+    return [
+        ("add_ground", store("ground", add_ground)),
+        ("add_donut", store("donut", add_donut)),
+        ("add_icing_and_sprinkles", icing_and_sprinkles),
+        ("add_camera", store("camera", add_camera)),
+        ("animate_camera_fly_through", fly_through),
+        ("add_light", store("light", add_light)),
+        ("bake_physics", lambda: bake_physics(verbose=False, use_bake_cache=False)),
+        ("clear_scene", lambda: clear_scene(verbose=False) is None),
+    ]
+
+
+def run_suite(mode: str, verbose: bool = False) -> Dict[str, dict]:
+    """
+    Runs every stage once in a fresh session.
+
+    Args:
+        mode (str): 'standin' or 'blender'.
+        verbose (bool): Whether to show the output of the stages.
+
+    Returns:
+        dict: Metrics per stage name.
+    """
+    from Blender_Global_Functions.Scene_builder import OperationCounter  # type: ignore
+
+    _fresh_session(mode)
+    results = {}
+    for name, call in _stage_calls():
+        before = _datablock_pointers()
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        error = None
+        with output, OperationCounter() as counter:
+            start = time.perf_counter()
+            try:
+                ok = bool(call())
+            except Exception as e:
+                ok, error = False, f"{type(e).__name__}: {e}"
+            seconds = time.perf_counter() - start
+        after = _datablock_pointers()
+
+        created = {kind: len(after[kind] - before[kind]) for kind in after}
+        removed = {kind: len(before[kind] - after[kind]) for kind in after}
+        results[name] = {
+            "ok": ok,
+            "seconds": round(seconds, 6),
+            "operator_calls": counter.operator_calls,
+            "operators": dict(sorted(counter.operators.items())),
+            "depsgraph_updates": counter.depsgraph_updates,
+            "datablocks_created": sum(created.values()),
+            "datablocks_removed": sum(removed.values()),
+            "created": {kind: n for kind, n in created.items() if n},
+            "removed": {kind: n for kind, n in removed.items() if n},
+        }
+        if error:
+            results[name]["error"] = error
+    return results
+
+
+def benchmark(mode: str, repeats: int = 3, verbose: bool = False) -> dict:
+    """
+    Runs the suite 'repeats' times and keeps the fastest time of every stage.
+    Counts come from the last run (they are the same in every run).
+
+    Returns:
+        dict: {"mode", "blender_version", "repeats", "stages": {name: metrics}}.
+    """
+    import bpy  # type: ignore
+
+    runs = [run_suite(mode, verbose) for _ in range(max(1, repeats))]
+    stages = runs[-1]
+    for name, metrics in stages.items():
+        metrics["seconds"] = min(run[name]["seconds"] for run in runs)
+    return {
+        "mode": mode,
+        "blender_version": bpy.app.version_string,
+        "repeats": len(runs),
+        "stages": stages,
+    }
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    time_threshold: Optional[float] = DEFAULT_TIME_THRESHOLD
+) -> List[str]:
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (dict): Output of benchmark().
+        baseline (dict): A stored benchmark() result.
+        threshold (float): Allowed relative growth of the count metrics.
+        time_threshold (float or None): Allowed relative growth of wall time. None skips time.
+
+    Returns:
+        list: One message per regression (empty if there is none).
+    """
+    regressions = []
+    for name, base in baseline.get("stages", {}).items():
+        current = results["stages"].get(name)
+        if current is None:
+            regressions.append(f"{name}: stage missing")
+            continue
+        if base.get("ok") and not current["ok"]:
+            regressions.append(f"{name}: stage failed ({current.get('error', 'returned no result')})")
+        for metric in COUNT_METRICS:
+            old, new = base.get(metric, 0), current[metric]
+            if new > old and new - old > threshold * old:
+                regressions.append(f"{name}: {metric} {old} -> {new}")
+        if time_threshold is not None:
+            old, new = base.get("seconds", 0.0), current["seconds"]
+            if new > old * (1 + time_threshold) and new - old > MIN_TIME_REGRESSION:
+                regressions.append(f"{name}: seconds {old:.4f} -> {new:.4f}")
+    return regressions
+
+
+def print_report(results: dict, baseline: Optional[dict] = None) -> None:
+    """Prints one line per stage, with the baseline values in brackets."""
+    base_stages = (baseline or {}).get("stages", {})
+    print(f"\n=== Pipeline benchmark ({results['mode']}, Blender {results['blender_version']}) ===")
+    print(f"{'stage':<28}{'ok':>4}{'seconds':>18}{'operators':>14}{'updates':>14}{'datablocks':>16}")
+    for name, metrics in results["stages"].items():
+        base = base_stages.get(name, {})
+
+        def cell(metric, fmt="{}"):
+            value = fmt.format(metrics[metric])
+            return f"{value} [{fmt.format(base[metric])}]" if metric in base else value
+
+        print(f"{name:<28}{'yes' if metrics['ok'] else 'NO':>4}{cell('seconds', '{:.4f}'):>18}"
+              f"{cell('operator_calls'):>14}{cell('depsgraph_updates'):>14}{cell('datablocks_created'):>16}")
+
+
+def _run_in_blender(args, argv: List[str]) -> int:
+    """Starts Blender in the background on this script and returns its exit code."""
+    command = [args.blender_binary, "--background", "--factory-startup", "--python-exit-code", "1",
+               "--python", os.path.abspath(__file__), "--"] + argv
+    return subprocess.call(command)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    args = _parse_args(argv)
+
+    in_blender = _inside_blender()
+    mode = args.mode if args.mode != "auto" else ("blender" if in_blender else "standin")
+    if mode == "blender" and not in_blender:
+        return _run_in_blender(args, argv)
+    _setup_imports(mode)
+
+    results = benchmark(mode, repeats=args.repeats, verbose=args.verbose)
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{mode}.json")
+    baseline = None
+    if os.path.isfile(baseline_path):
+        with open(baseline_path, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one.")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold,
+                          None if args.ignore_time else args.time_threshold)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,9 +10,11 @@ slow-motion and a rolling camera effect.
 SCENE OVERVIEW:
 ---------------
 - The camera is placed and configured with depth of field for cinematic focus.
-- A Bezier curve path is generated to guide the camera through the donut hole.
-- The camera is animated to follow this path, with slow-motion in the middle.
-- The camera spins (rolls) as it flies through the donut for extra anime flair.
+- The fly-through is computed for every frame at once (Camera_trajectory) from a
+  declarative path spec: a pass through the donut hole by default, or any mix of
+  through / orbit / dolly / hold segments with ease curves.
+- The camera slows down in the middle and spins (rolls) for extra anime flair.
+- Location and rotation are keyed on every frame in bulk (Keyframe_utils).
 
 FUNCTIONS:
 ----------
@@ -24,10 +26,13 @@ FUNCTIONS:
    - Returns the created camera object.
 
 2. animate_camera_fly_through(...)
-   - Creates a curved path through the donut hole.
-   - Animates the camera to follow this path, flying through the donut.
-   - Adds slow-motion by adjusting animation keyframes.
+   - Samples a path through the donut hole (or a custom path spec).
+   - Adds slow-motion through the "slowmo" ease curve.
    - Adds dramatic camera roll for an anime-style effect.
+   - Writes the keyframes in bulk.
+
+3. apply_trajectory(...)
+   - Writes any sampled Camera_trajectory to a camera as keyframes.
 
 USAGE EXAMPLE:
 --------------
@@ -46,7 +51,11 @@ TIPS:
 
 import bpy # type: ignore
 import math
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
+
+from Blender_Global_Functions.Camera_trajectory import Trajectory, fly_through_path, sample_path  # type: ignore
+from Blender_Global_Functions.Keyframe_utils import matrices_to_loc_quat, write_keyframes  # type: ignore
+from Blender_Global_Functions.Object_utils import link_object, make_active  # type: ignore
 
 def add_camera(
     location: Tuple[float, float, float] = (5.0, -5.0, 5.0),
@@ -107,19 +116,21 @@ def add_camera(
         return None
 
     try:
-        # 6. Deselect all objects before adding
-        bpy.ops.object.select_all(action='DESELECT')
+        # 6. Create camera data and object through the data API (no operators)
+        camera_data = bpy.data.cameras.new(camera_name if camera_name else "Camera")
+        camera = bpy.data.objects.new(camera_name if camera_name else "Camera", camera_data)
+        camera.location = location
+        camera.rotation_euler = rotation
 
-        # 7. Add camera
-        bpy.ops.object.camera_add(location=location, rotation=rotation)
-        camera = bpy.context.active_object
+        # 7. Link camera into the active collection
+        link_object(camera)
 
         # 8. Check if camera was created
         if camera is None or camera.type != 'CAMERA':
-            print("Camera creation failed: No active camera object after camera_add.")
+            print("Camera creation failed: object is not a camera.")
             return None
 
-        # 9. Assign name
+        # 9. Assign name (data-API names get a suffix if the name is taken)
         camera.name = camera_name if camera_name else "Camera"
 
         # 10. Set as scene camera if requested
@@ -128,8 +139,8 @@ def add_camera(
 
         # 11. Access camera data safely
         camera_data = getattr(camera, "data", None)
-        if camera_data is None or camera_data.type != 'CAMERA':
-            print("Camera data not found or not of type CAMERA.")
+        if camera_data is None or camera_data.type not in {'PERSP', 'ORTHO', 'PANO'}:
+            print("Camera data not found or not a camera.")
             return None
 
         # 12. Set depth of field
@@ -149,11 +160,9 @@ def add_camera(
         # 14. Ensure camera is visible and selectable
         camera.hide_viewport = False
         camera.hide_render = False
-        camera.hide_set(False)
-        camera.select_set(True)
 
-        # 15. Set camera as active object
-        bpy.context.view_layer.objects.active = camera
+        # 15. Set camera as active object (deferred inside a SceneBuilder block)
+        make_active(camera)
 
         # 16. Return the camera object
         return camera
@@ -162,78 +171,64 @@ def add_camera(
         print(f"Failed to add camera: {e}")
         return None
 
+def apply_trajectory(camera_obj, trajectory: Trajectory, interpolation: str = 'LINEAR') -> None:
+    """
+    Writes a sampled trajectory to the camera as location and quaternion keyframes,
+    one bulk write per channel.
+
+    Args:
+        camera_obj (bpy.types.Object): The camera object to animate.
+        trajectory (Trajectory): Output of Camera_trajectory.sample_path().
+        interpolation (str): Keyframe interpolation; every frame is keyed, so 'LINEAR' is exact.
+    """
+    locations, quaternions = matrices_to_loc_quat(trajectory.matrices)
+    camera_obj.rotation_mode = 'QUATERNION'
+    write_keyframes(camera_obj, "location", trajectory.frames, locations,
+                    interpolation=interpolation, group="Object Transforms")
+    write_keyframes(camera_obj, "rotation_quaternion", trajectory.frames, quaternions,
+                    interpolation=interpolation, group="Object Transforms")
+
+
 def animate_camera_fly_through(
     camera_obj,
     donut_obj,
     frames: int = 120,
-    slowmo_factor: float = 2.0
+    slowmo_factor: float = 2.0,
+    path: Optional[List[dict]] = None,
+    frame_start: int = 1
 ):
     """
     Animates the camera flying through the donut hole with slow-motion and dramatic rotation.
+
+    The whole move is computed with Camera_trajectory and keyed on every frame in bulk;
+    no path curve or Follow Path constraint is created.
+
     Args:
         camera_obj: The camera object to animate.
         donut_obj: The donut object to fly through.
         frames: Total frames for the animation.
         slowmo_factor: How much to slow down in the middle (higher = slower).
+        path (list, optional): A Camera_trajectory path spec replacing the default
+            fly-through (orbits, dollies, other ease curves...). 'frames' and
+            'slowmo_factor' are ignored when given.
+        frame_start (int): Frame of the first keyframe.
     """
-    # 1. Create a path (Bezier curve) through the donut hole
-    bpy.ops.curve.primitive_bezier_curve_add()
-    path = bpy.context.active_object
-    path.name = "DonutFlyThroughPath"
-    curve = path.data
-
-    # 2. Position curve points: start outside, pass through center, exit behind
-    major_radius = donut_obj.dimensions.x / 2
-    minor_radius = donut_obj.dimensions.z / 2
-    donut_center = donut_obj.location
-
-    # Set curve points
-    curve.splines[0].bezier_points[0].co = (donut_center.x - major_radius * 2, donut_center.y, donut_center.z)
-    curve.splines[0].bezier_points[1].co = (donut_center.x + major_radius * 2, donut_center.y, donut_center.z)
-    # Add a middle point at the donut center for dramatic effect
-    mid_point = curve.splines[0].bezier_points[0].handle_right
-    curve.splines[0].bezier_points[0].handle_right_type = 'FREE'
-    curve.splines[0].bezier_points[1].handle_left_type = 'FREE'
-
-    # 3. Add a Follow Path constraint to the camera
+    # 1. Describe the move: a pass through the donut center, slow in the middle, one full roll
+    if path is None:
+        major_radius = donut_obj.dimensions.x / 2
+        path = fly_through_path(tuple(donut_obj.location), major_radius, frames, slowmo_factor)
+
+    # 2. Sample every frame at once
+    trajectory = sample_path(path, frame_start=frame_start)
+
+    # 3. Constraints (e.g. a Follow Path of an older fly-through) would override the keys
     camera_obj.constraints.clear()
-    follow = camera_obj.constraints.new(type='FOLLOW_PATH')
-    follow.target = path
-    follow.use_curve_follow = True
-
-    # 4. Animate camera along the path
-    path.data.path_duration = frames
-    bpy.context.view_layer.objects.active = path
-    bpy.ops.object.select_all(action='DESELECT')
-    path.select_set(True)
-    bpy.context.view_layer.objects.active = path
-
-    # Insert keyframes for evaluation time (controls camera position on path)
-    path.data.use_path = True
-    path.data.eval_time = 0
-    path.data.keyframe_insert(data_path="eval_time", frame=1)
-    path.data.eval_time = frames
-    path.data.keyframe_insert(data_path="eval_time", frame=frames)
-
-    # 5. Slow-motion effect: adjust F-curve interpolation
-    fcurve = path.data.animation_data.action.fcurves.find('eval_time')
-    if fcurve:
-        for kp in fcurve.keyframe_points:
-            kp.interpolation = 'EASE_IN_OUT'
-        # Add slowmo in the middle by manipulating handles
-        mid_frame = frames // 2
-        fcurve.keyframe_points.insert(frame=mid_frame, value=frames // slowmo_factor, options={'FAST'})
-        fcurve.update()
-
-    # 6. Add dramatic camera roll (anime style)
-    camera_obj.rotation_mode = 'XYZ'
-    camera_obj.keyframe_insert(data_path="rotation_euler", frame=1)
-    camera_obj.rotation_euler[1] = math.radians(0)  # No tilt at start
-    camera_obj.keyframe_insert(data_path="rotation_euler", frame=mid_frame)
-    camera_obj.rotation_euler[1] = math.radians(360)  # Full roll at mid
-    camera_obj.keyframe_insert(data_path="rotation_euler", frame=frames)
-    
-    print("Camera fly-through animation created! Render your animation to see the effect.")
+
+    # 4. Bulk-write location and rotation keyframes
+    apply_trajectory(camera_obj, trajectory)
+
+    print(f"Camera fly-through animation created ({len(trajectory.frames)} frames)! "
+          "Render your animation to see the effect.")
 
 # Example usage after creating donut and camera:
 # donut = add_donut()
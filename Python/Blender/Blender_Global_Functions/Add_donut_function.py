@@ -1,7 +1,15 @@
 import bpy  # type: ignore
-import random
 from typing import Tuple, Optional
 
+from Blender_Global_Functions.Collision_proxy import add_torus_proxy  # type: ignore
+from Blender_Global_Functions.Donut_mesh_builder import torus_geometry  # type: ignore
+from Blender_Global_Functions.Icing_generator import get_icing_object, set_object_material  # type: ignore
+from Blender_Global_Functions.Material_library import get_material, procedural_noise_spec  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import write_mesh_arrays, write_uv_layer, set_smooth_shading  # type: ignore
+from Blender_Global_Functions.Object_utils import link_object, add_rigid_body  # type: ignore
+
+DISPLACE_STRENGTH = 0.07  # Subtle imperfections, tweak for more/less bump
+
 def add_donut(
     location: Tuple[float, float, float] = (0.0, 0.0, 3.0),
     major_radius: float = 1.0,
@@ -16,40 +24,46 @@ def add_donut(
     material_color: Tuple[float, float, float, float] = (0.9, 0.6, 0.3, 1.0),
     roughness: float = 0.4,
     subsurface: float = 0.2,
-    material_name: str = "DonutMaterial"
+    material_name: str = "DonutMaterial",
+    major_segments: int = 48,
+    minor_segments: int = 12,
+    collision_proxy: Optional[str] = "hull"
 ) -> Optional[bpy.types.Object]:
     """
     Adds a photorealistic donut mesh to the scene with procedural bread texture,
     frosting, and optional rigid body physics. Includes natural imperfections.
 
+    The torus and frosting meshes are generated as NumPy arrays and written through
+    the data API, so no operators, selection changes or mode switches are involved
+    and the function is safe to call many times in --background batch runs.
+
+    With collision_proxy ("hull" or "compound", see Collision_proxy) the rigid body
+    goes on a render-hidden low-poly proxy that the donut is parented to, instead of
+    on the subdivided, displaced donut itself. None keeps it on the donut.
+
     Returns:
         The donut object, or None if creation failed.
     """
     try:
-        # Store current selection and mode
-        prev_mode = bpy.context.object.mode if bpy.context.object else 'OBJECT'
-        bpy.ops.object.select_all(action='DESELECT')
-
-        # --- Create Donut Base ---
-        bpy.ops.mesh.primitive_torus_add(
-            major_radius=major_radius,
-            minor_radius=minor_radius,
-            location=location
-        )
-        donut = bpy.context.active_object
-        donut.name = name
-
-        # --- Add Rigid Body Physics ---
-        if rigid_body:
-            bpy.ops.rigidbody.object_add()
-            donut.rigid_body.type = 'ACTIVE'
-            donut.rigid_body.mass = mass
-            donut.rigid_body.friction = friction
-            donut.rigid_body.restitution = restitution
+        # --- Create Donut Base (data API: no operators, selection or mode changes) ---
+        verts, faces, uvs = torus_geometry(major_radius, minor_radius, major_segments, minor_segments)
+        mesh = bpy.data.meshes.new(name)
+        write_mesh_arrays(mesh, verts, faces)
+        write_uv_layer(mesh, uvs)
+        donut = bpy.data.objects.new(name, mesh)
+        donut.location = location
+        link_object(donut)
+
+        # --- Add Rigid Body Physics (on a low-poly proxy covering the displaced surface) ---
+        if rigid_body and collision_proxy:
+            add_torus_proxy(donut, major_radius, minor_radius + DISPLACE_STRENGTH / 2, shape=collision_proxy,
+                            mass=mass, friction=friction, restitution=restitution)
+        elif rigid_body:
+            add_rigid_body(donut, 'ACTIVE', mass=mass, friction=friction, restitution=restitution)
 
         # --- Smooth Shading & Subdivision ---
         if smooth_shading:
-            bpy.ops.object.shade_smooth()
+            set_smooth_shading(mesh)
         subdiv = donut.modifiers.new(name="Subdivision", type='SUBSURF')
         subdiv.levels = subdivision_levels
         subdiv.render_levels = subdivision_levels
@@ -58,103 +72,34 @@ def add_donut(
         tex = bpy.data.textures.new("DonutImperfection", type='CLOUDS')
         disp = donut.modifiers.new(name="Imperfection", type='DISPLACE')
         disp.texture = tex
-        disp.strength = 0.07  # Subtle, tweak for more/less bump
-
-        # --- Bread Material (Procedural) ---
-        mat = bpy.data.materials.new(name=material_name)
-        mat.use_nodes = True
-        nodes = mat.node_tree.nodes
-        links = mat.node_tree.links
-        nodes.clear()
-
-        # Nodes for bread
-        output = nodes.new("ShaderNodeOutputMaterial")
-        bsdf = nodes.new("ShaderNodeBsdfPrincipled")
-        noise = nodes.new("ShaderNodeTexNoise")
-        bump = nodes.new("ShaderNodeBump")
-        colorramp = nodes.new("ShaderNodeValToRGB")
-        mapping = nodes.new("ShaderNodeMapping")
-        texcoord = nodes.new("ShaderNodeTexCoord")
-
-        # Bread color ramp (golden brown)
-        colorramp.color_ramp.elements[0].color = (0.92, 0.75, 0.45, 1)
-        colorramp.color_ramp.elements[1].color = (0.7, 0.5, 0.2, 1)
-
-        # Node links for bread
-        links.new(texcoord.outputs['Object'], mapping.inputs['Vector'])
-        links.new(mapping.outputs['Vector'], noise.inputs['Vector'])
-        noise.inputs['Scale'].default_value = 8.0
-        links.new(noise.outputs['Fac'], colorramp.inputs['Fac'])
-        links.new(colorramp.outputs['Color'], bsdf.inputs['Base Color'])
-        links.new(noise.outputs['Fac'], bump.inputs['Height'])
-        bump.inputs['Strength'].default_value = 0.15
-        links.new(bump.outputs['Normal'], bsdf.inputs['Normal'])
-        bsdf.inputs['Subsurface'].default_value = 0.25
-        bsdf.inputs['Subsurface Color'].default_value = (1, 0.8, 0.6, 1)
-        bsdf.inputs['Roughness'].default_value = 0.45
-        links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+        disp.strength = DISPLACE_STRENGTH
+
+        # --- Bread Material (Procedural, shared through the material library) ---
+        mat = get_material(material_name, procedural_noise_spec(
+            ramp_colors=[(0.92, 0.75, 0.45, 1), (0.7, 0.5, 0.2, 1)],  # Golden brown
+            noise_scale=8.0,
+            bump_strength=0.15,
+            roughness=0.45,
+            subsurface=0.25,
+            subsurface_color=(1, 0.8, 0.6, 1)
+        ))
 
         donut.data.materials.clear()
         donut.data.materials.append(mat)
 
-        # --- Frosting Geometry ---
-        bpy.ops.object.select_all(action='DESELECT')
-        donut.select_set(True)
-        bpy.context.view_layer.objects.active = donut
-        bpy.ops.object.duplicate()
-        frosting = bpy.context.active_object
-        frosting.name = f"{name}_Frosting"
-
-        # Edit frosting mesh: keep only top faces, shrink/fatten for thickness
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_random(percent=60, seed=random.randint(0, 100))
-        bpy.ops.mesh.delete(type='FACE')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.transform.shrink_fatten(value=0.07)
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        # --- Frosting Material (Procedural) ---
-        frosting_mat = bpy.data.materials.new(name="FrostingMaterial")
-        frosting_mat.use_nodes = True
-        f_nodes = frosting_mat.node_tree.nodes
-        f_links = frosting_mat.node_tree.links
-        f_nodes.clear()
-
-        f_output = f_nodes.new("ShaderNodeOutputMaterial")
-        f_bsdf = f_nodes.new("ShaderNodeBsdfPrincipled")
-        f_noise = f_nodes.new("ShaderNodeTexNoise")
-        f_bump = f_nodes.new("ShaderNodeBump")
-        f_colorramp = f_nodes.new("ShaderNodeValToRGB")
-        f_mapping = f_nodes.new("ShaderNodeMapping")
-        f_texcoord = f_nodes.new("ShaderNodeTexCoord")
-
-        # Frosting color ramp (pink gradient)
-        f_colorramp.color_ramp.elements[0].color = (0.95, 0.6, 0.8, 1)
-        f_colorramp.color_ramp.elements[1].color = (0.8, 0.2, 0.4, 1)
-
-        f_links.new(f_texcoord.outputs['Object'], f_mapping.inputs['Vector'])
-        f_links.new(f_mapping.outputs['Vector'], f_noise.inputs['Vector'])
-        f_noise.inputs['Scale'].default_value = 12.0
-        f_links.new(f_noise.outputs['Fac'], f_colorramp.inputs['Fac'])
-        f_links.new(f_colorramp.outputs['Color'], f_bsdf.inputs['Base Color'])
-        f_links.new(f_noise.outputs['Fac'], f_bump.inputs['Height'])
-        f_bump.inputs['Strength'].default_value = 0.08
-        f_links.new(f_bump.outputs['Normal'], f_bsdf.inputs['Normal'])
-        f_bsdf.inputs['Roughness'].default_value = 0.25
-        f_bsdf.inputs['Subsurface'].default_value = 0.1
-        f_links.new(f_bsdf.outputs['BSDF'], f_output.inputs['Surface'])
-
-        frosting.data.materials.clear()
-        frosting.data.materials.append(frosting_mat)
-        frosting.parent = donut
-
-        # --- Restore previous mode ---
-        bpy.ops.object.select_all(action='DESELECT')
-        donut.select_set(True)
-        bpy.context.view_layer.objects.active = donut
-        if prev_mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode=prev_mode)
+        # --- Frosting Geometry (shared, cached icing shell over the top-facing faces) ---
+        frosting = get_icing_object(donut, thickness=0.07, name=f"{name}_Frosting")
+
+        # --- Frosting Material (Procedural, shared through the material library) ---
+        frosting_mat = get_material("FrostingMaterial", procedural_noise_spec(
+            ramp_colors=[(0.95, 0.6, 0.8, 1), (0.8, 0.2, 0.4, 1)],  # Pink gradient
+            noise_scale=12.0,
+            bump_strength=0.08,
+            roughness=0.25,
+            subsurface=0.1
+        ))
+
+        set_object_material(frosting, frosting_mat)
 
         print("Donut creation complete! Reminder: Your render will be saved to the output path set in Blender's Render Properties (default: //render.png).")
         return donut
@@ -1,6 +1,12 @@
 import bpy # type: ignore
+import numpy as np
 from typing import Tuple, Optional
 
+from Blender_Global_Functions.Collision_proxy import add_box_proxy  # type: ignore
+from Blender_Global_Functions.Material_library import get_material, procedural_noise_spec  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import write_mesh_arrays, write_uv_layer  # type: ignore
+from Blender_Global_Functions.Object_utils import link_object, add_rigid_body  # type: ignore
+
 def add_ground(
     size: float = 8.0,
     location: Tuple[float, float, float] = (0.0, 0.0, 0.0),
@@ -9,7 +15,8 @@ def add_ground(
     restitution: float = 0.7,
     rigid_body: bool = True,
     use_material: bool = True,
-    material_name: str = "GroundMaterial"
+    material_name: str = "GroundMaterial",
+    collision_proxy: bool = True
 ) -> Optional[bpy.types.Object]:
     """
     Adds a ground plane to the scene with optional rigid body physics and a procedural material.
@@ -23,54 +30,40 @@ def add_ground(
         rigid_body (bool): Whether to add rigid body physics.
         use_material (bool): Whether to add a procedural material to the ground.
         material_name (str): Name for the ground material.
+        collision_proxy (bool): Whether the rigid body goes on a render-hidden box
+            proxy under the plane (see Collision_proxy) instead of the plane itself.
 
     Returns:
         bpy.types.Object or None: The created ground object, or None if creation failed.
     """
     try:
-        # Deselect all and add the plane
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.ops.mesh.primitive_plane_add(size=size, location=location)
-        ground = bpy.context.active_object
-        ground.name = name
+        # Build the plane through the data API (no operators or selection changes)
+        half = size / 2
+        mesh = bpy.data.meshes.new(name)
+        write_mesh_arrays(
+            mesh,
+            [(-half, -half, 0.0), (half, -half, 0.0), (half, half, 0.0), (-half, half, 0.0)],
+            np.array([[0, 1, 2, 3]])
+        )
+        write_uv_layer(mesh, [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)])
+        ground = bpy.data.objects.new(name, mesh)
+        ground.location = location
+        link_object(ground)
 
         # Add rigid body physics if requested
-        if rigid_body:
-            bpy.ops.rigidbody.object_add()
-            ground.rigid_body.type = 'PASSIVE'
-            ground.rigid_body.friction = friction
-            ground.rigid_body.restitution = restitution
+        if rigid_body and collision_proxy:
+            add_box_proxy(ground, 'PASSIVE', friction=friction, restitution=restitution)
+        elif rigid_body:
+            add_rigid_body(ground, 'PASSIVE', friction=friction, restitution=restitution)
 
         # Add a procedural material for realism
         if use_material:
-            mat = bpy.data.materials.new(name=material_name)
-            mat.use_nodes = True
-            nodes = mat.node_tree.nodes
-            links = mat.node_tree.links
-            nodes.clear()
-
-            output = nodes.new("ShaderNodeOutputMaterial")
-            bsdf = nodes.new("ShaderNodeBsdfPrincipled")
-            noise = nodes.new("ShaderNodeTexNoise")
-            bump = nodes.new("ShaderNodeBump")
-            mapping = nodes.new("ShaderNodeMapping")
-            texcoord = nodes.new("ShaderNodeTexCoord")
-            colorramp = nodes.new("ShaderNodeValToRGB")
-
-            # Color ramp for subtle variation (gray to brownish)
-            colorramp.color_ramp.elements[0].color = (0.7, 0.7, 0.7, 1)
-            colorramp.color_ramp.elements[1].color = (0.4, 0.3, 0.2, 1)
-
-            links.new(texcoord.outputs['Object'], mapping.inputs['Vector'])
-            links.new(mapping.outputs['Vector'], noise.inputs['Vector'])
-            noise.inputs['Scale'].default_value = 3.0
-            links.new(noise.outputs['Fac'], colorramp.inputs['Fac'])
-            links.new(colorramp.outputs['Color'], bsdf.inputs['Base Color'])
-            links.new(noise.outputs['Fac'], bump.inputs['Height'])
-            bump.inputs['Strength'].default_value = 0.15
-            links.new(bump.outputs['Normal'], bsdf.inputs['Normal'])
-            bsdf.inputs['Roughness'].default_value = 0.7
-            links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+            mat = get_material(material_name, procedural_noise_spec(
+                ramp_colors=[(0.7, 0.7, 0.7, 1), (0.4, 0.3, 0.2, 1)],  # Gray to brownish
+                noise_scale=3.0,
+                bump_strength=0.15,
+                roughness=0.7
+            ))
 
             ground.data.materials.clear()
             ground.data.materials.append(mat)
@@ -1,6 +1,8 @@
 import bpy # type: ignore
 from typing import Tuple, Optional
 
+from Blender_Global_Functions.Object_utils import link_object  # type: ignore
+
 def add_light(
     light_type: str = 'AREA',
     location: Tuple[float, float, float] = (4.0, -4.0, 6.0),
@@ -30,10 +32,11 @@ def add_light(
         if light_type not in valid_types:
             raise ValueError(f"Invalid light_type '{light_type}'. Must be one of {valid_types}.")
 
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.ops.object.light_add(type=light_type, location=location)
-        light = bpy.context.active_object
-        light.name = name
+        # Create light data and object through the data API (no operators)
+        light_data = bpy.data.lights.new(name=name, type=light_type)
+        light = bpy.data.objects.new(name, light_data)
+        light.location = location
+        link_object(light)
         light.data.energy = energy
         light.data.color = color
 
@@ -1,23 +1,44 @@
 import bpy # type: ignore
 
+from Blender_Global_Functions.Fast_physics import apply_fast_physics  # type: ignore
+from Blender_Global_Functions.Physics_bake_cache import (  # type: ignore
+    DEFAULT_BAKE_CACHE_DIR, DEFAULT_BAKE_CACHE_MAX_BYTES, apply_physics_bake, open_bake_cache,
+    physics_bake_key, remove_cached_motion, store_physics_bake
+)
+
 def bake_physics(
     steps_per_second: int = 120,
     solver_iterations: int = 25,
     verbose: bool = True,
     clear_cache: bool = True,
     frame_start: int = None,
-    frame_end: int = None
+    frame_end: int = None,
+    use_bake_cache: bool = True,
+    cache_dir: str = DEFAULT_BAKE_CACHE_DIR,
+    cache_max_bytes: int = DEFAULT_BAKE_CACHE_MAX_BYTES,
+    fast_physics: bool = False
 ) -> bool:
     """
     Bake the physics simulation for all objects in the current scene.
 
+    Rigid body results are kept in a disk cache keyed by the rigid body setup
+    (see Physics_bake_cache); a matching setup replays the stored motion instead of
+    simulating again.
+
+    With fast_physics, a single body dropped onto a ground plane is solved in closed
+    form instead (see Fast_physics); any other scene falls back to the simulation.
+
     Args:
         steps_per_second (int): Number of simulation steps per second.
         solver_iterations (int): Number of solver iterations for the simulation.
         verbose (bool): Whether to print status messages.
-        clear_cache (bool): Whether to clear previous bakes before baking.
+        clear_cache (bool): Whether to clear previous in-memory bakes before baking.
         frame_start (int, optional): Start frame for baking. Defaults to scene start.
         frame_end (int, optional): End frame for baking. Defaults to scene end.
+        use_bake_cache (bool): Whether to reuse and store bakes in the disk cache.
+        cache_dir (str): Directory of the physics bake cache.
+        cache_max_bytes (int): Size cap of the physics bake cache in bytes.
+        fast_physics (bool): Whether to solve simple drop scenes analytically.
 
     Returns:
         bool: True if baking succeeded, False otherwise.
@@ -29,6 +50,10 @@ def bake_physics(
             if verbose:
                 print("Rigidbody world added to the scene.")
 
+        # Start from the objects' own transforms and a live simulation
+        if remove_cached_motion(scene) and verbose:
+            print("Removed previously replayed physics cache.")
+
         rbw = scene.rigidbody_world
         if hasattr(rbw, "steps_per_second"):
             rbw.steps_per_second = steps_per_second
@@ -41,6 +66,22 @@ def bake_physics(
         if frame_end is not None:
             scene.frame_end = frame_end
 
+        if fast_physics:
+            scene.frame_set(rbw.point_cache.frame_start)
+            if apply_fast_physics(scene, verbose=verbose):
+                return True
+
+        cache = key = None
+        if use_bake_cache:
+            cache = open_bake_cache(cache_dir, max_bytes=cache_max_bytes)
+            # Initial transforms are read at the first simulated frame
+            scene.frame_set(rbw.point_cache.frame_start)
+            key = physics_bake_key(scene)
+            if apply_physics_bake(cache, key, scene):
+                if verbose:
+                    print(f"Physics bake reused from cache ({key[:12]}).")
+                return True
+
         if clear_cache:
             bpy.ops.ptcache.free_bake_all()
             if verbose:
@@ -50,8 +91,11 @@ def bake_physics(
         if verbose:
             obj_count = sum(1 for obj in scene.objects if obj.rigid_body)
             print(f"Physics baking completed successfully for {obj_count} rigid body object(s).")
+
+        if cache is not None and store_physics_bake(cache, key, scene) and verbose:
+            print(f"Physics bake stored in cache ({key[:12]}).")
         return True
     except Exception as e:
         if verbose:
             print(f"Physics baking failed: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -1,34 +1,61 @@
 try:
     import bpy # type: ignore
+    from Blender_Global_Functions.Scene_reset import baseline, capture_snapshot, set_baseline  # type: ignore
 except ImportError:
     bpy = None  # Allows code completion in editors, but only works in Blender
 
-def clear_scene(verbose: bool = True, remove_orphans: bool = True, reset_cursor: bool = True) -> None:
+def clear_scene(
+    verbose: bool = True,
+    remove_orphans: bool = True,
+    reset_cursor: bool = True,
+    use_snapshot: bool = True
+) -> None:
     """
     Deletes all objects in the current Blender scene and optionally removes orphan data.
 
+    If a baseline snapshot is registered (Scene_reset.set_baseline) and still complete,
+    the scene is restored to it instead: only the datablocks created since are removed,
+    in one batch, and no orphan purge is needed. Otherwise the scene is cleared in
+    full and then registered as the baseline, so the first clear of a session (at
+    pipeline start) pays for the purge and every later one only removes what the
+    pipeline created.
+
     Args:
         verbose (bool): Whether to print status messages.
         remove_orphans (bool): Whether to remove orphan data blocks (meshes, materials, etc.).
         reset_cursor (bool): Whether to reset the 3D cursor and frame to defaults.
+        use_snapshot (bool): Whether to restore the registered baseline snapshot, if any,
+            and to register the cleared scene as the baseline otherwise.
     """
     if bpy is None:
         if verbose:
             print("bpy module not available. This function must be run inside Blender.")
         return
 
+    snapshot = baseline() if use_snapshot else None
+    if snapshot is not None:
+        try:
+            if not snapshot.restore(verbose=verbose)["missing"]:
+                return
+            if verbose:
+                print("Baseline snapshot is incomplete; clearing the scene instead.")
+        except Exception as e:
+            if verbose:
+                print(f"Snapshot restore failed, clearing the scene instead: {e}")
+
     try:
-        # Deselect all, select all, and delete
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete(use_global=False)
+        # Delete every object of the scene in one data-API batch (no selection or operators)
+        bpy.data.batch_remove(list(bpy.context.scene.objects))
         if verbose:
             print("All objects deleted from the scene.")
 
         # Remove orphan data blocks for a truly clean scene
         if remove_orphans:
-            for _ in range(3):  # Run multiple times to ensure all are purged
-                bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+            if hasattr(bpy.data, "orphans_purge"):
+                bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
+            else:
+                for _ in range(3):  # Run multiple times to ensure all are purged
+                    bpy.ops.outliner.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True)
             if verbose:
                 print("Orphan data blocks purged.")
 
@@ -39,6 +66,9 @@ def clear_scene(verbose: bool = True, remove_orphans: bool = True, reset_cursor:
             if verbose:
                 print("3D cursor and frame reset.")
 
+        if use_snapshot:
+            set_baseline(capture_snapshot())
+
     except Exception as e:
         if verbose:
             print(f"Scene clearing failed: {e}")
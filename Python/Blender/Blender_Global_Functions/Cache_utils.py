@@ -0,0 +1,275 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import uuid
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+# Package whose modules code_fingerprint() follows
+GLOBAL_FUNCTIONS_PACKAGE = "Blender_Global_Functions"
+
+
+def _normalize(value: Any) -> Any:
+    """Converts tuples, sets and Blender vectors into plain JSON-friendly values."""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, float):
+        # Round away float noise so equal specs hash equally
+        return round(value, 6)
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha1(value).hexdigest()
+    if hasattr(value, "__len__") and hasattr(value, "__getitem__"):
+        return [_normalize(v) for v in value]
+    return repr(value)
+
+
+def stable_hash(data: Any) -> str:
+    """
+    Returns a content hash for nested dicts/lists/tuples of plain values.
+
+    Args:
+        data: The data to hash. Dict key order does not matter.
+
+    Returns:
+        str: Hex SHA-1 digest of the canonical JSON form of the data.
+    """
+    canonical = json.dumps(_normalize(data), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    """One file stored in a DiskCache."""
+    key: str
+    path: str
+    size: int
+    last_used: float
+
+
+class DiskCache:
+    """
+    A directory of cache files keyed by content hashes, evicted least-recently-used
+    first once the size or entry cap is exceeded.
+
+    Each entry is a single file named '<key><suffix>'. Files are written to a temporary
+    name and moved into place with os.replace, so readers never see partial entries and
+    several processes can share the directory. The file modification time records the
+    last use; get() refreshes it.
+
+    Args:
+        directory (str): Cache directory (created if missing).
+        max_bytes (int, optional): Total size cap in bytes. None disables the size cap.
+        max_entries (int, optional): Maximum number of entries. None disables the cap.
+        suffix (str): File extension of the entries, e.g. ".blend".
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: Optional[int] = 2 * 1024 ** 3,
+        max_entries: Optional[int] = None,
+        suffix: str = ""
+    ):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.suffix = suffix
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        """Returns the file path of an entry (whether or not it exists)."""
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Looks up an entry and marks it as recently used.
+
+        Returns:
+            str or None: Path of the cached file, or None on a miss.
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, writer: Callable[[str], Any]) -> Optional[str]:
+        """
+        Stores an entry written by a callback, then evicts old entries if needed.
+
+        Args:
+            key (str): The entry key.
+            writer (callable): Called with a temporary file path (ending in the cache
+                suffix) and must write the entry there.
+
+        Returns:
+            str or None: Path of the stored entry, or None if the writer produced no file.
+        """
+        tmp_path = os.path.join(self.directory, f".tmp-{key}-{uuid.uuid4().hex}{self.suffix}")
+        try:
+            writer(tmp_path)
+            if not os.path.isfile(tmp_path):
+                return None
+            path = self.path_for(key)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict(keep=key)
+        return path
+
+    def invalidate(self, key: str) -> bool:
+        """Removes one entry. Returns True if it existed."""
+        try:
+            os.remove(self.path_for(key))
+            return True
+        except OSError:
+            return False
+
+    def clear(self) -> int:
+        """Removes every entry. Returns the number of entries removed."""
+        removed = 0
+        for entry in self.entries():
+            if self.invalidate(entry.key):
+                removed += 1
+        return removed
+
+    def entries(self) -> List[CacheEntry]:
+        """Lists the entries, least recently used first."""
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(".tmp-") or not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if not os.path.isfile(path):
+                continue
+            key = name[:len(name) - len(self.suffix)] if self.suffix else name
+            found.append(CacheEntry(key, path, stat.st_size, stat.st_mtime))
+        found.sort(key=lambda e: e.last_used)
+        return found
+
+    def total_bytes(self) -> int:
+        """Total size of all entries in bytes."""
+        return sum(entry.size for entry in self.entries())
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Removes least recently used entries until the caps are met.
+
+        Args:
+            keep (str, optional): Key that is never evicted (the entry just written).
+
+        Returns:
+            list: Keys of the evicted entries.
+        """
+        entries = self.entries()
+        total = sum(entry.size for entry in entries)
+        count = len(entries)
+        evicted = []
+        for entry in entries:
+            over_size = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_size or over_count):
+                break
+            if entry.key == keep:
+                continue
+            if self.invalidate(entry.key):
+                evicted.append(entry.key)
+                total -= entry.size
+                count -= 1
+        return evicted
+
+
+def file_fingerprint(paths: List[str]) -> str:
+    """
+    Returns a hash of the names and contents of files, e.g. module sources, so a cache
+    key changes whenever the code that produced an entry changes.
+    """
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def _package_module(value: Any, package: str) -> Optional[str]:
+    """Name of the package module that defines a value (or is the value), if any."""
+    try:
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+    except Exception:
+        return None
+    if isinstance(name, str) and (name == package or name.startswith(package + ".")):
+        return name
+    return None
+
+
+def _referenced_globals(code, namespace: dict) -> List[Any]:
+    """The global values a code object (and the functions nested in it) refers to."""
+    found = [namespace[name] for name in code.co_names if name in namespace]
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            found += _referenced_globals(const, namespace)
+    return found
+
+
+def module_sources(entry_points: Iterable[Any], package: str = GLOBAL_FUNCTIONS_PACKAGE) -> List[str]:
+    """
+    Returns the source files of the package modules some code depends on: the
+    modules defining the entry points and, transitively, every package module
+    they import from. For a function defined outside the package (e.g. in a
+    pipeline script), the package functions its body refers to (globals and
+    closure variables) are the entry points.
+
+    Args:
+        entry_points (iterable): Functions, classes or modules.
+        package (str): The package whose modules are followed.
+
+    Returns:
+        list: Sorted source file paths.
+    """
+    pending = []
+    for entry in entry_points:
+        name = _package_module(entry, package)
+        if name is not None:
+            pending.append(name)
+        elif inspect.isfunction(entry):
+            used = _referenced_globals(entry.__code__, entry.__globals__)
+            for cell in entry.__closure__ or ():
+                try:
+                    used.append(cell.cell_contents)
+                except ValueError:
+                    pass  # not assigned yet
+            pending += [n for n in (_package_module(value, package) for value in used) if n is not None]
+    sources = {}
+    while pending:
+        name = pending.pop()
+        module = sys.modules.get(name)
+        path = getattr(module, "__file__", None)
+        if name in sources or path is None:
+            continue
+        sources[name] = path
+        for value in vars(module).values():
+            dependency = _package_module(value, package)
+            if dependency is not None and dependency not in sources:
+                pending.append(dependency)
+    return sorted(sources.values())
+
+
+def code_fingerprint(entry_points: Iterable[Any], package: str = GLOBAL_FUNCTIONS_PACKAGE) -> str:
+    """
+    Returns a hash of the sources behind some code (see module_sources()), so a cache
+    key changes when that code changes and not when unrelated modules do.
+    """
+    return file_fingerprint(module_sources(entry_points, package))
@@ -0,0 +1,291 @@
+"""
+================================================================================
+Camera Trajectory Engine
+================================================================================
+
+Computes a camera move for every frame at once with NumPy, from a declarative
+path spec. The result (per-frame locations and world matrices, roll included)
+is written to the camera in bulk by Add_camera_function.apply_trajectory(), so a
+long or high-frame-rate move costs milliseconds instead of one keyframe_insert()
+per frame. This module does not import bpy, so it can be used and unit-tested
+outside Blender.
+
+PATH SPEC:
+----------
+A path is a list of segment dicts played one after another. Consecutive segments
+share their boundary frame; a segment spans 'frames' frames (first to last key).
+Keys common to every segment:
+- "type":   "through", "orbit", "dolly" or "hold" (see below).
+- "frames": length of the segment in frames.
+- "ease":   "linear", "ease_in", "ease_out", "ease_in_out" or "slowmo".
+- "slowmo": for "slowmo" ease, how much slower the middle is than the ends.
+- "target": a point to look at, or None to look along the path.
+- "roll":   camera roll in degrees, a number (end roll, starting from the
+            previous segment's) or a (start, end) pair.
+
+Segment types:
+- "through": a straight pass through "center" along "direction", from
+             "distance" before it to "distance" after it (e.g. the donut hole).
+- "orbit":   a circle around "center" with "radius", at "height" above it, from
+             "start_angle" to "end_angle" (degrees, counter-clockwise from +X).
+             Looks at the center unless "target" is given.
+- "dolly":   a straight move from "start" (default: where the previous segment
+             ended) to "end".
+- "hold":    stays where the previous segment ended ("location" to override).
+
+USAGE EXAMPLE:
+--------------
+    path = [
+        {"type": "orbit", "center": (0, 0, 1), "radius": 6, "height": 2,
+         "start_angle": -90, "end_angle": 0, "frames": 60, "ease": "ease_in"},
+        {"type": "through", "center": (0, 0, 1), "direction": (-1, 0, 0),
+         "distance": 6, "frames": 120, "ease": "slowmo", "slowmo": 3, "roll": 360},
+    ]
+    trajectory = sample_path(path, frame_start=1)
+    trajectory.locations   # (181, 3)
+    trajectory.matrices    # (181, 4, 4) camera world matrices
+
+================================================================================
+"""
+
+import math
+import numpy as np
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+SEGMENT_TYPES = ("through", "orbit", "dolly", "hold")
+
+_WORLD_UP = np.array([0.0, 0.0, 1.0])
+
+
+class Trajectory(NamedTuple):
+    """A sampled camera move."""
+    frames: np.ndarray      # (F,) frame numbers
+    locations: np.ndarray   # (F, 3) camera locations
+    matrices: np.ndarray    # (F, 4, 4) camera world matrices (camera looks down its -Z)
+    roll: np.ndarray        # (F,) roll in radians
+
+
+def _slowmo(u: np.ndarray, factor: float) -> np.ndarray:
+    # Speed 1 at the ends and 1 / factor in the middle: speed(u) = 1 - k * sin^2(pi u),
+    # integrated in closed form and normalized to end at 1.
+    k = 1.0 - 1.0 / max(factor, 1e-6)
+    integral = u - k * (u / 2.0 - np.sin(2.0 * math.pi * u) / (4.0 * math.pi))
+    return integral / (1.0 - k / 2.0)
+
+
+EASE_CURVES: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "linear": lambda u, strength: u,
+    "ease_in": lambda u, strength: u * u,
+    "ease_out": lambda u, strength: 1.0 - (1.0 - u) ** 2,
+    "ease_in_out": lambda u, strength: u * u * (3.0 - 2.0 * u),
+    "slowmo": _slowmo,
+}
+
+
+def ease(u: np.ndarray, curve: str = "linear", strength: float = 2.0) -> np.ndarray:
+    """
+    Remaps normalized time to normalized path progress.
+
+    Args:
+        u (ndarray): Times in [0, 1].
+        curve (str): One of EASE_CURVES.
+        strength (float): Slow-down factor of the "slowmo" curve.
+
+    Returns:
+        ndarray: Progress in [0, 1], monotonic in u, 0 at u=0 and 1 at u=1.
+    """
+    if curve not in EASE_CURVES:
+        raise ValueError(f"Invalid ease curve '{curve}'. Must be one of {tuple(EASE_CURVES)}.")
+    return EASE_CURVES[curve](np.asarray(u, dtype=np.float64), strength)
+
+
+def _vector(value, name: str) -> np.ndarray:
+    vector = np.asarray(value, dtype=np.float64).reshape(-1)
+    if vector.shape != (3,):
+        raise ValueError(f"'{name}' must be a 3D point or vector, got {value!r}.")
+    return vector
+
+
+def _segment_points(segment: dict, s: np.ndarray, previous_end: Optional[np.ndarray]
+                    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """Locations, path tangents and the default look-at target of one segment at progress s."""
+    kind = segment.get("type")
+    if kind == "through":
+        center = _vector(segment["center"], "center")
+        direction = _vector(segment.get("direction", (1.0, 0.0, 0.0)), "direction")
+        direction /= max(np.linalg.norm(direction), 1e-12)
+        start = center - direction * float(segment["distance"])
+        delta = 2.0 * direction * float(segment["distance"])
+        return start + s[:, None] * delta, np.broadcast_to(delta, (len(s), 3)), None
+
+    if kind == "orbit":
+        center = _vector(segment["center"], "center")
+        radius = float(segment["radius"])
+        a0 = math.radians(segment.get("start_angle", 0.0))
+        a1 = math.radians(segment.get("end_angle", 360.0))
+        angles = a0 + s * (a1 - a0)
+        cos, sin = np.cos(angles), np.sin(angles)
+        points = np.empty((len(s), 3))
+        points[:, 0] = center[0] + radius * cos
+        points[:, 1] = center[1] + radius * sin
+        points[:, 2] = center[2] + float(segment.get("height", 0.0))
+        sign = 1.0 if a1 >= a0 else -1.0
+        tangents = np.stack([-sin * sign, cos * sign, np.zeros_like(s)], axis=-1)
+        return points, tangents, center
+
+    if kind == "dolly":
+        if "start" in segment:
+            start = _vector(segment["start"], "start")
+        elif previous_end is not None:
+            start = previous_end
+        else:
+            raise ValueError("A 'dolly' segment needs a 'start' when it opens the path.")
+        delta = _vector(segment["end"], "end") - start
+        return start + s[:, None] * delta, np.broadcast_to(delta, (len(s), 3)), None
+
+    if kind == "hold":
+        if "location" in segment:
+            location = _vector(segment["location"], "location")
+        elif previous_end is not None:
+            location = previous_end
+        else:
+            raise ValueError("A 'hold' segment needs a 'location' when it opens the path.")
+        return np.broadcast_to(location, (len(s), 3)).copy(), np.zeros((len(s), 3)), None
+
+    raise ValueError(f"Invalid segment type '{kind}'. Must be one of {SEGMENT_TYPES}.")
+
+
+def _fill_invalid(vectors: np.ndarray, valid: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    """Replaces invalid rows with the last valid row before them (or the first valid one / fallback)."""
+    if valid.all():
+        return vectors
+    if not valid.any():
+        return np.broadcast_to(fallback, vectors.shape).copy()
+    index = np.where(valid, np.arange(len(valid)), 0)
+    np.maximum.accumulate(index, out=index)
+    first = np.argmax(valid)
+    index[:first] = first
+    return vectors[index]
+
+
+def look_at_matrices(locations: np.ndarray, forward: np.ndarray, roll: np.ndarray) -> np.ndarray:
+    """
+    Builds camera world matrices looking along 'forward', with +Z as up and a roll
+    around the view axis.
+
+    Args:
+        locations (ndarray): (F, 3) camera locations.
+        forward (ndarray): (F, 3) view directions (need not be normalized; zero
+            rows keep the previous direction).
+        roll (ndarray): (F,) roll angles in radians (positive rolls the image clockwise).
+
+    Returns:
+        ndarray: (F, 4, 4) matrices whose -Z axis is the view direction.
+    """
+    forward = np.asarray(forward, dtype=np.float64)
+    length = np.linalg.norm(forward, axis=-1)
+    forward = _fill_invalid(forward, length > 1e-9, np.array([0.0, 1.0, 0.0]))
+    forward = forward / np.linalg.norm(forward, axis=-1, keepdims=True)
+
+    # Looking straight up or down: measure the heading against +Y instead of +Z
+    up = np.where((np.abs(forward @ _WORLD_UP) > 0.9999)[:, None], np.array([0.0, 1.0, 0.0]), _WORLD_UP)
+    right = np.cross(forward, up)
+    right /= np.linalg.norm(right, axis=-1, keepdims=True)
+    cam_up = np.cross(right, forward)
+
+    cos, sin = np.cos(roll)[:, None], np.sin(roll)[:, None]
+    rolled_right = right * cos + cam_up * sin
+    rolled_up = cam_up * cos - right * sin
+
+    matrices = np.zeros((len(forward), 4, 4))
+    matrices[:, :3, 0] = rolled_right
+    matrices[:, :3, 1] = rolled_up
+    matrices[:, :3, 2] = -forward
+    matrices[:, :3, 3] = locations
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def sample_path(path: Sequence[dict], frame_start: int = 1) -> Trajectory:
+    """
+    Samples a path spec at every frame.
+
+    Args:
+        path (list): Segment dicts (see the module docstring).
+        frame_start (int): Frame of the first key.
+
+    Returns:
+        Trajectory: Per-frame frames, locations, matrices and roll.
+
+    Raises:
+        ValueError: For an empty path or an invalid segment.
+    """
+    if not path:
+        raise ValueError("A camera path needs at least one segment.")
+
+    locations: List[np.ndarray] = []
+    forwards: List[np.ndarray] = []
+    rolls: List[np.ndarray] = []
+    previous_end: Optional[np.ndarray] = None
+    previous_roll = 0.0
+    for index, segment in enumerate(path):
+        frames = int(segment.get("frames", 0))
+        if frames < 1:
+            raise ValueError(f"Segment {index} must span at least one frame, got {frames}.")
+        # Later segments start on the previous segment's last frame; skip that shared sample
+        u = np.arange(0 if index == 0 else 1, frames + 1, dtype=np.float64) / frames
+        s = ease(u, segment.get("ease", "linear"), float(segment.get("slowmo", 2.0)))
+
+        points, tangents, default_target = _segment_points(segment, s, previous_end)
+        target = segment.get("target", default_target)
+        forwards.append(_vector(target, "target") - points if target is not None else tangents)
+        locations.append(points)
+
+        roll = segment.get("roll", previous_roll)
+        roll_start, roll_end = (previous_roll, roll) if np.isscalar(roll) else roll
+        rolls.append(np.radians(roll_start + s * (float(roll_end) - float(roll_start))))
+
+        previous_end = points[-1]
+        previous_roll = float(roll_end)
+
+    all_locations = np.concatenate(locations)
+    all_roll = np.concatenate(rolls)
+    frames = frame_start + np.arange(len(all_locations))
+    matrices = look_at_matrices(all_locations, np.concatenate(forwards), all_roll)
+    return Trajectory(frames, all_locations, matrices, all_roll)
+
+
+def fly_through_path(
+    center: Sequence[float],
+    major_radius: float,
+    frames: int = 120,
+    slowmo_factor: float = 2.0,
+    direction: Sequence[float] = (1.0, 0.0, 0.0),
+    roll_degrees: float = 360.0
+) -> List[dict]:
+    """
+    The classic donut shot: a straight pass through the center that slows down
+    in the middle while the camera does a full roll.
+
+    Args:
+        center (tuple): Center of the donut.
+        major_radius (float): Outer radius of the donut; the pass starts and ends
+            two radii away from the center.
+        frames (int): Number of keyed frames.
+        slowmo_factor (float): How much slower the middle is than the ends.
+        direction (tuple): Direction of the pass.
+        roll_degrees (float): Roll over the whole pass.
+
+    Returns:
+        list: A one-segment path spec for sample_path().
+    """
+    return [{
+        "type": "through",
+        "center": tuple(center),
+        "direction": tuple(direction),
+        "distance": 2.0 * major_radius,
+        "frames": max(int(frames) - 1, 1),
+        "ease": "slowmo",
+        "slowmo": slowmo_factor,
+        "roll": (0.0, roll_degrees),
+    }]
@@ -0,0 +1,239 @@
+"""
+================================================================================
+Collision Proxies
+================================================================================
+
+Low-poly stand-ins that carry the rigid body of a visual object, so the physics
+bake collides a handful of points instead of the subdivided, displaced render
+mesh. The proxy takes the rigid body, is hidden from render (shown as wire in
+the viewport), and the visual object is parented to it with its transform kept,
+so it follows the simulated motion unchanged.
+
+SHAPES:
+-------
+- "hull":     one low-poly torus with a convex hull shape. Cheapest; the hole is
+              filled, which is fine for a donut landing on a table.
+- "compound": a Compound Parent whose children are convex segments of the ring,
+              so other bodies can fall through the hole.
+- "box":      a box shape under a plane (the ground), with some thickness so fast
+              bodies cannot tunnel through a zero-height plane.
+
+The proxy geometry is circumscribed (polygon corners pushed out by 1/cos(pi/n)),
+so it is never smaller than the smooth surface it replaces.
+
+FUNCTIONS:
+----------
+- torus_proxy_geometry() / torus_segment_geometry() / box_geometry(): proxy meshes.
+- add_torus_proxy(): hull or compound proxy for a torus-shaped object.
+- add_box_proxy(): box proxy for a plane or any flat-topped object.
+- is_compound_part(): whether a rigid body is a child of a Compound Parent.
+
+USAGE EXAMPLE:
+--------------
+    donut = add_donut(rigid_body=False)
+    proxy = add_torus_proxy(donut, 1.0, 0.4, shape="compound", mass=1.0, restitution=0.7)
+    ground = add_ground(rigid_body=False)
+    add_box_proxy(ground, 'PASSIVE', restitution=0.7)
+
+================================================================================
+"""
+
+import math
+import bpy # type: ignore
+import numpy as np
+from typing import Optional, Tuple
+
+from Blender_Global_Functions.Donut_mesh_builder import torus_geometry  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import write_mesh_arrays  # type: ignore
+from Blender_Global_Functions.Object_utils import add_rigid_body, link_object  # type: ignore
+
+PROXY_SHAPES = ("hull", "compound", "box")
+
+# Custom property on proxy objects: the name of the visual object they carry
+PROXY_OF_PROP = "collision_proxy_of"
+
+
+def torus_proxy_geometry(
+    major_radius: float,
+    minor_radius: float,
+    major_segments: int = 16,
+    minor_segments: int = 6
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    A low-poly torus that circumscribes the smooth one.
+
+    Returns:
+        (verts, faces): (V, 3) vertices and (F, 4) quads.
+    """
+    minor = minor_radius / math.cos(math.pi / minor_segments)
+    verts, faces, _ = torus_geometry(major_radius, minor, major_segments, minor_segments)
+    verts = verts.astype(np.float64)
+    verts[:, :2] /= math.cos(math.pi / major_segments)
+    return verts, faces
+
+
+def torus_segment_geometry(
+    major_radius: float,
+    minor_radius: float,
+    start_angle: float,
+    end_angle: float,
+    minor_segments: int = 6
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    A convex piece of a torus between two angles around its axis: the tube's
+    cross-sections at both ends, bridged and capped.
+
+    Returns:
+        (verts, faces): (2 * minor_segments, 3) vertices and a ragged face list.
+    """
+    minor = minor_radius / math.cos(math.pi / minor_segments)
+    v = np.arange(minor_segments) * (2 * math.pi / minor_segments)
+    # Push the outer half of the ends out, so the straight chord between them still
+    # covers the outside of the ring (on the inner half the chord already bulges inwards)
+    radial = major_radius + minor * np.cos(v)
+    radial = np.where(radial > major_radius, radial / math.cos((end_angle - start_angle) / 2), radial)
+    rings = []
+    for angle in (start_angle, end_angle):
+        rings.append(np.stack([radial * math.cos(angle), radial * math.sin(angle), minor * np.sin(v)], axis=-1))
+    verts = np.concatenate(rings)
+    n = minor_segments
+    faces = [(j, (j + 1) % n, n + (j + 1) % n, n + j) for j in range(n)]
+    faces.append(tuple(range(n - 1, -1, -1)))
+    faces.append(tuple(range(n, 2 * n)))
+    return verts, faces
+
+
+def box_geometry(low: np.ndarray, high: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """An axis-aligned box between two corners, as (8, 3) vertices and (6, 4) quads."""
+    low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+    verts = np.array([[x, y, z] for z in (low[2], high[2]) for y in (low[1], high[1]) for x in (low[0], high[0])])
+    faces = np.array([[0, 2, 3, 1], [4, 5, 7, 6], [0, 1, 5, 4], [2, 6, 7, 3], [0, 4, 6, 2], [1, 3, 7, 5]])
+    return verts, faces
+
+
+def is_compound_part(obj: bpy.types.Object) -> bool:
+    """Whether a rigid body is simulated as part of its parent's compound shape."""
+    parent = obj.parent
+    return (parent is not None and parent.rigid_body is not None
+            and parent.rigid_body.collision_shape == 'COMPOUND')
+
+
+def _new_proxy_object(name: str, verts, faces, visual: bpy.types.Object) -> bpy.types.Object:
+    """Creates a render-hidden wire object in the visual object's collection."""
+    mesh = bpy.data.meshes.new(name)
+    write_mesh_arrays(mesh, verts, faces)
+    proxy = bpy.data.objects.new(name, mesh)
+    proxy.hide_render = True
+    proxy.display_type = 'WIRE'
+    link_object(proxy, visual.users_collection[0] if visual.users_collection else None)
+    return proxy
+
+
+def _carry(proxy: bpy.types.Object, visual: bpy.types.Object) -> None:
+    """Moves the visual object's rigid body to the proxy and parents the visual to it."""
+    proxy.location = visual.location
+    proxy.rotation_mode = visual.rotation_mode
+    proxy.rotation_euler = visual.rotation_euler
+    proxy.rotation_quaternion = visual.rotation_quaternion
+    proxy.scale = visual.scale
+    proxy[PROXY_OF_PROP] = visual.name
+
+    rbw = bpy.context.scene.rigidbody_world
+    if visual.rigid_body is not None and rbw is not None and rbw.collection is not None:
+        rbw.collection.objects.unlink(visual)
+    # Keep the visual where it is: the parent inverse cancels the proxy's (equal) transform.
+    # matrix_basis is used because matrix_world is only updated by the depsgraph.
+    visual.parent = proxy
+    visual.matrix_parent_inverse = visual.matrix_basis.inverted()
+
+
+def add_torus_proxy(
+    visual: bpy.types.Object,
+    major_radius: float,
+    minor_radius: float,
+    shape: str = "hull",
+    body_type: str = 'ACTIVE',
+    segments: int = 8,
+    ring_segments: int = 16,
+    name: Optional[str] = None,
+    **settings
+) -> Optional[bpy.types.Object]:
+    """
+    Gives a torus-shaped object a low-poly collision proxy.
+
+    Args:
+        visual (bpy.types.Object): The render object (it loses its own rigid body).
+        major_radius (float): Ring radius of the torus (object space).
+        minor_radius (float): Tube radius, including any displacement to cover.
+        shape (str): "hull" or "compound".
+        body_type (str): 'ACTIVE' or 'PASSIVE'.
+        segments (int): Compound pieces around the ring.
+        ring_segments (int): Segments around the ring of the proxy torus.
+        name (str, optional): Proxy name. Defaults to '<visual>_Collision'.
+        **settings: Rigid body settings of the proxy (mass, friction, restitution, ...).
+
+    Returns:
+        bpy.types.Object or None: The proxy carrying the rigid body.
+    """
+    if shape not in ("hull", "compound"):
+        raise ValueError(f"Invalid torus proxy shape '{shape}'. Must be 'hull' or 'compound'.")
+    name = name or f"{visual.name}_Collision"
+    verts, faces = torus_proxy_geometry(major_radius, minor_radius, major_segments=ring_segments)
+    proxy = _new_proxy_object(name, verts, faces, visual)
+    _carry(proxy, visual)
+    body = add_rigid_body(proxy, body_type, **settings)
+    if body is None:
+        return None
+
+    if shape == "hull":
+        body.collision_shape = 'CONVEX_HULL'
+        return proxy
+
+    body.collision_shape = 'COMPOUND'
+    step = 2 * math.pi / segments
+    for k in range(segments):
+        piece_verts, piece_faces = torus_segment_geometry(major_radius, minor_radius, k * step, (k + 1) * step)
+        piece = _new_proxy_object(f"{name}_{k:02d}", piece_verts, piece_faces, visual)
+        piece.parent = proxy
+        piece_body = add_rigid_body(piece, body_type, **{key: value for key, value in settings.items()
+                                                         if key in ("friction", "restitution")})
+        if piece_body is not None:
+            piece_body.collision_shape = 'CONVEX_HULL'
+    return proxy
+
+
+def add_box_proxy(
+    visual: bpy.types.Object,
+    body_type: str = 'PASSIVE',
+    thickness: float = 0.5,
+    name: Optional[str] = None,
+    **settings
+) -> Optional[bpy.types.Object]:
+    """
+    Gives a plane (or any flat-topped object) a box collision proxy whose top is
+    the object's top and which extends 'thickness' below it.
+
+    Args:
+        visual (bpy.types.Object): The render object (it loses its own rigid body).
+        body_type (str): 'ACTIVE' or 'PASSIVE'.
+        thickness (float): Depth of the box below the object's lowest point.
+        name (str, optional): Proxy name. Defaults to '<visual>_Collision'.
+        **settings: Rigid body settings of the proxy.
+
+    Returns:
+        bpy.types.Object or None: The proxy carrying the rigid body.
+    """
+    co = np.empty(len(visual.data.vertices) * 3, dtype=np.float32)
+    visual.data.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+    low, high = co.min(axis=0), co.max(axis=0)
+    low[2] -= thickness
+    verts, faces = box_geometry(low, high)
+    proxy = _new_proxy_object(name or f"{visual.name}_Collision", verts, faces, visual)
+    _carry(proxy, visual)
+    body = add_rigid_body(proxy, body_type, **settings)
+    if body is None:
+        return None
+    body.collision_shape = 'BOX'
+    return proxy
+
@@ -0,0 +1,166 @@
+"""
+================================================================================
+Donut Mesh Builder
+================================================================================
+
+Data-level generators for the donut geometry. Every function works on NumPy
+arrays and does not import bpy; the results are written to Blender meshes with
+Mesh_data_utils.write_mesh_arrays(), so building a donut never needs operators,
+selection changes or edit-mode round trips.
+
+FUNCTIONS:
+----------
+- torus_geometry(): vertices, quad faces and per-corner UVs of a torus laid out
+  like bpy.ops.mesh.primitive_torus_add (ring around Z, centered on the origin).
+- polygon_normals(): unit face normals of any polygon mesh.
+- vertex_normals(): area-weighted vertex normals of any polygon mesh.
+- shell_geometry(): a subset of faces pushed outward along the vertex normals,
+  used for frosting/icing layers.
+- icing_geometry(): the deterministic icing shell: faces whose normal points up
+  enough, thickened along the vertex normals in one vectorized pass.
+
+================================================================================
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+
+def torus_geometry(
+    major_radius: float = 1.0,
+    minor_radius: float = 0.4,
+    major_segments: int = 48,
+    minor_segments: int = 12
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds a torus around the Z axis.
+
+    Args:
+        major_radius (float): Radius from the origin to the center of the tube.
+        minor_radius (float): Radius of the tube.
+        major_segments (int): Segments around the ring.
+        minor_segments (int): Segments around the tube.
+
+    Returns:
+        (verts, faces, uvs): (V, 3) float32 vertices, (F, 4) int32 quads and
+        (F * 4, 2) float32 UVs in face-corner order.
+    """
+    u = np.arange(major_segments) * (2 * np.pi / major_segments)
+    v = np.arange(minor_segments) * (2 * np.pi / minor_segments)
+    uu, vv = np.meshgrid(u, v, indexing="ij")
+    ring = major_radius + minor_radius * np.cos(vv)
+    verts = np.stack([ring * np.cos(uu), ring * np.sin(uu), minor_radius * np.sin(vv)], axis=-1)
+
+    i, j = np.meshgrid(np.arange(major_segments), np.arange(minor_segments), indexing="ij")
+    i1 = (i + 1) % major_segments
+    j1 = (j + 1) % minor_segments
+    faces = np.stack([
+        i * minor_segments + j,
+        i1 * minor_segments + j,
+        i1 * minor_segments + j1,
+        i * minor_segments + j1,
+    ], axis=-1).reshape(-1, 4)
+
+    # UVs use the unwrapped indices so the seams get their own 1.0 coordinates
+    corner_i = np.stack([i, i + 1, i + 1, i], axis=-1).reshape(-1) / major_segments
+    corner_j = np.stack([j, j, j + 1, j + 1], axis=-1).reshape(-1) / minor_segments
+    uvs = np.stack([corner_i, corner_j], axis=-1)
+
+    return verts.reshape(-1, 3).astype(np.float32), faces.astype(np.int32), uvs.astype(np.float32)
+
+
+def polygon_normals(verts: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Computes unit face normals of polygons (summed over a triangle fan).
+
+    Args:
+        verts (ndarray): (V, 3) vertex coordinates.
+        faces (ndarray): (F, K) vertex indices of faces with K corners.
+
+    Returns:
+        ndarray: (F, 3) unit face normals.
+    """
+    verts = np.asarray(verts, dtype=np.float64)
+    faces = np.asarray(faces)
+    normals = np.zeros((len(faces), 3))
+    for k in range(1, faces.shape[1] - 1):
+        a, b, c = verts[faces[:, 0]], verts[faces[:, k]], verts[faces[:, k + 1]]
+        normals += np.cross(b - a, c - a)
+    length = np.linalg.norm(normals, axis=1)
+    return normals / np.maximum(length, 1e-12)[:, None]
+
+
+def vertex_normals(verts: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """
+    Computes area-weighted vertex normals.
+
+    Args:
+        verts (ndarray): (V, 3) vertex coordinates.
+        faces (ndarray): (F, K) vertex indices of faces with K corners.
+
+    Returns:
+        ndarray: (V, 3) unit vertex normals.
+    """
+    verts = np.asarray(verts, dtype=np.float64)
+    faces = np.asarray(faces)
+    normals = np.zeros_like(verts)
+    # Fan-triangulate each face; the cross products are twice the triangle areas
+    for k in range(1, faces.shape[1] - 1):
+        a, b, c = verts[faces[:, 0]], verts[faces[:, k]], verts[faces[:, k + 1]]
+        cross = np.cross(b - a, c - a)
+        for corner in (0, k, k + 1):
+            np.add.at(normals, faces[:, corner], cross)
+    length = np.linalg.norm(normals, axis=1)
+    return normals / np.maximum(length, 1e-12)[:, None]
+
+
+def shell_geometry(
+    verts: np.ndarray,
+    faces: np.ndarray,
+    face_mask: np.ndarray,
+    thickness: float,
+    normals: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extracts the masked faces and moves their vertices outward along the normals.
+
+    Args:
+        verts (ndarray): (V, 3) vertex coordinates.
+        faces (ndarray): (F, K) face vertex indices.
+        face_mask (ndarray): (F,) bool mask of the faces to keep.
+        thickness (float): Offset distance along the normals.
+        normals (ndarray, optional): (V, 3) vertex normals; computed if not given.
+
+    Returns:
+        (verts, faces, source_faces): Compacted shell vertices, remapped faces and
+        the indices of the source faces that were kept.
+    """
+    if normals is None:
+        normals = vertex_normals(verts, faces)
+    kept = np.flatnonzero(face_mask)
+    shell_faces = np.asarray(faces)[kept]
+    used, remapped = np.unique(shell_faces, return_inverse=True)
+    shell_verts = np.asarray(verts, dtype=np.float64)[used] + normals[used] * thickness
+    return shell_verts.astype(np.float32), remapped.reshape(shell_faces.shape).astype(np.int32), kept
+
+
+def icing_geometry(
+    verts: np.ndarray,
+    faces: np.ndarray,
+    thickness: float,
+    min_normal_z: float = 0.3
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds an icing shell from the top-facing faces of a mesh.
+
+    Args:
+        verts (ndarray): (V, 3) vertex coordinates of the source mesh.
+        faces (ndarray): (F, K) face vertex indices of the source mesh.
+        thickness (float): How far the shell sits above the source surface.
+        min_normal_z (float): Faces whose normal Z is below this value are left bare.
+
+    Returns:
+        (verts, faces, source_faces): See shell_geometry().
+    """
+    top = polygon_normals(verts, faces)[:, 2] >= min_normal_z
+    return shell_geometry(verts, faces, top, thickness)
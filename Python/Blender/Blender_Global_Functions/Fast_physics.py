@@ -0,0 +1,315 @@
+"""
+================================================================================
+Fast Physics
+================================================================================
+
+Closed-form rigid body motion for the pipeline's common shot: one active body
+(the donut from add_donut) dropped onto one passive horizontal plane (the ground
+from add_ground). Such a drop is solved bounce by bounce in closed form and
+keyframed in bulk, in microseconds instead of a full Bullet bake.
+
+MODEL:
+------
+- Flight: gravity plus the body's linear damping (Bullet scales the velocity by
+  (1 - damping) every second), integrated exactly between impacts.
+- Impact: the vertical speed is reversed and scaled by the combined restitution
+  (body x ground, as Bullet combines them), so the bounces decay geometrically.
+- Rest: once a bounce would leave the ground slower than 'rest_speed', the body
+  stays on the ground.
+- Mass drops out (the plane is static) and so does friction: a body dropped flat
+  on a horizontal plane neither slides nor spins.
+
+A scene only qualifies when that model is exact enough: rigid body world
+enabled, gravity straight down, no rigid body constraints, exactly one active
+and one passive body (the pieces of a compound collision proxy count as their
+parent), neither animated nor parented, the passive body a horizontal plane or a
+flat-topped solid (a box collision proxy) whose top is under the whole footprint
+of the active one, and the active
+body resting on its own bottom (its origin, the center of mass, above the
+lowest vertices). Anything else falls back to the real bake.
+
+The motion is written like a replayed physics bake (Physics_bake_cache): a
+marked action with the body's rest pose, and the rigid body world disabled, so
+remove_cached_motion() undoes it before a real bake.
+
+FUNCTIONS:
+----------
+- simulate_drop(): heights of a body dropped from a gap above a plane, per frame.
+- find_simple_drop(): the drop setup of a scene, or why it does not qualify.
+- apply_fast_physics(): detects, simulates and keyframes in one call.
+
+USAGE EXAMPLE:
+--------------
+    if not apply_fast_physics():
+        bpy.ops.ptcache.bake_all(bake=True)    # complex scene: real simulation
+
+================================================================================
+"""
+
+import math
+import bpy # type: ignore
+import numpy as np
+from typing import NamedTuple, Optional, Tuple
+
+from Blender_Global_Functions.Collision_proxy import is_compound_part  # type: ignore
+from Blender_Global_Functions.Keyframe_utils import ensure_action, write_keyframes  # type: ignore
+from Blender_Global_Functions.Physics_bake_cache import BAKE_KEY_PROP, REST_POSE_PROP, disable_rigidbody_world  # type: ignore
+
+# Value of BAKE_KEY_PROP on actions written by apply_fast_physics()
+FAST_PHYSICS_KEY = "fast_physics"
+
+
+class DropResult(NamedTuple):
+    """Motion of a dropped body."""
+    heights: np.ndarray     # (F,) gap between the body's bottom and the plane
+    impacts: np.ndarray     # (B,) times of the impacts, in seconds
+    rest_time: float        # time the body comes to rest (inf if it never does in range)
+
+
+class DropSetup(NamedTuple):
+    """A scene that qualifies for fast physics."""
+    body: bpy.types.Object
+    ground: bpy.types.Object
+    gap: float              # initial distance between the body's bottom and the plane
+    restitution: float      # combined restitution
+    linear_damping: float
+    gravity: float          # magnitude, m/s^2
+    seconds_per_frame: float
+    frame_start: int
+    frame_end: int
+
+
+def _flight(z0, v0, g, c, tau):
+    """Height and vertical velocity after 'tau' seconds of damped free flight."""
+    if c < 1e-9:
+        return z0 + v0 * tau - 0.5 * g * tau * tau, v0 - g * tau
+    terminal = g / c
+    decay = np.exp(-c * tau)
+    return z0 + (v0 + terminal) * (1.0 - decay) / c - terminal * tau, (v0 + terminal) * decay - terminal
+
+
+def _impact_time(z0: float, v0: float, g: float, c: float) -> float:
+    """Time at which a flight from height z0 >= 0 with upward speed v0 reaches height 0."""
+    # Undamped time as the first guess; z(t) is concave, so Newton converges from past the apex
+    tau = (v0 + math.sqrt(v0 * v0 + 2.0 * g * z0)) / g
+    for _ in range(50):
+        z, v = _flight(z0, v0, g, c, tau)
+        if v >= -1e-12:
+            tau *= 2.0
+            continue
+        step = z / v
+        tau -= step
+        if abs(step) < 1e-12:
+            break
+    return tau
+
+
+def simulate_drop(
+    gap: float,
+    times: np.ndarray,
+    gravity: float = 9.81,
+    restitution: float = 0.49,
+    linear_damping: float = 0.04,
+    rest_speed: float = 0.05,
+    max_bounces: int = 64
+) -> DropResult:
+    """
+    Computes the height above the plane of a body dropped from rest.
+
+    Args:
+        gap (float): Initial distance between the body's bottom and the plane.
+        times (ndarray): (F,) simulation times in seconds (0 = release).
+        gravity (float): Gravity magnitude.
+        restitution (float): Combined restitution of body and plane.
+        linear_damping (float): Fraction of the velocity lost per second.
+        rest_speed (float): Rebound speed below which the body stays on the plane.
+        max_bounces (int): Bounces simulated before the body is put to rest.
+
+    Returns:
+        DropResult: Heights at the given times, impact times and the rest time.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    c = -math.log(max(1.0 - linear_damping, 1e-9))
+    horizon = float(times.max()) if len(times) else 0.0
+
+    # Flights as (start time, start height, start speed, gravity); the last one is the rest
+    starts, heights, speeds, gravities = [0.0], [max(gap, 0.0)], [0.0], [gravity]
+    impacts = []
+    rest_time = math.inf
+    while gravity > 0.0:
+        tau = _impact_time(heights[-1], speeds[-1], gravity, c)
+        impact = starts[-1] + tau
+        impacts.append(impact)
+        _, v_in = _flight(heights[-1], speeds[-1], gravity, c, tau)
+        rebound = -v_in * restitution
+        if rebound < rest_speed or len(impacts) >= max_bounces or impact > horizon:
+            if impact <= horizon:
+                rest_time = impact
+            starts.append(impact)
+            heights.append(0.0)
+            speeds.append(0.0)
+            gravities.append(0.0)
+            break
+        starts.append(impact)
+        heights.append(0.0)
+        speeds.append(rebound)
+        gravities.append(gravity)
+
+    # Evaluate every time at once against its flight
+    starts_arr = np.array(starts)
+    index = np.clip(np.searchsorted(starts_arr, times, side="right") - 1, 0, len(starts) - 1)
+    tau = times - starts_arr[index]
+    z0, v0, g = np.array(heights)[index], np.array(speeds)[index], np.array(gravities)[index]
+    if c < 1e-9:
+        z = z0 + v0 * tau - 0.5 * g * tau * tau
+    else:
+        z = z0 + (v0 + g / c) * (1.0 - np.exp(-c * tau)) / c - (g / c) * tau
+    return DropResult(np.maximum(z, 0.0), np.array(impacts), rest_time)
+
+
+def _world_points(obj, points) -> np.ndarray:
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    matrix = np.array(obj.matrix_world)
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def _mesh_points(obj) -> np.ndarray:
+    co = np.empty(len(obj.data.vertices) * 3, dtype=np.float32)
+    obj.data.vertices.foreach_get("co", co)
+    return _world_points(obj, co)
+
+
+def _is_animated(obj) -> bool:
+    return obj.animation_data is not None and obj.animation_data.action is not None
+
+
+def find_simple_drop(scene: Optional[bpy.types.Scene] = None) -> Tuple[Optional[DropSetup], str]:
+    """
+    Checks whether a scene is a single body dropped onto a plane (or a flat-topped
+    passive body such as a box collision proxy).
+
+    Args:
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+
+    Returns:
+        tuple: (DropSetup, "") if the scene qualifies, otherwise (None, reason).
+    """
+    scene = scene or bpy.context.scene
+    rbw = scene.rigidbody_world
+    if rbw is None or not rbw.enabled:
+        return None, "no enabled rigid body world"
+    constraints = getattr(rbw, "constraints", None)  # collection of constraint empties
+    if constraints is not None and len(constraints.objects):
+        return None, "rigid body constraints"
+    gravity = np.array(list(scene.gravity), dtype=np.float64) if getattr(scene, "use_gravity", True) else np.zeros(3)
+    if abs(gravity[0]) > 1e-6 or abs(gravity[1]) > 1e-6 or gravity[2] >= 0.0:
+        return None, "gravity is not straight down"
+
+    bodies = [obj for obj in scene.objects if obj.rigid_body is not None and not is_compound_part(obj)]
+    active = [obj for obj in bodies if obj.rigid_body.type == 'ACTIVE']
+    passive = [obj for obj in bodies if obj.rigid_body.type != 'ACTIVE']
+    if len(active) != 1 or len(passive) != 1:
+        return None, f"{len(active)} active and {len(passive)} passive bodies (need 1 and 1)"
+    body, ground = active[0], passive[0]
+    if body.rigid_body.kinematic or not body.rigid_body.enabled:
+        return None, f"'{body.name}' is animated or not dynamic"
+    if ground.rigid_body.kinematic or not ground.rigid_body.enabled:
+        return None, f"'{ground.name}' is animated or does not collide"
+    for obj in (body, ground):
+        if obj.parent is not None or _is_animated(obj):
+            return None, f"'{obj.name}' is parented or animated"
+    if body.type != 'MESH' or ground.type != 'MESH' or len(ground.data.vertices) < 3:
+        return None, "bodies must be meshes"
+
+    # The ground's top must be flat and horizontal, as wide as the ground itself,
+    # and reach under the whole body
+    points = _mesh_points(ground)
+    extent = max(np.ptp(points[:, 0]), np.ptp(points[:, 1]), 1.0)
+    plane = points[points[:, 2] >= points[:, 2].max() - 1e-6 * extent]
+    if (len(plane) < 3 or np.ptp(plane[:, 0]) < np.ptp(points[:, 0]) - 1e-6 * extent
+            or np.ptp(plane[:, 1]) < np.ptp(points[:, 1]) - 1e-6 * extent):
+        return None, f"'{ground.name}' is not a horizontal plane or flat-topped"
+    plane_z = float(plane[:, 2].mean())
+
+    corners = _world_points(body, list(body.bound_box))
+    if (corners[:, 0].min() < plane[:, 0].min() or corners[:, 0].max() > plane[:, 0].max()
+            or corners[:, 1].min() < plane[:, 1].min() or corners[:, 1].max() > plane[:, 1].max()):
+        return None, f"'{body.name}' is not entirely above '{ground.name}'"
+    gap = float(corners[:, 2].min()) - plane_z
+    if gap < -1e-4:
+        return None, f"'{body.name}' starts below '{ground.name}'"
+
+    # The body must land on its bottom without tipping: center of mass above the lowest vertices
+    points = _mesh_points(body)
+    lowest = points[points[:, 2] <= points[:, 2].min() + 0.02 * np.ptp(points[:, 2]) + 1e-6]
+    center = np.array(body.matrix_world)[:2, 3]
+    if (np.ptp(lowest[:, 0]) < 1e-6 or np.ptp(lowest[:, 1]) < 1e-6
+            or not (lowest[:, 0].min() <= center[0] <= lowest[:, 0].max())
+            or not (lowest[:, 1].min() <= center[1] <= lowest[:, 1].max())):
+        return None, f"'{body.name}' would tip over on landing"
+
+    fps = scene.render.fps / getattr(scene.render, "fps_base", 1.0)
+    point_cache = rbw.point_cache
+    return DropSetup(
+        body=body,
+        ground=ground,
+        gap=max(gap, 0.0),
+        restitution=body.rigid_body.restitution * ground.rigid_body.restitution,
+        linear_damping=body.rigid_body.linear_damping,
+        gravity=float(-gravity[2]),
+        seconds_per_frame=getattr(rbw, "time_scale", 1.0) / fps,
+        frame_start=point_cache.frame_start,
+        frame_end=point_cache.frame_end,
+    ), ""
+
+
+def apply_fast_physics(
+    scene: Optional[bpy.types.Scene] = None,
+    rest_speed: float = 0.05,
+    verbose: bool = True
+) -> bool:
+    """
+    Keyframes the drop of a qualifying scene and disables its rigid body world.
+
+    Args:
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        rest_speed (float): Rebound speed below which the body stays on the ground.
+        verbose (bool): Whether to print why a scene does not qualify.
+
+    Returns:
+        bool: True if the motion was written, False if the scene needs a real bake.
+    """
+    scene = scene or bpy.context.scene
+    setup, reason = find_simple_drop(scene)
+    if setup is None:
+        if verbose:
+            print(f"Fast physics not applicable ({reason}); using the rigid body simulation.")
+        return False
+
+    body = setup.body
+    frames = np.arange(setup.frame_start, setup.frame_end + 1)
+    result = simulate_drop(setup.gap, (frames - setup.frame_start) * setup.seconds_per_frame,
+                           gravity=setup.gravity, restitution=setup.restitution,
+                           linear_damping=setup.linear_damping, rest_speed=rest_speed)
+
+    locations = np.tile(np.array(list(body.location), dtype=np.float64), (len(frames), 1))
+    locations[:, 2] += result.heights - setup.gap
+
+    rest_pose = {
+        "location": list(body.location),
+        "rotation_mode": body.rotation_mode,
+        "rotation_euler": list(body.rotation_euler),
+        "rotation_quaternion": list(body.rotation_quaternion),
+    }
+    action = ensure_action(body, f"{body.name}FastPhysics")
+    action[BAKE_KEY_PROP] = FAST_PHYSICS_KEY
+    action[REST_POSE_PROP] = rest_pose
+    write_keyframes(body, "location", frames, locations, group="Cached Physics")
+    disable_rigidbody_world(scene)
+
+    if verbose:
+        rest = (f"rests at {setup.frame_start + result.rest_time / setup.seconds_per_frame:.1f}"
+                if math.isfinite(result.rest_time) else "still bouncing at the end")
+        print(f"Fast physics: '{body.name}' dropped {setup.gap:.3f} onto '{setup.ground.name}', "
+              f"{len(result.impacts)} impact(s), {rest}.")
+    return True
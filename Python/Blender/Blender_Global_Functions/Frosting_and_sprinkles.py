@@ -1,29 +1,267 @@
 import bpy # type: ignore
+import math
 import random
+import numpy as np
 from typing import Tuple, Optional, List
 
+from Blender_Global_Functions.Icing_generator import get_icing_object, set_object_material  # type: ignore
+from Blender_Global_Functions.Material_library import get_material, principled_spec  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import read_mesh_triangles, write_mesh_arrays, set_smooth_shading  # type: ignore
+from Blender_Global_Functions.Modifier_freeze import evaluate_for_render  # type: ignore
+from Blender_Global_Functions.Sprinkle_scatter import (  # type: ignore
+    scatter_on_surface, instancer_triangles, spacing_for_count, surface_area)
+
+# Custom property on sprinkle prototype meshes: the capsule's dimensions and resolution
+SPRINKLE_SHAPE_PROP = "sprinkle_shape"
+
+
+def _sprinkle_capsule_geometry(
+    radius: float,
+    length: float,
+    segments: int = 8,
+    cap_rings: int = 3
+) -> Tuple[List[Tuple[float, float, float]], List[Tuple[int, ...]]]:
+    """
+    Builds the vertices and faces of a capsule (cylinder with hemispherical ends)
+    centered on the origin and aligned with the Z axis.
+
+    Args:
+        radius (float): Radius of the capsule.
+        length (float): Length of the cylindrical part.
+        segments (int): Number of segments around the capsule.
+        cap_rings (int): Number of rings in each hemispherical end.
+
+    Returns:
+        (verts, faces): Vertex coordinates and face index tuples for Mesh.from_pydata.
+    """
+    half = length / 2
+    # Ring profile from bottom pole to top pole as (ring radius, z)
+    profile = []
+    for r in range(1, cap_rings + 1):
+        phi = (math.pi / 2) * (1 - r / cap_rings)
+        profile.append((radius * math.cos(phi), -half - radius * math.sin(phi)))
+    for r in range(cap_rings):
+        phi = (math.pi / 2) * (r / cap_rings)
+        profile.append((radius * math.cos(phi), half + radius * math.sin(phi)))
+
+    verts = [(0.0, 0.0, -half - radius)]
+    for ring_radius, z in profile:
+        for s in range(segments):
+            theta = 2 * math.pi * s / segments
+            verts.append((ring_radius * math.cos(theta), ring_radius * math.sin(theta), z))
+    top = len(verts)
+    verts.append((0.0, 0.0, half + radius))
+
+    faces = []
+    for s in range(segments):
+        faces.append((0, 1 + (s + 1) % segments, 1 + s))
+    for r in range(len(profile) - 1):
+        a = 1 + r * segments
+        b = a + segments
+        for s in range(segments):
+            s1 = (s + 1) % segments
+            faces.append((a + s, a + s1, b + s1, b + s))
+    last = 1 + (len(profile) - 1) * segments
+    for s in range(segments):
+        faces.append((last + s, last + (s + 1) % segments, top))
+    return verts, faces
+
+
+def _sprinkle_material(color: Tuple[float, float, float]) -> bpy.types.Material:
+    """Returns the shared glossy material for a sprinkle color."""
+    return get_material("SprinkleMaterial", principled_spec((*color, 1.0), roughness=0.35))
+
+
+def write_sprinkle_geometry(
+    mesh: bpy.types.Mesh,
+    sprinkle_size: float,
+    sprinkle_length: float,
+    segments: int = 8,
+    cap_rings: int = 3
+) -> None:
+    """
+    Fills a mesh with a capsule sprinkle lying along the local X axis, so an instance
+    oriented by a surface normal lies flat on that surface. The dimensions and
+    resolution are stored on the mesh (SPRINKLE_SHAPE_PROP), so the sprinkle can be
+    rebuilt at another resolution later (see Level_of_detail).
+    """
+    verts, faces = _sprinkle_capsule_geometry(sprinkle_size / 2, sprinkle_length, segments, cap_rings)
+    # Rotate +90 degrees about Y: the long (Z) axis becomes X
+    verts = [(z, y, -x) for x, y, z in verts]
+    write_mesh_arrays(mesh, verts, faces)
+    set_smooth_shading(mesh)
+    mesh[SPRINKLE_SHAPE_PROP] = {"size": sprinkle_size, "length": sprinkle_length,
+                                 "segments": segments, "cap_rings": cap_rings}
+
+
+def _build_sprinkle_prototype(
+    name: str,
+    color: Tuple[float, float, float],
+    sprinkle_size: float,
+    sprinkle_length: float,
+    segments: int = 8,
+    cap_rings: int = 3
+) -> bpy.types.Mesh:
+    """
+    Builds a capsule sprinkle mesh through the data API (no operators, no depsgraph
+    update) with its shared color material assigned.
+    """
+    mesh = bpy.data.meshes.new(name)
+    write_sprinkle_geometry(mesh, sprinkle_size, sprinkle_length, segments, cap_rings)
+    mesh.materials.append(_sprinkle_material(color))
+    return mesh
+
+
+def _add_sprinkle_instancer(
+    name: str,
+    prototype: bpy.types.Mesh,
+    points: np.ndarray,
+    normals: np.ndarray,
+    tangents: np.ndarray,
+    parent: bpy.types.Object,
+    collection: bpy.types.Collection
+) -> bpy.types.Object:
+    """
+    Creates one face-instancing object that places the prototype at every point.
+    The instance frames are written to the instancer mesh in bulk.
+    """
+    inst_mesh = bpy.data.meshes.new(f"{name}_Points")
+    write_mesh_arrays(inst_mesh, *instancer_triangles(points, normals, tangents))
+    instancer = bpy.data.objects.new(name, inst_mesh)
+    instancer.instance_type = 'FACES'
+    instancer.show_instancer_for_viewport = False
+    instancer.show_instancer_for_render = False
+    collection.objects.link(instancer)
+    instancer.parent = parent
+
+    source = bpy.data.objects.new(f"{name}_Prototype", prototype)
+    collection.objects.link(source)
+    source.parent = instancer
+    return instancer
+
+
+def _random_sprinkle_transform(
+    donut_obj: bpy.types.Object,
+    icing_thickness: float
+) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+    """Returns a random (location, rotation_euler) for one sprinkle above the donut."""
+    # Randomly position on icing surface (approximate, for perfection use particle system)
+    ring = random.uniform(donut_obj.dimensions.x * 0.35, donut_obj.dimensions.x * 0.48)
+    x = donut_obj.location.x + ring * random.uniform(0.95, 1.05) * (random.uniform(-1, 1))
+    y = donut_obj.location.y + ring * random.uniform(0.95, 1.05) * (random.uniform(-1, 1))
+    z = donut_obj.location.z + random.uniform(icing_thickness * 0.7, icing_thickness * 1.2) + donut_obj.dimensions.z / 2
+    rotation = (
+        random.uniform(0, 3.14159),
+        random.uniform(0, 3.14159),
+        random.uniform(0, 3.14159)
+    )
+    return (x, y, z), rotation
+
+
+def _add_sprinkle_with_operators(
+    index: int,
+    donut_obj: bpy.types.Object,
+    icing: bpy.types.Object,
+    sprinkles_collection: bpy.types.Collection,
+    color: Tuple[float, float, float],
+    sprinkle_size: float,
+    sprinkle_length: float,
+    icing_thickness: float
+) -> bpy.types.Object:
+    """
+    Legacy sprinkle builder: three primitives joined into a unique mesh with its own
+    material. Kept for comparison with the instanced path; it costs several
+    operator calls (and depsgraph updates) per sprinkle.
+    """
+    # Sprinkle shape: capsule (cylinder with hemispherical ends)
+    bpy.ops.mesh.primitive_uv_sphere_add(radius=sprinkle_size/2, location=(0,0,0))
+    sphere1 = bpy.context.active_object
+    bpy.ops.mesh.primitive_cylinder_add(
+        radius=sprinkle_size / 2,
+        depth=sprinkle_length,
+        location=(0, 0, 0)
+    )
+    cylinder = bpy.context.active_object
+    bpy.ops.mesh.primitive_uv_sphere_add(radius=sprinkle_size/2, location=(0,0,sprinkle_length/2))
+    sphere2 = bpy.context.active_object
+
+    # Join the three parts into one sprinkle
+    bpy.ops.object.select_all(action='DESELECT')
+    cylinder.select_set(True)
+    sphere1.select_set(True)
+    sphere2.select_set(True)
+    bpy.context.view_layer.objects.active = cylinder
+    bpy.ops.object.join()
+    sprinkle = bpy.context.active_object
+    sprinkle.name = f"Sprinkle_{index:03d}"
+    sprinkle.location, sprinkle.rotation_euler = _random_sprinkle_transform(donut_obj, icing_thickness)
+
+    sprinkle.data.materials.clear()
+    sprinkle.data.materials.append(_sprinkle_material(color))
+
+    # Move sprinkle to sprinkles collection
+    bpy.ops.collection.objects_remove_all()
+    sprinkles_collection.objects.link(sprinkle)
+    sprinkle.parent = icing
+    return sprinkle
+
+
+def _rendered_surface(icing: bpy.types.Object):
+    """
+    Reads the icing surface as it renders, i.e. with its Subdivision and Displace
+    modifiers applied (or its frozen mesh), in icing-local space.
+
+    Returns:
+        (verts, tris): As read_mesh_triangles().
+    """
+    if not any(modifier.show_render for modifier in icing.modifiers):
+        return read_mesh_triangles(icing.data)
+    mesh = evaluate_for_render([icing])[icing.name]
+    try:
+        return read_mesh_triangles(mesh)
+    finally:
+        bpy.data.meshes.remove(mesh)
+
+
 def add_icing_and_sprinkles(
     donut_obj: bpy.types.Object,
-    icing_color: Tuple[float, float, float, float] = (0.95, 0.6, 0.8, 1.0),
+    icing_color: Optional[Tuple[float, float, float, float]] = None,
     icing_thickness: float = 0.07,
     sprinkle_count: int = 150,
     sprinkle_colors: Optional[List[Tuple[float, float, float]]] = None,
     sprinkle_size: float = 0.04,
     sprinkle_length: float = 0.12,
-    seed: Optional[int] = None
+    seed: Optional[int] = None,
+    use_instancing: bool = True,
+    min_spacing: Optional[float] = None,
+    sprinkle_segments: int = 8,
+    sprinkle_cap_rings: int = 3
 ) -> Tuple[Optional[bpy.types.Object], Optional[bpy.types.Collection]]:
     """
     Adds a realistic icing layer and sprinkles to the provided donut object.
 
     Args:
         donut_obj (bpy.types.Object): The donut mesh to add icing and sprinkles to.
-        icing_color (tuple): RGBA color for the icing.
-        icing_thickness (float): Thickness of the icing layer.
+        icing_color (tuple, optional): RGBA color for the icing. Defaults to pink for a new
+            icing shell; when the donut's frosting is reused, its material is kept unless
+            a color is given.
+        icing_thickness (float): Thickness of the icing layer. When it matches the
+            donut's frosting, the frosting shell is reused as the icing.
         sprinkle_count (int): Number of sprinkles to add.
         sprinkle_colors (list): List of RGB tuples for sprinkle colors.
         sprinkle_size (float): Diameter of each sprinkle.
         sprinkle_length (float): Length of each sprinkle (for capsule/cylinder shape).
         seed (int, optional): Random seed for reproducibility.
+        use_instancing (bool): Scatter sprinkles over the icing surface and render them
+            through one face instancer per color that shares a single prototype mesh.
+            When False, every sprinkle is built from primitives with its own mesh and
+            placed at random above the donut (slow for large counts).
+        min_spacing (float, optional): Minimum distance between sprinkle centers when
+            instancing. Defaults to sprinkle_length + sprinkle_size (no overlaps), or
+            less when the icing is too small to fit sprinkle_count at that spacing.
+            Only an explicit spacing can leave fewer than sprinkle_count sprinkles.
+        sprinkle_segments (int): Segments around an instanced sprinkle capsule.
+        sprinkle_cap_rings (int): Rings in each rounded end of an instanced sprinkle.
 
     Returns:
         (icing_obj, sprinkles_collection): The icing mesh object and the sprinkles collection.
@@ -32,38 +270,13 @@ def add_icing_and_sprinkles(
         if seed is not None:
             random.seed(seed)
 
-        # --- Create Icing Layer ---
-        bpy.ops.object.select_all(action='DESELECT')
-        donut_obj.select_set(True)
-        bpy.context.view_layer.objects.active = donut_obj
-        bpy.ops.object.duplicate()
-        icing = bpy.context.active_object
-        icing.name = f"{donut_obj.name}_Icing"
-
-        # Edit icing mesh: keep only top faces, shrink/fatten for thickness
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        bpy.ops.mesh.select_random(percent=60, seed=random.randint(0, 100))
-        bpy.ops.mesh.delete(type='FACE')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.transform.shrink_fatten(value=icing_thickness)
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-        # --- Icing Material ---
-        icing_mat = bpy.data.materials.new(name="IcingMaterial")
-        icing_mat.use_nodes = True
-        nodes = icing_mat.node_tree.nodes
-        links = icing_mat.node_tree.links
-        nodes.clear()
-        output = nodes.new("ShaderNodeOutputMaterial")
-        bsdf = nodes.new("ShaderNodeBsdfPrincipled")
-        bsdf.inputs['Base Color'].default_value = icing_color
-        bsdf.inputs['Roughness'].default_value = 0.25
-        bsdf.inputs['Subsurface'].default_value = 0.1
-        links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-        icing.data.materials.clear()
-        icing.data.materials.append(icing_mat)
-        icing.parent = donut_obj
+        # --- Icing Layer (reuses the donut's frosting shell when it matches) ---
+        icing = get_icing_object(donut_obj, thickness=icing_thickness)
+        if icing_color is not None or not icing.material_slots or icing.material_slots[0].material is None:
+            icing_mat = get_material("IcingMaterial", principled_spec(
+                icing_color or (0.95, 0.6, 0.8, 1.0), roughness=0.25, subsurface=0.1
+            ))
+            set_object_material(icing, icing_mat)
 
         # --- Create Sprinkles Collection ---
         sprinkles_collection = bpy.data.collections.new(f"{donut_obj.name}_Sprinkles")
@@ -82,64 +295,47 @@ def add_icing_and_sprinkles(
             ]
 
         # --- Generate Sprinkles ---
-        for i in range(sprinkle_count):
-            # Sprinkle shape: capsule (cylinder with hemispherical ends)
-            bpy.ops.mesh.primitive_uv_sphere_add(radius=sprinkle_size/2, location=(0,0,0))
-            sphere1 = bpy.context.active_object
-            bpy.ops.mesh.primitive_cylinder_add(
-                radius=sprinkle_size / 2,
-                depth=sprinkle_length,
-                location=(0, 0, 0)
-            )
-            cylinder = bpy.context.active_object
-            bpy.ops.mesh.primitive_uv_sphere_add(radius=sprinkle_size/2, location=(0,0,sprinkle_length/2))
-            sphere2 = bpy.context.active_object
-
-            # Join the three parts into one sprinkle
-            bpy.ops.object.select_all(action='DESELECT')
-            cylinder.select_set(True)
-            sphere1.select_set(True)
-            sphere2.select_set(True)
-            bpy.context.view_layer.objects.active = cylinder
-            bpy.ops.object.join()
-            sprinkle = bpy.context.active_object
-            sprinkle.name = f"Sprinkle_{i:03d}"
-
-            # Randomly position on icing surface (approximate, for perfection use particle system)
-            angle = random.uniform(0, 2 * 3.14159)
-            ring = random.uniform(donut_obj.dimensions.x * 0.35, donut_obj.dimensions.x * 0.48)
-            x = donut_obj.location.x + ring * random.uniform(0.95, 1.05) * (random.uniform(-1, 1))
-            y = donut_obj.location.y + ring * random.uniform(0.95, 1.05) * (random.uniform(-1, 1))
-            z = donut_obj.location.z + random.uniform(icing_thickness * 0.7, icing_thickness * 1.2) + donut_obj.dimensions.z / 2
-
-            sprinkle.location = (x, y, z)
-            sprinkle.rotation_euler = (
-                random.uniform(0, 3.14159),
-                random.uniform(0, 3.14159),
-                random.uniform(0, 3.14159)
+        if use_instancing:
+            # Scatter on the top-facing surface of the icing as rendered (icing-local
+            # space), then write one face instancer per color that reuses a single
+            # prototype mesh
+            scatter_seed = seed if seed is not None else random.getrandbits(32)
+            verts, tris = _rendered_surface(icing)
+            if min_spacing is None:
+                min_spacing = min(sprinkle_length + sprinkle_size,
+                                  spacing_for_count(surface_area(verts, tris, min_normal_z=0.2), sprinkle_count))
+            scatter = scatter_on_surface(
+                verts, tris, sprinkle_count,
+                min_spacing=min_spacing,
+                seed=scatter_seed,
+                min_normal_z=0.2,
+                lift=sprinkle_size * 0.4
             )
+            placed = len(scatter.points)
+            color_index = np.random.default_rng(scatter_seed + 1).integers(len(sprinkle_colors), size=placed)
+            for k, color in enumerate(sprinkle_colors):
+                chosen = color_index == k
+                if not chosen.any():
+                    continue
+                _add_sprinkle_instancer(
+                    f"{donut_obj.name}_Sprinkles_{k:02d}",
+                    _build_sprinkle_prototype(f"SprinkleMesh_{k:02d}", color, sprinkle_size, sprinkle_length,
+                                              sprinkle_segments, sprinkle_cap_rings),
+                    scatter.points[chosen], scatter.normals[chosen], scatter.tangents[chosen],
+                    icing, sprinkles_collection
+                )
+            if placed < sprinkle_count:
+                print(f"Only {placed} of {sprinkle_count} sprinkles fit on the icing at the requested spacing.")
+            added = placed
+        else:
+            for i in range(sprinkle_count):
+                _add_sprinkle_with_operators(
+                    i, donut_obj, icing, sprinkles_collection,
+                    random.choice(sprinkle_colors), sprinkle_size, sprinkle_length, icing_thickness
+                )
+            added = sprinkle_count
 
-            # Sprinkle material
-            color = random.choice(sprinkle_colors)
-            sprinkle_mat = bpy.data.materials.new(name=f"SprinkleMat_{i:03d}")
-            sprinkle_mat.use_nodes = True
-            snodes = sprinkle_mat.node_tree.nodes
-            slinks = sprinkle_mat.node_tree.links
-            snodes.clear()
-            soutput = snodes.new("ShaderNodeOutputMaterial")
-            sbsdf = snodes.new("ShaderNodeBsdfPrincipled")
-            sbsdf.inputs['Base Color'].default_value = (*color, 1.0)
-            sbsdf.inputs['Roughness'].default_value = 0.35
-            slinks.new(sbsdf.outputs['BSDF'], soutput.inputs['Surface'])
-            sprinkle.data.materials.clear()
-            sprinkle.data.materials.append(sprinkle_mat)
-
-            # Move sprinkle to sprinkles collection
-            bpy.ops.collection.objects_remove_all()
-            sprinkles_collection.objects.link(sprinkle)
-            sprinkle.parent = icing
-
-        print(f"Icing and {sprinkle_count} sprinkles added to '{donut_obj.name}'.")
+        print(f"Icing and {added} sprinkles added to '{donut_obj.name}'.")
         return icing, sprinkles_collection
 
     except Exception as e:
@@ -0,0 +1,159 @@
+"""
+================================================================================
+Shared Icing Generator
+================================================================================
+
+One deterministic icing/frosting generator used by both add_donut (the
+"{name}_Frosting" child) and add_icing_and_sprinkles (the icing the sprinkles sit
+on). The shell covers the faces of the donut mesh that point up and is thickened
+along the vertex normals in a single vectorized pass (Donut_mesh_builder).
+
+The resulting mesh is cached, keyed by a hash of the source mesh geometry and the
+shell parameters. A second request for the same donut and thickness reuses the
+existing frosting object instead of duplicating the donut and running another
+edit-mode pass, and identical donuts share one icing mesh as linked data.
+
+USAGE EXAMPLE:
+--------------
+    icing = get_icing_object(donut, thickness=0.07, name="Donut_Icing")
+
+================================================================================
+"""
+
+import bpy # type: ignore
+from typing import Dict, Optional
+
+from Blender_Global_Functions.Cache_utils import stable_hash  # type: ignore
+from Blender_Global_Functions.Donut_mesh_builder import icing_geometry  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import (  # type: ignore
+    mesh_content_hash, read_mesh_polygons, read_uv_layer, set_smooth_shading, write_mesh_arrays, write_uv_layer
+)
+from Blender_Global_Functions.Object_utils import link_object  # type: ignore
+
+# Custom property storing the cache key on generated icing meshes
+ICING_KEY_PROP = "icing_key"
+
+# Cache key -> icing mesh name for meshes generated in this session
+_ICING_CACHE: Dict[str, str] = {}
+
+
+def icing_cache_key(source_mesh: bpy.types.Mesh, thickness: float, min_normal_z: float) -> str:
+    """Returns the cache key of the icing for a source mesh and shell parameters."""
+    return stable_hash({
+        "mesh": mesh_content_hash(source_mesh),
+        "thickness": thickness,
+        "min_normal_z": min_normal_z,
+    })
+
+
+def _find_cached(key: str) -> Optional[bpy.types.Mesh]:
+    """Returns an existing icing mesh generated with the given key, if any."""
+    name = _ICING_CACHE.get(key)
+    if name is not None:
+        mesh = bpy.data.meshes.get(name)
+        if mesh is not None and mesh.get(ICING_KEY_PROP) == key:
+            return mesh
+        del _ICING_CACHE[key]
+    for mesh in bpy.data.meshes:
+        if mesh.get(ICING_KEY_PROP) == key:
+            _ICING_CACHE[key] = mesh.name
+            return mesh
+    return None
+
+
+def get_icing_mesh(
+    source_mesh: bpy.types.Mesh,
+    thickness: float = 0.07,
+    min_normal_z: float = 0.3,
+    name: str = "Icing",
+    smooth_shading: bool = True
+) -> bpy.types.Mesh:
+    """
+    Returns the icing shell mesh for a source mesh, generating it only on a cache miss.
+
+    Args:
+        source_mesh (bpy.types.Mesh): The donut mesh to ice.
+        thickness (float): Thickness of the icing layer.
+        min_normal_z (float): Faces whose normal Z is below this value are left bare.
+        name (str): Name for the mesh if it has to be generated.
+        smooth_shading (bool): Whether a generated mesh is smooth shaded.
+
+    Returns:
+        bpy.types.Mesh: The (possibly shared) icing mesh. It has one empty material
+        slot; materials are assigned per object.
+    """
+    key = icing_cache_key(source_mesh, thickness, min_normal_z)
+    mesh = _find_cached(key)
+    if mesh is not None:
+        return mesh
+
+    verts, faces = read_mesh_polygons(source_mesh)
+    shell_verts, shell_faces, kept = icing_geometry(verts, faces, thickness, min_normal_z)
+    mesh = bpy.data.meshes.new(name)
+    write_mesh_arrays(mesh, shell_verts, shell_faces)
+    uvs = read_uv_layer(source_mesh)
+    if uvs is not None and len(uvs) == faces.size:
+        write_uv_layer(mesh, uvs.reshape(len(faces), -1, 2)[kept].reshape(-1, 2))
+    if smooth_shading:
+        set_smooth_shading(mesh)
+    mesh.materials.append(None)
+    mesh[ICING_KEY_PROP] = key
+    _ICING_CACHE[key] = mesh.name
+    return mesh
+
+
+def get_icing_object(
+    donut_obj: bpy.types.Object,
+    thickness: float = 0.07,
+    min_normal_z: float = 0.3,
+    name: Optional[str] = None
+) -> bpy.types.Object:
+    """
+    Returns the icing object of a donut, reusing an existing child that already
+    shows the same cached icing mesh. A new object copies the donut's Subdivision
+    and Displace modifiers so the shell follows the same surface.
+
+    Args:
+        donut_obj (bpy.types.Object): The donut to ice.
+        thickness (float): Thickness of the icing layer.
+        min_normal_z (float): Faces whose normal Z is below this value are left bare.
+        name (str, optional): Name for a new icing object. Defaults to "{donut}_Icing".
+
+    Returns:
+        bpy.types.Object: The icing object, parented to the donut.
+    """
+    mesh = get_icing_mesh(donut_obj.data, thickness, min_normal_z, name=f"{donut_obj.data.name}_Icing")
+    for child in donut_obj.children:
+        if child.data == mesh:
+            return child
+
+    icing = bpy.data.objects.new(name or f"{donut_obj.name}_Icing", mesh)
+    for modifier in donut_obj.modifiers:
+        if modifier.type == 'SUBSURF':
+            copy = icing.modifiers.new(name=modifier.name, type=modifier.type)
+            copy.levels = modifier.levels
+            copy.render_levels = modifier.render_levels
+        elif modifier.type == 'DISPLACE':
+            copy = icing.modifiers.new(name=modifier.name, type=modifier.type)
+            copy.texture = modifier.texture
+            copy.strength = modifier.strength
+    link_object(icing, donut_obj.users_collection[0] if donut_obj.users_collection else None)
+    icing.parent = donut_obj
+    return icing
+
+
+def set_object_material(obj: bpy.types.Object, mat: bpy.types.Material) -> None:
+    """
+    Assigns a material to the first slot of an object at object level, so objects
+    that share one icing mesh can still use different materials.
+    """
+    if not obj.material_slots:
+        obj.data.materials.append(None)
+    slot = obj.material_slots[0]
+    slot.link = 'OBJECT'
+    slot.material = mat
+
+
+def clear_icing_cache() -> None:
+    """Forgets every cached icing mesh (the meshes themselves are left untouched)."""
+    _ICING_CACHE.clear()
@@ -0,0 +1,167 @@
+"""
+================================================================================
+Keyframe Utilities
+================================================================================
+
+Bulk keyframe writing for animation generated as NumPy arrays (cached physics,
+camera trajectories, ...). Instead of one keyframe_insert() call per frame and
+channel, every F-curve is filled with keyframe_points.add() and a single
+foreach_set() of its (frame, value) pairs.
+
+FUNCTIONS:
+----------
+- ensure_action(): the action of a datablock, created if needed.
+- write_keyframes(): writes an (F, C) array of values to C channels of a property,
+  with their interpolation set by one foreach_set() as well.
+- matrices_to_loc_quat(): splits 4x4 world matrices into locations and
+  sign-continuous quaternions, ready for write_keyframes().
+
+USAGE EXAMPLE:
+--------------
+    frames = np.arange(1, 121)
+    write_keyframes(camera, "location", frames, locations)            # (120, 3)
+    write_keyframes(camera, "rotation_quaternion", frames, quats)     # (120, 4)
+
+================================================================================
+"""
+
+import bpy # type: ignore
+import numpy as np
+from typing import Optional, Tuple
+
+# Keyframe.interpolation enum items -> the integers foreach_get()/foreach_set() use
+INTERPOLATION_VALUES = {'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2, 'BACK': 3, 'BOUNCE': 4, 'CIRC': 5,
+                        'CUBIC': 6, 'ELASTIC': 7, 'EXPO': 8, 'QUAD': 9, 'QUART': 10, 'QUINT': 11,
+                        'SINE': 12}
+
+
+def ensure_action(id_data, name: Optional[str] = None):
+    """
+    Returns the action assigned to a datablock, creating animation data and an
+    action if needed.
+
+    Args:
+        id_data (bpy.types.ID): The animated datablock (object, curve, ...).
+        name (str, optional): Name of a new action. Defaults to '<name>Action'.
+
+    Returns:
+        bpy.types.Action: The assigned action.
+    """
+    anim = id_data.animation_data or id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(name or f"{id_data.name}Action")
+    return anim.action
+
+
+def _ensure_fcurve(action, id_data, data_path: str, index: int, group: str):
+    """Finds or creates an F-curve, on layered (4.4+) and legacy actions."""
+    if hasattr(action, "fcurve_ensure_for_datablock"):
+        return action.fcurve_ensure_for_datablock(id_data, data_path, index=index, group_name=group)
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index, action_group=group)
+    return fcurve
+
+
+def write_keyframes(
+    id_data,
+    data_path: str,
+    frames: np.ndarray,
+    values: np.ndarray,
+    interpolation: str = 'LINEAR',
+    group: str = "",
+    replace: bool = True
+) -> list:
+    """
+    Writes keyframes for every channel of a property in bulk.
+
+    Args:
+        id_data (bpy.types.ID): The animated datablock.
+        data_path (str): Animated property, e.g. "location" or "eval_time".
+        frames (ndarray): (F,) frame numbers.
+        values (ndarray): (F,) values of a single channel or (F, C) values of C channels.
+        interpolation (str): Interpolation of the written keyframes ('LINEAR', 'BEZIER',
+            'CONSTANT', ... see INTERPOLATION_VALUES).
+        group (str): F-curve group name.
+        replace (bool): Remove existing keyframes of the channels first.
+
+    Returns:
+        list: The written F-curves, one per channel.
+    """
+    if interpolation not in INTERPOLATION_VALUES:
+        raise ValueError(f"Invalid interpolation '{interpolation}'. Must be one of {sorted(INTERPOLATION_VALUES)}.")
+    frames = np.asarray(frames, dtype=np.float32).ravel()
+    values = np.asarray(values, dtype=np.float32).reshape(len(frames), -1)
+    action = ensure_action(id_data)
+
+    coords = np.empty((len(frames), 2), dtype=np.float32)
+    coords[:, 0] = frames
+    fcurves = []
+    for index in range(values.shape[1]):
+        fcurve = _ensure_fcurve(action, id_data, data_path, index, group)
+        points = fcurve.keyframe_points
+        if replace and len(points):
+            points.clear()
+        start = len(points)
+        points.add(len(frames))
+        coords[:, 1] = values[:, index]
+        all_coords = np.empty(len(points) * 2, dtype=np.float32)
+        if start:
+            points.foreach_get("co", all_coords)
+        all_coords[start * 2:] = coords.ravel()
+        points.foreach_set("co", all_coords)
+        # Enums go through foreach_set as their integer values
+        modes = np.empty(len(points), dtype=np.int32)
+        if start:
+            points.foreach_get("interpolation", modes)
+        modes[start:] = INTERPOLATION_VALUES[interpolation]
+        points.foreach_set("interpolation", modes)
+        fcurve.update()
+        fcurves.append(fcurve)
+    return fcurves
+
+
+def matrices_to_loc_quat(matrices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Splits 4x4 transform matrices into locations and unit quaternions (W, X, Y, Z).
+
+    Scale is removed from the rotation columns first. Along the first axis (frames)
+    quaternion signs are kept continuous, so interpolating between keyframes never
+    takes the long way around.
+
+    Args:
+        matrices (ndarray): (..., 4, 4) matrices; the first axis is treated as time.
+
+    Returns:
+        (locations, quaternions): (..., 3) and (..., 4) float64 arrays.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    locations = matrices[..., :3, 3].copy()
+    rot = matrices[..., :3, :3] / np.maximum(np.linalg.norm(matrices[..., :3, :3], axis=-2, keepdims=True), 1e-12)
+
+    m00, m11, m22 = rot[..., 0, 0], rot[..., 1, 1], rot[..., 2, 2]
+    # Shepperd's method: pick the largest of w, x, y, z for numerical stability
+    candidates = np.stack([
+        1.0 + m00 + m11 + m22,
+        1.0 + m00 - m11 - m22,
+        1.0 - m00 + m11 - m22,
+        1.0 - m00 - m11 + m22,
+    ], axis=-1)
+    pick = np.argmax(candidates, axis=-1)
+    s = np.sqrt(np.maximum(np.take_along_axis(candidates, pick[..., None], axis=-1)[..., 0], 1e-12)) * 2.0
+
+    r = rot
+    options = np.stack([
+        np.stack([0.25 * s, (r[..., 2, 1] - r[..., 1, 2]) / s, (r[..., 0, 2] - r[..., 2, 0]) / s, (r[..., 1, 0] - r[..., 0, 1]) / s], axis=-1),
+        np.stack([(r[..., 2, 1] - r[..., 1, 2]) / s, 0.25 * s, (r[..., 0, 1] + r[..., 1, 0]) / s, (r[..., 0, 2] + r[..., 2, 0]) / s], axis=-1),
+        np.stack([(r[..., 0, 2] - r[..., 2, 0]) / s, (r[..., 0, 1] + r[..., 1, 0]) / s, 0.25 * s, (r[..., 1, 2] + r[..., 2, 1]) / s], axis=-1),
+        np.stack([(r[..., 1, 0] - r[..., 0, 1]) / s, (r[..., 0, 2] + r[..., 2, 0]) / s, (r[..., 1, 2] + r[..., 2, 1]) / s, 0.25 * s], axis=-1),
+    ], axis=-2)
+    quats = np.take_along_axis(options, pick[..., None, None], axis=-2)[..., 0, :]
+    quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+
+    if quats.ndim > 1 and len(quats) > 1:
+        dots = np.sum(quats[1:] * quats[:-1], axis=-1)
+        flips = np.cumprod(np.where(dots < 0.0, -1.0, 1.0), axis=0)
+        quats[1:] *= flips[..., None]
+    return locations, quats
@@ -0,0 +1,434 @@
+"""
+================================================================================
+Camera-Aware Level of Detail
+================================================================================
+
+Chooses geometry detail from how big things actually get on screen. The camera
+is sampled over the whole shot (its keyframed path included), every object's
+bounding sphere is projected into the render resolution, and the largest size
+it reaches decides its detail:
+
+- Subdivided objects (the donut and its icing): Subdivision levels, so that a
+  subdivided edge covers about 'edge_pixels' pixels at the closest frame.
+- Sprinkle instancers: the segment and ring count of their capsule prototype
+  (rebuilt in place), or no sprinkles at all when a sprinkle stays smaller than
+  'cull_pixels' for the whole shot.
+- Objects that never enter the frame get the lowest detail.
+
+The result is then fitted into a scene-wide triangle budget: the largest item is
+stepped down one level at a time, and if every item is at its lowest level the
+sprinkle instances are thinned evenly. Subdivision levels apply to the viewport
+(and so to the rigid body bake) and to the render.
+
+Objects are measured at their current pose: apply LOD after the camera is
+animated and before the physics bake. Culling and thinning remove instances,
+so apply it once per build.
+
+FUNCTIONS:
+----------
+- camera_matrices(): world matrices of a camera at the given frames.
+- max_screen_sizes(): largest on-screen diameter of bounding spheres over a shot.
+- subdivision_for_size() / capsule_resolution_for_size(): detail from a screen size.
+- fit_to_budget(): steps the chosen detail down into a triangle budget.
+- apply_level_of_detail(): measures the scene and applies all of the above.
+
+USAGE EXAMPLE:
+--------------
+    animate_camera_fly_through(camera, donut)
+    report = apply_level_of_detail(camera, triangle_budget=200_000)
+    print(report["triangles"], report["objects"])
+
+================================================================================
+"""
+
+import math
+import bpy # type: ignore
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from Blender_Global_Functions.Frosting_and_sprinkles import SPRINKLE_SHAPE_PROP, write_sprinkle_geometry  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import read_mesh_triangles, write_mesh_arrays  # type: ignore
+
+# Capsule resolutions (segments, cap rings) from finest to coarsest
+CAPSULE_RESOLUTIONS = ((8, 3), (6, 2), (5, 2), (4, 1), (3, 1))
+
+
+def _euler_xyz_matrices(euler: np.ndarray) -> np.ndarray:
+    """(F, 3) XYZ Euler angles to (F, 3, 3) rotation matrices (R = Rz @ Ry @ Rx)."""
+    cx, cy, cz = np.cos(euler).T
+    sx, sy, sz = np.sin(euler).T
+    return np.stack([
+        np.stack([cy * cz, sx * sy * cz - cx * sz, cx * sy * cz + sx * sz], axis=-1),
+        np.stack([cy * sz, sx * sy * sz + cx * cz, cx * sy * sz - sx * cz], axis=-1),
+        np.stack([-sy, sx * cy, cx * cy], axis=-1),
+    ], axis=-2)
+
+
+def _quaternion_matrices(quats: np.ndarray) -> np.ndarray:
+    """(F, 4) quaternions (W, X, Y, Z) to (F, 3, 3) rotation matrices."""
+    quats = quats / np.maximum(np.linalg.norm(quats, axis=-1, keepdims=True), 1e-12)
+    w, x, y, z = quats.T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)], axis=-1),
+        np.stack([2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)], axis=-1),
+        np.stack([2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+
+def camera_matrices(camera_obj: bpy.types.Object, frames: Sequence[int]) -> np.ndarray:
+    """
+    Returns the camera's world matrices at the given frames.
+
+    Transform F-curves are evaluated directly (no scene.frame_set()). Cameras with a
+    parent, constraints or an unsupported rotation mode are sampled through
+    frame_set() instead.
+
+    Args:
+        camera_obj (bpy.types.Object): The camera.
+        frames (sequence): Frame numbers.
+
+    Returns:
+        ndarray: (F, 4, 4) world matrices.
+    """
+    frames = np.asarray(frames)
+    anim = camera_obj.animation_data
+    action = anim.action if anim is not None else None
+    if action is None:
+        return np.broadcast_to(np.array(camera_obj.matrix_world), (len(frames), 4, 4)).copy()
+
+    mode = camera_obj.rotation_mode
+    if (camera_obj.parent is not None or len(camera_obj.constraints) or mode not in ('XYZ', 'QUATERNION')
+            or not hasattr(action, "fcurves")):
+        scene = bpy.context.scene
+        current = scene.frame_current
+        matrices = []
+        for frame in frames:
+            scene.frame_set(int(frame))
+            matrices.append(np.array(camera_obj.matrix_world))
+        scene.frame_set(current)
+        return np.array(matrices)
+
+    channels = {
+        "location": np.tile(np.array(list(camera_obj.location), dtype=np.float64), (len(frames), 1)),
+        "rotation_euler": np.tile(np.array(list(camera_obj.rotation_euler), dtype=np.float64), (len(frames), 1)),
+        "rotation_quaternion": np.tile(np.array(list(camera_obj.rotation_quaternion), dtype=np.float64),
+                                       (len(frames), 1)),
+        "scale": np.tile(np.array(list(camera_obj.scale), dtype=np.float64), (len(frames), 1)),
+    }
+    for fcurve in action.fcurves:
+        values = channels.get(fcurve.data_path)
+        if values is not None and fcurve.array_index < values.shape[1]:
+            values[:, fcurve.array_index] = [fcurve.evaluate(float(frame)) for frame in frames]
+
+    matrices = np.zeros((len(frames), 4, 4))
+    rotation = (_quaternion_matrices(channels["rotation_quaternion"]) if mode == 'QUATERNION'
+                else _euler_xyz_matrices(channels["rotation_euler"]))
+    matrices[:, :3, :3] = rotation * channels["scale"][:, None, :]
+    matrices[:, :3, 3] = channels["location"]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def max_screen_sizes(
+    matrices: np.ndarray,
+    centers: np.ndarray,
+    radii: np.ndarray,
+    resolution: Tuple[int, int],
+    focal_pixels: Optional[float] = None,
+    ortho_pixels_per_unit: Optional[float] = None
+) -> np.ndarray:
+    """
+    Largest on-screen diameter of bounding spheres over a camera move.
+
+    Args:
+        matrices (ndarray): (F, 4, 4) camera world matrices (the camera looks down -Z).
+        centers (ndarray): (N, 3) sphere centers.
+        radii (ndarray): (N,) sphere radii.
+        resolution (tuple): (width, height) in pixels.
+        focal_pixels (float, optional): Focal length in pixels (perspective cameras).
+        ortho_pixels_per_unit (float, optional): Pixels per unit (orthographic cameras).
+
+    Returns:
+        ndarray: (N,) diameters in pixels; inf when the camera gets inside a sphere,
+            0 when a sphere never enters the frame.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64)
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+    radii = np.asarray(radii, dtype=np.float64).reshape(-1)
+    rotation, location = matrices[:, :3, :3], matrices[:, :3, 3]
+    # Camera-space centers: R^T (c - t), shape (F, N, 3)
+    local = np.einsum("fji,fnj->fni", rotation, centers[None, :, :] - location[:, None, :])
+    depth = -local[..., 2]
+    half_w, half_h = resolution[0] / 2.0, resolution[1] / 2.0
+
+    if ortho_pixels_per_unit is not None:
+        size = np.broadcast_to(2.0 * radii * ortho_pixels_per_unit, depth.shape)
+        x, y = local[..., 0] * ortho_pixels_per_unit, local[..., 1] * ortho_pixels_per_unit
+        inside = np.zeros(depth.shape, dtype=bool)
+        behind = depth < -radii
+    else:
+        safe_depth = np.maximum(depth, 1e-9)
+        size = 2.0 * radii * focal_pixels / safe_depth
+        x, y = local[..., 0] * focal_pixels / safe_depth, local[..., 1] * focal_pixels / safe_depth
+        inside = np.linalg.norm(local, axis=-1) <= radii
+        behind = depth < -radii
+
+    on_screen = (np.abs(x) - size / 2 <= half_w) & (np.abs(y) - size / 2 <= half_h) & ~behind
+    sizes = np.where(on_screen, size, 0.0)
+    sizes = np.where(inside & ~behind, np.inf, sizes)
+    return sizes.max(axis=0) if len(sizes) else np.zeros(len(radii))
+
+
+def subdivision_for_size(size_pixels: float, base_edge_fraction: float, edge_pixels: float, max_level: int) -> int:
+    """
+    Subdivision level at which an edge covers about edge_pixels on screen.
+
+    Args:
+        size_pixels (float): On-screen diameter of the object.
+        base_edge_fraction (float): Mean edge length of the base mesh / object diameter.
+        edge_pixels (float): Target on-screen edge length.
+        max_level (int): Highest level allowed.
+
+    Returns:
+        int: Level between 0 and max_level (each level halves the edges).
+    """
+    if not math.isfinite(size_pixels):
+        return max_level
+    edge = size_pixels * base_edge_fraction
+    if edge <= edge_pixels:
+        return 0
+    return int(min(max_level, math.ceil(math.log2(edge / edge_pixels))))
+
+
+def capsule_resolution_for_size(diameter_pixels: float, edge_pixels: float) -> int:
+    """Index into CAPSULE_RESOLUTIONS whose segments are about edge_pixels long on screen."""
+    if not math.isfinite(diameter_pixels):
+        return 0
+    circumference = math.pi * diameter_pixels
+    # The coarsest resolution that is still fine enough; the finest if none is
+    for index in range(len(CAPSULE_RESOLUTIONS) - 1, -1, -1):
+        if circumference / CAPSULE_RESOLUTIONS[index][0] <= edge_pixels:
+            return index
+    return 0
+
+
+def fit_to_budget(options: List[List[int]], chosen: List[int], budget: int, thinnable: List[int]
+                  ) -> Tuple[List[int], List[float], int]:
+    """
+    Steps detail down until the total triangle count fits the budget.
+
+    Args:
+        options (list): Per item, triangle counts of its detail levels, finest first.
+        chosen (list): Per item, the index of the level picked from screen size.
+        budget (int): Triangle budget.
+        thinnable (list): Indices of items whose instances can be thinned.
+
+    Returns:
+        tuple: (levels per item, kept fraction per item, total triangles).
+    """
+    levels = list(chosen)
+    keep = [1.0] * len(options)
+    total = sum(option[level] for option, level in zip(options, levels))
+    while total > budget:
+        # Step down the biggest item that still has a coarser level
+        candidates = [i for i in range(len(options)) if levels[i] + 1 < len(options[i])]
+        if not candidates:
+            break
+        i = max(candidates, key=lambda k: options[k][levels[k]])
+        total -= options[i][levels[i]] - options[i][levels[i] + 1]
+        levels[i] += 1
+
+    if total > budget and thinnable:
+        thin_total = sum(options[i][levels[i]] for i in thinnable)
+        fixed = total - thin_total
+        fraction = max(0.0, (budget - fixed) / thin_total) if thin_total else 1.0
+        for i in thinnable:
+            keep[i] = fraction
+        total = int(fixed + thin_total * fraction)
+    return levels, keep, total
+
+
+def _triangle_count(mesh) -> int:
+    totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", totals)
+    return int(np.sum(totals - 2))
+
+
+def _bounding_sphere(obj) -> Tuple[np.ndarray, float]:
+    corners = np.asarray(list(obj.bound_box), dtype=np.float64).reshape(-1, 3)
+    matrix = np.array(obj.matrix_world)
+    world = corners @ matrix[:3, :3].T + matrix[:3, 3]
+    center = world.mean(axis=0)
+    return center, float(np.linalg.norm(world - center, axis=1).max())
+
+
+def _mean_edge_length(mesh) -> float:
+    verts, tris = read_mesh_triangles(mesh)
+    if not len(tris):
+        return 0.0
+    edges = verts[tris] - verts[np.roll(tris, 1, axis=1)]
+    return float(np.linalg.norm(edges, axis=-1).mean())
+
+
+def _subdivision_root(obj):
+    """The top-most subdivided ancestor, so a donut and its icing share one level."""
+    root = obj
+    parent = obj.parent
+    while parent is not None:
+        if any(m.type == 'SUBSURF' for m in getattr(parent, "modifiers", ())):
+            root = parent
+        parent = parent.parent
+    return root
+
+
+def _thin_instancer(instancer, keep: float) -> int:
+    """Keeps an even subset of an instancer's face instances. Returns the instances left."""
+    verts, faces = read_mesh_triangles(instancer.data)
+    count = len(faces)
+    kept = int(round(count * keep))
+    if kept >= count:
+        return count
+    chosen = np.unique(np.linspace(0, count - 1, kept).round().astype(np.int64)) if kept else np.zeros(0, np.int64)
+    write_mesh_arrays(instancer.data, verts[faces[chosen]].reshape(-1, 3),
+                      np.arange(len(chosen) * 3).reshape(-1, 3))
+    return len(chosen)
+
+
+def apply_level_of_detail(
+    camera_obj: bpy.types.Object,
+    scene: Optional[bpy.types.Scene] = None,
+    frame_start: Optional[int] = None,
+    frame_end: Optional[int] = None,
+    triangle_budget: int = 500_000,
+    edge_pixels: float = 6.0,
+    cull_pixels: float = 1.0,
+    max_subdivision: int = 2,
+    size_margin: float = 1.25,
+    frame_step: int = 1,
+    resolution: Optional[Tuple[int, int]] = None,
+    verbose: bool = True
+) -> dict:
+    """
+    Sets subdivision levels, sprinkle resolution and sprinkle culling from the
+    largest on-screen size of each object over the shot.
+
+    Args:
+        camera_obj (bpy.types.Object): The shot camera (animated or not).
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        frame_start (int, optional): First frame of the shot. Defaults to the scene's.
+        frame_end (int, optional): Last frame of the shot. Defaults to the scene's.
+        triangle_budget (int): Scene-wide triangle budget of the measured objects.
+        edge_pixels (float): Target on-screen edge length.
+        cull_pixels (float): Sprinkles never longer than this on screen are removed.
+        max_subdivision (int): Highest subdivision level to use.
+        size_margin (float): Bounding spheres are scaled by this, for motion after the
+            build pose (e.g. a bounce towards the camera).
+        frame_step (int): Measure every n-th frame.
+        resolution (tuple, optional): Final render (width, height) in pixels. Defaults
+            to the scene's current resolution and percentage.
+        verbose (bool): Whether to print a summary.
+
+    Returns:
+        dict: {"triangles": estimated total, "objects": {name: chosen detail}}.
+    """
+    scene = scene or bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    frames = np.arange(frame_start, frame_end + 1, max(int(frame_step), 1))
+    matrices = camera_matrices(camera_obj, frames)
+
+    camera = camera_obj.data
+    if resolution is None:
+        percentage = scene.render.resolution_percentage / 100.0
+        resolution = (scene.render.resolution_x * percentage, scene.render.resolution_y * percentage)
+    width, height = resolution
+    sensor_pixels = max(width, height)
+    focal = ortho = None
+    if camera.type == 'ORTHO':
+        ortho = sensor_pixels / camera.ortho_scale
+    else:
+        focal = camera.lens / camera.sensor_width * sensor_pixels
+
+    subdivided, instancers = [], []
+    for obj in scene.objects:
+        if obj.type != 'MESH':
+            continue
+        if any(m.type == 'SUBSURF' for m in obj.modifiers):
+            subdivided.append(obj)
+        elif obj.instance_type == 'FACES':
+            prototypes = [child for child in obj.children
+                          if child.type == 'MESH' and child.data.get(SPRINKLE_SHAPE_PROP) is not None]
+            if prototypes:
+                instancers.append((obj, prototypes[0]))
+
+    spheres = [_bounding_sphere(obj) for obj in subdivided] + [_bounding_sphere(inst) for inst, _ in instancers]
+    if not spheres:
+        return {"triangles": 0, "objects": {}}
+    centers = np.array([center for center, _ in spheres])
+    radii = np.array([radius for _, radius in spheres]) * size_margin
+    sizes = max_screen_sizes(matrices, centers, radii, (width, height), focal, ortho)
+
+    # Items: one per subdivision group (an object and its subdivided children), one per instancer
+    groups: Dict[str, List[bpy.types.Object]] = {}
+    group_size: Dict[str, float] = {}
+    for obj, size in zip(subdivided, sizes[:len(subdivided)]):
+        root = _subdivision_root(obj)
+        groups.setdefault(root.name, []).append(obj)
+        group_size[root.name] = max(group_size.get(root.name, 0.0), float(size))
+
+    options, chosen, labels = [], [], []
+    for name, members in groups.items():
+        root = bpy.data.objects[name]
+        base_tris = sum(_triangle_count(obj.data) for obj in members)
+        diameter = 2.0 * _bounding_sphere(root)[1]
+        fraction = _mean_edge_length(root.data) / diameter if diameter > 0 else 0.0
+        level = subdivision_for_size(group_size[name], fraction, edge_pixels, max_subdivision)
+        options.append([base_tris * 4 ** lvl for lvl in range(max_subdivision, -1, -1)])
+        chosen.append(max_subdivision - level)
+        labels.append(("subdivision", name, members))
+
+    thinnable = []
+    for (instancer, prototype), size in zip(instancers, sizes[len(subdivided):]):
+        shape = prototype.data[SPRINKLE_SHAPE_PROP]
+        count = len(instancer.data.polygons)
+        # The sprinkles are a fraction of the instancer's sphere
+        scale = float(size) / max(2.0 * _bounding_sphere(instancer)[1], 1e-9)
+        length_px = scale * (shape["length"] + shape["size"])
+        if length_px < cull_pixels:
+            options.append([0])
+            chosen.append(0)
+        else:
+            options.append([count * 4 * segments * rings for segments, rings in CAPSULE_RESOLUTIONS])
+            chosen.append(capsule_resolution_for_size(scale * shape["size"], edge_pixels))
+            thinnable.append(len(options) - 1)
+        labels.append(("sprinkles", instancer.name, (instancer, prototype, length_px < cull_pixels)))
+
+    levels, keep, total = fit_to_budget(options, chosen, triangle_budget, thinnable)
+
+    report = {}
+    for (kind, name, payload), level, fraction in zip(labels, levels, keep):
+        if kind == "subdivision":
+            subdiv_level = max_subdivision - level
+            for obj in payload:
+                for modifier in obj.modifiers:
+                    if modifier.type == 'SUBSURF':
+                        modifier.levels = subdiv_level
+                        modifier.render_levels = subdiv_level
+            report[name] = {"subdivision_levels": subdiv_level}
+        else:
+            instancer, prototype, culled = payload
+            if culled:
+                left = _thin_instancer(instancer, 0.0)
+                report[name] = {"culled": True, "instances": left}
+                continue
+            segments, rings = CAPSULE_RESOLUTIONS[level]
+            shape = prototype.data[SPRINKLE_SHAPE_PROP]
+            if (shape["segments"], shape["cap_rings"]) != (segments, rings):
+                write_sprinkle_geometry(prototype.data, shape["size"], shape["length"], segments, rings)
+            left = _thin_instancer(instancer, fraction)
+            report[name] = {"segments": segments, "cap_rings": rings, "instances": left}
+
+    if verbose:
+        print(f"Level of detail: ~{total:,} triangles (budget {triangle_budget:,}) for "
+              f"{len(groups)} subdivided group(s) and {len(instancers)} sprinkle instancer(s).")
+    return {"triangles": int(total), "objects": report}
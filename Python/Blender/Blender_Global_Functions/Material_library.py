@@ -0,0 +1,262 @@
+"""
+================================================================================
+Shared Material Library
+================================================================================
+
+Content-addressed material cache used by every Global Function.
+
+Node graphs are described as plain data (a "spec"): a dict of named nodes with
+their type, input default values and color ramp stops, plus a list of links.
+Each spec is hashed, and get_material() compiles a spec into a Blender material
+only the first time it is requested. Identical requests afterwards return the
+same datablock, so e.g. 1,000 sprinkles in 7 colors share 7 materials.
+
+SPEC FORMAT:
+------------
+    {
+        "nodes": {
+            "output": {"type": "ShaderNodeOutputMaterial"},
+            "bsdf": {"type": "ShaderNodeBsdfPrincipled",
+                     "inputs": {"Base Color": (1, 0, 0, 1), "Roughness": 0.35}},
+            "ramp": {"type": "ShaderNodeValToRGB",
+                     "color_ramp": [(0.0, (1, 1, 1, 1)), (1.0, (0, 0, 0, 1))]},
+        },
+        "links": [("bsdf", "BSDF", "output", "Surface")],
+    }
+
+Image Texture nodes take an "image" entry, {"filepath": ..., "colorspace": ...}:
+the file is loaded once (bpy.data.images.load with check_existing).
+
+USAGE EXAMPLE:
+--------------
+    mat = get_material("SprinkleMat", principled_spec((1.0, 0.2, 0.2, 1.0), roughness=0.35))
+    obj.data.materials.append(mat)
+
+================================================================================
+"""
+
+import json
+import bpy # type: ignore
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from Blender_Global_Functions.Cache_utils import stable_hash  # type: ignore
+
+# Custom property storing the spec hash on compiled materials
+SPEC_HASH_PROP = "spec_hash"
+
+# Custom property storing the spec itself (as JSON) on compiled materials
+SPEC_PROP = "material_spec"
+
+# Input names renamed across Blender versions (old name -> new name)
+_INPUT_ALIASES = {
+    "Subsurface": "Subsurface Weight",
+    "Specular": "Specular IOR Level",
+    "Emission": "Emission Color",
+}
+
+# Spec hash -> material name for materials compiled in this session
+_MATERIAL_CACHE: Dict[str, str] = {}
+
+
+def principled_spec(
+    base_color: Tuple[float, float, float, float],
+    roughness: float = 0.5,
+    subsurface: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Spec for a flat-colored Principled BSDF material.
+
+    Args:
+        base_color (tuple): RGBA base color.
+        roughness (float): Surface roughness.
+        subsurface (float): Subsurface scattering weight.
+
+    Returns:
+        dict: The material spec.
+    """
+    inputs = {"Base Color": tuple(base_color), "Roughness": roughness}
+    if subsurface:
+        inputs["Subsurface"] = subsurface
+    return {
+        "nodes": {
+            "output": {"type": "ShaderNodeOutputMaterial"},
+            "bsdf": {"type": "ShaderNodeBsdfPrincipled", "inputs": inputs},
+        },
+        "links": [("bsdf", "BSDF", "output", "Surface")],
+    }
+
+
+def procedural_noise_spec(
+    ramp_colors: Sequence[Tuple[float, float, float, float]],
+    noise_scale: float,
+    bump_strength: float,
+    roughness: float,
+    subsurface: float = 0.0,
+    subsurface_color: Optional[Tuple[float, float, float, float]] = None
+) -> Dict[str, Any]:
+    """
+    Spec for the Noise -> ColorRamp -> Bump -> Principled network used by the
+    bread, frosting and ground materials.
+
+    Args:
+        ramp_colors (list): RGBA colors of the color ramp stops, spread evenly from 0 to 1.
+        noise_scale (float): Scale of the noise texture.
+        bump_strength (float): Strength of the bump node.
+        roughness (float): Surface roughness.
+        subsurface (float): Subsurface scattering weight.
+        subsurface_color (tuple, optional): RGBA subsurface color (ignored by Blender 4.x).
+
+    Returns:
+        dict: The material spec.
+    """
+    stops = len(ramp_colors)
+    bsdf_inputs: Dict[str, Any] = {"Roughness": roughness}
+    if subsurface:
+        bsdf_inputs["Subsurface"] = subsurface
+    if subsurface_color is not None:
+        bsdf_inputs["Subsurface Color"] = tuple(subsurface_color)
+    return {
+        "nodes": {
+            "output": {"type": "ShaderNodeOutputMaterial"},
+            "bsdf": {"type": "ShaderNodeBsdfPrincipled", "inputs": bsdf_inputs},
+            "noise": {"type": "ShaderNodeTexNoise", "inputs": {"Scale": noise_scale}},
+            "bump": {"type": "ShaderNodeBump", "inputs": {"Strength": bump_strength}},
+            "ramp": {
+                "type": "ShaderNodeValToRGB",
+                "color_ramp": [
+                    (i / (stops - 1) if stops > 1 else 0.0, tuple(c)) for i, c in enumerate(ramp_colors)
+                ],
+            },
+            "mapping": {"type": "ShaderNodeMapping"},
+            "texcoord": {"type": "ShaderNodeTexCoord"},
+        },
+        "links": [
+            ("texcoord", "Object", "mapping", "Vector"),
+            ("mapping", "Vector", "noise", "Vector"),
+            ("noise", "Fac", "ramp", "Fac"),
+            ("ramp", "Color", "bsdf", "Base Color"),
+            ("noise", "Fac", "bump", "Height"),
+            ("bump", "Normal", "bsdf", "Normal"),
+            ("bsdf", "BSDF", "output", "Surface"),
+        ],
+    }
+
+
+def _socket(sockets, name: str):
+    """Looks up a node socket by name, following renamed-input aliases."""
+    if name in sockets:
+        return sockets[name]
+    alias = _INPUT_ALIASES.get(name)
+    if alias and alias in sockets:
+        return sockets[alias]
+    return None
+
+
+def build_node_tree(mat: bpy.types.Material, spec: Dict[str, Any]) -> None:
+    """
+    Replaces the node tree of a material with the nodes and links described by a spec.
+    Inputs, and links to or from sockets, that do not exist in the running Blender
+    version are skipped.
+
+    Args:
+        mat (bpy.types.Material): The material to (re)build.
+        spec (dict): The material spec.
+    """
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+
+    created = {}
+    for key, node_spec in spec["nodes"].items():
+        node = nodes.new(node_spec["type"])
+        node.name = key
+        for input_name, value in node_spec.get("inputs", {}).items():
+            socket = _socket(node.inputs, input_name)
+            if socket is not None:
+                socket.default_value = value
+        ramp_stops = node_spec.get("color_ramp")
+        if ramp_stops:
+            elements = node.color_ramp.elements
+            while len(elements) < len(ramp_stops):
+                elements.new(1.0)
+            for element, (position, color) in zip(elements, ramp_stops):
+                element.position = position
+                element.color = color
+        image_spec = node_spec.get("image")
+        if image_spec:
+            node.image = bpy.data.images.load(image_spec["filepath"], check_existing=True)
+            node.image.colorspace_settings.name = image_spec.get("colorspace", "sRGB")
+        created[key] = node
+
+    for from_node, from_socket, to_node, to_socket in spec["links"]:
+        output = _socket(created[from_node].outputs, from_socket)
+        target = _socket(created[to_node].inputs, to_socket)
+        if output is not None and target is not None:
+            links.new(output, target)
+
+
+def _find_cached(spec_hash: str) -> Optional[bpy.types.Material]:
+    """Returns an existing material compiled from the given spec hash, if any."""
+    name = _MATERIAL_CACHE.get(spec_hash)
+    if name is not None:
+        mat = bpy.data.materials.get(name)
+        if mat is not None and mat.get(SPEC_HASH_PROP) == spec_hash:
+            return mat
+        del _MATERIAL_CACHE[spec_hash]
+    # Materials compiled by an earlier session (e.g. loaded from a .blend)
+    for mat in bpy.data.materials:
+        if mat.get(SPEC_HASH_PROP) == spec_hash:
+            _MATERIAL_CACHE[spec_hash] = mat.name
+            return mat
+    return None
+
+
+def get_material(name: str, spec: Dict[str, Any]) -> bpy.types.Material:
+    """
+    Returns the material for a spec, compiling it only if no identical spec was compiled before.
+
+    Args:
+        name (str): Name for the material if it has to be created.
+        spec (dict): The material spec.
+
+    Returns:
+        bpy.types.Material: The shared material.
+    """
+    spec_hash = stable_hash(spec)
+    mat = _find_cached(spec_hash)
+    if mat is not None:
+        return mat
+
+    mat = bpy.data.materials.new(name=name)
+    build_node_tree(mat, spec)
+    mat[SPEC_HASH_PROP] = spec_hash
+    mat[SPEC_PROP] = json.dumps(spec, sort_keys=True)
+    _MATERIAL_CACHE[spec_hash] = mat.name
+    return mat
+
+
+def material_spec(mat: Optional[bpy.types.Material]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the spec a material was compiled from by get_material().
+
+    Args:
+        mat (bpy.types.Material, optional): The material.
+
+    Returns:
+        dict or None: The spec (tuples come back as lists), or None for materials
+        not built by the library.
+    """
+    if mat is None or mat.get(SPEC_PROP) is None:
+        return None
+    return json.loads(mat[SPEC_PROP])
+
+
+def cached_material_names() -> List[str]:
+    """Returns the names of the materials currently held by the cache."""
+    return [name for name in _MATERIAL_CACHE.values() if bpy.data.materials.get(name) is not None]
+
+
+def clear_material_cache() -> None:
+    """Forgets every cached spec (the materials themselves are left untouched)."""
+    _MATERIAL_CACHE.clear()
@@ -0,0 +1,142 @@
+import hashlib
+import numpy as np
+from typing import Optional, Sequence, Tuple, Union
+
+
+def read_mesh_triangles(mesh) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads the vertices and triangulated faces of a Blender mesh in bulk.
+
+    Args:
+        mesh (bpy.types.Mesh): The mesh to read.
+
+    Returns:
+        (verts, tris): (V, 3) float64 vertex coordinates and (T, 3) int64 triangle indices.
+    """
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    mesh.calc_loop_triangles()
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    return verts.reshape(-1, 3).astype(np.float64), tris.reshape(-1, 3).astype(np.int64)
+
+
+def read_mesh_polygons(mesh) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads the vertices and faces of a Blender mesh in bulk. Faces are returned as an
+    (F, K) array when every face has K corners, otherwise the mesh is triangulated.
+
+    Args:
+        mesh (bpy.types.Mesh): The mesh to read.
+
+    Returns:
+        (verts, faces): (V, 3) float64 vertex coordinates and (F, K) int64 faces.
+    """
+    totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", totals)
+    if len(totals) == 0 or np.any(totals != totals[0]):
+        return read_mesh_triangles(mesh)
+
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", starts)
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    faces = loops[starts[:, None] + np.arange(totals[0])]
+    return verts.reshape(-1, 3).astype(np.float64), faces.astype(np.int64)
+
+
+def read_uv_layer(mesh) -> Optional[np.ndarray]:
+    """Returns the active UV layer as an (L, 2) array in loop order, or None."""
+    layer = mesh.uv_layers.active
+    if layer is None:
+        return None
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    layer.data.foreach_get("uv", uvs)
+    return uvs.reshape(-1, 2)
+
+
+def mesh_content_hash(mesh) -> str:
+    """
+    Returns a hash of a mesh's vertex positions and face topology, so identical
+    geometry in different datablocks hashes equally.
+    """
+    verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", verts)
+    starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", starts)
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    digest = hashlib.sha1()
+    for array in (verts, starts, loops):
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def write_mesh_arrays(
+    mesh,
+    verts: np.ndarray,
+    faces: Union[np.ndarray, Sequence[Sequence[int]]]
+) -> None:
+    """
+    Replaces the geometry of a Blender mesh with the given arrays using foreach_set.
+
+    Args:
+        mesh (bpy.types.Mesh): The mesh to fill (existing geometry is removed).
+        verts (ndarray): (V, 3) vertex coordinates.
+        faces: (F, K) array of faces that all have K corners, or a ragged list of faces
+            (ragged input falls back to Mesh.from_pydata).
+    """
+    verts = np.asarray(verts, dtype=np.float32).reshape(-1, 3)
+    mesh.clear_geometry()
+
+    if not isinstance(faces, np.ndarray):
+        if len({len(f) for f in faces}) > 1:
+            mesh.from_pydata(verts.tolist(), [], [tuple(f) for f in faces])
+            mesh.update()
+            return
+        faces = np.asarray(faces)
+    faces = np.asarray(faces, dtype=np.int32)
+    face_count, corners = faces.shape if faces.size else (0, 3)
+
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(face_count)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, corners, dtype=np.int32))
+    try:
+        # Needed before Blender 4.0; read-only (derived from loop_start) afterwards
+        mesh.polygons.foreach_set("loop_total", np.full(face_count, corners, dtype=np.int32))
+    except (AttributeError, TypeError):
+        pass
+    mesh.update(calc_edges=True)
+
+
+def set_smooth_shading(mesh, smooth: bool = True) -> None:
+    """Sets flat or smooth shading on every face of a mesh without operators."""
+    if hasattr(mesh, "shade_smooth"):
+        if smooth:
+            mesh.shade_smooth()
+        else:
+            mesh.shade_flat()
+    else:
+        mesh.polygons.foreach_set("use_smooth", np.full(len(mesh.polygons), smooth, dtype=bool))
+
+
+def write_uv_layer(mesh, uvs: np.ndarray, name: str = "UVMap"):
+    """
+    Adds a UV layer filled from per-corner UVs (in loop order) in one bulk write.
+
+    Args:
+        mesh (bpy.types.Mesh): The mesh to add the layer to.
+        uvs (ndarray): (L, 2) UV coordinates, one per loop.
+        name (str): Name of the UV layer.
+
+    Returns:
+        bpy.types.MeshUVLoopLayer: The new UV layer.
+    """
+    layer = mesh.uv_layers.new(name=name)
+    layer.data.foreach_set("uv", np.asarray(uvs, dtype=np.float32).ravel())
+    return layer
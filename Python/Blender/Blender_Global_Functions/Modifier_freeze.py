@@ -0,0 +1,261 @@
+"""
+================================================================================
+Modifier Stack Freezing
+================================================================================
+
+Replaces modifier stacks that can never change during an animation (the donut's
+Subdivision + Displace) with their evaluated mesh, so the depsgraph stops
+re-evaluating them on every frame change of bake_physics() and
+render_animation(). Objects still move freely: only their geometry is frozen.
+
+A stack qualifies when every modifier is a self-contained generator or deformer
+(FREEZABLE_MODIFIERS) that references no other object, uses no world-space
+texture coordinates, and has no animated or driven settings, and neither does
+its texture or the mesh (shape keys).
+
+The stack is evaluated once with its render settings (render subdivision levels,
+render visibility). The frozen mesh is cached in the session, keyed by a hash of
+the source mesh and every modifier setting, so identical objects (e.g. the
+icing of several identical donuts) share one frozen mesh as linked data.
+
+The originals stay on the side for re-editing: the source mesh is kept with a
+fake user and the modifiers stay on the object, disabled. thaw_modifiers()
+swaps the source mesh back and re-enables them.
+
+FUNCTIONS:
+----------
+- freeze_blocker(): why an object's stack cannot be frozen, or None.
+- freeze_key(): cache key of an object's evaluated stack.
+- evaluate_for_render(): new meshes of objects with their stacks evaluated for rendering.
+- freeze_modifiers(): freezes the qualifying objects of a scene.
+- thaw_modifiers(): restores the live modifier stacks.
+
+USAGE EXAMPLE:
+--------------
+    frozen = freeze_modifiers()          # ['Donut', 'Donut_Frosting', ...]
+    bake_physics()
+    render_animation()
+    thaw_modifiers()                     # back to editable modifiers
+
+================================================================================
+"""
+
+import bpy # type: ignore
+from typing import Dict, List, Optional, Sequence
+
+from Blender_Global_Functions.Cache_utils import stable_hash  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import mesh_content_hash, read_uv_layer  # type: ignore
+from Blender_Global_Functions.Object_utils import modifier_signature  # type: ignore
+
+# Modifiers whose result depends only on the mesh and their own settings
+FREEZABLE_MODIFIERS = {
+    'SUBSURF', 'DISPLACE', 'SOLIDIFY', 'BEVEL', 'MIRROR', 'ARRAY', 'DECIMATE', 'REMESH',
+    'SMOOTH', 'LAPLACIANSMOOTH', 'TRIANGULATE', 'WELD', 'EDGE_SPLIT', 'WEIGHTED_NORMAL',
+    'SIMPLE_DEFORM', 'WIREFRAME', 'SCREW', 'SKIN',
+}
+
+# Custom property on frozen meshes: the cache key they were evaluated for
+FREEZE_KEY_PROP = "frozen_modifiers_key"
+
+# Custom property on frozen objects: {"mesh": source mesh name, "visibility": [[viewport, render], ...]}
+FROZEN_STATE_PROP = "frozen_modifiers"
+
+# Cache key -> frozen mesh name for meshes evaluated in this session
+_FREEZE_CACHE: Dict[str, str] = {}
+
+
+def _is_animated(id_data, prefix: str = "") -> bool:
+    """Whether an ID has F-curves or drivers on paths starting with 'prefix'."""
+    anim = getattr(id_data, "animation_data", None)
+    if anim is None:
+        return False
+    fcurves = list(anim.action.fcurves) if anim.action is not None else []
+    fcurves += list(getattr(anim, "drivers", []))
+    return any(fcurve.data_path.startswith(prefix) for fcurve in fcurves)
+
+
+def _references_object(modifier) -> bool:
+    """Whether a modifier has a pointer to another object (mirror/offset/origin objects, ...)."""
+    rna = getattr(modifier, "bl_rna", None)
+    if rna is None:
+        return False
+    return any(prop.type == 'POINTER' and isinstance(getattr(modifier, prop.identifier, None), bpy.types.Object)
+               for prop in rna.properties)
+
+
+def freeze_blocker(obj: bpy.types.Object) -> Optional[str]:
+    """
+    Checks whether an object's modifier stack is static.
+
+    Args:
+        obj (bpy.types.Object): The object.
+
+    Returns:
+        str or None: The reason it cannot be frozen, or None if it can.
+    """
+    if obj.type != 'MESH':
+        return "not a mesh"
+    if obj.get(FROZEN_STATE_PROP) is not None:
+        return "already frozen"
+    if not len(obj.modifiers):
+        return "no modifiers"
+    if _is_animated(obj, "modifiers"):
+        return "animated modifier settings"
+    mesh = obj.data
+    if getattr(mesh, "shape_keys", None) is not None or _is_animated(mesh):
+        return "shape keys or animated mesh"
+    for modifier in obj.modifiers:
+        if modifier.type not in FREEZABLE_MODIFIERS:
+            return f"'{modifier.name}' ({modifier.type}) can change over time"
+        if _references_object(modifier):
+            return f"'{modifier.name}' depends on another object"
+        if getattr(modifier, "texture_coords", 'LOCAL') not in ('LOCAL', 'UV'):
+            return f"'{modifier.name}' uses world-space texture coordinates"
+        texture = getattr(modifier, "texture", None)
+        if texture is not None and _is_animated(texture):
+            return f"'{modifier.name}' has an animated texture"
+    return None
+
+
+def freeze_key(obj: bpy.types.Object) -> str:
+    """Returns the cache key of an object's evaluated modifier stack."""
+    uvs = read_uv_layer(obj.data)
+    return stable_hash({
+        "mesh": mesh_content_hash(obj.data),
+        "uvs": uvs.tobytes() if uvs is not None else None,
+        "materials": [mat.name if mat is not None else None for mat in obj.data.materials],
+        "modifiers": [modifier_signature(m) for m in obj.modifiers],
+        "blender": tuple(bpy.app.version),
+    })
+
+
+def _find_cached(key: str) -> Optional[bpy.types.Mesh]:
+    """Returns an existing frozen mesh evaluated with the given key, if any."""
+    name = _FREEZE_CACHE.get(key)
+    if name is not None:
+        mesh = bpy.data.meshes.get(name)
+        if mesh is not None and mesh.get(FREEZE_KEY_PROP) == key:
+            return mesh
+        del _FREEZE_CACHE[key]
+    for mesh in bpy.data.meshes:
+        if mesh.get(FREEZE_KEY_PROP) == key:
+            _FREEZE_CACHE[key] = mesh.name
+            return mesh
+    return None
+
+
+def evaluate_for_render(objects: List[bpy.types.Object]) -> Dict[str, bpy.types.Mesh]:
+    """Evaluates the modifier stacks of objects with their render settings, in one depsgraph update."""
+    saved = []
+    for obj in objects:
+        for modifier in obj.modifiers:
+            saved.append((modifier, modifier.show_viewport, getattr(modifier, "levels", None)))
+            modifier.show_viewport = modifier.show_render
+            if modifier.type == 'SUBSURF':
+                modifier.levels = modifier.render_levels
+    try:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        return {obj.name: bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph),
+                                                          preserve_all_data_layers=True, depsgraph=depsgraph)
+                for obj in objects}
+    finally:
+        for modifier, show_viewport, levels in saved:
+            modifier.show_viewport = show_viewport
+            if levels is not None:
+                modifier.levels = levels
+
+
+def freeze_modifiers(
+    objects: Optional[Sequence[bpy.types.Object]] = None,
+    verbose: bool = True
+) -> List[str]:
+    """
+    Replaces static modifier stacks with cached evaluated meshes.
+
+    Args:
+        objects (list, optional): Objects to freeze. Defaults to every object in the scene.
+        verbose (bool): Whether to print what was frozen and why other stacks were not.
+
+    Returns:
+        list: Names of the frozen objects.
+    """
+    objects = list(bpy.context.scene.objects) if objects is None else list(objects)
+    keys = {}
+    for obj in objects:
+        reason = freeze_blocker(obj)
+        if reason is None:
+            keys[obj.name] = freeze_key(obj)
+        elif verbose and reason not in ("not a mesh", "no modifiers", "already frozen"):
+            print(f"Modifiers of '{obj.name}' left live: {reason}.")
+
+    # Evaluate each distinct stack once
+    candidates = [obj for obj in objects if obj.name in keys]
+    missing = {}
+    for obj in candidates:
+        key = keys[obj.name]
+        if _find_cached(key) is None and key not in missing:
+            missing[key] = obj
+    try:
+        evaluated = evaluate_for_render(list(missing.values())) if missing else {}
+    except Exception as e:
+        print(f"Failed to evaluate modifier stacks: {e}")
+        return []
+    for key, obj in missing.items():
+        mesh = evaluated[obj.name]
+        mesh.name = f"{obj.data.name}_Frozen"
+        mesh[FREEZE_KEY_PROP] = key
+        _FREEZE_CACHE[key] = mesh.name
+
+    frozen = []
+    for obj in candidates:
+        mesh = _find_cached(keys[obj.name])
+        if mesh is None:
+            continue
+        source = obj.data
+        source.use_fake_user = True
+        obj[FROZEN_STATE_PROP] = {
+            "mesh": source.name,
+            "visibility": [[m.show_viewport, m.show_render] for m in obj.modifiers],
+        }
+        for modifier in obj.modifiers:
+            modifier.show_viewport = False
+            modifier.show_render = False
+        obj.data = mesh
+        frozen.append(obj.name)
+
+    if verbose:
+        print(f"Froze the modifier stacks of {len(frozen)} object(s) ({len(missing)} evaluated, "
+              f"{len(frozen) - len(missing)} shared or cached).")
+    return frozen
+
+
+def thaw_modifiers(objects: Optional[Sequence[bpy.types.Object]] = None) -> int:
+    """
+    Restores the source meshes and live modifier stacks of frozen objects.
+
+    Args:
+        objects (list, optional): Objects to thaw. Defaults to every object in the scene.
+
+    Returns:
+        int: Number of objects thawed.
+    """
+    objects = list(bpy.context.scene.objects) if objects is None else list(objects)
+    thawed = 0
+    for obj in objects:
+        state = obj.get(FROZEN_STATE_PROP)
+        source = bpy.data.meshes.get(state["mesh"]) if state is not None else None
+        if source is None:
+            continue
+        obj.data = source
+        source.use_fake_user = False
+        for modifier, (show_viewport, show_render) in zip(obj.modifiers, state["visibility"]):
+            modifier.show_viewport = show_viewport
+            modifier.show_render = show_render
+        del obj[FROZEN_STATE_PROP]
+        thawed += 1
+    return thawed
+
+
+def clear_freeze_cache() -> None:
+    """Forgets every cached frozen mesh (the meshes themselves are left untouched)."""
+    _FREEZE_CACHE.clear()
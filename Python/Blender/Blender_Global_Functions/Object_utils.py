@@ -0,0 +1,132 @@
+import bpy # type: ignore
+from typing import Optional
+
+from Blender_Global_Functions.Scene_builder import active_builder  # type: ignore
+
+
+def link_object(obj: bpy.types.Object, collection: Optional[bpy.types.Collection] = None) -> bpy.types.Object:
+    """
+    Links an object into a collection without changing selection or the active object.
+    Inside a SceneBuilder block the object is also registered with the builder.
+
+    Args:
+        obj (bpy.types.Object): The object to link.
+        collection (bpy.types.Collection, optional): Target collection. Defaults to the
+            active collection (like the add operators), or the scene collection.
+
+    Returns:
+        bpy.types.Object: The linked object.
+    """
+    if collection is None:
+        collection = getattr(bpy.context, "collection", None) or bpy.context.scene.collection
+    collection.objects.link(obj)
+    builder = active_builder()
+    if builder is not None:
+        builder.register(obj)
+    return obj
+
+
+def make_active(obj: bpy.types.Object) -> None:
+    """
+    Makes an object active and selected. Inside a SceneBuilder block this is deferred
+    to the commit, so building never touches the view layer in between.
+    """
+    builder = active_builder()
+    if builder is not None:
+        builder.set_active(obj)
+        return
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+
+
+def ensure_rigidbody_world(scene: Optional[bpy.types.Scene] = None):
+    """
+    Returns the scene's rigid body world, creating it (and its collection) if needed.
+
+    Args:
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+
+    Returns:
+        bpy.types.RigidBodyWorld: The rigid body world.
+    """
+    scene = scene or bpy.context.scene
+    if scene.rigidbody_world is None:
+        if hasattr(bpy.context, "temp_override"):
+            with bpy.context.temp_override(scene=scene):
+                bpy.ops.rigidbody.world_add()
+        else:
+            bpy.ops.rigidbody.world_add({"scene": scene})
+    rbw = scene.rigidbody_world
+    if rbw.collection is None:
+        rbw.collection = bpy.data.collections.new("RigidBodyWorld")
+    return rbw
+
+
+def add_rigid_body(
+    obj: bpy.types.Object,
+    body_type: str = 'ACTIVE',
+    **settings
+) -> Optional[bpy.types.RigidBodyObject]:
+    """
+    Adds rigid body physics to an object without touching selection, the active object
+    or the mode. The object is linked into the rigid body world collection, which gives
+    it rigid body settings through the data API; a context-override operator call is
+    only used as a fallback.
+
+    Args:
+        obj (bpy.types.Object): The object to make a rigid body.
+        body_type (str): 'ACTIVE' or 'PASSIVE'.
+        **settings: Rigid body properties to set (mass, friction, restitution, ...).
+
+    Returns:
+        bpy.types.RigidBodyObject or None: The rigid body settings of the object.
+    """
+    if obj.rigid_body is None:
+        rbw = ensure_rigidbody_world()
+        if obj.name not in rbw.collection.objects:
+            rbw.collection.objects.link(obj)
+    if obj.rigid_body is None:
+        if hasattr(bpy.context, "temp_override"):
+            with bpy.context.temp_override(object=obj, active_object=obj, selected_objects=[obj]):
+                bpy.ops.rigidbody.object_add(type=body_type)
+        else:
+            bpy.ops.rigidbody.object_add({"object": obj, "active_object": obj}, type=body_type)
+
+    rigid_body = obj.rigid_body
+    if rigid_body is None:
+        return None
+    rigid_body.type = body_type
+    for key, value in settings.items():
+        setattr(rigid_body, key, value)
+    return rigid_body
+
+
+# RNA property types whose values describe a modifier's settings
+_PLAIN_PROPERTY_TYPES = {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM'}
+
+
+def _plain_settings(struct) -> dict:
+    """Reads the editable plain-valued properties of an RNA struct."""
+    values = {}
+    rna = getattr(struct, "bl_rna", None)
+    if rna is None:
+        return values
+    for prop in rna.properties:
+        if prop.is_readonly or prop.type not in _PLAIN_PROPERTY_TYPES:
+            continue
+        value = getattr(struct, prop.identifier)
+        values[prop.identifier] = list(value) if hasattr(value, "__len__") and not isinstance(value, str) else value
+    return values
+
+
+def modifier_signature(modifier) -> dict:
+    """
+    Returns the settings of a modifier as plain values, for cache keys. A modifier
+    texture (e.g. the Displace CLOUDS texture) contributes its own settings.
+    """
+    values = {"type": modifier.type}
+    values.update(_plain_settings(modifier))
+    texture = getattr(modifier, "texture", None)
+    if texture is not None:
+        values["texture"] = {"type": texture.type, **_plain_settings(texture)}
+    return values
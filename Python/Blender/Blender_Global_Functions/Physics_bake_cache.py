@@ -0,0 +1,276 @@
+"""
+================================================================================
+Physics Bake Cache
+================================================================================
+
+Stores rigid body simulation results on disk and replays them, so identical
+rigid body setups are simulated once instead of on every run and in every
+render worker.
+
+Blender keeps rigid body point caches in memory only, so an entry holds the
+simulated result itself: the per-frame transforms of every moving rigid body
+(an .npz file in a DiskCache). The key is a hash of everything that affects the
+simulation: the rigid body world settings, gravity, the frame range, and every
+rigid body's type, shape, mass, friction, restitution, damping, initial
+transform, mesh and modifier stack.
+
+On a hit the transforms are written as keyframes in bulk (Keyframe_utils) and
+the rigid body world is disabled, so the objects follow the cached motion. A
+fresh bake removes those keyframes and puts the world back as it was.
+
+FUNCTIONS:
+----------
+- physics_bake_key(): the cache key of the scene's current rigid body setup.
+- store_physics_bake(): records the baked motion into the cache.
+- apply_physics_bake(): replays a cached bake, if there is one.
+- disable_rigidbody_world(): disables the world for replayed motion, remembering its state.
+- remove_cached_motion(): undoes apply_physics_bake().
+- invalidate_physics_bake(): removes one entry, or the whole cache.
+
+================================================================================
+"""
+
+import os
+import bpy # type: ignore
+import numpy as np
+from typing import List, Optional
+
+from Blender_Global_Functions.Cache_utils import DiskCache, stable_hash  # type: ignore
+from Blender_Global_Functions.Collision_proxy import is_compound_part  # type: ignore
+from Blender_Global_Functions.Keyframe_utils import ensure_action, matrices_to_loc_quat, write_keyframes  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import mesh_content_hash  # type: ignore
+from Blender_Global_Functions.Object_utils import modifier_signature  # type: ignore
+
+DEFAULT_BAKE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blender_donut", "physics")
+DEFAULT_BAKE_CACHE_MAX_BYTES = 512 * 1024 ** 2
+
+# Custom properties on actions written by apply_physics_bake(): the entry key and the
+# object's own transform channels, restored by remove_cached_motion()
+BAKE_KEY_PROP = "physics_bake_key"
+REST_POSE_PROP = "physics_rest_pose"
+# Custom property on the scene: whether the rigid body world was enabled before a replay
+# disabled it, restored by remove_cached_motion()
+WORLD_ENABLED_PROP = "physics_world_enabled"
+
+_RIGID_BODY_SETTINGS = ("type", "enabled", "kinematic", "collision_shape", "mesh_source", "mass",
+                        "friction", "restitution", "collision_margin", "use_margin",
+                        "linear_damping", "angular_damping", "use_deactivation")
+_WORLD_SETTINGS = ("steps_per_second", "substeps_per_frame", "solver_iterations", "time_scale",
+                   "use_split_impulse")
+
+
+def open_bake_cache(
+    cache_dir: str = DEFAULT_BAKE_CACHE_DIR,
+    max_bytes: Optional[int] = DEFAULT_BAKE_CACHE_MAX_BYTES
+) -> DiskCache:
+    """Returns the DiskCache holding physics bakes."""
+    return DiskCache(cache_dir, max_bytes=max_bytes, suffix=".npz")
+
+
+def _rna_values(struct, names) -> dict:
+    """Reads the given properties of an RNA struct, skipping ones it does not have."""
+    return {name: getattr(struct, name) for name in names if hasattr(struct, name)}
+
+
+def _moving_bodies(scene) -> List[bpy.types.Object]:
+    """Active, non-animated rigid bodies in the scene (compound parts move with their parent), sorted by name."""
+    bodies = [obj for obj in scene.objects
+              if obj.rigid_body is not None and obj.rigid_body.type == 'ACTIVE'
+              and not obj.rigid_body.kinematic and not is_compound_part(obj)]
+    return sorted(bodies, key=lambda obj: obj.name)
+
+
+def physics_bake_key(scene: Optional[bpy.types.Scene] = None) -> Optional[str]:
+    """
+    Hashes the rigid body setup of a scene.
+
+    Args:
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+
+    Returns:
+        str or None: The cache key, or None if the scene has no rigid body world.
+    """
+    scene = scene or bpy.context.scene
+    rbw = scene.rigidbody_world
+    if rbw is None:
+        return None
+    point_cache = rbw.point_cache
+    bodies = []
+    for obj in sorted((o for o in scene.objects if o.rigid_body is not None), key=lambda o: o.name):
+        body = {
+            "name": obj.name,
+            "settings": _rna_values(obj.rigid_body, _RIGID_BODY_SETTINGS),
+            "matrix": [list(row) for row in obj.matrix_world],
+            "modifiers": [modifier_signature(m) for m in obj.modifiers],
+        }
+        if obj.type == 'MESH':
+            body["mesh"] = mesh_content_hash(obj.data)
+        bodies.append(body)
+    return stable_hash({
+        "world": _rna_values(rbw, _WORLD_SETTINGS),
+        "gravity": list(scene.gravity) if getattr(scene, "use_gravity", True) else None,
+        "frames": (point_cache.frame_start, point_cache.frame_end),
+        "bodies": bodies,
+    })
+
+
+def store_physics_bake(
+    cache: DiskCache,
+    key: str,
+    scene: Optional[bpy.types.Scene] = None
+) -> Optional[str]:
+    """
+    Records the transforms of every moving rigid body over the bake range and
+    stores them under the key. Call it right after a successful bake.
+
+    Args:
+        cache (DiskCache): The physics bake cache.
+        key (str): Key from physics_bake_key(), computed before baking.
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+
+    Returns:
+        str or None: Path of the stored entry.
+    """
+    scene = scene or bpy.context.scene
+    point_cache = scene.rigidbody_world.point_cache
+    bodies = _moving_bodies(scene)
+    frames = np.arange(point_cache.frame_start, point_cache.frame_end + 1)
+    matrices = np.empty((len(frames), len(bodies), 4, 4), dtype=np.float64)
+
+    current = scene.frame_current
+    for f, frame in enumerate(frames):
+        scene.frame_set(int(frame))
+        for b, obj in enumerate(bodies):
+            matrix = np.array(obj.matrix_world)
+            if obj.parent is not None:
+                # Keyframes are local: undo the parent transform
+                parent = np.array(obj.parent.matrix_world) @ np.array(obj.matrix_parent_inverse)
+                matrix = np.linalg.inv(parent) @ matrix
+            matrices[f, b] = matrix
+    scene.frame_set(current)
+
+    locations, quaternions = matrices_to_loc_quat(matrices)
+
+    def write(tmp_path):
+        np.savez_compressed(tmp_path, names=np.array([obj.name for obj in bodies]), frames=frames,
+                            locations=locations.astype(np.float32),
+                            quaternions=quaternions.astype(np.float32))
+
+    return cache.put(key, write)
+
+
+def apply_physics_bake(
+    cache: DiskCache,
+    key: str,
+    scene: Optional[bpy.types.Scene] = None
+) -> bool:
+    """
+    Replays a cached bake: keyframes every moving rigid body with the stored motion
+    and disables the rigid body world.
+
+    Args:
+        cache (DiskCache): The physics bake cache.
+        key (str): Key from physics_bake_key().
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+
+    Returns:
+        bool: True on a hit, False on a miss (or an entry that does not fit the scene).
+    """
+    path = cache.get(key)
+    if path is None:
+        return False
+    scene = scene or bpy.context.scene
+    with np.load(path) as entry:
+        names = [str(name) for name in entry["names"]]
+        frames = entry["frames"]
+        locations = entry["locations"]
+        quaternions = entry["quaternions"]
+
+    bodies = _moving_bodies(scene)
+    if [obj.name for obj in bodies] != names:
+        cache.invalidate(key)
+        return False
+    # Objects with their own animation cannot take the replayed motion
+    if any(obj.animation_data is not None and obj.animation_data.action is not None for obj in bodies):
+        return False
+
+    for b, obj in enumerate(bodies):
+        rest_pose = {
+            "location": list(obj.location),
+            "rotation_mode": obj.rotation_mode,
+            "rotation_euler": list(obj.rotation_euler),
+            "rotation_quaternion": list(obj.rotation_quaternion),
+        }
+        # Mark the action first, so remove_cached_motion() can undo a partial replay
+        action = ensure_action(obj, f"{obj.name}CachedPhysics")
+        action[BAKE_KEY_PROP] = key
+        action[REST_POSE_PROP] = rest_pose
+        obj.rotation_mode = 'QUATERNION'
+        write_keyframes(obj, "location", frames, locations[:, b], group="Cached Physics")
+        write_keyframes(obj, "rotation_quaternion", frames, quaternions[:, b], group="Cached Physics")
+    disable_rigidbody_world(scene)
+    return True
+
+
+def disable_rigidbody_world(scene: bpy.types.Scene) -> None:
+    """
+    Disables the rigid body world so objects follow replayed motion, remembering
+    whether it was enabled (remove_cached_motion() restores that).
+    """
+    world = scene.rigidbody_world
+    if WORLD_ENABLED_PROP not in scene:  # a replay over a replay keeps the original state
+        scene[WORLD_ENABLED_PROP] = bool(world.enabled)
+    world.enabled = False
+
+
+def remove_cached_motion(scene: Optional[bpy.types.Scene] = None) -> int:
+    """
+    Removes the keyframes written by apply_physics_bake(), restores the objects' own
+    transforms and puts the rigid body world back in the enabled state it had
+    before the replay.
+
+    Returns:
+        int: Number of objects whose cached motion was removed.
+    """
+    scene = scene or bpy.context.scene
+    removed = 0
+    for obj in scene.objects:
+        anim = obj.animation_data
+        if anim is None or anim.action is None or anim.action.get(BAKE_KEY_PROP) is None:
+            continue
+        action = anim.action
+        anim.action = None
+        rest_pose = action.get(REST_POSE_PROP)
+        if rest_pose is not None:
+            obj.location = rest_pose["location"]
+            obj.rotation_quaternion = rest_pose["rotation_quaternion"]
+            obj.rotation_euler = rest_pose["rotation_euler"]
+            obj.rotation_mode = rest_pose["rotation_mode"]
+        if action.users == 0:
+            bpy.data.actions.remove(action)
+        removed += 1
+    enabled = scene.get(WORLD_ENABLED_PROP)
+    if enabled is not None:
+        del scene[WORLD_ENABLED_PROP]
+    elif removed:
+        enabled = True  # replayed before the state was recorded
+    if scene.rigidbody_world is not None and enabled is not None:
+        scene.rigidbody_world.enabled = bool(enabled)
+    return removed
+
+
+def invalidate_physics_bake(key: Optional[str] = None, cache_dir: str = DEFAULT_BAKE_CACHE_DIR) -> int:
+    """
+    Removes cached physics bakes.
+
+    Args:
+        key (str, optional): The entry to remove. None removes every entry.
+        cache_dir (str): Directory of the physics bake cache.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    cache = open_bake_cache(cache_dir, max_bytes=None)
+    if key is None:
+        return cache.clear()
+    return int(cache.invalidate(key))
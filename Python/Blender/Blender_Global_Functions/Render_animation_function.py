@@ -1,13 +1,21 @@
 import bpy # type: ignore
 import os
+from typing import Optional
+
+from Blender_Global_Functions.Render_sequence import render_sharded  # type: ignore
 
 def render_animation(
     frame_start: int = 1,
     frame_end: int = 100,
     output_path: str = "//render/",
     file_format: str = "FFMPEG",
-    verbose: bool = True
-) -> None:
+    verbose: bool = True,
+    sharded: bool = False,
+    workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    resumable: bool = False,
+    streaming: bool = False
+) -> bool:
     """
     Renders the animation for the current scene.
 
@@ -17,10 +25,41 @@ def render_animation(
         output_path (str): The directory to save rendered frames or video.
         file_format (str): Output file format ('FFMPEG', 'AVI_JPEG', etc.).
         verbose (bool): Whether to print status messages.
+        sharded (bool): Render with several Blender worker processes that pull frames from
+            a shared queue, then assemble the image sequence (see Render_sequence).
+        workers (int, optional): Number of worker processes in sharded mode.
+        threads_per_worker (int, optional): Render threads of each worker in sharded mode.
+        resumable (bool): Render to a checkpointed image sequence first (one worker unless
+            sharded); rerunning the same job skips frames that are already done and only
+            encodes the movie once every frame exists. Without it, every frame is rendered
+            again. Cannot be combined with streaming.
+        streaming (bool): Render with worker processes (several if sharded) and encode the
+            frames with one external ffmpeg process as they finish, without an image
+            sequence on disk (FFMPEG output only; see Stream_encoder). Streamed frames are
+            not checkpointed, so it cannot be combined with resumable.
+
+    Returns:
+        bool: True if rendering succeeded, False otherwise.
+
+    Raises:
+        ValueError: If both resumable and streaming are requested.
     """
+    if resumable and streaming:
+        raise ValueError("A render cannot be both resumable and streaming: streamed frames are not checkpointed.")
     try:
         scene = bpy.context.scene
 
+        if sharded or resumable or streaming:
+            movie = file_format == "FFMPEG"
+            result = render_sharded(frame_start, frame_end, output_path,
+                                    workers=workers if sharded else 1,
+                                    threads_per_worker=threads_per_worker,
+                                    frames_dir=None if movie else output_path,
+                                    frame_format="PNG" if movie else file_format,
+                                    assemble=movie, resume=resumable, streaming=streaming,
+                                    verbose=verbose)
+            return result is not None
+
         # Ensure output directory exists (if not using Blender's // relative path)
         if not output_path.startswith("//"):
             os.makedirs(bpy.path.abspath(output_path), exist_ok=True)
@@ -50,10 +89,12 @@ def render_animation(
         scene.frame_end = prev_frame_end
         scene.render.filepath = prev_filepath
         scene.render.image_settings.file_format = prev_format
+        return True
 
     except Exception as e:
         if verbose:
             print(f"Animation rendering failed: {e}")
+        return False
 
 if __name__ == "__main__":
     render_animation()
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+================================================================================
+Render Manifest
+================================================================================
+
+Checkpoint bookkeeping for resumable image-sequence renders.
+
+Next to the frames, 'manifest.json' records the hash of the scene the frames
+belong to and every completed frame with its file name and size. The manifest
+is rewritten atomically (temporary file + os.replace) after each frame, so a
+crash loses at most the frames that were still rendering.
+
+A rerun of the same job keeps frames whose file still exists with the recorded
+size and renders the rest. If the scene hash changed, all checkpoints are
+dropped and the job starts over.
+
+FUNCTIONS:
+----------
+- scene_content_hash(): hash of what a render of the scene depends on.
+- RenderManifest: load/record/save the completed frames of a frames directory.
+
+================================================================================
+"""
+
+import json
+import os
+import bpy # type: ignore
+import numpy as np
+from typing import Dict, List, Optional
+
+from Blender_Global_Functions.Cache_utils import stable_hash  # type: ignore
+from Blender_Global_Functions.Material_library import SPEC_HASH_PROP  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import mesh_content_hash  # type: ignore
+
+MANIFEST_NAME = "manifest.json"
+
+_RENDER_SETTINGS = ("engine", "resolution_x", "resolution_y", "resolution_percentage", "fps",
+                    "fps_base", "film_transparent", "use_motion_blur", "use_simplify",
+                    "simplify_subdivision_render")
+
+
+def _action_hash(anim_data) -> Optional[str]:
+    """Hashes the keyframes of an animation data block's action."""
+    if anim_data is None or anim_data.action is None:
+        return None
+    values = []
+    for fcurve in getattr(anim_data.action, "fcurves", ()):
+        coords = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get("co", coords)
+        values.append([fcurve.data_path, fcurve.array_index, coords.tobytes()])
+    return stable_hash(values)
+
+
+def scene_content_hash(scene: Optional[bpy.types.Scene] = None, extra=None) -> str:
+    """
+    Hashes what a render of a scene depends on: render/engine settings, the camera,
+    the world, and every object's transform, mesh, modifiers, materials, light or
+    camera settings, animation and rigid body settings.
+
+    Args:
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        extra: Additional inputs to mix into the hash (e.g. a scene build key).
+
+    Returns:
+        str: Hex digest.
+    """
+    scene = scene or bpy.context.scene
+    render = scene.render
+    settings = {name: getattr(render, name) for name in _RENDER_SETTINGS if hasattr(render, name)}
+    if hasattr(scene, "cycles"):
+        settings["cycles"] = [getattr(scene.cycles, name, None) for name in
+                              ("samples", "use_adaptive_sampling", "adaptive_threshold", "use_denoising")]
+    if hasattr(scene, "eevee"):
+        settings["eevee"] = getattr(scene.eevee, "taa_render_samples", None)
+
+    objects = []
+    for obj in sorted(scene.objects, key=lambda o: o.name):
+        entry = {
+            "name": obj.name,
+            "type": obj.type,
+            "matrix": [list(row) for row in obj.matrix_world],
+            "hidden": obj.hide_render,
+            "modifiers": [[m.type, m.name, getattr(m, "show_render", True)] for m in obj.modifiers],
+            "materials": [slot.material.get(SPEC_HASH_PROP, slot.material.name) if slot.material else None
+                          for slot in obj.material_slots],
+            "animation": _action_hash(obj.animation_data),
+        }
+        if obj.type == 'MESH':
+            entry["mesh"] = mesh_content_hash(obj.data)
+        elif obj.type in {'LIGHT', 'CAMERA'}:
+            entry["data"] = [getattr(obj.data, name, None) for name in
+                             ("type", "energy", "color", "size", "lens", "clip_start", "clip_end")]
+        if obj.rigid_body is not None:
+            entry["rigid_body"] = [getattr(obj.rigid_body, name, None) for name in
+                                   ("type", "mass", "friction", "restitution", "collision_shape")]
+        objects.append(entry)
+
+    return stable_hash({
+        "render": settings,
+        "frames": (scene.frame_start, scene.frame_end),
+        "camera": scene.camera.name if scene.camera else None,
+        "world": scene.world.name if scene.world else None,
+        "objects": objects,
+        "extra": extra,
+    })
+
+
+class RenderManifest:
+    """
+    The completed frames of a frames directory.
+
+    Args:
+        frames_dir (str): Directory of the image sequence.
+        scene_hash (str): Hash of the scene being rendered. Checkpoints recorded for a
+            different hash are discarded.
+    """
+
+    def __init__(self, frames_dir: str, scene_hash: str):
+        self.frames_dir = frames_dir
+        self.path = os.path.join(frames_dir, MANIFEST_NAME)
+        self.scene_hash = scene_hash
+        self.frames: Dict[int, dict] = {}
+        self.reset = False
+
+    def load(self) -> "RenderManifest":
+        """Reads the manifest, keeping only checkpoints of this scene whose file is intact."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return self
+        if data.get("scene_hash") != self.scene_hash:
+            self.reset = bool(data.get("frames"))
+            return self
+        for frame, record in data.get("frames", {}).items():
+            path = os.path.join(self.frames_dir, record["file"])
+            if os.path.isfile(path) and os.path.getsize(path) == record["size"]:
+                self.frames[int(frame)] = record
+        return self
+
+    def record(self, frame: int, path: str, seconds: float = 0.0) -> None:
+        """Marks a frame as completed and saves the manifest."""
+        self.frames[frame] = {"file": os.path.basename(path), "size": os.path.getsize(path),
+                              "seconds": round(float(seconds), 3)}
+        self.save()
+
+    def save(self) -> None:
+        """Writes the manifest atomically."""
+        os.makedirs(self.frames_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"scene_hash": self.scene_hash,
+                       "frames": {str(f): r for f, r in sorted(self.frames.items())}}, handle, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def missing(self, frames: List[int]) -> List[int]:
+        """Returns the frames of a range that are not completed yet."""
+        return [frame for frame in frames if frame not in self.frames]
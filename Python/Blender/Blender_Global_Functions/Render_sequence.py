@@ -0,0 +1,452 @@
+"""
+================================================================================
+Sharded Image-Sequence Rendering
+================================================================================
+
+Renders an animation with several `blender --background` worker processes and
+assembles the frames into the final video.
+
+HOW IT WORKS:
+-------------
+- The current scene is saved to a temporary .blend copy.
+- N workers (Render_worker.py) open that copy, each with its own thread count.
+- The coordinator hands out one frame at a time from a shared queue: whichever
+  worker finishes first gets the next frame, so slow frames never hold up a
+  fixed shard of the range.
+- Frames are written as an image sequence (PNG by default). A worker that dies
+  is restarted and its frame handed out again.
+- Completed frames are checkpointed in a manifest (Render_manifest) with the
+  scene hash. Rerunning the same job skips finished frames; a changed scene
+  starts over.
+- Once every frame exists, the sequence is encoded with the scene's FFMPEG
+  settings through a temporary sequencer scene.
+- Streaming mode skips the image sequence: finished frames go through a bounded
+  reorder buffer into one ffmpeg process while the other frames are still
+  rendering (Stream_encoder), so the movie is done right after the last frame.
+  Nothing is checkpointed in this mode.
+
+USAGE EXAMPLE:
+--------------
+    render_sharded(1, 100, "/tmp/render_output/", workers=4, threads_per_worker=4)
+    render_sharded(1, 100, "/tmp/render_output/", workers=4, streaming=True)
+
+================================================================================
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import bpy # type: ignore
+from typing import Dict, List, Optional
+
+from Blender_Global_Functions.Render_manifest import RenderManifest, scene_content_hash  # type: ignore
+from Blender_Global_Functions.Stream_encoder import (  # type: ignore
+    StreamingAssembler, encoder_settings, ffmpeg_command, find_ffmpeg, stream_movie_path)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Render_worker.py")
+
+_EXTENSIONS = {"PNG": ".png", "OPEN_EXR": ".exr", "JPEG": ".jpg", "TIFF": ".tif", "BMP": ".bmp"}
+
+
+def frame_file(frames_dir: str, frame: int, file_format: str = "PNG") -> str:
+    """Returns the path of one frame of an image sequence."""
+    return os.path.join(frames_dir, f"frame_{frame:05d}{_EXTENSIONS.get(file_format, '.png')}")
+
+
+def default_worker_layout(
+    frame_count: int,
+    workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None
+):
+    """
+    Fills in the number of workers and threads per worker for this machine.
+
+    Args:
+        frame_count (int): Number of frames to render.
+        workers (int, optional): Number of workers. Defaults to what fits the cores.
+        threads_per_worker (int, optional): Threads of each worker. Defaults to 4, or to
+            an even share of the cores when the number of workers is given.
+
+    Returns:
+        (workers, threads_per_worker): Both at least 1.
+    """
+    cores = os.cpu_count() or 1
+    if workers:
+        threads = threads_per_worker or max(1, cores // workers)
+        return max(1, min(frame_count, workers)), threads
+    threads = max(1, min(threads_per_worker or 4, cores))
+    return max(1, min(frame_count, cores // threads)), threads
+
+
+class _Worker:
+    """One Blender worker process and the pipe protocol of Render_worker.py."""
+
+    def __init__(self, index: int, command: List[str]):
+        self.index = index
+        self.command = command
+        self.process = None
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1)
+
+    def render(self, frame: int, path: str):
+        """Sends one frame and waits for the answer. Returns (ok, detail)."""
+        if self.process is None or self.process.poll() is not None:
+            self.start()
+        try:
+            self.process.stdin.write(f"RENDER\t{frame}\t{path}\n")
+            self.process.stdin.flush()
+            for line in self.process.stdout:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) == 3 and fields[1] == str(frame):
+                    if fields[0] == "FRAME_DONE":
+                        return True, float(fields[2])
+                    if fields[0] == "FRAME_FAILED":
+                        return False, fields[2]
+        except (BrokenPipeError, OSError) as e:
+            return False, f"worker {self.index} pipe error: {e}"
+        # stdout closed: the worker died
+        self.process.wait()
+        return False, f"worker {self.index} exited with code {self.process.returncode}"
+
+    def stop(self) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        try:
+            self.process.stdin.write("QUIT\n")
+            self.process.stdin.close()
+            self.process.wait(timeout=30)
+        except (BrokenPipeError, OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+
+
+def render_frames_parallel(
+    blend_path: str,
+    frames: List[int],
+    frames_dir: str,
+    scene_name: str,
+    workers: int,
+    threads_per_worker: int,
+    file_format: str = "PNG",
+    blender_binary: Optional[str] = None,
+    max_retries: int = 2,
+    on_frame_done=None,
+    assembler: Optional[StreamingAssembler] = None,
+    verbose: bool = True
+) -> Dict[int, str]:
+    """
+    Renders frames of a saved .blend with a pool of Blender workers pulling from one queue.
+
+    Args:
+        blend_path (str): The .blend file the workers open.
+        frames (list): Frame numbers to render.
+        frames_dir (str): Directory of the image sequence.
+        scene_name (str): Scene to render.
+        workers (int): Number of Blender processes.
+        threads_per_worker (int): Render threads of each process.
+        file_format (str): Image format of the frames.
+        blender_binary (str, optional): Blender executable. Defaults to the running Blender.
+        max_retries (int): How often a failed frame is handed out again.
+        on_frame_done (callable, optional): Called with (frame, path, seconds) after each frame.
+        assembler (StreamingAssembler, optional): Receives each finished frame. Workers wait
+            for room in its reorder buffer before taking a frame, and it is aborted when a
+            frame fails for good.
+        verbose (bool): Whether to print progress.
+
+    Returns:
+        dict: Frames that failed for good, mapped to the last error message.
+    """
+    blender_binary = blender_binary or bpy.app.binary_path
+    command = [blender_binary, "--background", blend_path, "--threads", str(threads_per_worker),
+               "--python", WORKER_SCRIPT, "--", "--scene", scene_name, "--file-format", file_format]
+
+    os.makedirs(frames_dir, exist_ok=True)
+    # Lowest frame first, so retried frames do not hold up streaming assembly
+    pending: "queue.PriorityQueue[int]" = queue.PriorityQueue()
+    for frame in frames:
+        pending.put(frame)
+    attempts: Dict[int, int] = {}
+    failed: Dict[int, str] = {}
+    lock = threading.Lock()
+    completed = [0]
+    start_time = time.perf_counter()
+
+    def run(worker: _Worker) -> None:
+        while True:
+            try:
+                frame = pending.get_nowait()
+            except queue.Empty:
+                return
+            if assembler is not None and not assembler.reserve(frame):
+                return
+            path = frame_file(frames_dir, frame, file_format)
+            ok, detail = worker.render(frame, path)
+            with lock:
+                if ok:
+                    completed[0] += 1
+                    if on_frame_done is not None:
+                        on_frame_done(frame, path, detail)
+                    if assembler is not None:
+                        assembler.add(frame, path)
+                    if verbose:
+                        print(f"Frame {frame} done by worker {worker.index} in {detail:.1f}s "
+                              f"({completed[0]}/{len(frames)}).")
+                    continue
+                attempts[frame] = attempts.get(frame, 0) + 1
+                if attempts[frame] <= max_retries:
+                    pending.put(frame)
+                else:
+                    failed[frame] = detail
+                    if assembler is not None:
+                        assembler.abort(f"frame {frame} failed")
+                if verbose:
+                    print(f"Frame {frame} failed on worker {worker.index}: {detail}")
+
+    pool = [_Worker(i, command) for i in range(max(1, min(workers, len(frames))))]
+    threads = [threading.Thread(target=run, args=(worker,), daemon=True) for worker in pool]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for worker in pool:
+            worker.stop()
+
+    if verbose:
+        print(f"Rendered {completed[0]} frame(s) with {len(pool)} worker(s) in "
+              f"{time.perf_counter() - start_time:.1f}s.")
+    return failed
+
+
+def assemble_video(
+    frame_paths: List[str],
+    output_path: str,
+    frame_start: int,
+    source_scene: Optional[bpy.types.Scene] = None,
+    verbose: bool = True
+) -> Optional[str]:
+    """
+    Encodes an image sequence into a movie with the FFMPEG settings of a scene, using
+    a temporary sequencer scene.
+
+    Args:
+        frame_paths (list): Frame image paths in playback order (one directory).
+        output_path (str): Render output path (as in scene.render.filepath).
+        frame_start (int): Frame number of the first image, used for the movie's name.
+        source_scene (bpy.types.Scene, optional): Scene whose resolution, fps and FFMPEG
+            settings are used. Defaults to the context scene.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        str or None: Path of the movie, or None if encoding failed.
+    """
+    source = source_scene or bpy.context.scene
+    assembly = bpy.data.scenes.new("SequenceAssembly")
+    try:
+        render = assembly.render
+        render.resolution_x = source.render.resolution_x
+        render.resolution_y = source.render.resolution_y
+        render.resolution_percentage = source.render.resolution_percentage
+        render.fps = source.render.fps
+        render.image_settings.file_format = 'FFMPEG'
+        for attr in ("format", "codec", "constant_rate_factor", "ffmpeg_preset", "video_bitrate",
+                     "minrate", "maxrate", "buffersize", "packetsize", "gopsize", "use_max_b_frames"):
+            if hasattr(source.render.ffmpeg, attr):
+                setattr(render.ffmpeg, attr, getattr(source.render.ffmpeg, attr))
+        render.filepath = output_path
+
+        editor = assembly.sequence_editor_create()
+        strips = editor.strips if hasattr(editor, "strips") else editor.sequences
+        strip = strips.new_image("Frames", frame_paths[0], channel=1, frame_start=frame_start)
+        for path in frame_paths[1:]:
+            strip.elements.append(os.path.basename(path))
+        assembly.frame_start = frame_start
+        assembly.frame_end = frame_start + len(frame_paths) - 1
+
+        movie_path = bpy.path.abspath(render.frame_path(frame=frame_start))
+        bpy.ops.render.render(animation=True, scene=assembly.name)
+        if verbose:
+            print(f"Assembled {len(frame_paths)} frame(s) into '{movie_path}'.")
+        return movie_path
+    except Exception as e:
+        print(f"Failed to assemble video: {e}")
+        return None
+    finally:
+        bpy.data.scenes.remove(assembly)
+
+
+def render_sharded(
+    frame_start: int,
+    frame_end: int,
+    output_path: str,
+    workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    frames_dir: Optional[str] = None,
+    frame_format: str = "PNG",
+    assemble: bool = True,
+    blender_binary: Optional[str] = None,
+    keep_frames: bool = True,
+    resume: bool = True,
+    scene_hash: Optional[str] = None,
+    streaming: bool = False,
+    reorder_buffer: Optional[int] = None,
+    ffmpeg_binary: Optional[str] = None,
+    verbose: bool = True
+) -> Optional[str]:
+    """
+    Renders a frame range of the current scene with several Blender processes and
+    assembles the frames into a movie. Frames already completed for the same scene
+    (per the manifest in the frames directory) are not rendered again.
+
+    Args:
+        frame_start (int): The first frame to render.
+        frame_end (int): The last frame to render.
+        output_path (str): Output path of the movie (as in scene.render.filepath).
+        workers (int, optional): Number of Blender processes. Defaults to what fits the CPU.
+        threads_per_worker (int, optional): Render threads of each process. Defaults to 4.
+        frames_dir (str, optional): Directory of the image sequence. Defaults to a
+            'frames' directory next to the output.
+        frame_format (str): Image format of the intermediate frames.
+        assemble (bool): Whether to encode the frames into a movie.
+        blender_binary (str, optional): Blender executable. Defaults to the running Blender.
+        keep_frames (bool): Whether to keep the image sequence after assembling.
+        resume (bool): Whether to reuse checkpointed frames of an earlier run.
+        scene_hash (str, optional): Identity of the scene for the checkpoints. Defaults
+            to scene_content_hash() of the current scene.
+        streaming (bool): Encode frames with ffmpeg while they are rendered instead of
+            writing an image sequence first (see render_streaming). Falls back to the
+            image sequence if ffmpeg is not available.
+        reorder_buffer (int, optional): Frames the workers may run ahead of the encoder in
+            streaming mode. Defaults to twice the number of workers.
+        ffmpeg_binary (str, optional): ffmpeg executable for streaming mode. Defaults to
+            'ffmpeg' on the PATH.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        str or None: Path of the movie (or of the frames directory when not assembling),
+        or None if frames failed.
+    """
+    scene = bpy.context.scene
+    frames = list(range(frame_start, frame_end + 1))
+    workers, threads = default_worker_layout(len(frames), workers, threads_per_worker)
+
+    if streaming and assemble:
+        ffmpeg = find_ffmpeg(ffmpeg_binary)
+        if ffmpeg is not None:
+            return render_streaming(frame_start, frame_end, output_path, workers, threads,
+                                    reorder_buffer or 2 * workers, blender_binary, ffmpeg, verbose)
+        print("ffmpeg not found; rendering an image sequence and assembling it afterwards.")
+
+    output_dir = os.path.dirname(bpy.path.abspath(output_path)) or os.getcwd()
+    frames_dir = bpy.path.abspath(frames_dir) if frames_dir else os.path.join(output_dir, "frames")
+    os.makedirs(frames_dir, exist_ok=True)
+
+    if scene_hash is None:
+        # Animated and simulated transforms are hashed at the first frame
+        current = scene.frame_current
+        scene.frame_set(frame_start)
+        scene_hash = scene_content_hash(scene, extra=frame_format)
+        scene.frame_set(current)
+    manifest = RenderManifest(frames_dir, scene_hash)
+    if resume:
+        manifest.load()
+        if manifest.reset and verbose:
+            print("Scene changed since the last run; discarding checkpointed frames.")
+    todo = manifest.missing(frames)
+    if verbose and len(todo) < len(frames):
+        print(f"Resuming: {len(frames) - len(todo)} of {len(frames)} frame(s) already rendered.")
+
+    failed = {}
+    if todo:
+        work_dir = tempfile.mkdtemp(prefix="sharded_render_")
+        try:
+            blend_path = os.path.join(work_dir, "scene.blend")
+            bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+            if verbose:
+                print(f"Rendering {len(todo)} frame(s) with {min(workers, len(todo))} worker(s) x {threads} thread(s).")
+            failed = render_frames_parallel(blend_path, todo, frames_dir, scene.name, workers, threads,
+                                            frame_format, blender_binary, on_frame_done=manifest.record,
+                                            verbose=verbose)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if failed:
+        print(f"Sharded render incomplete: {len(failed)} frame(s) failed: {sorted(failed)}")
+        return None
+    if not assemble:
+        return frames_dir
+
+    frame_paths = [frame_file(frames_dir, frame, frame_format) for frame in frames]
+    movie_path = assemble_video(frame_paths, output_path, frame_start, scene, verbose=verbose)
+    if movie_path and not keep_frames:
+        shutil.rmtree(frames_dir, ignore_errors=True)
+    return movie_path
+
+
+def render_streaming(
+    frame_start: int,
+    frame_end: int,
+    output_path: str,
+    workers: int,
+    threads_per_worker: int,
+    reorder_buffer: int = 8,
+    blender_binary: Optional[str] = None,
+    ffmpeg_binary: Optional[str] = None,
+    verbose: bool = True
+) -> Optional[str]:
+    """
+    Renders a frame range with several Blender processes and encodes the frames into
+    a movie as they finish, through one ffmpeg process (see Stream_encoder). Only the
+    frames in the reorder buffer are ever on disk, and nothing is checkpointed.
+
+    Args:
+        frame_start (int): The first frame to render.
+        frame_end (int): The last frame to render.
+        output_path (str): Output path of the movie (as in scene.render.filepath).
+        workers (int): Number of Blender processes.
+        threads_per_worker (int): Render threads of each process.
+        reorder_buffer (int): Frames the workers may run ahead of the encoder.
+        blender_binary (str, optional): Blender executable. Defaults to the running Blender.
+        ffmpeg_binary (str, optional): ffmpeg executable. Defaults to 'ffmpeg' on the PATH.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        str or None: Path of the movie, or None if frames or encoding failed.
+    """
+    scene = bpy.context.scene
+    frames = list(range(frame_start, frame_end + 1))
+    settings = encoder_settings(scene)
+    movie_path = stream_movie_path(output_path, frame_start, frame_end, settings["format"])
+    assembler = StreamingAssembler(ffmpeg_command(movie_path, settings, ffmpeg_binary),
+                                   frame_start, frame_end, reorder_buffer, verbose=verbose)
+
+    work_dir = tempfile.mkdtemp(prefix="streaming_render_")
+    try:
+        blend_path = os.path.join(work_dir, "scene.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+        if not assembler.start():
+            return None
+        if verbose:
+            print(f"Rendering {len(frames)} frame(s) with {min(workers, len(frames))} worker(s) x "
+                  f"{threads_per_worker} thread(s), encoding to '{movie_path}' as they finish.")
+        failed = render_frames_parallel(blend_path, frames, os.path.join(work_dir, "frames"), scene.name,
+                                        workers, threads_per_worker, "PNG", blender_binary,
+                                        assembler=assembler, verbose=verbose)
+        if failed:
+            assembler.abort(f"{len(failed)} frame(s) failed")
+            print(f"Streaming render incomplete: {len(failed)} frame(s) failed: {sorted(failed)}")
+            return None
+        return assembler.finish()
+    except Exception as e:
+        assembler.abort(str(e))
+        print(f"Failed to render and encode the animation: {e}")
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,95 @@
+"""
+================================================================================
+Blender Render Worker
+================================================================================
+
+Worker process for sharded rendering (see Render_sequence.render_sharded).
+It is started by the coordinator as
+
+    blender --background scene.blend --threads N --python Render_worker.py -- \
+        --scene Scene --file-format PNG
+
+and then renders frames on request. The coordinator writes one tab-separated
+command per line to stdin and the worker answers on stdout:
+
+    RENDER <frame> <path>   ->   FRAME_DONE <frame> <seconds>
+                                 FRAME_FAILED <frame> <message>
+    QUIT                    ->   (process exits)
+
+Each frame is rendered to a temporary file next to its target and moved into
+place with os.replace, so a crash never leaves a partial frame behind.
+
+This file is executed by Blender as a script and only depends on bpy.
+
+================================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+import bpy # type: ignore
+
+DONE = "FRAME_DONE"
+FAILED = "FRAME_FAILED"
+
+
+def _parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render frames requested on stdin.")
+    parser.add_argument("--scene", default=None, help="Scene to render (defaults to the active scene).")
+    parser.add_argument("--file-format", default="PNG", help="Image format of the frames.")
+    return parser.parse_args(argv)
+
+
+def render_frame(scene: bpy.types.Scene, frame: int, path: str) -> float:
+    """
+    Renders one frame of a scene to an image file, atomically.
+
+    Args:
+        scene (bpy.types.Scene): The scene to render.
+        frame (int): The frame number.
+        path (str): Target file path (including the extension).
+
+    Returns:
+        float: Render time in seconds.
+    """
+    start = time.perf_counter()
+    scene.frame_set(frame)
+    bpy.ops.render.render(scene=scene.name)
+
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{name}.partial-{os.getpid()}{os.path.splitext(name)[1]}")
+    bpy.data.images["Render Result"].save_render(tmp_path, scene=scene)
+    os.replace(tmp_path, path)
+    return time.perf_counter() - start
+
+
+def _reply(*fields) -> None:
+    sys.stdout.write("\t".join(str(f) for f in fields) + "\n")
+    sys.stdout.flush()
+
+
+def serve(scene_name: str = None, file_format: str = "PNG") -> None:
+    """Renders the frames requested on stdin until QUIT or end of input."""
+    scene = bpy.data.scenes[scene_name] if scene_name else bpy.context.scene
+    scene.render.image_settings.file_format = file_format
+
+    for line in sys.stdin:
+        fields = line.rstrip("\n").split("\t")
+        if not fields or fields[0] == "QUIT":
+            break
+        if fields[0] != "RENDER" or len(fields) != 3:
+            continue
+        frame = int(fields[1])
+        try:
+            seconds = render_frame(scene, frame, fields[2])
+            _reply(DONE, frame, f"{seconds:.3f}")
+        except Exception as e:
+            _reply(FAILED, frame, str(e).replace("\n", " "))
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    serve(args.scene, args.file_format)
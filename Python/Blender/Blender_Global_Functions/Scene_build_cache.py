@@ -0,0 +1,254 @@
+"""
+================================================================================
+Scene Build Cache
+================================================================================
+
+Keeps built scenes as .blend files in a local DiskCache, keyed by a hash of
+everything that went into the build: the build parameters (including seeds),
+the source of the Global Functions modules the build calls and the Blender
+version.
+
+A build stores the scene's collection hierarchy and objects (with their meshes,
+materials, modifiers, constraints and animation) through
+bpy.data.libraries.write, together with the scene's world and a small text
+datablock holding the settings that live on the scene itself (gravity and the
+rigid body world). On a hit everything is appended with
+bpy.data.libraries.load, the collections and objects are linked into the scene
+where they were, and the world and rigid body world are restored, so the
+pipeline can go straight to bake/render.
+
+Objects are found again by the role they were tagged with (ROLE_PROP), e.g.
+"donut" or "camera".
+
+USAGE EXAMPLE:
+--------------
+    cache = DiskCache(DEFAULT_SCENE_CACHE_DIR, suffix=".blend")
+    key = scene_build_key(build_params, [build])
+    objects = load_scene_build(cache, key)
+    if objects is None:
+        objects = build()
+        save_scene_build(cache, key)
+
+================================================================================
+"""
+
+import json
+import os
+import bpy # type: ignore
+from typing import Any, Dict, Iterable, Optional
+
+from Blender_Global_Functions.Cache_utils import DiskCache, code_fingerprint, stable_hash  # type: ignore
+from Blender_Global_Functions.Object_utils import ensure_rigidbody_world, link_object  # type: ignore
+
+ROLE_PROP = "pipeline_role"
+DEFAULT_SCENE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blender_donut", "scenes")
+
+# Text datablock stored with a build: the scene layout and settings as JSON
+SETTINGS_TEXT = "SceneBuildSettings"
+
+# Datablock collections whose new entries get their fake user cleared after a load
+_LOADED_ID_COLLECTIONS = ("objects", "collections", "meshes", "materials", "textures", "images", "curves",
+                          "cameras", "lights", "actions", "node_groups", "worlds")
+
+_RIGIDBODY_WORLD_SETTINGS = ("enabled", "steps_per_second", "substeps_per_frame", "solver_iterations",
+                             "time_scale", "use_split_impulse")
+
+
+def _loaded_ids() -> set:
+    """Returns the datablocks of the collections in _LOADED_ID_COLLECTIONS."""
+    ids = set()
+    for attr in _LOADED_ID_COLLECTIONS:
+        ids.update(getattr(bpy.data, attr, ()))
+    return ids
+
+
+def scene_build_key(params: Dict[str, Any], functions: Iterable[Any] = ()) -> str:
+    """
+    Returns the cache key of a scene build.
+
+    Args:
+        params (dict): The effective build inputs (function arguments, seeds, and any
+            pipeline code that calls the functions). Seeds must be fixed values for a
+            cached build to be meaningful.
+        functions (iterable): The code that builds the scene. Only the Global Functions
+            modules it depends on are part of the key (see Cache_utils.module_sources).
+
+    Returns:
+        str: Hex digest identifying the build.
+    """
+    return stable_hash({
+        "params": params,
+        "sources": code_fingerprint(functions),
+        "blender": tuple(bpy.app.version),
+    })
+
+
+def _scene_settings(scene: bpy.types.Scene) -> dict:
+    """The layout and scene-level settings a cached build has to restore."""
+    rbw = scene.rigidbody_world
+    rigid_body_world = None
+    if rbw is not None:
+        rigid_body_world = {name: getattr(rbw, name) for name in _RIGIDBODY_WORLD_SETTINGS if hasattr(rbw, name)}
+        rigid_body_world["frames"] = [rbw.point_cache.frame_start, rbw.point_cache.frame_end]
+        rigid_body_world["objects"] = [obj.name for obj in rbw.collection.objects] if rbw.collection else []
+    return {
+        "collections": [collection.name for collection in scene.collection.children],
+        "objects": [obj.name for obj in scene.collection.objects],
+        "world": scene.world.name if scene.world is not None else None,
+        "gravity": list(scene.gravity),
+        "use_gravity": getattr(scene, "use_gravity", True),
+        "rigidbody_world": rigid_body_world,
+    }
+
+
+def tag_role(obj: Optional[bpy.types.Object], role: str) -> Optional[bpy.types.Object]:
+    """Tags an object with its pipeline role so it can be found after a cache load."""
+    if obj is not None:
+        obj[ROLE_PROP] = role
+    return obj
+
+
+def save_scene_build(
+    cache: DiskCache,
+    key: str,
+    scene: Optional[bpy.types.Scene] = None,
+    verbose: bool = True
+) -> Optional[str]:
+    """
+    Stores the objects of a scene (and everything they use) as a cache entry.
+
+    Args:
+        cache (DiskCache): The scene cache.
+        key (str): Key from scene_build_key().
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        str or None: Path of the stored .blend, or None if saving failed.
+    """
+    scene = scene or bpy.context.scene
+    text = None
+    try:
+        text = bpy.data.texts.new(SETTINGS_TEXT)
+        text.write(json.dumps(_scene_settings(scene)))
+        datablocks = set(scene.objects) | set(scene.collection.children) | {text}
+        if scene.world is not None:
+            datablocks.add(scene.world)
+        path = cache.put(key, lambda tmp_path: bpy.data.libraries.write(
+            tmp_path, datablocks, path_remap='ABSOLUTE', fake_user=True, compress=True))
+        if verbose:
+            print(f"Scene build cached ({len(scene.objects)} object(s)): {path}")
+        return path
+    except Exception as e:
+        print(f"Failed to cache scene build: {e}")
+        return None
+    finally:
+        if text is not None:
+            bpy.data.texts.remove(text)
+
+
+def load_scene_build(
+    cache: DiskCache,
+    key: str,
+    scene: Optional[bpy.types.Scene] = None,
+    verbose: bool = True
+) -> Optional[Dict[str, bpy.types.Object]]:
+    """
+    Appends a cached scene build into a scene.
+
+    Args:
+        cache (DiskCache): The scene cache.
+        key (str): Key from scene_build_key().
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        dict or None: The loaded objects by role, or None on a cache miss or failure.
+    """
+    path = cache.get(key)
+    if path is None:
+        return None
+    scene = scene or bpy.context.scene
+    existing = _loaded_ids()
+    appended = []
+    settings_text = None
+    try:
+        with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+            data_to.objects = list(data_from.objects)
+            data_to.collections = list(data_from.collections)
+            data_to.worlds = list(data_from.worlds)
+            data_to.texts = [name for name in data_from.texts if name == SETTINGS_TEXT]
+        # Appended datablocks keep their order; names can differ if they were taken
+        objects = {name: obj for name, obj in zip(data_from.objects, data_to.objects) if obj is not None}
+        collections = {name: c for name, c in zip(data_from.collections, data_to.collections) if c is not None}
+        appended = [d for d in (*data_to.objects, *data_to.collections, *data_to.worlds) if d is not None]
+        settings_text = data_to.texts[0] if data_to.texts else None
+        settings = json.loads(settings_text.as_string()) if settings_text is not None else {}
+
+        # Entries are written with fake users so nothing is dropped on save; the
+        # appended copies should be freed like any other scene data
+        for datablock in _loaded_ids() - existing:
+            datablock.use_fake_user = False
+
+        # Same hierarchy as the build: top-level collections (their children and objects
+        # come with them) and the objects directly in the scene collection
+        for name in settings.get("collections", list(collections)):
+            collection = collections.get(name)
+            if collection is not None and collection.name not in scene.collection.children:
+                scene.collection.children.link(collection)
+        for name in settings.get("objects", []):
+            if name in objects:
+                link_object(objects[name], scene.collection)
+        for obj in objects.values():
+            if not obj.users_collection:
+                link_object(obj, scene.collection)
+
+        worlds = {name: world for name, world in zip(data_from.worlds, data_to.worlds) if world is not None}
+        if settings.get("world") in worlds:
+            scene.world = worlds[settings["world"]]
+        if "gravity" in settings:
+            scene.gravity = settings["gravity"]
+            if hasattr(scene, "use_gravity"):
+                scene.use_gravity = settings["use_gravity"]
+        _restore_rigidbody_world(scene, settings.get("rigidbody_world"), objects)
+
+        roles = {}
+        for obj in objects.values():
+            role = obj.get(ROLE_PROP)
+            if role:
+                roles[role] = obj
+        if roles.get("camera") is not None:
+            scene.camera = roles["camera"]
+        if verbose:
+            print(f"Scene build loaded from cache ({len(objects)} object(s)): {path}")
+        return roles
+    except Exception as e:
+        print(f"Failed to load cached scene build, rebuilding: {e}")
+        if appended:
+            bpy.data.batch_remove(appended)
+        cache.invalidate(key)
+        return None
+    finally:
+        if settings_text is not None:
+            bpy.data.texts.remove(settings_text)
+
+
+def _restore_rigidbody_world(
+    scene: bpy.types.Scene,
+    settings: Optional[dict],
+    objects: Dict[str, bpy.types.Object]
+) -> None:
+    """Recreates the rigid body world of a cached build and registers its bodies."""
+    bodies = [objects[name] for name in (settings or {}).get("objects", []) if name in objects]
+    bodies += [obj for obj in objects.values() if obj.rigid_body is not None and obj not in bodies]
+    if settings is None and not bodies:
+        return
+    rbw = ensure_rigidbody_world(scene)
+    for name, value in (settings or {}).items():
+        if name == "frames":
+            rbw.point_cache.frame_start, rbw.point_cache.frame_end = value
+        elif name != "objects" and hasattr(rbw, name):
+            setattr(rbw, name, value)
+    for obj in bodies:
+        if obj.name not in rbw.collection.objects:
+            rbw.collection.objects.link(obj)
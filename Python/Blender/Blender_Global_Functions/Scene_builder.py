@@ -0,0 +1,158 @@
+"""
+================================================================================
+Batched Scene Builder
+================================================================================
+
+A transaction-style context for building scenes through the data API, with the
+view layer work deferred to the end.
+
+Inside a SceneBuilder block, the Global Functions create objects, modifiers,
+constraints and materials with bpy.data only (no operators), link them through
+Object_utils.link_object(), and leave selection alone: the object that would have
+become active is remembered and applied once at commit, followed by one view
+layer update.
+
+The builder does not hold back evaluations its stages need on the way:
+- a stage that reads evaluated data evaluates the depsgraph itself, e.g.
+  add_icing_and_sprinkles() scatters the sprinkles on the icing's rendered
+  surface (Modifier_freeze.evaluate_for_render), and the optional texture bake,
+  level of detail and modifier freeze stages read evaluated meshes too;
+- the first rigid body creates the scene's rigid body world with
+  bpy.ops.rigidbody.world_add (the data API cannot create one), one operator
+  call and one depsgraph update.
+A default donut build therefore costs three depsgraph updates, not one;
+Benchmarks/benchmark_build_scene.py reports the counts.
+
+OperationCounter measures the cost of a block: the operator calls made through
+bpy.ops and the depsgraph updates Blender reports.
+
+USAGE EXAMPLE:
+--------------
+    with OperationCounter() as counter:
+        with SceneBuilder():
+            ground = add_ground()
+            donut = add_donut()
+            camera = add_camera()
+    print(counter.summary())
+
+================================================================================
+"""
+
+import time
+import bpy # type: ignore
+from collections import Counter
+from typing import List, Optional
+
+# Stack of open builders (the innermost one receives the objects)
+_ACTIVE_BUILDERS: List["SceneBuilder"] = []
+
+
+def active_builder() -> Optional["SceneBuilder"]:
+    """Returns the innermost open SceneBuilder, or None outside a builder block."""
+    return _ACTIVE_BUILDERS[-1] if _ACTIVE_BUILDERS else None
+
+
+class SceneBuilder:
+    """
+    Context manager that defers selection and the view layer update of a scene build
+    to one commit (see the module docstring for the evaluations it cannot defer).
+
+    Args:
+        scene (bpy.types.Scene, optional): Scene to build into. Defaults to the context scene.
+        verbose (bool): Whether to print a summary at commit.
+    """
+
+    def __init__(self, scene: Optional[bpy.types.Scene] = None, verbose: bool = False):
+        self.scene = scene
+        self.verbose = verbose
+        self.objects: List[bpy.types.Object] = []
+        self.active_object: Optional[bpy.types.Object] = None
+        self.committed = False
+
+    def __enter__(self) -> "SceneBuilder":
+        if self.scene is None:
+            self.scene = bpy.context.scene
+        _ACTIVE_BUILDERS.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _ACTIVE_BUILDERS.remove(self)
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def register(self, obj: bpy.types.Object) -> None:
+        """Records an object created inside the block."""
+        self.objects.append(obj)
+
+    def set_active(self, obj: bpy.types.Object) -> None:
+        """Remembers the object to make active and selected at commit."""
+        self.active_object = obj
+
+    def commit(self) -> None:
+        """Applies the deferred selection and runs the view layer update."""
+        if self.committed:
+            return
+        view_layer = bpy.context.view_layer
+        if self.active_object is not None:
+            view_layer.objects.active = self.active_object
+            self.active_object.select_set(True)
+        view_layer.update()
+        self.committed = True
+        if self.verbose:
+            print(f"Scene builder committed {len(self.objects)} object(s) and one view layer update.")
+
+
+class OperationCounter:
+    """
+    Context manager counting bpy.ops calls and depsgraph updates inside a block.
+
+    Operator calls are counted by wrapping the bpy.ops operator call type;
+    depsgraph updates through a depsgraph_update_post handler.
+    """
+
+    def __init__(self):
+        self.operators: Counter = Counter()
+        self.depsgraph_updates = 0
+        self.seconds = 0.0
+        self._op_type = None
+        self._original_call = None
+        self._start = 0.0
+
+    def _on_depsgraph_update(self, *args) -> None:
+        self.depsgraph_updates += 1
+
+    def __enter__(self) -> "OperationCounter":
+        # Every bpy.ops.<module>.<name> is an instance of the same Python class
+        self._op_type = type(bpy.ops.object.select_all)
+        self._original_call = self._op_type.__call__
+        counter = self
+        original = self._original_call
+
+        def counting_call(op, *args, **kwargs):
+            idname = op.idname_py() if hasattr(op, "idname_py") else repr(op)
+            counter.operators[idname] += 1
+            return original(op, *args, **kwargs)
+
+        self._op_type.__call__ = counting_call
+        bpy.app.handlers.depsgraph_update_post.append(self._on_depsgraph_update)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.seconds = time.perf_counter() - self._start
+        self._op_type.__call__ = self._original_call
+        if self._on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.remove(self._on_depsgraph_update)
+        return False
+
+    @property
+    def operator_calls(self) -> int:
+        """Total number of operator calls."""
+        return sum(self.operators.values())
+
+    def summary(self) -> str:
+        """One-line description of the counts."""
+        top = ", ".join(f"{name} x{count}" for name, count in self.operators.most_common(5))
+        return (f"{self.operator_calls} operator call(s), {self.depsgraph_updates} depsgraph update(s), "
+                f"{self.seconds:.3f}s" + (f" [{top}]" if top else ""))
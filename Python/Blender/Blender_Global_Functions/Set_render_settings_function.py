@@ -1,5 +1,165 @@
 import bpy # type: ignore
 import os
+import time
+from typing import Optional
+
+# Quality/performance knobs of each named profile. 'EEVEE' resolves to the EEVEE
+# engine id of the running Blender version.
+RENDER_PROFILES = {
+    "draft": {
+        "engine": "EEVEE",
+        "samples": 16,
+        "use_adaptive_sampling": False,
+        "adaptive_threshold": 0.1,
+        "use_denoising": False,
+        "use_simplify": True,
+        "simplify_subdivision_render": 1,
+        "resolution_percentage": 50,
+    },
+    "preview": {
+        "engine": "CYCLES",
+        "samples": 128,
+        "use_adaptive_sampling": True,
+        "adaptive_threshold": 0.05,
+        "use_denoising": True,
+        "use_simplify": True,
+        "simplify_subdivision_render": 2,
+        "resolution_percentage": 75,
+    },
+    "final": {
+        "engine": "CYCLES",
+        "samples": 1024,
+        "use_adaptive_sampling": True,
+        "adaptive_threshold": 0.01,
+        "use_denoising": True,
+        "use_simplify": False,
+        "simplify_subdivision_render": 6,
+        "resolution_percentage": 100,
+    },
+}
+
+
+def _engine_id(engine: str) -> str:
+    """Maps 'EEVEE' to the engine id of this Blender version; other ids pass through."""
+    if engine != "EEVEE":
+        return engine
+    items = bpy.types.RenderSettings.bl_rna.properties["engine"].enum_items.keys()
+    return "BLENDER_EEVEE_NEXT" if "BLENDER_EEVEE_NEXT" in items else "BLENDER_EEVEE"
+
+
+def _set_samples(scene, samples: int) -> None:
+    """Sets the render samples of the scene's engine."""
+    if scene.render.engine == "CYCLES":
+        scene.cycles.samples = samples
+    else:
+        scene.eevee.taa_render_samples = samples
+
+
+def apply_render_profile(name: str, scene: Optional[bpy.types.Scene] = None, verbose: bool = True) -> dict:
+    """
+    Applies a named render profile (see RENDER_PROFILES) to a scene.
+
+    Args:
+        name (str): 'draft', 'preview' or 'final'.
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        dict: The applied profile settings.
+    """
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"Unknown render profile '{name}'. Expected one of {sorted(RENDER_PROFILES)}.")
+    profile = RENDER_PROFILES[name]
+    scene = scene or bpy.context.scene
+    render = scene.render
+
+    render.engine = _engine_id(profile["engine"])
+    _set_samples(scene, profile["samples"])
+    if render.engine == "CYCLES":
+        scene.cycles.use_adaptive_sampling = profile["use_adaptive_sampling"]
+        scene.cycles.adaptive_threshold = profile["adaptive_threshold"]
+        scene.cycles.use_denoising = profile["use_denoising"]
+    render.use_simplify = profile["use_simplify"]
+    render.simplify_subdivision_render = profile["simplify_subdivision_render"]
+    render.resolution_percentage = profile["resolution_percentage"]
+
+    if verbose:
+        print(f"Render profile '{name}' applied: {render.engine}, {profile['samples']} samples, "
+              f"{profile['resolution_percentage']}% resolution.")
+    return profile
+
+
+def _time_test_render(scene, samples: int) -> float:
+    """Renders the current frame with a fixed sample count and returns the seconds taken."""
+    _set_samples(scene, samples)
+    start = time.perf_counter()
+    bpy.ops.render.render(scene=scene.name)
+    return time.perf_counter() - start
+
+
+def auto_tune_samples(
+    seconds_per_frame: float,
+    frame: Optional[int] = None,
+    scene: Optional[bpy.types.Scene] = None,
+    test_samples: int = 16,
+    min_samples: int = 1,
+    max_samples: int = 4096,
+    verbose: bool = True
+) -> int:
+    """
+    Picks the sample count (and, for Cycles, the adaptive noise threshold) that fits
+    a render time budget.
+
+    Two test renders of a representative frame, at test_samples and twice that, give
+    the fixed per-frame cost (scene sync, compositing) and the cost per sample; the
+    budget left after the fixed cost is divided by the per-sample cost.
+
+    Args:
+        seconds_per_frame (float): Render time budget per frame.
+        frame (int, optional): Representative frame. Defaults to the middle of the range.
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        test_samples (int): Samples of the first test render.
+        min_samples (int): Lower bound of the result.
+        max_samples (int): Upper bound of the result.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        int: The chosen sample count (already applied to the scene).
+    """
+    scene = scene or bpy.context.scene
+    cycles = scene.render.engine == "CYCLES"
+    previous_frame = scene.frame_current
+    previous_adaptive = scene.cycles.use_adaptive_sampling if cycles else None
+    scene.frame_set(frame if frame is not None else (scene.frame_start + scene.frame_end) // 2)
+    try:
+        # Adaptive sampling stops early and would hide the per-sample cost
+        if cycles:
+            scene.cycles.use_adaptive_sampling = False
+        first = _time_test_render(scene, test_samples)
+        second = _time_test_render(scene, test_samples * 2)
+    finally:
+        if cycles:
+            scene.cycles.use_adaptive_sampling = previous_adaptive
+        scene.frame_set(previous_frame)
+
+    per_sample = max((second - first) / test_samples, 1e-6)
+    fixed = max(first - per_sample * test_samples, 0.0)
+    samples = int((seconds_per_frame - fixed) / per_sample)
+    samples = max(min_samples, min(max_samples, samples))
+    _set_samples(scene, samples)
+
+    if cycles:
+        # Fewer samples leave more noise: loosen the threshold so adaptive sampling
+        # spends them where they matter most
+        scene.cycles.use_adaptive_sampling = True
+        scene.cycles.adaptive_threshold = 0.01 if samples >= 512 else 0.02 if samples >= 128 else 0.05
+
+    if verbose:
+        print(f"Auto-tuned to {samples} samples for {seconds_per_frame:.1f}s/frame "
+              f"(fixed {fixed:.2f}s + {per_sample * 1000:.1f}ms/sample).")
+        if fixed >= seconds_per_frame:
+            print("Warning: the fixed per-frame cost alone exceeds the budget; consider the draft profile.")
+    return samples
 
 def set_render_settings(
     output_path: str,
@@ -11,7 +171,9 @@ def set_render_settings(
     ffmpeg_format: str = 'MPEG4',
     color_mode: str = 'RGB',
     color_depth: str = '8',
-    verbose: bool = True
+    verbose: bool = True,
+    profile: Optional[str] = None,
+    seconds_per_frame: Optional[float] = None
 ) -> None:
     """
     Sets render resolution, frame rate, file format, and output path for the current Blender scene.
@@ -27,6 +189,11 @@ def set_render_settings(
         color_mode (str): Color mode ('RGB', 'BW', 'RGBA').
         color_depth (str): Color depth ('8', '16').
         verbose (bool): Whether to print status messages.
+        profile (str, optional): Render profile to apply ('draft', 'preview', 'final').
+        seconds_per_frame (float, optional): Render time budget; if given, the sample
+            count is auto-tuned to it after applying the profile. The test renders show
+            the scene as it is now: with rigid bodies, leave this out and call
+            auto_tune_samples() after the physics bake instead.
     """
     try:
         output_dir = os.path.dirname(output_path)
@@ -58,6 +225,11 @@ def set_render_settings(
             scene.render.ffmpeg.use_max_b_frames = True
             scene.render.ffmpeg.audio_codec = 'AAC'
 
+        if profile is not None:
+            apply_render_profile(profile, scene, verbose=verbose)
+        if seconds_per_frame is not None:
+            auto_tune_samples(seconds_per_frame, scene=scene, verbose=verbose)
+
         if verbose:
             print(f"Render settings applied: {resolution_x}x{resolution_y} @ {fps}fps, format={file_format}, output='{output_path}'")
     except Exception as e:
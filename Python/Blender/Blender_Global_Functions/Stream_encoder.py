@@ -0,0 +1,327 @@
+"""
+================================================================================
+Streaming Frame Encoder
+================================================================================
+
+Encodes frames into a movie while they are still being rendered, with one
+external ffmpeg process, instead of writing a full image sequence and encoding
+it in a separate pass afterwards.
+
+HOW IT WORKS:
+-------------
+- ffmpeg is started once and reads PNG frames from a pipe on stdin
+  (image2pipe), encoding with the scene's FFMPEG settings (H264 in MPEG4 by
+  default, as set by set_render_settings).
+- Render workers finish frames in any order. Each finished frame is read into
+  a bounded reorder buffer in memory and its file is deleted straight away.
+- A writer thread streams frames from the buffer into ffmpeg in frame order as
+  soon as the next one is available.
+- reserve() keeps workers at most 'buffer_size' frames ahead of the oldest
+  frame not yet encoded, so the buffer (and the frames on disk) never grows
+  beyond that, however uneven the render times are.
+- The movie is complete moments after the last frame is rendered.
+
+FUNCTIONS:
+----------
+- encoder_settings(): the FFMPEG settings of a scene, as a plain dict.
+- ffmpeg_command(): ffmpeg command line for a stream of PNG frames.
+- stream_movie_path(): path of the movie for a frame range, named like Blender does.
+- find_ffmpeg(): the ffmpeg executable, if there is one.
+- StreamingAssembler: reorder buffer + ffmpeg process.
+
+USAGE EXAMPLE:
+--------------
+    assembler = StreamingAssembler(ffmpeg_command(movie, encoder_settings(scene)), 1, 100)
+    assembler.start()
+    ...                                  # workers: assembler.reserve(frame), render,
+    ...                                  #          assembler.add(frame, path)
+    movie = assembler.finish()
+
+================================================================================
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import bpy # type: ignore
+from typing import Dict, List, Optional
+
+# Blender container names -> (ffmpeg muxer, file extension)
+_CONTAINERS = {
+    "MPEG4": ("mp4", ".mp4"),
+    "QUICKTIME": ("mov", ".mov"),
+    "MKV": ("matroska", ".mkv"),
+    "WEBM": ("webm", ".webm"),
+    "AVI": ("avi", ".avi"),
+    "OGG": ("ogg", ".ogv"),
+    "FLASH": ("flv", ".flv"),
+    "MPEG2": ("dvd", ".mpg"),
+    "MPEG1": ("mpeg", ".mpg"),
+}
+
+# Blender codec names -> ffmpeg encoders
+_CODECS = {
+    "H264": "libx264",
+    "H265": "libx265",
+    "AV1": "libaom-av1",
+    "MPEG4": "mpeg4",
+    "WEBM": "libvpx",
+    "THEORA": "libtheora",
+    "PRORES": "prores_ks",
+    "DNXHD": "dnxhd",
+    "FFV1": "ffv1",
+    "PNG": "png",
+    "QTRLE": "qtrle",
+    "HUFFYUV": "huffyuv",
+    "MPEG2": "mpeg2video",
+    "MPEG1": "mpeg1video",
+}
+
+# Blender's constant rate factor presets -> CRF values
+_CRF = {"LOSSLESS": 0, "PERC_LOSSLESS": 17, "HIGH": 20, "MEDIUM": 23, "LOW": 26,
+        "VERYLOW": 29, "LOWEST": 32}
+
+# Blender's encoding speed presets -> x264/x265 presets
+_PRESETS = {"BEST": "slower", "GOOD": "medium", "REALTIME": "ultrafast"}
+
+# Defaults of set_render_settings(), used for settings a scene does not have
+DEFAULT_ENCODER_SETTINGS = {
+    "format": "MPEG4",
+    "codec": "H264",
+    "constant_rate_factor": "HIGH",
+    "ffmpeg_preset": "GOOD",
+    "video_bitrate": 6000,
+    "minrate": 0,
+    "maxrate": 9000,
+    "buffersize": 224 * 8,
+    "gopsize": 12,
+    "use_max_b_frames": True,
+    "max_b_frames": 2,
+    "fps": 24,
+    "fps_base": 1.0,
+}
+
+
+def encoder_settings(scene: Optional[bpy.types.Scene] = None) -> Dict:
+    """
+    Reads the FFMPEG output settings of a scene.
+
+    Args:
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+
+    Returns:
+        dict: The keys of DEFAULT_ENCODER_SETTINGS, taken from the scene where it has them.
+    """
+    scene = scene or bpy.context.scene
+    settings = dict(DEFAULT_ENCODER_SETTINGS)
+    for attr, default in DEFAULT_ENCODER_SETTINGS.items():
+        source = scene.render if attr in ("fps", "fps_base") else scene.render.ffmpeg
+        value = getattr(source, attr, None)
+        if isinstance(value, type(default)) or (isinstance(default, float) and isinstance(value, int)):
+            settings[attr] = value
+    return settings
+
+
+def ffmpeg_command(
+    movie_path: str,
+    settings: Optional[Dict] = None,
+    ffmpeg_binary: Optional[str] = None
+) -> List[str]:
+    """
+    Builds the ffmpeg command line that encodes PNG frames read from stdin.
+
+    Args:
+        movie_path (str): Path of the movie to write.
+        settings (dict, optional): Encoder settings (see encoder_settings()). Defaults
+            to DEFAULT_ENCODER_SETTINGS.
+        ffmpeg_binary (str, optional): ffmpeg executable. Defaults to 'ffmpeg' on the PATH.
+
+    Returns:
+        list: The command and its arguments.
+    """
+    settings = {**DEFAULT_ENCODER_SETTINGS, **(settings or {})}
+    fps = f"{settings['fps']}/{settings['fps_base']}" if settings["fps_base"] != 1 else str(settings["fps"])
+    codec = _CODECS.get(settings["codec"], "libx264")
+    muxer = _CONTAINERS.get(settings["format"], _CONTAINERS["MPEG4"])[0]
+
+    command = [ffmpeg_binary or "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+               "-f", "image2pipe", "-c:v", "png", "-framerate", fps, "-i", "-",
+               "-c:v", codec, "-g", str(settings["gopsize"])]
+    if codec in ("libx264", "libx265"):
+        command += ["-preset", _PRESETS.get(settings["ffmpeg_preset"], "medium"),
+                    # Chroma subsampling needs even dimensions
+                    "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+    crf = _CRF.get(settings["constant_rate_factor"])
+    if crf is not None and codec in ("libx264", "libx265", "libaom-av1", "libvpx"):
+        command += ["-crf", str(crf)]
+    else:
+        command += ["-b:v", f"{settings['video_bitrate']}k", "-maxrate", f"{settings['maxrate']}k",
+                    "-bufsize", f"{settings['buffersize']}k"]
+        if settings["minrate"]:
+            command += ["-minrate", f"{settings['minrate']}k"]
+    if settings["use_max_b_frames"]:
+        command += ["-bf", str(settings["max_b_frames"])]
+    command += ["-f", muxer, movie_path]
+    return command
+
+
+def stream_movie_path(output_path: str, frame_start: int, frame_end: int, container: str = "MPEG4") -> str:
+    """
+    Returns the movie path Blender would use for a frame range: the frame range and
+    extension are appended to the output path, unless it already has the extension.
+
+    Args:
+        output_path (str): Render output path (as in scene.render.filepath).
+        frame_start (int): The first frame.
+        frame_end (int): The last frame.
+        container (str): Blender container name (e.g. 'MPEG4').
+
+    Returns:
+        str: Absolute path of the movie.
+    """
+    extension = _CONTAINERS.get(container, _CONTAINERS["MPEG4"])[1]
+    path = bpy.path.abspath(output_path)
+    if path.lower().endswith(extension):
+        return path
+    return f"{path}{frame_start:04d}-{frame_end:04d}{extension}"
+
+
+class StreamingAssembler:
+    """Reorders finished frames and streams them into one ffmpeg process."""
+
+    def __init__(
+        self,
+        command: List[str],
+        frame_start: int,
+        frame_end: int,
+        buffer_size: int = 8,
+        verbose: bool = True
+    ):
+        """
+        Args:
+            command (list): ffmpeg command reading PNG frames from stdin (see ffmpeg_command()).
+            frame_start (int): The first frame of the movie.
+            frame_end (int): The last frame of the movie.
+            buffer_size (int): How many frames workers may run ahead of the oldest frame
+                not yet encoded.
+            verbose (bool): Whether to print status messages.
+        """
+        self.command = command
+        self.movie_path = command[-1]
+        self.next_frame = frame_start
+        self.frame_end = frame_end
+        self.buffer_size = max(1, buffer_size)
+        self.verbose = verbose
+        self.process = None
+        self.error: Optional[str] = None
+        self._buffer: Dict[int, bytes] = {}
+        self._condition = threading.Condition()
+        self._writer = None
+
+    def start(self) -> bool:
+        """Starts ffmpeg and the writer thread. Returns False if ffmpeg cannot be started."""
+        os.makedirs(os.path.dirname(self.movie_path) or ".", exist_ok=True)
+        try:
+            self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as e:
+            print(f"Failed to start ffmpeg: {e}")
+            return False
+        self._writer = threading.Thread(target=self._write_frames, daemon=True)
+        self._writer.start()
+        return True
+
+    def reserve(self, frame: int) -> bool:
+        """
+        Blocks until a frame fits in the reorder buffer.
+
+        Args:
+            frame (int): The frame a worker is about to render.
+
+        Returns:
+            bool: False if encoding was aborted and the frame should not be rendered.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.error is not None or frame < self.next_frame + self.buffer_size)
+            return self.error is None
+
+    def add(self, frame: int, path: str) -> None:
+        """Moves a finished frame file into the reorder buffer (the file is deleted)."""
+        with open(path, "rb") as f:
+            data = f.read()
+        os.remove(path)
+        with self._condition:
+            self._buffer[frame] = data
+            self._condition.notify_all()
+
+    def abort(self, reason: str) -> None:
+        """Stops encoding, releases waiting workers and deletes the partial movie."""
+        with self._condition:
+            if self.error is None:
+                self.error = reason
+            self._buffer.clear()
+            self._condition.notify_all()
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        if self._writer is not None:
+            self._writer.join()
+        if os.path.exists(self.movie_path):
+            os.remove(self.movie_path)
+
+    def _write_frames(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self.error is not None or self.next_frame in self._buffer
+                                         or self.next_frame > self.frame_end)
+                if self.error is not None or self.next_frame > self.frame_end:
+                    return
+                data = self._buffer.pop(self.next_frame)
+            try:
+                self.process.stdin.write(data)
+            except (BrokenPipeError, OSError) as e:
+                with self._condition:
+                    self.error = self.error or f"ffmpeg stopped reading frames: {e}"
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                self.next_frame += 1
+                self._condition.notify_all()
+
+    def finish(self) -> Optional[str]:
+        """
+        Waits for every frame to be encoded and closes the movie.
+
+        Returns:
+            str or None: Path of the movie, or None if encoding failed.
+        """
+        if self._writer is not None:
+            self._writer.join()
+        stderr = b""
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            stderr = self.process.stderr.read()
+            self.process.wait()
+            if self.process.returncode and self.error is None:
+                self.error = f"ffmpeg exited with code {self.process.returncode}"
+        if self.error is not None:
+            detail = stderr.decode(errors="replace").strip()
+            print(f"Failed to encode '{self.movie_path}': {self.error}" + (f"\n{detail}" if detail else ""))
+            if os.path.exists(self.movie_path):
+                os.remove(self.movie_path)
+            return None
+        if self.verbose:
+            print(f"Encoded frames up to {self.frame_end} into '{self.movie_path}'.")
+        return self.movie_path
+
+
+def find_ffmpeg(ffmpeg_binary: Optional[str] = None) -> Optional[str]:
+    """Returns the ffmpeg executable to use, or None if there is none."""
+    if ffmpeg_binary:
+        return ffmpeg_binary if shutil.which(ffmpeg_binary) else None
+    return shutil.which("ffmpeg")
@@ -0,0 +1,359 @@
+"""
+================================================================================
+Procedural Texture Bake Cache
+================================================================================
+
+Bakes the procedural Noise -> ColorRamp -> Bump networks of the bread, frosting
+and ground materials (Material_library.procedural_noise_spec) into image
+textures, and swaps in a material that samples the images through the mesh UVs.
+Every shading sample then costs a few texture lookups instead of evaluating the
+noise, ramp and bump (which evaluates the noise three more times), so long
+animations trade a one-time bake for cheaper shading on every frame.
+
+CHANNELS:
+---------
+- "color":     the Base Color network, baked through a temporary Emission shader
+               (an exact copy of the value, without lighting).
+- "roughness": likewise, for a Roughness input driven by nodes.
+- "normal":    the shading normal including the Bump node, baked as a tangent
+               space normal map and plugged in through a Normal Map node.
+Only the channels whose BSDF input is driven by nodes are baked; constant inputs
+(e.g. the roughness of procedural_noise_spec) are copied to the new material.
+
+CACHE:
+------
+Each channel image is a DiskCache entry keyed by the material spec, the mesh
+(vertices, faces and UVs), the object's modifier settings (the noise is sampled
+at the evaluated surface), the bake settings and the Blender version. Later
+jobs with the same inputs load the PNGs instead of baking. The cache is LRU
+bounded, so the images of a baked material are packed into the .blend as soon
+as it is assigned; evicting an entry never breaks a scene. Baking needs Cycles;
+the engine and sample count are switched for the bake and restored afterwards.
+
+FUNCTIONS:
+----------
+- bakeable_channels(): channels of a material spec that would be baked.
+- texture_bake_key(): cache key of one channel of one object.
+- bake_procedural_textures(): bakes (or loads) and swaps in the textures.
+- restore_procedural_materials(): puts the procedural materials back.
+
+USAGE EXAMPLE:
+--------------
+    donut = add_donut()
+    ground = add_ground()
+    report = bake_procedural_textures(resolution=2048)
+    print(report)    # {'Donut': ['color', 'normal'], 'Donut_Frosting': [...], ...}
+
+================================================================================
+"""
+
+import copy
+import os
+import bpy # type: ignore
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+from Blender_Global_Functions.Cache_utils import DiskCache, stable_hash  # type: ignore
+from Blender_Global_Functions.Material_library import build_node_tree, get_material, material_spec  # type: ignore
+from Blender_Global_Functions.Mesh_data_utils import mesh_content_hash, read_uv_layer  # type: ignore
+from Blender_Global_Functions.Object_utils import modifier_signature  # type: ignore
+
+DEFAULT_TEXTURE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blender_donut", "textures")
+TEXTURE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Channel -> (Principled BSDF input, bake type, image color space)
+BAKE_CHANNELS = {
+    "color": ("Base Color", 'EMIT', "sRGB"),
+    "roughness": ("Roughness", 'EMIT', "Non-Color"),
+    "normal": ("Normal", 'NORMAL', "Non-Color"),
+}
+
+# Custom property on baked objects: the name of the procedural material they had
+BAKED_FROM_PROP = "baked_from_material"
+
+
+def _bsdf_node(spec: Dict[str, Any]) -> Optional[str]:
+    """Key of the Principled BSDF node of a spec, if any."""
+    return next((key for key, node in spec["nodes"].items() if node["type"] == "ShaderNodeBsdfPrincipled"), None)
+
+
+def bakeable_channels(spec: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Returns the channels of a material spec that are driven by procedural textures.
+
+    Args:
+        spec (dict, optional): A spec from Material_library.
+
+    Returns:
+        list: Channel names (see BAKE_CHANNELS); empty for flat or image-based materials.
+    """
+    if spec is None:
+        return []
+    procedural = any(node["type"].startswith("ShaderNodeTex") and node["type"] != "ShaderNodeTexImage"
+                     for node in spec["nodes"].values())
+    bsdf = _bsdf_node(spec)
+    if not procedural or bsdf is None:
+        return []
+    linked = {to_socket for _, _, to_node, to_socket in spec["links"] if to_node == bsdf}
+    return [channel for channel, (socket, _, _) in BAKE_CHANNELS.items() if socket in linked]
+
+
+def texture_bake_key(
+    obj: bpy.types.Object,
+    spec: Dict[str, Any],
+    channel: str,
+    resolution: int,
+    samples: int,
+    margin: int
+) -> Optional[str]:
+    """
+    Returns the cache key of one baked channel of an object.
+
+    Args:
+        obj (bpy.types.Object): The mesh object.
+        spec (dict): Spec of its procedural material.
+        channel (str): One of BAKE_CHANNELS.
+        resolution (int): Image width and height in pixels.
+        samples (int): Cycles samples per pixel.
+        margin (int): Bake margin in pixels.
+
+    Returns:
+        str or None: Hex digest, or None if the mesh has no UV map.
+    """
+    uvs = read_uv_layer(obj.data)
+    if uvs is None:
+        return None
+    return stable_hash({
+        "spec": spec,
+        "channel": channel,
+        "mesh": mesh_content_hash(obj.data),
+        "uvs": uvs.tobytes(),
+        "modifiers": [modifier_signature(m) for m in obj.modifiers],
+        "bake": (resolution, samples, margin),
+        "blender": tuple(bpy.app.version),
+    })
+
+
+def _channel_bake_spec(spec: Dict[str, Any], channel: str) -> Dict[str, Any]:
+    """
+    The spec used to bake a channel: color-like channels are routed into an
+    Emission shader; the normal channel bakes the material as it is. Both get an
+    unlinked 'bake_target' Image Texture node to receive the bake.
+    """
+    socket, bake_type, _ = BAKE_CHANNELS[channel]
+    bake_spec = copy.deepcopy(spec)
+    bake_spec["nodes"]["bake_target"] = {"type": "ShaderNodeTexImage"}
+    if bake_type != 'EMIT':
+        return bake_spec
+
+    bsdf = _bsdf_node(spec)
+    output = next(key for key, node in spec["nodes"].items() if node["type"] == "ShaderNodeOutputMaterial")
+    source = next((from_node, from_socket) for from_node, from_socket, to_node, to_socket in spec["links"]
+                  if to_node == bsdf and to_socket == socket)
+    bake_spec["nodes"]["bake_emit"] = {"type": "ShaderNodeEmission", "inputs": {"Strength": 1.0}}
+    bake_spec["links"] = [link for link in spec["links"] if link[2] != output] + [
+        (source[0], source[1], "bake_emit", "Color"),
+        ("bake_emit", "Emission", output, "Surface"),
+    ]
+    return bake_spec
+
+
+def baked_material_spec(spec: Dict[str, Any], images: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Spec of the material that replaces a procedural one: the BSDF with its
+    constant inputs, fed by Image Texture nodes (active UV map) for the baked channels.
+
+    Args:
+        spec (dict): The procedural material spec.
+        images (dict): Channel -> image file path.
+
+    Returns:
+        dict: The material spec.
+    """
+    bsdf = _bsdf_node(spec)
+    output = next(key for key, node in spec["nodes"].items() if node["type"] == "ShaderNodeOutputMaterial")
+    nodes = {
+        output: copy.deepcopy(spec["nodes"][output]),
+        bsdf: copy.deepcopy(spec["nodes"][bsdf]),
+    }
+    links = [link for link in spec["links"] if link[0] == bsdf and link[2] == output]
+    for channel, path in sorted(images.items()):
+        socket, _, colorspace = BAKE_CHANNELS[channel]
+        nodes[f"{channel}_tex"] = {"type": "ShaderNodeTexImage",
+                                   "image": {"filepath": path, "colorspace": colorspace}}
+        if channel == "normal":
+            nodes["normal_map"] = {"type": "ShaderNodeNormalMap"}
+            links += [(f"{channel}_tex", "Color", "normal_map", "Color"), ("normal_map", "Normal", bsdf, socket)]
+        else:
+            links.append((f"{channel}_tex", "Color", bsdf, socket))
+    return {"nodes": nodes, "links": links}
+
+
+@contextmanager
+def _cycles_bake_settings(scene: bpy.types.Scene, samples: int, margin: int):
+    """Switches the scene to Cycles for baking and restores the render settings afterwards."""
+    saved = (scene.render.engine, scene.cycles.samples, scene.render.bake.margin,
+             scene.render.bake.use_selected_to_active)
+    scene.render.engine = 'CYCLES'
+    scene.cycles.samples = samples
+    scene.render.bake.margin = margin
+    scene.render.bake.use_selected_to_active = False
+    try:
+        yield
+    finally:
+        (scene.render.engine, scene.cycles.samples, scene.render.bake.margin,
+         scene.render.bake.use_selected_to_active) = saved
+
+
+def _bake_channel(
+    obj: bpy.types.Object,
+    spec: Dict[str, Any],
+    channel: str,
+    resolution: int,
+    margin: int,
+    path: str
+) -> None:
+    """Bakes one channel of an object into a PNG file, using a temporary material and image."""
+    _, bake_type, colorspace = BAKE_CHANNELS[channel]
+    original = obj.material_slots[0].material
+    mat = bpy.data.materials.new(f"{original.name}_Bake_{channel}")
+    image = bpy.data.images.new(f"{obj.name}_{channel}", resolution, resolution, alpha=False)
+    try:
+        build_node_tree(mat, _channel_bake_spec(spec, channel))
+        image.colorspace_settings.name = colorspace
+        target = mat.node_tree.nodes.get("bake_target")
+        target.image = image
+        mat.node_tree.nodes.active = target
+        obj.material_slots[0].material = mat
+
+        override = {"object": obj, "active_object": obj, "selected_objects": [obj],
+                    "selected_editable_objects": [obj]}
+        if hasattr(bpy.context, "temp_override"):
+            with bpy.context.temp_override(**override):
+                bpy.ops.object.bake(type=bake_type, normal_space='TANGENT', margin=margin, use_clear=True)
+        else:
+            bpy.ops.object.bake(override, type=bake_type, normal_space='TANGENT', margin=margin, use_clear=True)
+
+        image.filepath_raw = path
+        image.file_format = 'PNG'
+        image.save()
+    finally:
+        obj.material_slots[0].material = original
+        bpy.data.materials.remove(mat)
+        bpy.data.images.remove(image)
+
+
+def _pack_images(mat: bpy.types.Material) -> None:
+    """
+    Packs the images of a material into the .blend, so it does not depend on cache
+    files that a later put() may evict.
+    """
+    for node in mat.node_tree.nodes:
+        image = getattr(node, "image", None)
+        if image is not None and image.packed_file is None:
+            image.pack()
+
+
+def bake_procedural_textures(
+    objects: Optional[Sequence[bpy.types.Object]] = None,
+    resolution: int = 1024,
+    channels: Sequence[str] = ("color", "roughness", "normal"),
+    samples: int = 4,
+    margin: int = 8,
+    cache_dir: str = DEFAULT_TEXTURE_CACHE_DIR,
+    scene: Optional[bpy.types.Scene] = None,
+    verbose: bool = True
+) -> Dict[str, List[str]]:
+    """
+    Replaces the procedural materials of objects with baked image textures.
+
+    Objects qualify when they are meshes with a UV map and a single material that
+    Material_library compiled from a spec with procedural textures. Others are
+    left untouched.
+
+    Args:
+        objects (list, optional): Objects to bake. Defaults to every mesh in the scene.
+        resolution (int): Width and height of the baked images in pixels.
+        channels (list): Channels to bake where the material drives them (see BAKE_CHANNELS).
+        samples (int): Cycles samples per pixel (anti-aliasing of the bake).
+        margin (int): Pixels the bake is extended past UV island borders.
+        cache_dir (str): Directory of the texture cache.
+        scene (bpy.types.Scene, optional): The scene. Defaults to the context scene.
+        verbose (bool): Whether to print status messages.
+
+    Returns:
+        dict: Object name -> channels now served from images (empty if nothing was baked).
+    """
+    scene = scene or bpy.context.scene
+    invalid = [channel for channel in channels if channel not in BAKE_CHANNELS]
+    if invalid:
+        raise ValueError(f"Invalid bake channel(s) {invalid}. Must be among {tuple(BAKE_CHANNELS)}.")
+    objects = list(scene.objects) if objects is None else list(objects)
+    cache = DiskCache(cache_dir, max_bytes=TEXTURE_CACHE_MAX_BYTES, suffix=".png")
+
+    report: Dict[str, List[str]] = {}
+    baked = loaded = 0
+    with _cycles_bake_settings(scene, samples, margin):
+        for obj in objects:
+            if obj.type != 'MESH' or len(obj.material_slots) != 1:
+                continue
+            mat = obj.material_slots[0].material
+            spec = material_spec(mat)
+            wanted = [channel for channel in bakeable_channels(spec) if channel in channels]
+            if not wanted:
+                continue
+            try:
+                images = {}
+                for channel in wanted:
+                    key = texture_bake_key(obj, spec, channel, resolution, samples, margin)
+                    if key is None:
+                        break
+                    path = cache.get(key)
+                    if path is None:
+                        path = cache.put(key, lambda tmp_path: _bake_channel(
+                            obj, spec, channel, resolution, margin, tmp_path))
+                        baked += 1
+                    else:
+                        loaded += 1
+                    if path is None:
+                        break
+                    images[channel] = path
+                if len(images) != len(wanted):
+                    if verbose:
+                        print(f"Texture bake skipped for '{obj.name}' (no UV map or the bake produced no image).")
+                    continue
+
+                baked_mat = get_material(f"{mat.name}_Baked", baked_material_spec(spec, images))
+                _pack_images(baked_mat)
+                obj.material_slots[0].material = baked_mat
+                obj[BAKED_FROM_PROP] = mat.name
+                report[obj.name] = wanted
+            except Exception as e:
+                print(f"Failed to bake textures of '{obj.name}': {e}")
+
+    if verbose:
+        print(f"Procedural textures: {len(report)} object(s), {baked} channel(s) baked, {loaded} from cache.")
+    return report
+
+
+def restore_procedural_materials(objects: Optional[Sequence[bpy.types.Object]] = None) -> int:
+    """
+    Puts back the procedural materials replaced by bake_procedural_textures().
+
+    Args:
+        objects (list, optional): Objects to restore. Defaults to every object in the scene.
+
+    Returns:
+        int: Number of objects restored.
+    """
+    objects = list(bpy.context.scene.objects) if objects is None else list(objects)
+    restored = 0
+    for obj in objects:
+        name = obj.get(BAKED_FROM_PROP)
+        mat = bpy.data.materials.get(name) if name else None
+        if mat is None or not obj.material_slots:
+            continue
+        obj.material_slots[0].material = mat
+        del obj[BAKED_FROM_PROP]
+        restored += 1
+    return restored
@@ -0,0 +1,21 @@
+"""
+Shared pytest setup for the Blender Global Functions and Automation tests.
+
+Run from Python/Blender with `python -m pytest tests`, inside Blender's Python or
+a plain Python. Without Blender, modules that import bpy at the top are loaded
+against the recording stand-in of the benchmark suite; the tests only exercise
+their NumPy, SQLite and planning code.
+"""
+
+import os
+import sys
+
+BLENDER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (BLENDER_DIR, os.path.join(BLENDER_DIR, "Automation")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+try:
+    import bpy  # type: ignore  # noqa: F401
+except ImportError:
+    sys.path.insert(0, os.path.join(BLENDER_DIR, "Benchmarks", "bpy_standin"))
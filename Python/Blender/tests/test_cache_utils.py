@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from Blender_Global_Functions.Cache_utils import DiskCache, module_sources, stable_hash
+
+
+def _write(text: str):
+    def writer(path: str) -> None:
+        with open(path, "w") as handle:
+            handle.write(text)
+    return writer
+
+
+def _age(cache: DiskCache, key: str, seconds_ago: float) -> None:
+    """Backdates the last use of an entry (mtime resolution would make the order flaky)."""
+    stamp = os.path.getmtime(cache.path_for(key)) - seconds_ago
+    os.utime(cache.path_for(key), (stamp, stamp))
+
+
+def test_put_is_atomic(tmp_path):
+    cache = DiskCache(str(tmp_path), suffix=".txt")
+
+    def writer(path: str) -> None:
+        assert path.endswith(".txt")
+        _write("partial")(path)
+        # Nothing is visible under the entry's name until the writer is done
+        assert cache.get("a") is None
+        assert cache.entries() == []
+
+    path = cache.put("a", writer)
+    assert path == cache.path_for("a") == cache.get("a")
+    assert open(path).read() == "partial"
+    assert os.listdir(str(tmp_path)) == ["a.txt"]
+
+
+def test_failed_writer_leaves_nothing_behind(tmp_path):
+    cache = DiskCache(str(tmp_path))
+
+    def broken(path: str) -> None:
+        _write("half")(path)
+        raise RuntimeError("crash while writing")
+
+    with pytest.raises(RuntimeError):
+        cache.put("a", broken)
+    assert cache.put("b", lambda path: None) is None
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_put_replaces_an_entry(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    cache.put("a", _write("old"))
+    cache.put("a", _write("new"))
+    assert open(cache.get("a")).read() == "new"
+    assert len(cache.entries()) == 1
+
+
+def test_evicts_least_recently_used_by_count(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=2)
+    cache.put("a", _write("1"))
+    cache.put("b", _write("2"))
+    _age(cache, "a", 20)
+    _age(cache, "b", 10)
+    cache.get("a")                          # 'a' is now the most recently used
+    cache.put("c", _write("3"))
+    assert sorted(entry.key for entry in cache.entries()) == ["a", "c"]
+
+
+def test_evicts_by_size_but_keeps_the_new_entry(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.put("a", _write("x" * 6))
+    _age(cache, "a", 10)
+    cache.put("b", _write("y" * 6))
+    assert [entry.key for entry in cache.entries()] == ["b"]
+    cache.put("big", _write("z" * 50))     # larger than the cap on its own
+    assert [entry.key for entry in cache.entries()] == ["big"]
+    assert cache.total_bytes() == 50
+
+
+def test_invalidate_and_clear(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    for key in "abc":
+        cache.put(key, _write(key))
+    assert cache.invalidate("a") and not cache.invalidate("a")
+    assert cache.clear() == 2
+    assert cache.entries() == []
+
+
+def test_stable_hash_is_order_independent_for_dicts():
+    assert stable_hash({"a": 1, "b": (1.0, 2.0)}) == stable_hash({"b": [1.0, 2.0], "a": 1})
+    assert stable_hash({"a": 1}) != stable_hash({"a": 2})
+
+
+def test_module_sources_follow_only_the_code_used():
+    from Blender_Global_Functions.Add_donut_function import add_donut
+    from Blender_Global_Functions.Render_animation_function import render_animation
+
+    donut = {os.path.basename(path) for path in module_sources([add_donut])}
+    assert {"Add_donut_function.py", "Donut_mesh_builder.py", "Cache_utils.py"} <= donut
+    assert not donut & {"Render_sequence.py", "Stream_encoder.py", "Render_worker.py"}
+
+    render = {os.path.basename(path) for path in module_sources([render_animation])}
+    assert {"Render_sequence.py", "Stream_encoder.py"} <= render
+    assert "Add_donut_function.py" not in render
+
+
+def test_module_sources_of_a_script_function_use_what_it_calls():
+    from Blender_Global_Functions.Add_donut_function import add_donut
+
+    def build():
+        return add_donut()
+
+    assert module_sources([build]) == module_sources([add_donut])
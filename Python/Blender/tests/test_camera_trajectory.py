@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+import pytest
+
+from Blender_Global_Functions.Camera_trajectory import ease, sample_path
+
+ORBIT = {"type": "orbit", "center": (0, 0, 1), "radius": 6, "height": 2,
+         "start_angle": -90, "end_angle": 0, "frames": 60, "ease": "ease_in"}
+THROUGH = {"type": "through", "center": (0, 0, 1), "direction": (-1, 0, 0),
+           "distance": 6, "frames": 120, "ease": "slowmo", "slowmo": 3, "roll": 360}
+
+
+def _view_directions(matrices: np.ndarray) -> np.ndarray:
+    return -matrices[:, :3, 2]
+
+
+def test_segments_share_their_boundary_frame():
+    trajectory = sample_path([ORBIT, THROUGH], frame_start=5)
+    assert len(trajectory.frames) == 60 + 120 + 1
+    assert trajectory.frames[0] == 5 and np.all(np.diff(trajectory.frames) == 1)
+    assert trajectory.locations.shape == (181, 3)
+    assert trajectory.matrices.shape == (181, 4, 4)
+
+
+def test_orbit_follows_the_circle_and_looks_at_the_center():
+    trajectory = sample_path([ORBIT])
+    center = np.array([0.0, 0.0, 1.0])
+    offsets = trajectory.locations - center
+    assert np.allclose(np.linalg.norm(offsets[:, :2], axis=1), 6.0)
+    assert np.allclose(offsets[:, 2], 2.0)
+    assert np.allclose(trajectory.locations[0], (0, -6, 3))
+    assert np.allclose(trajectory.locations[-1], (6, 0, 3))
+
+    to_center = center - trajectory.locations
+    to_center /= np.linalg.norm(to_center, axis=1, keepdims=True)
+    assert np.allclose(_view_directions(trajectory.matrices), to_center)
+
+
+def test_matrices_are_rotations_with_the_location():
+    trajectory = sample_path([ORBIT, THROUGH])
+    rotations = trajectory.matrices[:, :3, :3]
+    identity = np.broadcast_to(np.eye(3), rotations.shape)
+    assert np.allclose(np.transpose(rotations, (0, 2, 1)) @ rotations, identity, atol=1e-9)
+    assert np.allclose(np.linalg.det(rotations), 1.0)
+    assert np.allclose(trajectory.matrices[:, :3, 3], trajectory.locations)
+    assert np.allclose(trajectory.matrices[:, 3], (0, 0, 0, 1))
+
+
+def test_through_looks_along_the_path_and_rolls():
+    trajectory = sample_path([ORBIT, THROUGH])
+    through = slice(61, None)
+    assert np.allclose(_view_directions(trajectory.matrices[through]), (-1, 0, 0))
+    assert np.allclose(trajectory.locations[-1], (-6, 0, 1))
+    # Roll starts where the orbit left it (0) and ends at 360 degrees
+    assert trajectory.roll[60] == 0.0
+    assert math.isclose(trajectory.roll[-1], 2 * math.pi)
+
+
+def test_dolly_and_hold_continue_from_the_previous_segment():
+    path = [{"type": "dolly", "start": (0, 0, 0), "end": (10, 0, 0), "frames": 10, "target": (10, 10, 0)},
+            {"type": "hold", "frames": 5},
+            {"type": "dolly", "end": (10, 5, 0), "frames": 5}]
+    trajectory = sample_path(path)
+    assert np.allclose(trajectory.locations[:11, 0], np.arange(11))
+    assert np.allclose(trajectory.locations[10:16], (10, 0, 0))
+    assert np.allclose(trajectory.locations[-1], (10, 5, 0))
+    # The hold has no tangent: it keeps the last view direction instead of a degenerate one
+    assert np.all(np.isfinite(trajectory.matrices))
+
+
+@pytest.mark.parametrize("curve", ["linear", "ease_in", "ease_out", "ease_in_out", "slowmo"])
+def test_ease_curves_are_monotonic_from_0_to_1(curve):
+    progress = ease(np.linspace(0, 1, 101), curve, 3.0)
+    assert progress[0] == pytest.approx(0.0) and progress[-1] == pytest.approx(1.0)
+    assert np.all(np.diff(progress) >= 0)
+
+
+@pytest.mark.parametrize("path, message", [
+    ([], "at least one segment"),
+    ([{"type": "orbit", "center": (0, 0, 0), "radius": 1, "frames": 0}], "at least one frame"),
+    ([{"type": "spiral", "frames": 10}], "Invalid segment type"),
+    ([{"type": "dolly", "end": (1, 0, 0), "frames": 10}], "needs a 'start'"),
+])
+def test_invalid_paths_are_refused(path, message):
+    with pytest.raises(ValueError, match=message):
+        sample_path(path)
@@ -0,0 +1,54 @@
+import bpy  # type: ignore
+import pytest
+
+from Blender_Global_Functions.Blender_clear_scene_function import clear_scene
+from Blender_Global_Functions.Scene_reset import baseline, set_baseline
+
+
+@pytest.fixture
+def fresh_file():
+    if not hasattr(bpy, "reset"):
+        pytest.skip("needs the bpy stand-in")
+    bpy.reset()
+    set_baseline(None)
+    yield
+    set_baseline(None)
+
+
+def _add_object(name: str, collection=None):
+    obj = bpy.data.objects.new(name, bpy.data.meshes.new(name))
+    (collection or bpy.context.scene.collection).objects.link(obj)
+    return obj
+
+
+def test_first_clear_registers_the_cleared_scene(fresh_file):
+    _add_object("Cube")
+    clear_scene(verbose=False)
+    assert len(bpy.data.objects) == 0
+    assert baseline() is not None and baseline().created() == []
+
+
+def test_later_clears_remove_only_what_was_created_since(fresh_file):
+    clear_scene(verbose=False)
+    sprinkles = bpy.data.collections.new("Donut_Sprinkles")
+    bpy.context.scene.collection.children.link(sprinkles)
+    _add_object("Donut")
+    _add_object("Sprinkle", sprinkles)
+    bpy.data.materials.new("SprinkleMaterial")
+
+    clear_scene(verbose=False)
+    for kind in ("objects", "meshes", "materials", "collections"):
+        assert len(getattr(bpy.data, kind)) == 0, kind
+    # No emptied pipeline collection is left behind to rename the next build's
+    assert "Donut_Sprinkles" not in bpy.context.scene.collection.children
+
+
+def test_incomplete_baseline_falls_back_to_a_full_clear(fresh_file):
+    kept = _add_object("Kept")
+    clear_scene(verbose=False, remove_orphans=False)  # full clear, baseline has Kept's mesh
+    bpy.data.meshes.remove(kept.data)
+    _add_object("Added")
+
+    clear_scene(verbose=False)
+    assert len(bpy.data.objects) == 0
+    assert baseline().missing() == {}
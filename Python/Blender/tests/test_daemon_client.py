@@ -0,0 +1,35 @@
+import socket
+
+import pytest
+
+from Daemon_client import parse_address
+
+
+@pytest.mark.parametrize("address, host", [("127.0.0.1:8765", "127.0.0.1"), (":8765", "127.0.0.1"),
+                                           ("localhost:8765", "localhost"), ("127.0.0.2:8765", "127.0.0.2")])
+def test_loopback_tcp_addresses(address, host):
+    assert parse_address(address) == (socket.AF_INET, (host, 8765))
+
+
+@pytest.mark.parametrize("address", ["0.0.0.0:8765", "192.168.1.20:8765", "render-box:8765"])
+def test_non_loopback_tcp_addresses_are_refused(address):
+    with pytest.raises(ValueError, match="non-loopback"):
+        parse_address(address)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no Unix sockets")
+def test_listen_does_not_replace_a_regular_file(tmp_path):
+    from Blender_daemon import BlenderDaemon
+
+    path = tmp_path / "daemon.sock"
+    path.write_text("not a socket")
+    with pytest.raises(FileExistsError):
+        BlenderDaemon(str(path))._listen()
+    assert path.read_text() == "not a socket"
+
+    path.unlink()
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    server = BlenderDaemon(str(path))._listen()  # a stale socket is replaced
+    server.close()
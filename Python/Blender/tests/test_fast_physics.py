@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pytest
+
+from Blender_Global_Functions.Fast_physics import simulate_drop
+
+G = 9.81
+
+
+def _impact_speeds(gap: float, impacts: np.ndarray) -> np.ndarray:
+    """Undamped impact speeds: the drop's, then those implied by each bounce's flight time."""
+    return np.concatenate([[math.sqrt(2 * G * gap)], G * np.diff(impacts) / 2])
+
+
+def test_first_impact_is_free_fall():
+    result = simulate_drop(2.0, np.linspace(0, 5, 121), linear_damping=0.0)
+    assert result.impacts[0] == pytest.approx(math.sqrt(2 * 2.0 / G))
+    times = np.linspace(0, result.impacts[0], 20)
+    assert np.allclose(simulate_drop(2.0, times, linear_damping=0.0).heights, 2.0 - 0.5 * G * times ** 2)
+
+
+@pytest.mark.parametrize("restitution", [0.3, 0.49, 0.8])
+def test_each_rebound_is_restitution_times_the_impact_speed(restitution):
+    result = simulate_drop(1.5, np.linspace(0, 10, 241), restitution=restitution, linear_damping=0.0,
+                           rest_speed=0.01)
+    speeds = _impact_speeds(1.5, result.impacts)
+    assert len(speeds) > 3
+    assert np.allclose(speeds[1:] / speeds[:-1], restitution)
+
+
+def test_bounce_apexes_decay_with_restitution_squared():
+    times = np.linspace(0, 4, 4001)
+    result = simulate_drop(1.0, times, restitution=0.5, linear_damping=0.0)
+    impacts = result.impacts
+    apexes = [result.heights[(times > a) & (times < b)].max() for a, b in zip(impacts[:3], impacts[1:4])]
+    assert np.allclose(apexes, [0.25, 0.0625, 0.015625], rtol=1e-3)
+
+
+def test_body_rests_once_a_rebound_would_be_slower_than_rest_speed():
+    times = np.linspace(0, 10, 241)
+    result = simulate_drop(1.0, times, restitution=0.5, linear_damping=0.0, rest_speed=0.2)
+    # Impact speeds sqrt(2g) * 0.5^k; the first rebound below 0.2 m/s ends the motion
+    first_slow = next(k for k in range(64) if math.sqrt(2 * G) * 0.5 ** (k + 1) < 0.2)
+    assert len(result.impacts) == first_slow + 1
+    assert math.isfinite(result.rest_time)
+    assert result.rest_time == result.impacts[-1]
+    assert np.all(result.heights[times >= result.rest_time] == 0.0)
+    assert np.all(result.heights[times < result.impacts[0]] > 0.0)
+
+
+def test_no_rest_within_the_time_range():
+    result = simulate_drop(5.0, np.linspace(0, 1.5, 37), restitution=0.9, linear_damping=0.0)
+    assert result.rest_time == math.inf
+    assert len(result.impacts) == 2           # the last one lies past the range
+
+
+def test_max_bounces_puts_the_body_to_rest():
+    result = simulate_drop(1.0, np.linspace(0, 10, 241), restitution=0.9, linear_damping=0.0,
+                           rest_speed=0.0, max_bounces=4)
+    assert len(result.impacts) == 4
+    assert result.rest_time == result.impacts[-1]
+
+
+def test_zero_restitution_rests_at_the_first_impact():
+    times = np.linspace(0, 2, 49)
+    result = simulate_drop(1.0, times, restitution=0.0)
+    assert len(result.impacts) == 1 and result.rest_time == result.impacts[0]
+    assert np.all(result.heights[times >= result.rest_time] == 0.0)
+
+
+def test_damping_slows_the_fall_and_never_goes_below_the_plane():
+    times = np.linspace(0, 6, 601)
+    free = simulate_drop(3.0, times, linear_damping=0.0)
+    damped = simulate_drop(3.0, times, linear_damping=0.3)
+    assert damped.impacts[0] > free.impacts[0]
+    assert np.all(damped.heights >= 0.0) and np.all(np.isfinite(damped.heights))
+    assert np.all(damped.heights[times <= free.impacts[0]] >= free.heights[times <= free.impacts[0]] - 1e-12)
@@ -0,0 +1,88 @@
+import bpy  # type: ignore
+import numpy as np
+import pytest
+
+from Blender_Global_Functions.Keyframe_utils import INTERPOLATION_VALUES, matrices_to_loc_quat, write_keyframes
+
+
+def _quat_to_matrix(q: np.ndarray) -> np.ndarray:
+    w, x, y, z = q / np.linalg.norm(q)
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+        [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+        [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+def _transforms(quats, locations, scale=(1.0, 1.0, 1.0)) -> np.ndarray:
+    matrices = np.zeros((len(quats), 4, 4))
+    for i, (q, loc) in enumerate(zip(quats, locations)):
+        matrices[i, :3, :3] = _quat_to_matrix(np.asarray(q, dtype=float)) * np.asarray(scale)
+        matrices[i, :3, 3] = loc
+        matrices[i, 3, 3] = 1.0
+    return matrices
+
+
+def test_matrices_to_loc_quat_recovers_rotation_and_location():
+    rng = np.random.default_rng(5)
+    quats = rng.normal(size=(50, 4))
+    quats /= np.linalg.norm(quats, axis=1, keepdims=True)
+    locations = rng.normal(size=(50, 3))
+    # Scale is divided out of the rotation columns
+    loc, out = matrices_to_loc_quat(_transforms(quats, locations, scale=(2.0, 0.5, 3.0)))
+    assert np.allclose(loc, locations)
+    assert np.allclose(np.linalg.norm(out, axis=1), 1.0)
+    # q and -q are the same rotation
+    assert np.allclose(np.abs(np.sum(out * quats, axis=1)), 1.0)
+
+
+def test_matrices_to_loc_quat_keeps_signs_continuous():
+    # A full turn about Z: the quaternion's w passes through 0 and would flip sign
+    angles = np.linspace(0, 2 * np.pi, 73)
+    quats = np.stack([np.cos(angles / 2), np.zeros_like(angles), np.zeros_like(angles), np.sin(angles / 2)], axis=1)
+    _, out = matrices_to_loc_quat(_transforms(quats, np.zeros((len(quats), 3))))
+    assert np.all(np.sum(out[1:] * out[:-1], axis=1) > 0)
+    assert np.allclose(out, quats * np.sign(out[0, 0]))
+
+
+def test_matrices_to_loc_quat_single_matrix():
+    loc, quat = matrices_to_loc_quat(np.eye(4))
+    assert np.allclose(loc, 0) and np.allclose(np.abs(quat), (1, 0, 0, 0))
+
+
+@pytest.fixture
+def animated_object():
+    if not hasattr(bpy, "reset"):
+        pytest.skip("needs the bpy stand-in")
+    bpy.reset()
+    return bpy.data.objects.new("Camera", None)
+
+
+def _interpolations(fcurve) -> list:
+    modes = np.empty(len(fcurve.keyframe_points), dtype=np.int32)
+    fcurve.keyframe_points.foreach_get("interpolation", modes)
+    return modes.tolist()
+
+
+def test_write_keyframes_sets_values_and_interpolation(animated_object):
+    frames = np.arange(1, 11)
+    values = np.stack([frames, frames * 2, frames * 3], axis=1)
+    fcurves = write_keyframes(animated_object, "location", frames, values, interpolation='CONSTANT')
+    assert len(fcurves) == 3
+    for index, fcurve in enumerate(fcurves):
+        co = np.empty(len(frames) * 2, dtype=np.float32)
+        fcurve.keyframe_points.foreach_get("co", co)
+        assert np.allclose(co.reshape(-1, 2), np.stack([frames, values[:, index]], axis=1))
+        assert _interpolations(fcurve) == [INTERPOLATION_VALUES['CONSTANT']] * len(frames)
+
+
+def test_appended_keyframes_leave_existing_interpolation(animated_object):
+    write_keyframes(animated_object, "eval_time", [1, 2], [0.0, 1.0], interpolation='LINEAR')
+    fcurve, = write_keyframes(animated_object, "eval_time", [3, 4], [2.0, 3.0], interpolation='BEZIER',
+                              replace=False)
+    assert _interpolations(fcurve) == [1, 1, 2, 2]
+
+
+def test_write_keyframes_refuses_unknown_interpolation(animated_object):
+    with pytest.raises(ValueError, match="Invalid interpolation"):
+        write_keyframes(animated_object, "location", [1], [[0.0, 0.0, 0.0]], interpolation='SMOOTH')
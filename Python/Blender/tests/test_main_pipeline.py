@@ -0,0 +1,33 @@
+import pytest
+
+import main_AutomateGraphicDesignTools as pipeline
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def stage(name, result=True):
+        def call(*args, **kwargs):
+            calls.append((name, kwargs))
+            return result
+        return call
+
+    monkeypatch.setattr(pipeline, "build_scene", stage("build_scene", {}))
+    monkeypatch.setattr(pipeline, "set_render_settings", stage("set_render_settings", None))
+    monkeypatch.setattr(pipeline, "bake_physics", stage("bake_physics"))
+    monkeypatch.setattr(pipeline, "auto_tune_samples", stage("auto_tune_samples", 64))
+    monkeypatch.setattr(pipeline, "render_animation", stage("render_animation"))
+    return calls
+
+
+def test_samples_are_auto_tuned_on_the_baked_scene(calls):
+    assert pipeline.main("/tmp/out", {"render_settings": {"profile": "draft", "seconds_per_frame": 2.0}})
+    assert [name for name, _ in calls] == ["build_scene", "set_render_settings", "bake_physics",
+                                           "auto_tune_samples", "render_animation"]
+    assert calls[1][1] == {"profile": "draft"}
+
+
+def test_no_auto_tuning_without_a_budget(calls):
+    assert pipeline.main("/tmp/out", {})
+    assert "auto_tune_samples" not in [name for name, _ in calls]
@@ -0,0 +1,72 @@
+import bpy  # type: ignore
+import pytest
+
+import Blender_Global_Functions.Material_library as material_library
+from Blender_Global_Functions.Material_library import (
+    SPEC_HASH_PROP, build_node_tree, cached_material_names, clear_material_cache, get_material, material_spec,
+    principled_spec, procedural_noise_spec)
+
+COLORS = [(1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1), (1, 1, 0, 1), (1, 0, 1, 1), (0, 1, 1, 1), (1, 1, 1, 1)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_file():
+    if not hasattr(bpy, "reset"):
+        pytest.skip("needs the bpy stand-in")
+    bpy.reset()
+    clear_material_cache()
+    yield
+    clear_material_cache()
+
+
+def test_same_spec_returns_the_same_material():
+    first = get_material("SprinkleMaterial", principled_spec((1, 0, 0, 1), roughness=0.35))
+    second = get_material("OtherName", principled_spec((1, 0, 0, 1), roughness=0.35))
+    assert second is first
+    assert len(bpy.data.materials) == 1
+    assert material_spec(first)["nodes"]["bsdf"]["inputs"]["Roughness"] == 0.35
+
+
+def test_each_distinct_spec_gets_one_material():
+    for _ in range(3):
+        materials = [get_material("SprinkleMaterial", principled_spec(color, roughness=0.35)) for color in COLORS]
+    assert len({mat.name for mat in materials}) == 7
+    assert len(bpy.data.materials) == 7
+    assert sorted(cached_material_names()) == sorted(mat.name for mat in materials)
+
+
+def test_deleted_material_is_compiled_again():
+    spec = principled_spec((0, 0, 1, 1))
+    mat = get_material("Blue", spec)
+    spec_hash = mat[SPEC_HASH_PROP]
+    bpy.data.materials.remove(mat)
+    assert material_library._find_cached(spec_hash) is None
+    assert spec_hash not in material_library._MATERIAL_CACHE
+
+    again = get_material("Blue", spec)
+    assert again is not mat and again[SPEC_HASH_PROP] == spec_hash
+    assert len(bpy.data.materials) == 1
+
+
+def test_materials_of_an_earlier_session_are_found_by_their_hash():
+    mat = get_material("Blue", principled_spec((0, 0, 1, 1)))
+    clear_material_cache()  # e.g. a new session that opened the .blend
+    assert material_library._find_cached(mat[SPEC_HASH_PROP]) is mat
+    assert get_material("Blue", principled_spec((0, 0, 1, 1))) is mat
+
+
+def test_links_to_missing_sockets_are_skipped(monkeypatch):
+    # Version drift: a Blender whose Bump node has no "Height" input
+    real_socket = material_library._socket
+
+    def socket(sockets, name):
+        return None if name == "Height" else real_socket(sockets, name)
+
+    monkeypatch.setattr(material_library, "_socket", socket)
+    spec = procedural_noise_spec([(0.2, 0.1, 0.05, 1), (0.5, 0.3, 0.1, 1)], 12.0, 0.3, 0.6)
+    mat = bpy.data.materials.new("Bread")
+    build_node_tree(mat, spec)
+    linked = {(link.from_socket.name, link.to_socket.name) for link in mat.node_tree.links}
+    assert len(linked) == len(spec["links"]) - 1
+    assert ("Fac", "Height") not in linked
+    assert ("BSDF", "Surface") in linked
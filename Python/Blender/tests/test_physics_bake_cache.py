@@ -0,0 +1,52 @@
+import bpy  # type: ignore
+import pytest
+
+from Blender_Global_Functions.Keyframe_utils import ensure_action
+from Blender_Global_Functions.Object_utils import ensure_rigidbody_world
+from Blender_Global_Functions.Physics_bake_cache import (
+    BAKE_KEY_PROP, REST_POSE_PROP, WORLD_ENABLED_PROP, disable_rigidbody_world, remove_cached_motion)
+
+
+@pytest.fixture
+def scene():
+    if not hasattr(bpy, "reset"):
+        pytest.skip("needs the bpy stand-in")
+    bpy.reset()
+    scene = bpy.context.scene
+    ensure_rigidbody_world(scene)
+    return scene
+
+
+def _replay(scene) -> bpy.types.Object:
+    """Marks an object's action like apply_physics_bake() and disables the world."""
+    obj = bpy.data.objects.new("Donut", None)
+    scene.collection.objects.link(obj)
+    action = ensure_action(obj, "DonutCachedPhysics")
+    action[BAKE_KEY_PROP] = "key"
+    action[REST_POSE_PROP] = {"location": [0, 0, 1], "rotation_mode": "XYZ",
+                              "rotation_euler": [0, 0, 0], "rotation_quaternion": [1, 0, 0, 0]}
+    disable_rigidbody_world(scene)
+    return obj
+
+
+def test_removing_a_replay_enables_the_world_again(scene):
+    obj = _replay(scene)
+    assert not scene.rigidbody_world.enabled
+    assert remove_cached_motion(scene) == 1
+    assert scene.rigidbody_world.enabled
+    assert obj.animation_data.action is None and tuple(obj.location) == (0, 0, 1)
+    assert WORLD_ENABLED_PROP not in scene
+
+
+def test_a_world_the_user_disabled_stays_disabled(scene):
+    scene.rigidbody_world.enabled = False
+    _replay(scene)
+    _replay(scene)  # replaying again keeps the state from before the first replay
+    assert remove_cached_motion(scene) == 2
+    assert not scene.rigidbody_world.enabled
+
+
+def test_without_a_replay_the_world_is_left_alone(scene):
+    scene.rigidbody_world.enabled = False
+    assert remove_cached_motion(scene) == 0
+    assert not scene.rigidbody_world.enabled
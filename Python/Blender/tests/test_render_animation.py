@@ -0,0 +1,31 @@
+import pytest
+
+import Blender_Global_Functions.Render_animation_function as render_animation_function
+from Blender_Global_Functions.Render_animation_function import render_animation
+
+
+@pytest.fixture
+def sharded_calls(monkeypatch):
+    calls = []
+
+    def render_sharded(*args, **kwargs):
+        calls.append(kwargs)
+        return "/tmp/movie.mp4"
+
+    monkeypatch.setattr(render_animation_function, "render_sharded", render_sharded)
+    return calls
+
+
+@pytest.mark.parametrize("resumable", [False, True])
+def test_only_resumable_renders_reuse_checkpointed_frames(sharded_calls, resumable):
+    assert render_animation(1, 10, "/tmp/out/", sharded=True, resumable=resumable, verbose=False)
+    assert sharded_calls[-1]["resume"] is resumable
+
+
+def test_streaming_and_resumable_cannot_be_combined(sharded_calls):
+    with pytest.raises(ValueError, match="resumable and streaming"):
+        render_animation(1, 10, "/tmp/out/", resumable=True, streaming=True, verbose=False)
+    assert sharded_calls == []
+
+    assert render_animation(1, 10, "/tmp/out/", streaming=True, verbose=False)
+    assert sharded_calls[-1]["streaming"] is True and sharded_calls[-1]["resume"] is False
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+import Render_job_queue
+from Render_job_queue import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+class _Clock:
+    """Stands in for the time module so lease expiry does not need sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(Render_job_queue, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(str(tmp_path / "jobs.sqlite"), lease_seconds=60.0)
+
+
+def _state(queue: JobQueue, job_id: int) -> str:
+    return next(row["state"] for row in queue.jobs() if row["id"] == job_id)
+
+
+def test_claim_by_priority_then_submission_order(queue):
+    low = queue.submit({"build": {}}, "/tmp/low/", priority=0)
+    first = queue.submit({"build": {}}, "/tmp/a/", priority=5)
+    second = queue.submit({"build": {}}, "/tmp/b/", priority=5)
+
+    claimed = [queue.claim("w")["id"] for _ in range(3)]
+    assert claimed == [first, second, low]
+    assert queue.claim("w") is None
+    job = queue.jobs(RUNNING)[0]
+    assert job["lease_owner"] == "w" and job["attempts"] == 1
+
+
+def test_a_job_is_leased_to_one_worker(queue):
+    job_id = queue.submit({}, "/tmp/a/")
+    assert queue.claim("w1")["id"] == job_id
+    assert queue.claim("w2") is None
+    assert queue.heartbeat(job_id, "w1")
+    assert not queue.heartbeat(job_id, "w2")
+
+
+def test_expired_lease_is_taken_over(queue, clock):
+    job_id = queue.submit({}, "/tmp/a/")
+    queue.claim("w1")
+    clock.now += 30
+    assert queue.heartbeat(job_id, "w1")           # renewed until now + 60
+    clock.now += 59
+    assert queue.claim("w2") is None
+    clock.now += 2
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["lease_owner"] == "w2" and job["attempts"] == 2
+    # The old worker lost the job and cannot finish it
+    assert not queue.heartbeat(job_id, "w1")
+    queue.complete(job_id, "w1")
+    assert _state(queue, job_id) == RUNNING
+    queue.complete(job_id, "w2")
+    assert _state(queue, job_id) == DONE
+
+
+def test_expired_lease_on_the_last_attempt_fails(queue, clock):
+    job_id = queue.submit({}, "/tmp/a/", max_attempts=1)
+    queue.claim("w1")
+    clock.now += 61
+    assert queue.claim("w2") is None
+    job = queue.jobs()[0]
+    assert job["state"] == FAILED and "lease expired" in job["last_error"]
+
+
+def test_failed_runs_are_retried_until_max_attempts(queue):
+    job_id = queue.submit({}, "/tmp/a/", max_attempts=2)
+    queue.claim("w")
+    assert queue.fail(job_id, "w", "crash 1") == QUEUED
+    assert queue.claim("w")["attempts"] == 2
+    assert queue.fail(job_id, "w", "crash 2") == FAILED
+    assert queue.claim("w") is None
+    assert queue.jobs(FAILED)[0]["last_error"] == "crash 2"
+
+
+def test_cancel(queue):
+    queued = queue.submit({}, "/tmp/a/")
+    running = queue.submit({}, "/tmp/b/")
+    done = queue.submit({}, "/tmp/c/", priority=-1)
+    queue.claim("w")                                  # 'queued' (lowest id first)
+    assert queue.cancel(queued)
+    assert queue.claim("w")["id"] == running
+    assert queue.cancel(running)
+    assert not queue.heartbeat(running, "w")          # the worker stops the run
+    assert queue.fail(running, "w", "killed") == CANCELLED
+    queue.complete(queue.claim("w")["id"], "w")
+    assert not queue.cancel(done)
+    assert [_state(queue, job) for job in (queued, running, done)] == [CANCELLED, CANCELLED, DONE]
+
+
+def test_params_round_trip(queue):
+    params = {"build": {"donut": {"major_radius": 1.5}}, "render": {"frame_end": 10}}
+    queue.submit(params, "/tmp/a/", name="big donut")
+    job = queue.claim("w")
+    assert job["name"] == "big donut" and job["output"] == "/tmp/a/"
+    assert json.loads(job["params"]) == params
@@ -0,0 +1,103 @@
+import os
+
+import bpy  # type: ignore
+import pytest
+
+import Scene_spec
+from Blender_Global_Functions.Cache_utils import module_sources
+from Blender_Global_Functions.Scene_reset import TRACKED_COLLECTIONS, set_baseline
+from Scene_spec import (DEFAULT_SPEC_PATH, STAGE_FUNCTIONS, SceneSpecExecutor, apply_overrides, load_scene_spec,
+                        stage_keys, stage_order)
+
+
+@pytest.fixture
+def spec():
+    return load_scene_spec(DEFAULT_SPEC_PATH)
+
+
+def _executor_after_run(spec: dict) -> SceneSpecExecutor:
+    """An executor that remembers every stage of 'spec' as executed."""
+    executor = SceneSpecExecutor(verbose=False)
+    executor.stages = {name: {"key": key} for name, key in stage_keys(spec).items()}
+    return executor
+
+
+def test_first_run_executes_every_stage_in_dependency_order(spec):
+    plan = SceneSpecExecutor(verbose=False).plan(spec)
+    assert plan == stage_order(spec)
+    assert plan.index("donut") < plan.index("icing_and_sprinkles") < plan.index("render")
+    assert plan.index("bake") < plan.index("render")
+
+
+def test_unchanged_spec_runs_nothing(spec):
+    assert _executor_after_run(spec).plan(spec) == []
+
+
+def test_light_change_only_relights_and_rerenders(spec):
+    executor = _executor_after_run(spec)
+    assert executor.plan(apply_overrides(spec, {"light": {"energy": 500}})) == ["light", "render"]
+
+
+def test_donut_change_flows_downstream(spec):
+    executor = _executor_after_run(spec)
+    plan = executor.plan(apply_overrides(spec, {"donut": {"major_radius": 1.2}}))
+    assert plan == ["donut", "icing_and_sprinkles", "fly_through", "bake", "render"]
+
+
+def test_stages_that_rebuild_upstream_rerun_their_dependencies(spec):
+    spec["stages"]["lod"] = {"function": "apply_level_of_detail", "inputs": {"camera_obj": "camera"}}
+    assert STAGE_FUNCTIONS["apply_level_of_detail"].rebuilds_upstream
+    executor = _executor_after_run(spec)
+    plan = executor.plan(apply_overrides(spec, {"lod": {"frame_start": 10}}))
+    assert plan == ["camera", "fly_through", "render", "lod"]
+
+
+def test_code_fingerprints_cover_only_the_modules_a_stage_uses(spec, monkeypatch):
+    light_modules = {os.path.basename(path) for path in module_sources([STAGE_FUNCTIONS["add_light"].call])}
+    assert "Add_light_function.py" in light_modules
+    assert "Frosting_and_sprinkles.py" not in light_modules
+
+    executor = _executor_after_run(spec)
+    fingerprint = Scene_spec.code_fingerprint
+
+    def edited_sprinkles(entry_points):
+        sources = module_sources(entry_points)
+        edited = any(path.endswith("Frosting_and_sprinkles.py") for path in sources)
+        return fingerprint(entry_points) + ("-edited" if edited else "")
+
+    monkeypatch.setattr(Scene_spec, "code_fingerprint", edited_sprinkles)
+    assert executor.plan(spec) == ["icing_and_sprinkles", "render"]
+
+
+def test_invalid_specs_are_refused(tmp_path):
+    path = tmp_path / "spec.json"
+    path.write_text('{"stages": {"a": {"function": "add_light", "after": ["b"]},'
+                    ' "b": {"function": "add_light", "after": ["a"]}}}')
+    with pytest.raises(ValueError, match="cycle"):
+        load_scene_spec(str(path))
+    path.write_text('{"stages": {"a": {"function": "add_teapot"}}}')
+    with pytest.raises(ValueError, match="invalid function"):
+        load_scene_spec(str(path))
+
+
+def _datablock_counts() -> dict:
+    return {kind: len(getattr(bpy.data, kind)) for kind in TRACKED_COLLECTIONS if hasattr(bpy.data, kind)}
+
+
+def test_rerunning_a_stage_removes_every_datablock_it_created():
+    if not hasattr(bpy, "reset"):
+        pytest.skip("needs the bpy stand-in")
+    bpy.reset()
+    set_baseline(None)
+    spec = {"stages": {"donut": {"function": "add_donut"},
+                       "icing_and_sprinkles": {"function": "add_icing_and_sprinkles", "params": {"seed": 1},
+                                               "inputs": {"donut_obj": "donut"}}}}
+    executor = SceneSpecExecutor(verbose=False)
+    assert executor.run(spec) == ["donut", "icing_and_sprinkles"]
+    counts = _datablock_counts()
+    assert {kind for kind, _ in executor.stages["icing_and_sprinkles"]["created"]} > {"objects", "meshes"}
+
+    for seed in (2, 3):
+        assert executor.run(spec, {"icing_and_sprinkles": {"seed": seed}}) == ["icing_and_sprinkles"]
+        assert _datablock_counts() == counts
+    set_baseline(None)
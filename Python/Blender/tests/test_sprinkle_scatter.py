@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from Blender_Global_Functions.Sprinkle_scatter import (
+    instancer_triangles, poisson_filter, scatter_on_surface, spacing_for_count, surface_area)
+
+
+def _grid_plane(size: float = 2.0, cells: int = 8):
+    """A flat square of 2 * cells^2 triangles in the XY plane, facing +Z."""
+    ticks = np.linspace(-size / 2, size / 2, cells + 1)
+    xs, ys = np.meshgrid(ticks, ticks)
+    verts = np.stack([xs.ravel(), ys.ravel(), np.zeros(xs.size)], axis=1)
+    tris = []
+    for row in range(cells):
+        for col in range(cells):
+            a = row * (cells + 1) + col
+            b, c, d = a + 1, a + cells + 1, a + cells + 2
+            tris += [(a, b, d), (a, d, c)]
+    return verts, np.array(tris)
+
+
+def _min_distance(points: np.ndarray) -> float:
+    d = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+    d[np.diag_indices(len(points))] = np.inf
+    return float(d.min())
+
+
+def test_poisson_filter_keeps_spacing_and_priority():
+    rng = np.random.default_rng(3)
+    points = rng.random((2000, 3))
+    keep = poisson_filter(points, 0.1)
+    assert len(keep) > 50
+    assert np.all(np.diff(keep) > 0)
+    assert keep[0] == 0                      # the first point always has priority
+    assert _min_distance(points[keep]) >= 0.1
+
+
+def test_poisson_filter_without_spacing_keeps_everything():
+    points = np.zeros((5, 3))
+    assert poisson_filter(points, 0.0).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_scatter_places_count_with_spacing_on_the_surface():
+    verts, tris = _grid_plane()
+    result = scatter_on_surface(verts, tris, 150, min_spacing=0.1, seed=1, lift=0.01)
+    assert result.points.shape == result.normals.shape == result.tangents.shape == (150, 3)
+    assert _min_distance(result.points) >= 0.1
+    assert np.allclose(result.points[:, 2], 0.01)
+    assert np.allclose(result.normals, [0.0, 0.0, 1.0])
+    assert np.allclose(np.einsum("ij,ij->i", result.normals, result.tangents), 0.0)
+    assert np.allclose(np.linalg.norm(result.tangents, axis=1), 1.0)
+
+
+def test_scatter_is_deterministic_per_seed():
+    verts, tris = _grid_plane()
+    a = scatter_on_surface(verts, tris, 100, min_spacing=0.1, seed=5)
+    b = scatter_on_surface(verts, tris, 100, min_spacing=0.1, seed=5)
+    c = scatter_on_surface(verts, tris, 100, min_spacing=0.1, seed=6)
+    assert np.array_equal(a.points, b.points) and np.array_equal(a.tangents, b.tangents)
+    assert not np.array_equal(a.points, c.points)
+
+
+def test_scatter_under_delivers_only_when_the_surface_is_full():
+    verts, tris = _grid_plane()
+    crowded = scatter_on_surface(verts, tris, 500, min_spacing=0.3, seed=2)
+    assert 0 < len(crowded.points) < 500
+    assert _min_distance(crowded.points) >= 0.3
+
+
+@pytest.mark.parametrize("seed", range(1, 9))
+def test_spacing_for_count_fits_the_count(seed):
+    verts, tris = _grid_plane()
+    spacing = spacing_for_count(surface_area(verts, tris), 400)
+    result = scatter_on_surface(verts, tris, 400, min_spacing=spacing, seed=seed)
+    assert len(result.points) == 400
+
+
+def test_surface_area_filters_by_normal():
+    verts, tris = _grid_plane()
+    assert surface_area(verts, tris) == pytest.approx(4.0)
+    assert surface_area(verts, tris[:, ::-1], min_normal_z=0.2) == 0.0
+
+
+def test_instancer_triangles_encode_the_frames():
+    points = np.array([[0.0, 0.0, 1.0], [2.0, 0.0, 0.0]])
+    normals = np.array([[0.0, 0.0, 1.0], [1.0, 0.0, 0.0]])
+    tangents = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    verts, faces = instancer_triangles(points, normals, tangents)
+    tri = verts[faces].astype(np.float64)
+    assert np.allclose(tri.mean(axis=1), points, atol=1e-6)
+    face_normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    face_normals /= np.linalg.norm(face_normals, axis=1)[:, None]
+    assert np.allclose(face_normals, normals, atol=1e-5)
+    first_edge = tri[:, 1] - tri[:, 0]
+    assert np.allclose(first_edge / np.linalg.norm(first_edge, axis=1)[:, None], tangents, atol=1e-5)